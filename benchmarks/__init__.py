@@ -0,0 +1,5 @@
+"""
+Benchmark suite for the biometric platform.
+
+Run ``python -m benchmarks --help`` from the project root for usage.
+"""
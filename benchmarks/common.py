@@ -0,0 +1,204 @@
+"""
+Shared helpers for benchmarks: timing, statistics, synthetic inputs and result files.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from pathlib import Path
+from random import Random
+from typing import Any, Callable, Iterable, Sequence
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def ensure_project_root_on_path() -> None:
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency distribution and throughput for one benchmark case."""
+
+    name: str
+    params: dict[str, Any]
+    iterations: int
+    items_per_iteration: int
+    latency_ms: dict[str, float]
+    throughput_per_s: float
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return result_key(self.name, self.params)
+
+
+def result_key(name: str, params: dict[str, Any]) -> str:
+    if not params:
+        return name
+    rendered = ",".join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{name}[{rendered}]"
+
+
+def summarize_latencies(samples_s: Sequence[float]) -> dict[str, float]:
+    """Summarize raw per-call latencies (seconds) into milliseconds statistics."""
+
+    values = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    if values.size == 0:
+        return {"mean": 0.0, "min": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    *,
+    params: dict[str, Any] | None = None,
+    iterations: int = 50,
+    warmup: int = 3,
+    items_per_iteration: int = 1,
+    min_time_s: float = 0.0,
+) -> BenchmarkResult:
+    """
+    Call ``fn`` repeatedly and record per-call latency.
+
+    ``items_per_iteration`` scales throughput for batched calls (e.g. a batch of 32 embeddings
+    counts as 32 items). When ``min_time_s`` is set, sampling continues past ``iterations``
+    until that much wall time has been spent.
+    """
+
+    for _ in range(warmup):
+        fn()
+
+    samples: list[float] = []
+    started = time.perf_counter()
+    while len(samples) < iterations or (time.perf_counter() - started) < min_time_s:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    total = sum(samples)
+    throughput = (len(samples) * items_per_iteration / total) if total > 0 else 0.0
+    return BenchmarkResult(
+        name=name,
+        params=dict(params or {}),
+        iterations=len(samples),
+        items_per_iteration=items_per_iteration,
+        latency_ms=summarize_latencies(samples),
+        throughput_per_s=throughput,
+    )
+
+
+def generate_dummy_face(size: int = 160, seed: int = 0) -> Image.Image:
+    """
+    Draw a cartoon face in the same way as ``scripts/smoke_test._generate_dummy_face``.
+
+    The seed jitters positions and colours so that a gallery of synthetic users does not
+    collapse onto identical images.
+    """
+
+    rng = Random(seed)
+    scale = size / 160.0
+
+    def jitter(value: float, spread: float = 4.0) -> float:
+        return (value + rng.uniform(-spread, spread)) * scale
+
+    background = tuple(200 + rng.randint(-20, 20) for _ in range(3))
+    skin = (255, 224 - rng.randint(0, 40), 189 - rng.randint(0, 60))
+    image = Image.new("RGB", (size, size), color=background)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((jitter(40), jitter(40), jitter(120), jitter(120)), fill=skin)
+    draw.ellipse((jitter(65, 2), jitter(70, 2), jitter(80, 2), jitter(85, 2)), fill=(0, 0, 0))
+    draw.ellipse((jitter(95, 2), jitter(70, 2), jitter(110, 2), jitter(85, 2)), fill=(0, 0, 0))
+    draw.arc((jitter(70, 2), jitter(95, 2), jitter(110, 2), jitter(125, 2)), start=0, end=180, fill=(150, 0, 0), width=3)
+    return image
+
+
+def encode_image(image: Image.Image, image_format: str = "PNG") -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def to_data_uri(data: bytes, image_format: str = "PNG") -> str:
+    encoded = base64.b64encode(data).decode("utf-8")
+    return f"data:image/{image_format.lower()};base64,{encoded}"
+
+
+def random_unit_vectors(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _git_revision() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def environment_metadata() -> dict[str, Any]:
+    metadata: dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "git_revision": _git_revision(),
+    }
+    try:
+        import torch
+
+        metadata["torch"] = torch.__version__
+        metadata["torch_threads"] = torch.get_num_threads()
+    except ImportError:  # pragma: no cover
+        metadata["torch"] = None
+    return metadata
+
+
+def write_results(path: str | Path, results: Iterable[BenchmarkResult], metadata: dict[str, Any]) -> Path:
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {"meta": metadata, "results": [asdict(result) for result in results]}
+    output.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+    return output
+
+
+def load_results(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Load a results file and index its entries by benchmark key."""
+
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    indexed: dict[str, dict[str, Any]] = {}
+    for entry in document.get("results", []):
+        indexed[result_key(entry["name"], entry.get("params", {}))] = entry
+    return indexed
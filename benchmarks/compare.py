@@ -0,0 +1,72 @@
+"""
+Compare two benchmark result files and flag regressions.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .common import load_results
+
+LATENCY_METRICS = ("p50", "p95", "p99")
+
+
+@dataclass(frozen=True)
+class Comparison:
+    key: str
+    metric: str
+    baseline: float
+    candidate: float
+
+    @property
+    def change(self) -> float:
+        """Relative change; positive means slower (latency) or faster (throughput)."""
+
+        if self.baseline == 0:
+            return 0.0
+        return (self.candidate - self.baseline) / self.baseline
+
+    def is_regression(self, tolerance: float) -> bool:
+        if self.metric == "throughput_per_s":
+            return self.change < -tolerance
+        return self.change > tolerance
+
+
+def compare_results(baseline_path: str | Path, candidate_path: str | Path) -> tuple[list[Comparison], list[str], list[str]]:
+    """
+    Pair up benchmark cases present in both files.
+
+    Returns:
+        (comparisons, keys only in baseline, keys only in candidate)
+    """
+
+    baseline = load_results(baseline_path)
+    candidate = load_results(candidate_path)
+    comparisons: list[Comparison] = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before: dict[str, Any] = baseline[key]
+        after: dict[str, Any] = candidate[key]
+        for metric in LATENCY_METRICS:
+            comparisons.append(Comparison(key, metric, before["latency_ms"][metric], after["latency_ms"][metric]))
+        comparisons.append(Comparison(key, "throughput_per_s", before["throughput_per_s"], after["throughput_per_s"]))
+    missing = sorted(baseline.keys() - candidate.keys())
+    added = sorted(candidate.keys() - baseline.keys())
+    return comparisons, missing, added
+
+
+def render_report(comparisons: list[Comparison], tolerance: float) -> tuple[str, int]:
+    """Render a plain-text table and return it with the number of regressions."""
+
+    lines = [f"{'benchmark':<72} {'metric':<17} {'baseline':>12} {'candidate':>12} {'change':>9}"]
+    regressions = 0
+    for item in comparisons:
+        flag = ""
+        if item.is_regression(tolerance):
+            flag = "  REGRESSION"
+            regressions += 1
+        lines.append(
+            f"{item.key:<72} {item.metric:<17} {item.baseline:>12.3f} {item.candidate:>12.3f} {item.change:>+8.1%}{flag}"
+        )
+    return "\n".join(lines), regressions
@@ -0,0 +1,156 @@
+"""
+Per-component benchmarks: image decode, face detection, embedding and gallery query.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+from typing import Any
+
+import numpy as np
+
+from .common import (
+    BenchmarkResult,
+    encode_image,
+    ensure_project_root_on_path,
+    generate_dummy_face,
+    measure,
+    random_unit_vectors,
+)
+
+ensure_project_root_on_path()
+
+from biometric_platform.core.utils import import_string  # noqa: E402
+
+# Rough per-user bookkeeping cost (dict entry, array header, id string) on top of the vector.
+_BYTES_PER_USER_OVERHEAD = 256
+
+
+def run_decode(options: argparse.Namespace) -> list[BenchmarkResult]:
+    """Time the data-URI -> RGB ndarray path used by ``FaceVerifier``."""
+
+    from biometric_platform.core.utils import image_from_bytes
+
+    results: list[BenchmarkResult] = []
+    for size in options.image_sizes:
+        for image_format in ("PNG", "JPEG"):
+            payload = base64.b64encode(encode_image(generate_dummy_face(size), image_format))
+
+            def decode() -> np.ndarray:
+                return image_from_bytes(base64.b64decode(payload, validate=True))
+
+            results.append(
+                measure(
+                    "decode.data_uri",
+                    decode,
+                    params={"format": image_format.lower(), "size": size},
+                    iterations=options.iterations,
+                    warmup=options.warmup,
+                )
+            )
+    return results
+
+
+def run_detect(options: argparse.Namespace) -> list[BenchmarkResult]:
+    """Time MTCNN detection + alignment; input size drives the image pyramid depth."""
+
+    from biometric_platform.models.face.detector import MTCNNDetector
+
+    detector = MTCNNDetector(image_size=160, device=options.device)
+    results: list[BenchmarkResult] = []
+    for size in options.image_sizes:
+        image = np.array(generate_dummy_face(size))
+        results.append(
+            measure(
+                "detect.mtcnn",
+                lambda image=image: detector.detect(image),
+                params={"size": size},
+                iterations=options.iterations,
+                warmup=options.warmup,
+            )
+        )
+    return results
+
+
+def _load_embedding_model(options: argparse.Namespace) -> Any:
+    if options.embedding_model:
+        return import_string(options.embedding_model)()
+
+    from biometric_platform.core.config import load_app_config
+    from biometric_platform.models import ModelManager
+
+    config = load_app_config(options.config)
+    return ModelManager().get_embedding_model("face", config.modalities["face"])
+
+
+def run_embedding(options: argparse.Namespace) -> list[BenchmarkResult]:
+    """Time batched embedding extraction (``embed_batch``) on aligned 160x160 crops for each batch size."""
+
+    model = _load_embedding_model(options)
+    crops = [np.array(generate_dummy_face(160, seed=seed)) for seed in range(max(options.batch_sizes))]
+    results: list[BenchmarkResult] = []
+    for batch_size in options.batch_sizes:
+        batch = crops[:batch_size]
+
+        def embed_batch(batch: list[np.ndarray] = batch) -> np.ndarray:
+            return model.embed_batch(batch)
+
+        results.append(
+            measure(
+                "embedding.forward",
+                embed_batch,
+                params={"batch_size": batch_size, "model": type(model).__name__},
+                iterations=max(3, options.iterations // batch_size),
+                warmup=1,
+                items_per_iteration=batch_size,
+            )
+        )
+    return results
+
+
+def run_store(options: argparse.Namespace) -> list[BenchmarkResult]:
+    """Time a 1:N ``query`` against galleries of increasing size."""
+
+    store_cls = import_string(options.store)
+    store_params = json.loads(options.store_params) if options.store_params else {}
+    budget_bytes = options.max_gallery_memory_gb * (1024**3)
+    probes = random_unit_vectors(16, options.dim, seed=1)
+    results: list[BenchmarkResult] = []
+    for gallery_size in options.gallery_sizes:
+        estimated = gallery_size * (options.dim * 4 + _BYTES_PER_USER_OVERHEAD)
+        if estimated > budget_bytes:
+            print(
+                f"[SKIP] store.query gallery_size={gallery_size}: needs ~{estimated / 1024**3:.1f} GiB "
+                f"(raise --max-gallery-memory-gb to run it)"
+            )
+            continue
+
+        store = store_cls(modality="face", **store_params)
+        chunk = 100_000
+        for start in range(0, gallery_size, chunk):
+            count = min(chunk, gallery_size - start)
+            vectors = random_unit_vectors(count, options.dim, seed=start + 2)
+            for offset in range(count):
+                store.add_embeddings(f"user_{start + offset:08d}", vectors[offset : offset + 1])
+
+        cursor = iter(range(1 << 62))
+
+        def query(store: Any = store) -> Any:
+            return store.query(probes[next(cursor) % len(probes)], top_k=options.top_k)
+
+        iterations = max(3, min(options.iterations, 2_000_000 // max(gallery_size, 1)))
+        results.append(
+            measure(
+                "store.query",
+                query,
+                params={"gallery_size": gallery_size, "dim": options.dim, "store": store_cls.__name__, **store_params},
+                iterations=iterations,
+                warmup=1,
+            )
+        )
+        if hasattr(store, "close"):
+            store.close()
+        del store
+    return results
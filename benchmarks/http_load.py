@@ -0,0 +1,188 @@
+"""
+End-to-end HTTP benchmark: closed-loop load generator against the FastAPI app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import yaml
+
+from .common import (
+    BenchmarkResult,
+    encode_image,
+    ensure_project_root_on_path,
+    generate_dummy_face,
+    summarize_latencies,
+    to_data_uri,
+)
+
+ensure_project_root_on_path()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _scratch_config(directory: Path) -> Iterator[None]:
+    """Point ``BIOMETRIC_CONFIG`` at a copy of the configuration that stores samples in ``directory``."""
+
+    previous = os.environ.get("BIOMETRIC_CONFIG")
+    config = yaml.safe_load(Path(previous or "configs/biometric.yaml").read_text(encoding="utf-8")) or {}
+    config.setdefault("storage", {})["dataset_root"] = str(directory / "raw")
+    scratch = directory / "biometric.yaml"
+    scratch.write_text(yaml.safe_dump(config), encoding="utf-8")
+    os.environ["BIOMETRIC_CONFIG"] = str(scratch)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("BIOMETRIC_CONFIG", None)
+        else:
+            os.environ["BIOMETRIC_CONFIG"] = previous
+
+
+@contextmanager
+def local_server(timeout_s: float = 120.0) -> Iterator[str]:
+    """
+    Serve ``biometric_platform.interfaces.api.app`` with uvicorn on a background thread.
+    Enrolled benchmark samples go to a temporary dataset root that is removed afterwards.
+    """
+
+    import uvicorn
+
+    with tempfile.TemporaryDirectory(prefix="biometric-bench-") as directory, _scratch_config(Path(directory)):
+        # Imported fresh so the app reads the scratch configuration.
+        sys.modules.pop("biometric_platform.interfaces.api.app", None)
+        app = importlib.import_module("biometric_platform.interfaces.api.app").app
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, name="benchmark-uvicorn", daemon=True)
+        thread.start()
+        deadline = time.monotonic() + timeout_s
+        while not server.started:
+            if not thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Local API server failed to start")
+            time.sleep(0.05)
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+
+def _post_json(url: str, body: dict[str, Any], timeout_s: float) -> None:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout_s) as response:
+        response.read()
+
+
+def _run_load(
+    name: str,
+    make_request: Any,
+    *,
+    concurrency: int,
+    duration_s: float,
+    warmup: int,
+    params: dict[str, Any],
+) -> BenchmarkResult:
+    for _ in range(warmup):
+        make_request()
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration_s
+
+    def worker() -> None:
+        nonlocal errors
+        local: list[float] = []
+        local_errors = 0
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                make_request()
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+                continue
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return BenchmarkResult(
+        name=name,
+        params=params,
+        iterations=len(latencies),
+        items_per_iteration=1,
+        latency_ms=summarize_latencies(latencies),
+        throughput_per_s=len(latencies) / elapsed if elapsed > 0 else 0.0,
+        extra={"errors": errors, "elapsed_s": elapsed},
+    )
+
+
+def run_http(options: argparse.Namespace) -> list[BenchmarkResult]:
+    """Benchmark enroll and verify requests at each configured concurrency level."""
+
+    with (local_server() if not options.base_url else _existing(options.base_url)) as base_url:
+        sample = to_data_uri(encode_image(generate_dummy_face(options.http_image_size)))
+        user_counter = itertools.count()
+        timeout_s = options.http_timeout
+        modality = options.modality
+
+        def enroll() -> None:
+            user_id = f"bench_user_{next(user_counter):08d}"
+            _post_json(f"{base_url}/biometric/{modality}/enroll", {"user_id": user_id, "samples": [sample]}, timeout_s)
+
+        def verify() -> None:
+            _post_json(f"{base_url}/biometric/{modality}/verify", {"sample": sample, "top_k": options.top_k}, timeout_s)
+
+        results: list[BenchmarkResult] = []
+        for concurrency in options.concurrency:
+            for endpoint, request_fn in (("enroll", enroll), ("verify", verify)):
+                results.append(
+                    _run_load(
+                        f"http.{endpoint}",
+                        request_fn,
+                        concurrency=concurrency,
+                        duration_s=options.duration,
+                        warmup=options.warmup,
+                        params={"concurrency": concurrency, "modality": modality},
+                    )
+                )
+        return results
+
+
+@contextmanager
+def _existing(base_url: str) -> Iterator[str]:
+    yield base_url.rstrip("/")
@@ -0,0 +1,123 @@
+"""
+Command line entry point for the benchmark suite.
+
+Examples:
+    python -m benchmarks run --suites decode,store --output bench/baseline.json
+    python -m benchmarks run --suites store --gallery-sizes 1000,100000,10000000 --max-gallery-memory-gb 64
+    python -m benchmarks run --suites store --store biometric_platform.infrastructure.ShardedEmbeddingStore --store-params '{"num_shards": 8}'
+    python -m benchmarks run --suites http --concurrency 1,8 --duration 20
+    python -m benchmarks compare bench/baseline.json bench/candidate.json --tolerance 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Callable
+
+from .common import BenchmarkResult, environment_metadata, write_results
+from .compare import compare_results, render_report
+
+
+def _suites() -> dict[str, Callable[[argparse.Namespace], list[BenchmarkResult]]]:
+    from . import components, http_load
+
+    return {
+        "decode": components.run_decode,
+        "detect": components.run_detect,
+        "embedding": components.run_embedding,
+        "store": components.run_store,
+        "http": http_load.run_http,
+    }
+
+
+DEFAULT_SUITES = "decode,detect,embedding,store"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _str_list(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Biometric platform benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run benchmark suites and write a JSON result file")
+    run.add_argument("--suites", type=_str_list, default=_str_list(DEFAULT_SUITES), help=f"Comma separated suites (default: {DEFAULT_SUITES}; also: http)")
+    run.add_argument("--output", type=str, default="bench_results.json", help="Where to write the JSON results")
+    run.add_argument("--config", type=str, default="configs/biometric.yaml", help="Application config used to build models")
+    run.add_argument("--iterations", type=int, default=50, help="Timed iterations per case")
+    run.add_argument("--warmup", type=int, default=3, help="Untimed warmup iterations per case")
+    run.add_argument("--device", type=str, default="cpu", help="Torch device for detector benchmarks")
+    run.add_argument("--image-sizes", type=_int_list, default=[160, 480, 960], help="Input image sizes for decode/detect")
+    run.add_argument("--batch-sizes", type=_int_list, default=[1, 2, 4, 8, 16, 32, 64], help="Embedding batch sizes")
+    run.add_argument("--embedding-model", type=str, default=None, help="Import path of an EmbeddingModel (default: configured face model)")
+    run.add_argument("--store", type=str, default="biometric_platform.infrastructure.InMemoryEmbeddingStore", help="Import path of the EmbeddingStore to benchmark")
+    run.add_argument("--store-params", type=str, default=None, help='JSON constructor params for the store, e.g. \'{"num_shards": 8}\'')
+    run.add_argument("--gallery-sizes", type=_int_list, default=[1_000, 10_000, 100_000], help="Gallery sizes for store.query (up to 10000000)")
+    run.add_argument("--dim", type=int, default=128, help="Embedding dimension for store benchmarks")
+    run.add_argument("--top-k", type=int, default=5, help="top_k for queries")
+    run.add_argument("--max-gallery-memory-gb", type=float, default=4.0, help="Skip gallery sizes estimated to exceed this much memory")
+    run.add_argument("--base-url", type=str, default=None, help="Benchmark an already running API instead of starting one locally")
+    run.add_argument("--modality", type=str, default="face", help="Modality for HTTP benchmarks")
+    run.add_argument("--concurrency", type=_int_list, default=[1, 4], help="Concurrent HTTP clients")
+    run.add_argument("--duration", type=float, default=10.0, help="Seconds of load per HTTP case")
+    run.add_argument("--http-image-size", type=int, default=320, help="Synthetic image size sent over HTTP")
+    run.add_argument("--http-timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+
+    compare = subparsers.add_parser("compare", help="Compare two result files and flag regressions")
+    compare.add_argument("baseline", type=str)
+    compare.add_argument("candidate", type=str)
+    compare.add_argument("--tolerance", type=float, default=0.10, help="Relative change treated as a regression (0.10 = 10%%)")
+    return parser
+
+
+def _print_result(result: BenchmarkResult) -> None:
+    latency = result.latency_ms
+    print(
+        f"{result.key:<72} p50={latency['p50']:9.3f}ms p95={latency['p95']:9.3f}ms "
+        f"p99={latency['p99']:9.3f}ms  {result.throughput_per_s:10.1f}/s"
+    )
+
+
+def run_command(args: argparse.Namespace) -> int:
+    suites = _suites()
+    unknown = [name for name in args.suites if name not in suites]
+    if unknown:
+        raise SystemExit(f"Unknown suites: {', '.join(unknown)}. Available: {', '.join(suites)}")
+
+    results: list[BenchmarkResult] = []
+    for name in args.suites:
+        print(f"== {name}")
+        for result in suites[name](args):
+            _print_result(result)
+            results.append(result)
+
+    metadata = environment_metadata()
+    metadata["suites"] = args.suites
+    output = write_results(args.output, results, metadata)
+    print(f"Results written to {output}")
+    return 0
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    comparisons, missing, added = compare_results(args.baseline, args.candidate)
+    report, regressions = render_report(comparisons, args.tolerance)
+    print(report)
+    for key in missing:
+        print(f"[MISSING] {key} only in baseline")
+    for key in added:
+        print(f"[NEW] {key} only in candidate")
+    print(f"{regressions} regression(s) beyond {args.tolerance:.0%} tolerance")
+    return 1 if regressions else 0
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        sys.exit(run_command(args))
+    sys.exit(compare_command(args))
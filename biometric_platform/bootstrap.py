@@ -5,7 +5,7 @@ Shared bootstrap utilities for configuring modality services.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Tuple
 
 from .core import (
     AppConfig,
@@ -17,6 +17,15 @@ from .core import (
 from .models import ModelManager
 
 
+def create_embedding_store(modality: str, store_cfg: dict[str, Any] | None) -> Any:
+    """Instantiate the embedding store described by a ``{class, params}`` mapping, if any."""
+
+    if not store_cfg or not store_cfg.get("class"):
+        return None
+    store_cls = import_string(store_cfg["class"])
+    return store_cls(modality=modality, **store_cfg.get("params", {}))
+
+
 def _create_service_factory(
     modality: str,
     modality_config: ModalityConfig,
@@ -29,13 +38,16 @@ def _create_service_factory(
     dataset_manager_instance = None
     if modality_config.dataset_manager_class:
         dataset_manager_cls = import_string(modality_config.dataset_manager_class)
-        dataset_manager_instance = dataset_manager_cls(dataset_root / modality)
+        dataset_kwargs = modality_config.extras.get("dataset_kwargs", {}) if modality_config.extras else {}
+        dataset_manager_instance = dataset_manager_cls(dataset_root / modality, **dataset_kwargs)
 
-    embedding_model = None
+    # Loaded eagerly so the first request does not pay for it; each request then asks the
+    # manager again, which is how a hot-swapped model reaches new services.
+    has_embedding_model = True
     try:
-        embedding_model = model_manager.get_embedding_model(modality, modality_config)
+        model_manager.get_embedding_model(modality, modality_config)
     except ValueError:
-        embedding_model = None
+        has_embedding_model = False
 
     detector_instance = None
     detector_cfg = modality_config.extras.get("detector") if modality_config.extras else None
@@ -46,30 +58,49 @@ def _create_service_factory(
             detector_cls = import_string(detector_class)
             detector_instance = detector_cls(**detector_params)
 
+    # One store per modality, shared by every service instance the factory creates.
+    store_cfg = modality_config.extras.get("embedding_store") if modality_config.extras else None
+    store_instance = create_embedding_store(modality, store_cfg)
+
     def factory():
         verifier_cls = import_string(modality_config.verifier_class)
         service_cls = import_string(modality_config.service_class)
 
         verifier_kwargs = {}
         if modality_config.extras:
-            verifier_kwargs = modality_config.extras.get("verifier_kwargs", {})
+            # Copied: the defaults below must not stick to the configuration.
+            verifier_kwargs = dict(modality_config.extras.get("verifier_kwargs", {}))
 
-        if embedding_model is not None:
-            verifier_kwargs.setdefault("embedder", embedding_model)
+        if has_embedding_model:
+            verifier_kwargs.setdefault("embedder", model_manager.get_embedding_model(modality, modality_config))
         if detector_instance is not None:
             verifier_kwargs.setdefault("detector", detector_instance)
+        if store_instance is not None:
+            verifier_kwargs.setdefault("embedding_store", store_instance)
 
         verifier = verifier_cls(threshold=modality_config.threshold, **verifier_kwargs)
 
         return service_cls(verifier, dataset_manager_instance)
 
+    if store_instance is not None:
+        # Refuses swaps that would leave the stored templates incomparable with new embeddings.
+        model_manager.set_gallery_check(modality, lambda: bool(store_instance.list_users()))
+    if has_embedding_model and hasattr(store_instance, "begin_migration"):
+        # Templates in a versioned store belong to the model that produced them: a swapped
+        # model is served once the gallery has been re-embedded with it.
+        model_manager.set_swap_handler(modality, lambda model, **options: factory().start_migration(model, **options))
+
     return factory
 
 
-def initialize_registry(config: AppConfig | None = None) -> Tuple[BiometricServiceRegistry, AppConfig]:
+def initialize_registry(
+    config: AppConfig | None = None, model_manager: ModelManager | None = None
+) -> Tuple[BiometricServiceRegistry, AppConfig]:
     """
     Build a service registry using the provided or default configuration.
 
+    Pass ``model_manager`` to keep a handle on it, e.g. to hot-swap models later.
+
     Returns:
         (registry, config)
     """
@@ -79,7 +110,7 @@ def initialize_registry(config: AppConfig | None = None) -> Tuple[BiometricServi
 
     registry = BiometricServiceRegistry()
     dataset_root = Path(config.storage.get("dataset_root", "datasets/raw"))
-    model_manager = ModelManager()
+    model_manager = model_manager or ModelManager()
 
     for modality, modality_config in config.modalities.items():
         if not modality_config.enabled:
@@ -90,3 +121,22 @@ def initialize_registry(config: AppConfig | None = None) -> Tuple[BiometricServi
 
     return registry, config
 
+
+DEFAULT_SHARD_STORE = {"class": "biometric_platform.infrastructure.ShardedEmbeddingStore", "params": {}}
+
+
+def initialize_shard_stores(config: AppConfig) -> dict[str, Any]:
+    """
+    Build the local embedding stores served by a node running in the ``shard`` API role.
+
+    Shard nodes only hold gallery partitions, so no models or dataset managers are loaded.
+    The store comes from ``api.shard_store`` and defaults to a local ``ShardedEmbeddingStore``.
+    """
+
+    store_cfg = config.api.get("shard_store") or DEFAULT_SHARD_STORE
+    return {
+        modality: create_embedding_store(modality, store_cfg)
+        for modality, modality_config in config.modalities.items()
+        if modality_config.enabled
+    }
+
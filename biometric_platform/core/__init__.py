@@ -3,26 +3,40 @@ Core abstractions, configuration management, and registries.
 """
 
 from .base import (
+    BatchQueryResult,
     BiometricService,
     BiometricVerifier,
     DatasetManager,
     MatchResult,
+    SampleQualityError,
     VerificationResult,
 )
 from .config import AppConfig, load_app_config, ModalityConfig
+from .evaluation import VerificationCurve, cmc_curve, suggest_threshold, verification_curve
+from .fusion import FusionSettings, FusionVerifier
 from .registry import BiometricServiceRegistry
+from .tracing import trace_stage
 from .utils import import_string
 
 __all__ = [
     "AppConfig",
+    "BatchQueryResult",
     "BiometricService",
     "BiometricServiceRegistry",
     "BiometricVerifier",
     "DatasetManager",
+    "FusionSettings",
+    "FusionVerifier",
     "MatchResult",
     "ModalityConfig",
+    "SampleQualityError",
+    "VerificationCurve",
     "VerificationResult",
+    "cmc_curve",
     "import_string",
     "load_app_config",
+    "suggest_threshold",
+    "trace_stage",
+    "verification_curve",
 ]
 
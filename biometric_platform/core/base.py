@@ -5,7 +5,9 @@ Abstract base classes and datamodel definitions for biometric modalities.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Iterable, Protocol, Sequence, Tuple
+from typing import Any, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -25,6 +27,153 @@ class VerificationResult:
     threshold: float
     modality: str
     decision: bool
+    partial: bool = False
+    # Set when the sample was rejected by a quality check before matching.
+    reason: str | None = None
+
+    @classmethod
+    def from_query(
+        cls, query_results: Iterable[Tuple[str, float, dict[str, Any]]], threshold: float, modality: str
+    ) -> "VerificationResult":
+        """Wrap a store's ``query`` results; the decision is the best score against ``threshold``."""
+
+        matches = [
+            MatchResult(user_id=user_id, score=score, metadata=metadata) for user_id, score, metadata in query_results
+        ]
+        # Scatter-gather stores flag results assembled without every gallery shard.
+        return cls(
+            matches=matches,
+            threshold=threshold,
+            modality=modality,
+            decision=bool(matches and matches[0].score >= threshold),
+            partial=bool(getattr(query_results, "partial", False)),
+        )
+
+
+@dataclass(frozen=True)
+class BatchQueryResult:
+    """
+    Top-k gallery matches of several probes as dense arrays.
+
+    Row ``i`` of ``scores``/``indices`` holds probe ``i``'s matches, best first. ``indices``
+    point into ``user_ids``/``num_samples`` (stores may pass their whole slot table rather
+    than copying out the matched users); slots beyond a probe's match count hold index -1
+    and score ``-inf``. ``result[i]`` gives the (user_id, score, metadata) list that
+    ``EmbeddingStore.query`` returns for probe ``i``.
+    """
+
+    scores: np.ndarray  # (probes, k) float32
+    indices: np.ndarray  # (probes, k) int64
+    user_ids: Sequence[str]
+    num_samples: np.ndarray  # per entry of ``user_ids``
+    metadata: Optional[Sequence[dict[str, Any]]] = None  # extra per-user metadata, e.g. the shard
+    missing_shards: Tuple[int, ...] = ()
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.missing_shards)
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+    def __getitem__(self, probe: int) -> List[Tuple[str, float, dict[str, Any]]]:
+        matches = []
+        for score, index in zip(self.scores[probe], self.indices[probe]):
+            if index < 0:
+                break
+            metadata = {"num_samples": int(self.num_samples[index])}
+            if self.metadata is not None:
+                metadata.update(self.metadata[index])
+            matches.append((self.user_ids[index], float(score), metadata))
+        return matches
+
+    def __iter__(self) -> Iterator[List[Tuple[str, float, dict[str, Any]]]]:
+        return (self[probe] for probe in range(len(self)))
+
+    def compact(self) -> "BatchQueryResult":
+        """Copy with ``user_ids``/``num_samples`` reduced to the users actually matched."""
+
+        return self.merge([self], self.scores.shape[1])
+
+    @classmethod
+    def empty(cls, probes: int, top_k: int = 0) -> "BatchQueryResult":
+        return cls(
+            scores=np.full((probes, top_k), -np.inf, dtype=np.float32),
+            indices=np.full((probes, top_k), -1, dtype=np.int64),
+            user_ids=[],
+            num_samples=np.zeros(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_matches(
+        cls, matches: Sequence[Sequence[Tuple[str, float, dict[str, Any]]]], missing_shards: Sequence[int] = ()
+    ) -> "BatchQueryResult":
+        """Pack per-probe match lists (as returned by ``query``)."""
+
+        k = max((len(row) for row in matches), default=0)
+        result = cls.empty(len(matches), k)
+        user_ids: List[str] = []
+        num_samples: List[int] = []
+        metadata: List[dict[str, Any]] = []
+        for probe, row in enumerate(matches):
+            for rank, (user_id, score, extra) in enumerate(row):
+                result.scores[probe, rank] = score
+                result.indices[probe, rank] = len(user_ids)
+                user_ids.append(user_id)
+                num_samples.append(int(extra.get("num_samples", 0)))
+                metadata.append({key: value for key, value in extra.items() if key != "num_samples"})
+        return cls(
+            scores=result.scores,
+            indices=result.indices,
+            user_ids=user_ids,
+            num_samples=np.asarray(num_samples, dtype=np.int64),
+            metadata=metadata if any(metadata) else None,
+            missing_shards=tuple(missing_shards),
+        )
+
+    @classmethod
+    def merge(
+        cls, results: Sequence["BatchQueryResult"], top_k: int, missing_shards: Sequence[int] = ()
+    ) -> "BatchQueryResult":
+        """Combine results for the same probes over disjoint galleries (shards); ties keep input order."""
+
+        if not results:
+            raise ValueError("Nothing to merge")
+        probes = len(results[0])
+        user_ids: List[str] = []
+        num_samples: List[np.ndarray] = []
+        metadata: List[dict[str, Any]] = []
+        score_columns: List[np.ndarray] = []
+        index_columns: List[np.ndarray] = []
+        for result in results:
+            # Re-index each input to the users it actually returned.
+            used = np.unique(result.indices[result.indices >= 0])
+            local = np.searchsorted(used, result.indices) + len(user_ids)
+            index_columns.append(np.where(result.indices >= 0, local, -1))
+            score_columns.append(result.scores)
+            user_ids.extend(result.user_ids[index] for index in used)
+            num_samples.append(np.asarray(result.num_samples)[used])
+            metadata.extend(result.metadata[index] if result.metadata is not None else {} for index in used)
+        scores = np.concatenate(score_columns, axis=1) if score_columns else np.zeros((probes, 0), np.float32)
+        indices = np.concatenate(index_columns, axis=1) if index_columns else np.zeros((probes, 0), np.int64)
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        return cls(
+            scores=np.take_along_axis(scores, order, axis=1).astype(np.float32),
+            indices=np.take_along_axis(indices, order, axis=1).astype(np.int64),
+            user_ids=user_ids,
+            num_samples=np.concatenate(num_samples) if num_samples else np.zeros(0, dtype=np.int64),
+            metadata=metadata if any(metadata) else None,
+            missing_shards=tuple(sorted(set(missing_shards).union(*(result.missing_shards for result in results)))),
+        )
+
+
+class SampleQualityError(ValueError):
+    """A sample was rejected before embedding; ``reason`` is a stable machine-readable code."""
+
+    def __init__(self, reason: str, detail: str = "") -> None:
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.detail = detail
 
 
 class DatasetManager(Protocol):
@@ -80,5 +229,9 @@ class EmbeddingStore(Protocol):
 
     def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]: ...
 
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult: ...
+
     def list_users(self) -> Sequence[str]: ...
 
+    def get_embeddings(self, user_id: str) -> Sequence[Any]: ...
+
@@ -32,6 +32,9 @@ class AppConfig(BaseModel):
     modalities: dict[str, ModalityConfig]
     logging: dict[str, Any] = Field(default_factory=dict)
     storage: dict[str, Any] = Field(default_factory=dict)
+    profiling: dict[str, Any] = Field(default_factory=dict)
+    api: dict[str, Any] = Field(default_factory=dict)
+    fusion: dict[str, Any] = Field(default_factory=dict)
 
     @field_validator("modalities")
     @classmethod
@@ -0,0 +1,183 @@
+"""
+Verification and identification metrics for choosing operating thresholds.
+
+Scores are similarities (higher means more alike) and a sample is accepted when its score
+is at least the threshold, matching how verifiers compare against ``threshold``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .utils import top_k_per_owner
+
+
+@dataclass(frozen=True)
+class VerificationCurve:
+    """
+    ROC/DET curve with one point per distinct score, strictest threshold first.
+
+    Point ``i`` accepts every score ``>= thresholds[i]``; point 0 (threshold ``inf``)
+    accepts nothing.
+    """
+
+    thresholds: np.ndarray
+    tar: np.ndarray  # genuine pairs accepted
+    far: np.ndarray  # impostor pairs accepted
+    positives: int
+    negatives: int
+
+    @property
+    def frr(self) -> np.ndarray:
+        return 1.0 - self.tar
+
+    def eer(self) -> Tuple[float, float]:
+        """``(equal error rate, threshold)``, interpolated where FAR crosses FRR."""
+
+        gap = self.far - self.frr  # rises from -1 to +1 along the curve
+        # gap[0] == -1 and gap[-1] == 1, so the crossing is strictly inside the curve.
+        crossing = int(np.searchsorted(gap, 0.0, side="left"))
+        before, after = crossing - 1, crossing
+        t = gap[before] / (gap[before] - gap[after])
+        rate = self.far[before] + t * (self.far[after] - self.far[before])
+        if before == 0:  # no finite threshold above the crossing
+            return float(rate), float(self.thresholds[after])
+        threshold = self.thresholds[before] + t * (self.thresholds[after] - self.thresholds[before])
+        return float(rate), float(threshold)
+
+    def operating_point(self, far: float) -> Tuple[float, float]:
+        """``(TAR, threshold)`` at the loosest threshold whose FAR does not exceed ``far``."""
+
+        index = int(np.searchsorted(self.far, far, side="right")) - 1
+        return float(self.tar[index]), float(self.thresholds[index])
+
+    def summary(self, fars: Sequence[float] = (1e-3, 1e-4)) -> Dict[str, Any]:
+        eer, eer_threshold = self.eer()
+        report: Dict[str, Any] = {
+            "genuine_pairs": self.positives,
+            "impostor_pairs": self.negatives,
+            "eer": eer,
+            "eer_threshold": eer_threshold,
+        }
+        for far in fars:
+            tar, threshold = self.operating_point(far)
+            # Fewer than 1/far impostors: the FAR can only be 0 there, so the point is optimistic.
+            report[f"tar@far={far:g}"] = {"tar": tar, "threshold": threshold, "resolved": self.negatives * far >= 1}
+        return report
+
+
+@dataclass(frozen=True)
+class ThresholdSuggestion:
+    threshold: float
+    tar: float
+    far: float
+    basis: str  # "far=<target>" or "eer" when there are too few impostor pairs
+
+
+@dataclass(frozen=True)
+class CMCCurve:
+    """Closed-set identification rate by rank; ``rates[k - 1]`` is the rank-k rate."""
+
+    rates: np.ndarray
+    probes: int  # probes whose identity is enrolled in the gallery
+    unmated_probes: int  # probes without a gallery mate (not counted in ``rates``)
+
+    def rank(self, k: int) -> float:
+        return float(self.rates[min(k, len(self.rates)) - 1]) if self.probes else 0.0
+
+
+def verification_curve(scores: Any, labels: Any) -> VerificationCurve:
+    """Full ROC/DET curve of pair ``scores`` (``labels`` true for genuine pairs) from a single sort."""
+
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    labels = np.asarray(labels).ravel().astype(bool)
+    if scores.shape != labels.shape:
+        raise ValueError("scores and labels must have the same length")
+    positives = int(labels.sum())
+    negatives = int(labels.size - positives)
+    if positives == 0 or negatives == 0:
+        raise ValueError("Need both genuine and impostor pairs")
+
+    order = np.argsort(-scores, kind="stable")
+    ranked = scores[order]
+    genuine = np.cumsum(labels[order])
+    # Last position of every run of equal scores: a threshold accepts all of a run or none.
+    ends = np.flatnonzero(np.r_[ranked[1:] != ranked[:-1], True])
+    accepted_genuine = genuine[ends]
+    accepted_impostor = ends + 1 - accepted_genuine
+    return VerificationCurve(
+        thresholds=np.r_[np.inf, ranked[ends]],
+        tar=np.r_[0.0, accepted_genuine / positives],
+        far=np.r_[0.0, accepted_impostor / negatives],
+        positives=positives,
+        negatives=negatives,
+    )
+
+
+def suggest_threshold(curve: VerificationCurve, target_far: float = 1e-3) -> ThresholdSuggestion:
+    """
+    Threshold for ``target_far``, or the EER threshold when there are too few impostor pairs
+    to measure that FAR. Clipped to [0, 1] like ``ModalityConfig.threshold``.
+    """
+
+    if curve.negatives * target_far >= 1:
+        tar, threshold = curve.operating_point(target_far)
+        basis = f"far={target_far:g}"
+    else:
+        _, threshold = curve.eer()
+        basis = "eer"
+    threshold = float(np.clip(threshold, 0.0, 1.0))
+    index = int(np.searchsorted(-curve.thresholds, -threshold, side="right")) - 1
+    return ThresholdSuggestion(threshold=threshold, tar=float(curve.tar[index]), far=float(curve.far[index]), basis=basis)
+
+
+def cmc_curve(
+    probes: Any,
+    probe_labels: Sequence[Any],
+    gallery: Any,
+    gallery_labels: Sequence[Any],
+    max_rank: int = 20,
+    block_bytes: int = 64 << 20,
+) -> CMCCurve:
+    """
+    Cumulative match characteristic of 1:N identification by cosine similarity.
+
+    ``gallery`` may hold several rows per identity (an identity scores its best row) and
+    distractor identities that no probe belongs to. Probes are scored in blocks so the
+    ``(block, gallery)`` score matrix stays around ``block_bytes``.
+    """
+
+    probes = _unit_rows(probes)
+    gallery = _unit_rows(gallery)
+    identities, owners = np.unique(np.asarray(gallery_labels, dtype=object).astype(str), return_inverse=True)
+    probe_keys = np.asarray(probe_labels, dtype=object).astype(str)
+    slots = np.searchsorted(identities, probe_keys)
+    slots[slots >= len(identities)] = 0
+    mated = identities[slots] == probe_keys if len(identities) else np.zeros(len(probe_keys), dtype=bool)
+
+    hits = np.zeros(max_rank, dtype=np.int64)
+    mated_rows = np.flatnonzero(mated)
+    block = max(1, block_bytes // max(1, gallery.shape[0] * 4))
+    for start in range(0, mated_rows.shape[0], block):
+        rows = mated_rows[start : start + block]
+        scores = probes[rows] @ gallery.T
+        _, ranked = top_k_per_owner(scores, owners, max_rank)
+        found = ranked == slots[rows][:, None]
+        hit = found.any(axis=1)
+        hits += np.bincount(found[hit].argmax(axis=1), minlength=max_rank)
+    total = int(mated_rows.shape[0])
+    rates = np.cumsum(hits) / total if total else np.zeros(max_rank)
+    return CMCCurve(rates=rates, probes=total, unmated_probes=int(len(probe_keys) - total))
+
+
+def _unit_rows(rows: Any) -> np.ndarray:
+    rows = np.asarray(rows, dtype=np.float32)
+    if rows.size == 0:  # no probes or an empty gallery: nothing to normalize
+        return np.zeros((rows.shape[0] if rows.ndim else 0, 0), dtype=np.float32)
+    rows = rows.reshape(rows.shape[0], -1)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return rows / norms
@@ -0,0 +1,213 @@
+"""
+Score-level fusion of several modalities verified in one request.
+
+Each modality's ``BiometricService.verify`` runs concurrently on a thread pool, so the
+request takes as long as the slowest modality instead of the sum. Scores are first
+mapped to comparable evidence around each modality's own threshold, then combined by
+the configured rule. As results arrive the coordinator checks whether the fused decision
+can still become "accept" even if every pending modality returned a perfect score; when
+it cannot, the remaining modalities are cancelled at their next ``trace_stage``
+boundary and the request returns immediately.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from .registry import BiometricServiceRegistry
+from .tracing import CancelToken, StageCancelled, bind_cancel_token
+
+FUSION_RULES = ("weighted_sum", "min", "max", "likelihood_ratio")
+
+
+@dataclass(frozen=True)
+class FusionSettings:
+    rule: str = "weighted_sum"
+    # Fused-score threshold; defaults to 0.5 for the score rules and 0.0 (log-LR) otherwise.
+    threshold: Optional[float] = None
+    weights: Mapping[str, float] = field(default_factory=dict)
+    # Width of the logistic mapping a raw score to evidence around its modality threshold.
+    scale: float = 0.05
+    # likelihood_ratio: modality -> {"genuine": [mean, std], "impostor": [mean, std]}.
+    score_models: Mapping[str, Mapping[str, Sequence[float]]] = field(default_factory=dict)
+    llr_clip: float = 6.0
+    short_circuit: bool = True
+    max_workers: int = 4
+
+    @classmethod
+    def from_config(cls, section: dict[str, Any] | None) -> "FusionSettings":
+        section = section or {}
+        known = {key: section[key] for key in cls.__dataclass_fields__ if key in section}
+        settings = cls(**known)
+        if settings.rule not in FUSION_RULES:
+            raise ValueError(f"Unsupported fusion rule: {settings.rule!r}")
+        return settings
+
+    @property
+    def decision_threshold(self) -> float:
+        if self.threshold is not None:
+            return self.threshold
+        return 0.0 if self.rule == "likelihood_ratio" else 0.5
+
+
+class ScoreFusion:
+    """Maps per-modality scores to evidence and combines them."""
+
+    def __init__(self, settings: FusionSettings) -> None:
+        self.settings = settings
+
+    @property
+    def floor(self) -> float:
+        """Evidence of a modality that gave no support (missing, failed or cancelled)."""
+
+        return -self.settings.llr_clip if self.settings.rule == "likelihood_ratio" else 0.0
+
+    @property
+    def ceiling(self) -> float:
+        return self.settings.llr_clip if self.settings.rule == "likelihood_ratio" else 1.0
+
+    def evidence(self, modality: str, score: float, threshold: float) -> float:
+        margin = (score - threshold) / self.settings.scale
+        if self.settings.rule != "likelihood_ratio":
+            return 1.0 / (1.0 + math.exp(-max(min(margin, 60.0), -60.0)))
+        model = self.settings.score_models.get(modality)
+        if model:
+            llr = _log_normal(score, *model["genuine"]) - _log_normal(score, *model["impostor"])
+        else:
+            # Without score distributions, use the log-odds of the logistic mapping.
+            llr = margin
+        return max(-self.settings.llr_clip, min(self.settings.llr_clip, llr))
+
+    def fuse(self, evidence: Mapping[str, float]) -> float:
+        rule = self.settings.rule
+        if not evidence:
+            return self.floor
+        if rule == "min":
+            return min(evidence.values())
+        if rule == "max":
+            return max(evidence.values())
+        weights = {modality: float(self.settings.weights.get(modality, 1.0)) for modality in evidence}
+        total = sum(weights[modality] * value for modality, value in evidence.items())
+        if rule == "likelihood_ratio":
+            return total
+        return total / (sum(weights.values()) or 1.0)
+
+
+def _log_normal(value: float, mean: float, std: float) -> float:
+    return -0.5 * ((value - mean) / std) ** 2 - math.log(std)
+
+
+class FusionVerifier:
+    """Runs several modality verifications concurrently and fuses their scores."""
+
+    def __init__(self, registry: BiometricServiceRegistry, settings: Optional[FusionSettings] = None) -> None:
+        self._registry = registry
+        self.settings = settings or FusionSettings()
+        self.fusion = ScoreFusion(self.settings)
+        self._executor = ThreadPoolExecutor(max_workers=self.settings.max_workers, thread_name_prefix="fusion")
+
+    def verify(self, samples: Mapping[str, Any], top_k: int = 5, user_id: Optional[str] = None) -> dict[str, Any]:
+        """
+        Verify ``samples`` (modality -> sample). With ``user_id`` the fused decision is about
+        that claimed identity; otherwise candidates from every modality's top-k are ranked.
+        """
+
+        if not samples:
+            raise ValueError("samples cannot be empty")
+        services = {modality: self._registry.get(modality) for modality in samples}
+        token = CancelToken()
+        pending: Dict[Future, str] = {}
+        for modality, service in services.items():
+            # Each task runs in its own copy of the caller's context (request trace included).
+            context = contextvars.copy_context()
+            payload = {"sample": samples[modality], "top_k": top_k}
+            pending[self._executor.submit(context.run, self._run, service, payload, token)] = modality
+
+        results: Dict[str, dict[str, Any]] = {}
+        short_circuited = False
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = self._outcome(future)
+            if pending and self.settings.short_circuit and self._rejected(results, list(pending.values()), user_id):
+                # The remaining modalities cannot change the outcome: stop them at their next
+                # stage boundary and do not wait for them.
+                token.cancel()
+                for future, modality in pending.items():
+                    future.cancel()
+                    results[modality] = {"status": "cancelled"}
+                short_circuited = True
+                break
+
+        return self._fused_response(results, top_k, user_id, short_circuited)
+
+    @staticmethod
+    def _run(service: Any, payload: dict[str, Any], token: CancelToken) -> dict[str, Any]:
+        bind_cancel_token(token)
+        return service.verify(payload)
+
+    @staticmethod
+    def _outcome(future: Future) -> dict[str, Any]:
+        try:
+            result = future.result()
+        except StageCancelled:
+            return {"status": "cancelled"}
+        # One failing modality (e.g. no replica of a gallery shard answered) is reported, not raised.
+        except Exception as exc:  # noqa: BLE001
+            return {"status": "error", "detail": str(exc)}
+        # Samples rejected by a quality gate contribute no evidence.
+        return {**result, "status": "rejected" if result.get("status") == "rejected" else "completed"}
+
+    def _candidate_evidence(self, modality: str, result: dict[str, Any], user_id: Optional[str]) -> Dict[str, float]:
+        if result.get("status") != "completed":
+            return {}
+        return {
+            match["user_id"]: self.fusion.evidence(modality, match["score"], result["threshold"])
+            for match in result["matches"]
+            if user_id is None or match["user_id"] == user_id
+        }
+
+    def _rejected(self, results: Mapping[str, dict[str, Any]], pending: Sequence[str], user_id: Optional[str]) -> bool:
+        """True when no candidate can reach the threshold, even with perfect pending scores."""
+
+        # Every rule is monotone in each modality's evidence, so the best evidence any
+        # candidate has per finished modality bounds every candidate's fused score.
+        best = {
+            modality: max(self._candidate_evidence(modality, result, user_id).values(), default=self.fusion.floor)
+            for modality, result in results.items()
+        }
+        best.update({modality: self.fusion.ceiling for modality in pending})
+        return self.fusion.fuse(best) < self.settings.decision_threshold
+
+    def _fused_response(
+        self, results: Mapping[str, dict[str, Any]], top_k: int, user_id: Optional[str], short_circuited: bool
+    ) -> dict[str, Any]:
+        per_modality = {modality: self._candidate_evidence(modality, result, user_id) for modality, result in results.items()}
+        candidates = {user_id} if user_id is not None else set().union(*per_modality.values())
+        fused = []
+        for candidate in candidates:
+            evidence = {modality: scores.get(candidate, self.fusion.floor) for modality, scores in per_modality.items()}
+            fused.append((self.fusion.fuse(evidence), candidate, evidence))
+        fused.sort(key=lambda item: (-item[0], item[1]))
+
+        threshold = self.settings.decision_threshold
+        best_score = fused[0][0] if fused else self.fusion.floor
+        return {
+            "status": "success",
+            "decision": bool(fused and best_score >= threshold),
+            "rule": self.settings.rule,
+            "threshold": threshold,
+            "score": best_score,
+            "user_id": fused[0][1] if fused else None,
+            "matches": [
+                {"user_id": candidate, "score": score, "metadata": {"evidence": evidence}}
+                for score, candidate, evidence in fused[:top_k]
+            ],
+            "modalities": dict(results),
+            "short_circuited": short_circuited,
+            "partial": any(result.get("partial", False) for result in results.values()),
+        }
@@ -0,0 +1,108 @@
+"""
+Lightweight per-request stage tracing.
+
+Code on the hot path wraps expensive steps in ``trace_stage("name")``. When no trace is
+active for the current context (the default) the wrapper only performs context-variable
+lookups, so instrumentation can stay in place permanently.
+
+Stage boundaries double as cooperative cancellation points: work running under a bound
+``CancelToken`` raises ``StageCancelled`` at the next stage once the token is cancelled.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+
+class RequestTrace:
+    """Collects (stage, seconds) records for one request."""
+
+    __slots__ = ("started", "stages")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    def record(self, name: str, duration_s: float) -> None:
+        self.stages.append((name, duration_s))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Aggregate repeated stages (e.g. one ``embed`` per enrollment sample)."""
+
+        totals: dict[str, dict[str, float]] = {}
+        for name, duration in self.stages:
+            entry = totals.setdefault(name, {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000.0
+        return totals
+
+
+class CancelToken:
+    """Thread-safe flag shared by the tasks of one request."""
+
+    __slots__ = ("_event",)
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class StageCancelled(RuntimeError):
+    """Raised when a stage is entered after the current cancel token was cancelled."""
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("biometric_request_trace", default=None)
+_current_cancel: ContextVar[Optional[CancelToken]] = ContextVar("biometric_cancel_token", default=None)
+
+
+def start_trace() -> tuple[RequestTrace, Token]:
+    trace = RequestTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: Token) -> None:
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def bind_cancel_token(token: CancelToken) -> Token:
+    return _current_cancel.set(token)
+
+
+class trace_stage:
+    """Context manager timing a named stage into the active trace, if any; a cancellation point."""
+
+    __slots__ = ("name", "_trace", "_started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._trace: Optional[RequestTrace] = None
+        self._started = 0.0
+
+    def __enter__(self) -> "trace_stage":
+        cancel = _current_cancel.get()
+        if cancel is not None and cancel.cancelled:
+            raise StageCancelled(self.name)
+        self._trace = _current_trace.get()
+        if self._trace is not None:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._trace is not None:
+            self._trace.record(self.name, time.perf_counter() - self._started)
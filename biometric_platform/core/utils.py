@@ -4,11 +4,21 @@ Shared utilities for the biometric platform.
 
 from __future__ import annotations
 
+import base64
+import binascii
 import importlib
+from io import BytesIO
+from pathlib import Path
 from typing import Any, TypeVar
 
+import numpy as np
+from PIL import Image
+
 T = TypeVar("T")
 
+# 16-bit popcount table (64 KiB, stays cache resident): four lookups per uint64 word.
+_POPCOUNT16 = np.array([bin(value).count("1") for value in range(1 << 16)], dtype=np.uint8)
+
 
 def import_string(path: str) -> Any:
     """Import dotted module path and return the referenced attribute."""
@@ -19,3 +29,120 @@ def import_string(path: str) -> Any:
     module = importlib.import_module(module_path)
     return getattr(module, attr)
 
+
+def decode_image(sample: Any, mode: str = "RGB") -> np.ndarray:
+    """
+    Image array of a sample given as an array, a nested list, encoded image bytes, a file
+    path, a ``data:`` URI or base64 text. Encoded images are converted to the PIL ``mode``;
+    arrays are returned as given.
+    """
+
+    if isinstance(sample, np.ndarray):
+        return sample
+    if isinstance(sample, list):
+        return np.array(sample)
+    if isinstance(sample, (bytes, bytearray)):
+        return image_from_bytes(bytes(sample), mode)
+    if not isinstance(sample, str):
+        raise TypeError(f"Unsupported sample type: {type(sample)!r}")
+
+    if sample.startswith("data:"):
+        _, _, data_part = sample.partition(",")
+        if not data_part:
+            raise ValueError("Invalid data URI sample")
+        try:
+            return image_from_bytes(base64.b64decode(data_part, validate=True), mode)
+        except binascii.Error as exc:
+            raise ValueError("Invalid base64 data URI") from exc
+
+    try:
+        if Path(sample).is_file():
+            return image_from_bytes(Path(sample).read_bytes(), mode)
+    except OSError:
+        pass  # long base64 payloads are not valid file names
+    try:
+        data = base64.b64decode(sample, validate=True)
+    except binascii.Error as exc:
+        raise ValueError("Unsupported string sample format") from exc
+    return image_from_bytes(data, mode)
+
+
+def image_from_bytes(data: bytes, mode: str = "RGB") -> np.ndarray:
+    try:
+        with Image.open(BytesIO(data)) as img:
+            return np.array(img.convert(mode))
+    except OSError as exc:  # includes UnidentifiedImageError
+        raise ValueError("Unable to decode image bytes") from exc
+
+
+def to_rgb_uint8(image: np.ndarray) -> np.ndarray:
+    """Grayscale images get three channels; other dtypes are clipped to ``uint8``."""
+
+    image = np.asarray(image)
+    if image.ndim == 2:
+        image = np.stack([image] * 3, axis=-1)
+    if image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+    return image
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of the last axis of a uint64 array."""
+
+    halves = np.ascontiguousarray(words).view(np.uint16).reshape(words.shape[:-1] + (words.shape[-1] * 4,))
+    return _POPCOUNT16[halves].sum(axis=-1, dtype=np.int32)
+
+
+def top_k_per_owner(scores: np.ndarray, owners: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Best ``k`` owners per row of a ``(probes, rows)`` score matrix, where an owner's score is
+    its best row and rows owned by -1 are ignored.
+
+    Returns ``(scores, owners)`` arrays of shape ``(probes, k)``, best first; rows with
+    fewer than ``k`` owners are padded with ``-inf`` / -1. Each row keeps only a window of
+    its top rows and widens it only while multi-row owners crowd out distinct ones, so the
+    cost is one partial sort of the matrix in the common case.
+    """
+
+    probes, total = scores.shape
+    top_scores = np.full((probes, k), -np.inf, dtype=np.float32)
+    top_owners = np.full((probes, k), -1, dtype=np.int64)
+    if total == 0 or k <= 0:
+        return top_scores, top_owners
+    dead = owners < 0
+    if dead.any():
+        scores = np.where(dead, -np.inf, scores)
+    pending = np.arange(probes)
+    window = min(total, k * 4)
+    while pending.shape[0]:
+        block = scores[pending]
+        if window < total:
+            candidates = np.argpartition(-block, window - 1, axis=1)[:, :window]
+        else:
+            candidates = np.broadcast_to(np.arange(total), block.shape)
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        slots = np.where(np.isfinite(candidate_scores), owners[candidates], -1)
+
+        # Keep the first (best) row of each owner: sort owners within each row, flag the
+        # first of every run, and scatter the flags back to score order.
+        by_owner = np.argsort(slots, axis=1, kind="stable")
+        grouped = np.take_along_axis(slots, by_owner, axis=1)
+        starts = np.ones_like(grouped, dtype=bool)
+        starts[:, 1:] = grouped[:, 1:] != grouped[:, :-1]
+        first = np.empty_like(starts)
+        np.put_along_axis(first, by_owner, starts, axis=1)
+        first &= slots >= 0
+        rank = np.cumsum(first, axis=1)
+        found = rank[:, -1]
+
+        done = (found >= k) | (window >= total)
+        rows, columns = np.nonzero(first & (rank <= k) & done[:, None])
+        targets = pending[rows]
+        top_scores[targets, rank[rows, columns] - 1] = candidate_scores[rows, columns]
+        top_owners[targets, rank[rows, columns] - 1] = slots[rows, columns]
+        pending = pending[~done]
+        window = min(total, window * 4)
+    return top_scores, top_owners
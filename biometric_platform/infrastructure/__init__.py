@@ -2,7 +2,31 @@
 Infrastructure components: embedding stores, databases, caching, etc.
 """
 
-from .embedding_store import InMemoryEmbeddingStore
-
-__all__ = ["InMemoryEmbeddingStore"]
+from .binary_store import BinaryTemplateStore
+from .dedup import CANDIDATE_MODES, DedupSummary, DuplicatePair, check_user, scan_duplicates
+from .embedding_store import InMemoryEmbeddingStore, ShardedEmbeddingStore, VectorEmbeddingStore
+from .minutiae_store import MinutiaeTemplateStore
+from .packed_store import PackedSampleStore
+from .remote_store import GatherResult, ScatterGatherEmbeddingStore, ShardUnavailableError
+from .sample_store import ContentAddressedSampleStore, SampleWriteError
+from .versioned_store import VersionedEmbeddingStore
 
+__all__ = [
+    "BinaryTemplateStore",
+    "CANDIDATE_MODES",
+    "ContentAddressedSampleStore",
+    "SampleWriteError",
+    "DedupSummary",
+    "DuplicatePair",
+    "GatherResult",
+    "InMemoryEmbeddingStore",
+    "MinutiaeTemplateStore",
+    "PackedSampleStore",
+    "ScatterGatherEmbeddingStore",
+    "ShardUnavailableError",
+    "ShardedEmbeddingStore",
+    "VectorEmbeddingStore",
+    "VersionedEmbeddingStore",
+    "check_user",
+    "scan_duplicates",
+]
@@ -0,0 +1,426 @@
+"""
+Gallery of fixed-length binary codes (fingerprint pair codes, iris-style codes).
+
+Codes are packed into uint64 rows, so comparing a probe with the whole gallery is one
+broadcast XOR followed by a popcount. Larger galleries are additionally indexed by
+multi-index hashing (MIH): every code is cut into 16-bit substrings and each substring
+position gets a bucket table. If two codes differ in at most ``m * (r + 1) - 1`` bits,
+where ``m`` is the number of substrings, at least one substring differs in at most ``r``
+bits; probing the buckets within radius ``r`` of every probe substring therefore finds
+every such code, and the search can stop as soon as the k-th best user found so far
+is provably closer than anything left unprobed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.base import BatchQueryResult
+from ..core.utils import popcount, top_k_per_owner
+from .concurrency import CopyOnWriteCell
+
+_SUBSTRING_BITS = 16
+_BUCKETS = 1 << _SUBSTRING_BITS
+
+
+@lru_cache(maxsize=8)
+def _flip_masks(radius: int) -> np.ndarray:
+    """All 16-bit masks with exactly ``radius`` bits set."""
+
+    values = np.arange(_BUCKETS, dtype=np.uint64)
+    masks = values[popcount(values[:, None]) == radius].astype(np.int64)
+    masks.setflags(write=False)
+    return masks
+
+
+@dataclass(frozen=True)
+class _MultiIndex:
+    """Bucket tables over the first ``size`` rows, one per 16-bit substring position."""
+
+    offsets: np.ndarray  # (tables * 65536 + 1,) CSR offsets into ``rows``
+    rows: np.ndarray  # (tables * size,) row ids grouped by (table, substring value)
+    size: int
+
+
+@dataclass(frozen=True)
+class _BinarySnapshot:
+    """Immutable view of a ``BinaryTemplateStore``; rows it covers are never rewritten."""
+
+    codes: np.ndarray  # (rows, words) uint64
+    bit_counts: np.ndarray  # (rows,) int32
+    owners: np.ndarray  # (rows,) user slot, -1 once the user is deleted
+    user_ids: List[str]  # slot -> user_id; append-only
+    counts: np.ndarray  # (slots,) live rows per user slot
+    slot_of: Dict[str, int]  # user_id -> slot of every live user; never changed once published
+    live_users: int
+    max_bits: int  # upper bound on the popcount of any row
+    index: Optional[_MultiIndex]
+
+
+class BinaryTemplateStore:
+    """
+    1:N search over binary templates with Hamming or Dice scoring.
+
+    ``add_embeddings`` accepts boolean/0-1 vectors of ``num_bits`` entries or already
+    packed uint64 words; ``num_bits`` is taken from the first enrollment when not given.
+    Scores are ``1 - hamming / num_bits`` (``metric="hamming"``, dense codes such as iris
+    codes) or ``1 - hamming / (|a| + |b|)`` (``metric="dice"``, sparse codes such as
+    ``MinutiaePairCode``), and a user's score is its best template.
+
+    Galleries of at least ``index_min_rows`` templates are searched through the
+    multi-index, which pays off when the best matches are close to the probe (few
+    differing bits). When a probe's neighbourhood is crowded (low-entropy or sparse
+    codes share most substrings) or the required radius exceeds ``max_radius``, the
+    search falls back to the exhaustive XOR + popcount scan, so results are always exact.
+    Rows appended after the last index build are scanned linearly; the index is rebuilt
+    by the writer once that tail grows past a quarter of the indexed rows. Writes follow
+    the copy-on-write model of ``VectorEmbeddingStore``.
+    """
+
+    modality = "generic"
+
+    def __init__(
+        self,
+        modality: str = "generic",
+        num_bits: Optional[int] = None,
+        metric: str = "hamming",
+        index_min_rows: int = 4096,
+        max_radius: int = 2,
+        candidate_fraction: float = 0.05,
+    ) -> None:
+        if metric not in ("hamming", "dice"):
+            raise ValueError(f"Unsupported metric: {metric!r}")
+        self.modality = modality
+        self.metric = metric
+        self.num_bits = num_bits
+        self._index_min_rows = index_min_rows
+        self._max_radius = max_radius
+        self._candidate_fraction = candidate_fraction
+        # Writer-side state, only touched by the committing writer.
+        self._rows = 0
+        self._codes = np.zeros((0, self._words), dtype=np.uint64)
+        self._bit_counts = np.zeros(0, dtype=np.int32)
+        self._owners = np.zeros(0, dtype=np.int32)
+        self._counts = np.zeros(0, dtype=np.int32)
+        self._user_ids: List[str] = []
+        self._slot_of: Dict[str, int] = {}
+        self._dead = 0
+        self._max_bits = 0
+        self._index: Optional[_MultiIndex] = None
+        # Set once this commit batch has copied a buffer that published snapshots cover.
+        self._owners_private = False
+        self._counts_private = False
+        self._slots_private = False
+        self._cell: CopyOnWriteCell[_BinarySnapshot, None] = CopyOnWriteCell(
+            self._snapshot(), begin=lambda _: None, apply=self._apply, finish=lambda _: self._finish()
+        )
+
+    @property
+    def _words(self) -> int:
+        return -(-(self.num_bits or 0) // 64)
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
+        codes = self._pack(embeddings, enroll=True)
+        if codes.shape[0]:
+            self._cell.write(("add", user_id, codes))
+
+    def delete_user(self, user_id: str) -> None:
+        self._cell.write(("delete", user_id))
+
+    def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]:
+        return self.query_batch([embedding], top_k=top_k)[0]
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        """
+        Probes whose neighbourhood the multi-index resolves are answered from it; all
+        remaining probes share one blocked XOR + popcount scan of the gallery.
+        """
+
+        embeddings = list(embeddings)
+        if self.num_bits is None:  # nothing enrolled yet: a probe must not fix the code length
+            return BatchQueryResult.empty(len(embeddings))
+        probes = self._pack(embeddings)
+        snapshot = self._cell.read()
+        if snapshot.live_users == 0 or top_k <= 0 or probes.shape[0] == 0:
+            return BatchQueryResult.empty(probes.shape[0])
+        k = min(top_k, snapshot.live_users)
+        scores = np.full((probes.shape[0], k), -np.inf, dtype=np.float32)
+        slots = np.full((probes.shape[0], k), -1, dtype=np.int64)
+        scan = []
+        for index, probe in enumerate(probes):
+            found = self._search_index(snapshot, probe, k) if snapshot.index is not None else None
+            if found is None:
+                scan.append(index)
+                continue
+            for rank, (slot, distance) in enumerate(found):
+                scores[index, rank], slots[index, rank] = 1.0 - distance, slot
+        if scan:
+            scan = np.asarray(scan)
+            scores[scan], slots[scan] = top_k_per_owner(1.0 - self._distance_matrix(snapshot, probes[scan]), snapshot.owners, k)
+        return BatchQueryResult(scores=scores, indices=slots, user_ids=snapshot.user_ids, num_samples=snapshot.counts)
+
+    def list_users(self) -> Sequence[str]:
+        snapshot = self._cell.read()
+        return tuple(sorted(snapshot.user_ids[slot] for slot in np.flatnonzero(snapshot.counts)))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        """Return the user's templates unpacked to an (n, num_bits) boolean matrix."""
+
+        snapshot = self._cell.read()
+        slot = snapshot.slot_of.get(user_id)
+        if slot is None or not snapshot.counts[slot]:
+            return np.zeros((0, self.num_bits or 0), dtype=bool)
+        rows = snapshot.codes[snapshot.owners == slot]
+        return np.unpackbits(rows.view(np.uint8), axis=1)[:, : self.num_bits].astype(bool)
+
+    def _pack(self, embeddings: Iterable[Any], enroll: bool = False) -> np.ndarray:
+        """Pack codes into uint64 rows; only an enrollment (``enroll``) sets ``num_bits`` of an empty store."""
+
+        num_bits = self.num_bits
+        rows = []
+        for embedding in embeddings:
+            array = np.asarray(embedding)
+            if array.dtype == np.uint64:
+                rows.append(array.reshape(-1))
+                continue
+            bits = array.reshape(-1).astype(bool)
+            if num_bits is None:
+                num_bits = bits.shape[0]
+            if bits.shape[0] != num_bits:
+                raise ValueError(f"Code length {bits.shape[0]} does not match store length {num_bits}")
+            padded = np.zeros(-(-num_bits // 64) * 64, dtype=bool)
+            padded[:num_bits] = bits
+            rows.append(np.packbits(padded).view(np.uint64))
+        if num_bits is None and rows:
+            num_bits = rows[0].shape[0] * 64
+        words = -(-(num_bits or 0) // 64)
+        if not rows:
+            return np.zeros((0, words), dtype=np.uint64)
+        codes = np.stack(rows)
+        if codes.shape[1] != words:
+            raise ValueError(f"Packed code has {codes.shape[1]} words, store expects {words}")
+        if enroll and self.num_bits is None:
+            self.num_bits = num_bits
+        return codes
+
+    def _distances(self, snapshot: _BinarySnapshot, probe: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        hamming = popcount(np.bitwise_xor(snapshot.codes[rows], probe))
+        if self.metric == "hamming":
+            return hamming / float(self.num_bits)
+        total = snapshot.bit_counts[rows] + popcount(probe)
+        return np.where(total > 0, hamming / np.maximum(total, 1), 1.0)
+
+    def _distance_matrix(self, snapshot: _BinarySnapshot, probes: np.ndarray) -> np.ndarray:
+        """Distances of every probe to every row, shape (probes, rows)."""
+
+        total = snapshot.codes.shape[0]
+        distances = np.empty((probes.shape[0], total), dtype=np.float32)
+        # Bound the (probes, rows, words) XOR block to roughly 32 MiB.
+        block = max(1, (4 << 20) // max(1, probes.shape[0] * probes.shape[1]))
+        probe_bits = popcount(probes)[:, None]
+        for start in range(0, total, block):
+            stop = min(total, start + block)
+            hamming = popcount(np.bitwise_xor(snapshot.codes[None, start:stop], probes[:, None]))
+            if self.metric == "hamming":
+                distances[:, start:stop] = hamming / float(self.num_bits)
+            else:
+                bits = snapshot.bit_counts[None, start:stop] + probe_bits
+                distances[:, start:stop] = np.where(bits > 0, hamming / np.maximum(bits, 1), 1.0)
+        return distances
+
+    @staticmethod
+    def _rank(snapshot: _BinarySnapshot, rows: np.ndarray, distances: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Best ``k`` users among ``rows`` as (slot, distance), nearest first."""
+
+        owners = snapshot.owners[rows]
+        live = owners >= 0
+        owners, distances = owners[live], distances[live]
+        total = distances.shape[0]
+        if total == 0:
+            return []
+        # Same widening window as ``VectorEmbeddingStore._top_users``: a user's distance is
+        # its first row in ascending order.
+        window = min(total, k * 4)
+        while True:
+            candidates = np.argpartition(distances, window - 1)[:window] if window < total else np.arange(total)
+            candidates = candidates[np.argsort(distances[candidates], kind="stable")]
+            _, first = np.unique(owners[candidates], return_index=True)
+            if first.shape[0] >= k or window >= total:
+                break
+            window = min(total, window * 4)
+        chosen = candidates[np.sort(first)[:k]]
+        return [(int(owners[row]), float(distances[row])) for row in chosen]
+
+    def _search_index(self, snapshot: _BinarySnapshot, probe: np.ndarray, k: int) -> Optional[List[Tuple[int, float]]]:
+        """Exact top-k through the multi-index, or ``None`` when a full scan is cheaper."""
+
+        index = snapshot.index
+        total = snapshot.codes.shape[0]
+        substrings = probe.view(np.uint16).astype(np.int64)
+        tables = substrings.shape[0]
+        table_base = np.arange(tables, dtype=np.int64)[:, None] * _BUCKETS
+        probe_bits = int(popcount(probe))
+        budget = max(k, int(self._candidate_fraction * total))
+
+        seen = np.zeros(total, dtype=bool)
+        seen[index.size :] = True  # rows appended since the last index build
+        probed = [np.arange(index.size, total)]
+        indexed = 0
+        for radius in range(self._max_radius + 1):
+            buckets = (table_base + (substrings[:, None] ^ _flip_masks(radius))).ravel()
+            starts, stops = index.offsets[buckets], index.offsets[buckets + 1]
+            lengths = stops - starts
+            hit_count = int(lengths.sum())
+            if hit_count + indexed > budget:
+                return None
+            hits = index.rows[np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(hit_count)]
+            hits = np.unique(hits[~seen[hits]])
+            seen[hits] = True
+            probed.append(hits)
+            indexed += hits.shape[0]
+
+            rows = np.concatenate(probed)
+            if rows.shape[0] == 0:
+                continue
+            found = self._rank(snapshot, rows, self._distances(snapshot, probe, rows), k)
+            if len(found) < k:
+                continue
+            # Every unprobed row differs in more than ``covered`` bits.
+            covered = tables * (radius + 1) - 1
+            worst = found[-1][1]
+            if self.metric == "hamming":
+                bound = worst * self.num_bits
+            else:
+                bound = worst * (probe_bits + snapshot.max_bits)
+            if bound < covered + 1:
+                return found
+        return None
+
+    def _apply(self, _: None, op: Tuple[Any, ...]) -> None:
+        if op[0] == "add":
+            self._append(op[1], op[2])
+        else:
+            self._remove(op[1])
+
+    def _append(self, user_id: str, codes: np.ndarray) -> None:
+        if self._codes.shape[1] != codes.shape[1]:
+            if self._rows:
+                raise ValueError(f"Packed code has {codes.shape[1]} words, store expects {self._codes.shape[1]}")
+            self._codes = np.zeros((0, codes.shape[1]), dtype=np.uint64)
+
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            slot = len(self._user_ids)
+            self._user_ids.append(user_id)
+            self._private_slots()[user_id] = slot
+            if slot >= self._counts.shape[0]:
+                self._counts = self._grow(self._counts, slot + 1, slot)
+                self._counts_private = True
+        elif not self._counts_private:
+            # Published snapshots cover this slot: copy before changing its count.
+            self._counts = self._counts.copy()
+            self._counts_private = True
+
+        # New rows land past every published snapshot, so the owner array is only copied
+        # when it runs out of capacity.
+        needed = self._rows + codes.shape[0]
+        if needed > self._codes.shape[0]:
+            self._codes = self._grow(self._codes, needed, self._rows)
+            self._bit_counts = self._grow(self._bit_counts, needed, self._rows)
+            self._owners = self._grow(self._owners, needed, self._rows)
+            self._owners_private = True
+        bit_counts = popcount(codes)
+        self._codes[self._rows : needed] = codes
+        self._bit_counts[self._rows : needed] = bit_counts
+        self._owners[self._rows : needed] = slot
+        self._counts[slot] += codes.shape[0]
+        self._max_bits = max(self._max_bits, int(bit_counts.max()))
+        self._rows = needed
+
+    def _remove(self, user_id: str) -> None:
+        if user_id not in self._slot_of:
+            return
+        slot = self._private_slots().pop(user_id)
+        if not self._owners_private:
+            self._owners = self._owners.copy()
+            self._owners_private = True
+        if not self._counts_private:
+            self._counts = self._counts.copy()
+            self._counts_private = True
+        owners = self._owners[: self._rows]
+        owners[owners == slot] = -1
+        self._dead += int(self._counts[slot])
+        self._counts[slot] = 0
+
+    def _finish(self) -> _BinarySnapshot:
+        if self._dead and self._dead * 2 >= self._rows:
+            self._compact()
+        if self._rows < self._index_min_rows:
+            self._index = None
+        elif self._index is None or (self._rows - self._index.size) * 4 > self._index.size:
+            self._index = self._build_index(self._codes[: self._rows])
+        self._owners_private = self._counts_private = self._slots_private = False
+        return self._snapshot()
+
+    def _private_slots(self) -> Dict[str, int]:
+        # Published snapshots share the slot map: copy it once per batch before changing it.
+        if not self._slots_private:
+            self._slot_of = dict(self._slot_of)
+            self._slots_private = True
+        return self._slot_of
+
+    def _snapshot(self) -> _BinarySnapshot:
+        return _BinarySnapshot(
+            codes=self._codes[: self._rows],
+            bit_counts=self._bit_counts[: self._rows],
+            owners=self._owners[: self._rows],
+            user_ids=self._user_ids,
+            counts=self._counts[: len(self._user_ids)],
+            slot_of=self._slot_of,
+            live_users=len(self._slot_of),
+            max_bits=self._max_bits,
+            index=self._index,
+        )
+
+    @staticmethod
+    def _build_index(codes: np.ndarray) -> _MultiIndex:
+        size = codes.shape[0]
+        substrings = codes.view(np.uint16).astype(np.int64)  # (size, tables)
+        tables = substrings.shape[1]
+        # Table-major bucket ids, so a stable sort groups rows by (table, substring).
+        buckets = (np.arange(tables, dtype=np.int64)[:, None] * _BUCKETS + substrings.T).ravel()
+        order = np.argsort(buckets, kind="stable")
+        offsets = np.zeros(tables * _BUCKETS + 1, dtype=np.int64)
+        np.cumsum(np.bincount(buckets, minlength=tables * _BUCKETS), out=offsets[1:])
+        return _MultiIndex(offsets=offsets, rows=(order % size).astype(np.int32), size=size)
+
+    def _compact(self) -> None:
+        owners = self._owners[: self._rows]
+        live_rows = owners >= 0
+        live_slots = np.flatnonzero(self._counts[: len(self._user_ids)])
+        remap = np.full(len(self._user_ids), -1, dtype=np.int32)
+        remap[live_slots] = np.arange(live_slots.shape[0], dtype=np.int32)
+
+        # Fresh buffers and lists: older snapshots keep the previous ones. Row ids change,
+        # so the multi-index is rebuilt from scratch.
+        self._codes = self._codes[: self._rows][live_rows].copy()
+        self._bit_counts = self._bit_counts[: self._rows][live_rows].copy()
+        self._owners = remap[owners[live_rows]]
+        self._counts = self._counts[live_slots].copy()
+        self._user_ids = [self._user_ids[slot] for slot in live_slots]
+        self._slot_of = {user_id: slot for slot, user_id in enumerate(self._user_ids)}
+        self._rows = self._codes.shape[0]
+        self._max_bits = int(self._bit_counts.max()) if self._rows else 0
+        self._dead = 0
+        self._index = None
+
+    @staticmethod
+    def _grow(array: np.ndarray, needed: int, used: int) -> np.ndarray:
+        capacity = max(needed, 2 * array.shape[0], 1024)
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:used] = array[:used]
+        return grown
@@ -0,0 +1,93 @@
+"""
+Concurrency primitives shared by the embedding stores.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Generic, List, Tuple, TypeVar
+
+S = TypeVar("S")
+B = TypeVar("B")
+
+
+class CopyOnWriteCell(Generic[S, B]):
+    """
+    Publishes immutable snapshots; readers never take a lock.
+
+    ``read()`` returns the current snapshot, which is never mutated after publication, so a
+    reader sees a consistent state for as long as it holds the reference. Writers go through
+    group commit: concurrent ``write`` calls queue their operation, and whichever writer
+    finds no commit in progress becomes the leader, folds every queued operation into one
+    new snapshot and publishes it with a single reference assignment. Callers return only
+    once their operation is visible, so enroll-then-verify sees the enrollment.
+
+    The snapshot lifecycle is supplied by three callbacks:
+
+    * ``begin(snapshot) -> builder``: start a mutable working copy,
+    * ``apply(builder, op)``: apply one operation (exceptions are re-raised to that op's writer
+      only; the rest of the batch still commits),
+    * ``finish(builder) -> snapshot``: freeze the working copy.
+    """
+
+    def __init__(
+        self,
+        initial: S,
+        begin: Callable[[S], B],
+        apply: Callable[[B, Any], None],
+        finish: Callable[[B], S],
+    ) -> None:
+        self._snapshot = initial
+        self._begin = begin
+        self._apply = apply
+        self._finish = finish
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[int, Any]] = []
+        self._next_ticket = 0
+        self._committed = 0
+        self._committing = False
+        self._errors: Dict[int, BaseException] = {}
+
+    def read(self) -> S:
+        return self._snapshot
+
+    def write(self, op: Any) -> None:
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._pending.append((ticket, op))
+            while self._committed <= ticket:
+                if self._committing:
+                    self._cond.wait()
+                    continue
+                self._commit_pending()
+            error = self._errors.pop(ticket, None)
+        if error is not None:
+            raise error
+
+    def _commit_pending(self) -> None:
+        # Called with the condition held; the expensive rebuild runs without it so new
+        # writers can keep queueing into the next batch.
+        self._committing = True
+        batch, self._pending = self._pending, []
+        errors: Dict[int, BaseException] = {}
+        snapshot = self._snapshot
+        self._cond.release()
+        try:
+            builder = self._begin(snapshot)
+            for ticket, op in batch:
+                try:
+                    self._apply(builder, op)
+                except Exception as exc:  # noqa: BLE001 - handed back to the op's writer
+                    errors[ticket] = exc
+            snapshot = self._finish(builder)
+        except BaseException as exc:
+            snapshot = self._snapshot
+            errors = {ticket: exc for ticket, _ in batch}
+        finally:
+            self._cond.acquire()
+            self._snapshot = snapshot
+            self._committed += len(batch)
+            self._errors.update(errors)
+            self._committing = False
+            self._cond.notify_all()
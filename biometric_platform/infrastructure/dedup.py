@@ -0,0 +1,287 @@
+"""
+Duplicate-identity detection: finds pairs of different users whose templates are closer
+than a threshold (the same person enrolled twice under different IDs).
+
+The offline scan compares every row of the gallery with every other row in
+``block_rows`` x ``block_rows`` tiles, so memory stays bounded by the tile size and the
+N x N similarity matrix is never formed. Rows are grouped by user and cut into stripes at
+user boundaries; a stripe compares its rows with all later rows, so every user pair is
+found in exactly one stripe. Stripes run on a thread pool (NumPy releases the GIL in the
+GEMM) and their pairs are appended to a JSONL report. A checkpoint records the finished
+stripes and the report length after each one, so an interrupted scan resumes where it
+stopped without duplicating report lines.
+
+``check_user`` is the online variant: one batched gallery query for a newly enrolled user.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover
+    faiss = None  # type: ignore
+
+CANDIDATE_MODES = ("exact", "faiss")
+
+
+@dataclass(frozen=True)
+class DuplicatePair:
+    user_a: str
+    user_b: str
+    score: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"user_a": self.user_a, "user_b": self.user_b, "score": round(self.score, 6)}
+
+
+@dataclass(frozen=True)
+class DedupSummary:
+    report_path: str
+    stripes: int
+    resumed_stripes: int  # stripes skipped because a previous run finished them
+    pairs: int  # pairs in the report, including those from a resumed run
+
+
+def gallery_rows(store: Any) -> Tuple[np.ndarray, List[str]]:
+    """Return every stored row as a unit-norm matrix plus the owning user of each row."""
+
+    export = getattr(store, "export_rows", None)
+    if export is not None:
+        matrix, owners = export()
+    else:
+        blocks, owners = [], []
+        for user_id in store.list_users():
+            rows = np.asarray(store.get_embeddings(user_id), dtype=np.float32)
+            if rows.size:
+                blocks.append(rows.reshape(rows.shape[0], -1))
+                owners.extend([user_id] * rows.shape[0])
+        matrix = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.shape[0]:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+    return matrix, list(owners)
+
+
+def scan_duplicates(
+    store: Any,
+    threshold: float,
+    report_path: str | Path,
+    checkpoint_path: str | Path | None = None,
+    block_rows: int = 4096,
+    max_workers: Optional[int] = None,
+    candidates: str = "exact",
+    ann_neighbors: int = 32,
+) -> DedupSummary:
+    """
+    Write every pair of distinct users with a row-to-row cosine similarity of at least
+    ``threshold`` to ``report_path`` (JSONL, one pair per line, best row pair's score).
+
+    ``candidates="faiss"`` replaces the exhaustive tiles with the ``ann_neighbors`` nearest
+    rows from a faiss HNSW index (requires ``faiss``); candidates are then re-scored
+    exactly, but pairs the index misses are not reported.
+    """
+
+    if candidates not in CANDIDATE_MODES:
+        raise ValueError(f"Unknown candidate mode {candidates!r}; expected one of {CANDIDATE_MODES}")
+    if candidates == "faiss" and faiss is None:
+        raise ImportError("faiss is required for candidates='faiss'")
+
+    matrix, row_users = gallery_rows(store)
+    # Group rows by user so stripes can be cut at user boundaries.
+    order = sorted(range(len(row_users)), key=row_users.__getitem__)
+    matrix = matrix[order] if order else matrix
+    user_ids = sorted(set(row_users))
+    slot_of = {user_id: slot for slot, user_id in enumerate(user_ids)}
+    owners = np.array([slot_of[row_users[row]] for row in order], dtype=np.int64)
+    stripes = list(_stripes(owners, block_rows))
+
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    if not stripes:  # empty gallery: nothing to compare
+        report_path.write_bytes(b"")
+        return DedupSummary(report_path=str(report_path), stripes=0, resumed_stripes=0, pairs=0)
+    fingerprint = _fingerprint(user_ids, owners, matrix, threshold, block_rows, candidates, ann_neighbors)
+    completed, report_bytes = _load_checkpoint(checkpoint_path, fingerprint)
+    if completed and report_path.exists():
+        with report_path.open("r+b") as report:
+            report.truncate(report_bytes)  # drop lines written after the last checkpoint
+        with report_path.open("rb") as report:
+            pairs = sum(1 for _ in report)
+    else:
+        completed = set()
+        report_path.write_bytes(b"")
+        pairs = 0
+
+    pending = [number for number in range(len(stripes)) if number not in completed]
+    ann_pairs = None
+    if candidates == "faiss" and pending:
+        ann_pairs = _ann_candidates(_ann_index(matrix), matrix, ann_neighbors, block_rows)
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1, thread_name_prefix="dedup") as executor:
+        futures = {
+            executor.submit(_stripe_pairs, matrix, owners, stripes[number], threshold, block_rows, ann_pairs): number
+            for number in pending
+        }
+        # Only this thread writes, so report lines and checkpoints stay consistent.
+        with report_path.open("ab") as report:
+            for future in as_completed(futures):
+                found = future.result()
+                for (a, b), score in sorted(found.items()):
+                    line = DuplicatePair(user_ids[a], user_ids[b], float(score)).to_dict()
+                    report.write(json.dumps(line).encode("utf-8") + b"\n")
+                pairs += len(found)
+                report.flush()
+                os.fsync(report.fileno())
+                completed.add(futures[future])
+                _save_checkpoint(checkpoint_path, fingerprint, completed, report.tell())
+
+    return DedupSummary(
+        report_path=str(report_path),
+        stripes=len(stripes),
+        resumed_stripes=len(stripes) - len(pending),
+        pairs=pairs,
+    )
+
+
+def check_user(store: Any, user_id: str, threshold: float, top_k: int = 5) -> List[DuplicatePair]:
+    """Other users whose templates score at least ``threshold`` against ``user_id``'s, best first."""
+
+    rows = np.asarray(store.get_embeddings(user_id), dtype=np.float32)
+    if rows.size == 0:
+        return []
+    best: Dict[str, float] = {}
+    # One extra match per probe: the user's own templates usually rank first.
+    for matches in store.query_batch(rows.reshape(rows.shape[0], -1), top_k=top_k + 1):
+        for other, score, _ in matches:
+            if other != user_id and score >= threshold:
+                best[other] = max(best.get(other, -np.inf), float(score))
+    ranked = sorted(best.items(), key=lambda item: -item[1])[:top_k]
+    return [DuplicatePair(user_id, other, score) for other, score in ranked]
+
+
+def _stripes(owners: np.ndarray, block_rows: int) -> Iterator[Tuple[int, int]]:
+    """Row ranges of about ``block_rows`` rows that never split a user's rows."""
+
+    total = owners.shape[0]
+    start = 0
+    while start < total:
+        stop = min(total, start + max(1, block_rows))
+        while stop < total and owners[stop] == owners[stop - 1]:
+            stop += 1
+        yield start, stop
+        start = stop
+
+
+def _stripe_pairs(
+    matrix: np.ndarray,
+    owners: np.ndarray,
+    stripe: Tuple[int, int],
+    threshold: float,
+    block_rows: int,
+    ann_pairs: Optional[np.ndarray] = None,
+) -> Dict[Tuple[int, int], float]:
+    """Best score per (lower slot, higher slot) user pair among rows ``stripe`` x later rows."""
+
+    start, stop = stripe
+    found: Dict[Tuple[int, int], float] = {}
+    if ann_pairs is not None:
+        total = matrix.shape[0]
+        # Pairs are sorted by their lower row, so this stripe's pairs are one slice.
+        lower, upper = np.searchsorted(ann_pairs, [start * total, stop * total])
+        rows, columns = np.divmod(ann_pairs[lower:upper], total)
+        scores = np.einsum("ij,ij->i", matrix[rows], matrix[columns])
+        _collect(found, owners, rows, columns, scores, threshold)
+        return found
+    for column_start in range(start, matrix.shape[0], block_rows):
+        column_stop = min(matrix.shape[0], column_start + block_rows)
+        tile = matrix[start:stop] @ matrix[column_start:column_stop].T
+        rows, columns = np.nonzero(tile >= threshold)
+        rows, columns = rows + start, columns + column_start
+        keep = columns > rows
+        rows, columns = rows[keep], columns[keep]
+        _collect(found, owners, rows, columns, tile[rows - start, columns - column_start], threshold)
+    return found
+
+
+def _collect(
+    found: Dict[Tuple[int, int], float],
+    owners: np.ndarray,
+    rows: np.ndarray,
+    columns: np.ndarray,
+    scores: np.ndarray,
+    threshold: float,
+) -> None:
+    a, b = owners[rows], owners[columns]
+    keep = (a != b) & (scores >= threshold)
+    a, b, scores = np.minimum(a, b)[keep], np.maximum(a, b)[keep], scores[keep]
+    for pair_a, pair_b, score in zip(a.tolist(), b.tolist(), scores.tolist()):
+        key = (pair_a, pair_b)
+        if score > found.get(key, -np.inf):
+            found[key] = score
+
+
+def _ann_candidates(index: Any, matrix: np.ndarray, ann_neighbors: int, block_rows: int) -> np.ndarray:
+    """
+    Sorted, unique ``lower * rows + higher`` codes of every row pair the index returns
+    in either direction: HNSW neighbour lists are not symmetric, so a pair found only
+    from its higher row must still be scored.
+    """
+
+    total = matrix.shape[0]
+    codes = []
+    for start in range(0, total, max(1, block_rows)):
+        stop = min(total, start + max(1, block_rows))
+        _, neighbours = index.search(matrix[start:stop], min(ann_neighbors + 1, total))
+        rows = np.repeat(np.arange(start, stop, dtype=np.int64), neighbours.shape[1])
+        columns = neighbours.ravel().astype(np.int64)
+        keep = (columns >= 0) & (columns != rows)
+        rows, columns = rows[keep], columns[keep]
+        codes.append(np.minimum(rows, columns) * total + np.maximum(rows, columns))
+    return np.unique(np.concatenate(codes)) if codes else np.zeros(0, dtype=np.int64)
+
+
+def _ann_index(matrix: np.ndarray) -> Any:
+    index = faiss.IndexHNSWFlat(matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+    index.add(np.ascontiguousarray(matrix))
+    return index
+
+
+def _fingerprint(user_ids: Sequence[str], owners: np.ndarray, matrix: np.ndarray, *params: Any) -> str:
+    digest = hashlib.sha256(json.dumps([list(user_ids), list(matrix.shape), *params]).encode("utf-8"))
+    digest.update(owners.tobytes())
+    digest.update(memoryview(np.ascontiguousarray(matrix)).cast("B"))
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path: str | Path | None, fingerprint: str) -> Tuple[set, int]:
+    if path is None or not Path(path).exists():
+        return set(), 0
+    state = json.loads(Path(path).read_text(encoding="utf-8"))
+    if state.get("fingerprint") != fingerprint:
+        raise ValueError(
+            f"Checkpoint {path} belongs to a different gallery or parameters; delete it to start over"
+        )
+    return set(state["completed"]), int(state["report_bytes"])
+
+
+def _save_checkpoint(path: str | Path | None, fingerprint: str, completed: set, report_bytes: int) -> None:
+    if path is None:
+        return
+    path = Path(path)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    temporary.write_text(
+        json.dumps({"fingerprint": fingerprint, "completed": sorted(completed), "report_bytes": report_bytes}),
+        encoding="utf-8",
+    )
+    os.replace(temporary, path)
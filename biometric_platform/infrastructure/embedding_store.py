@@ -1,11 +1,50 @@
 """
 Embedding store implementations.
+
+All stores follow the same concurrency model (see ``CopyOnWriteCell``): queries run
+lock-free against an immutable snapshot, while enrollments and deletions are batched into
+the next snapshot and published atomically. A reader therefore never observes a
+half-applied write, and a write never waits for readers.
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Any, DefaultDict, Iterable, List, Sequence, Tuple
+import heapq
+import itertools
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.base import BatchQueryResult
+from ..core.utils import top_k_per_owner
+from .concurrency import CopyOnWriteCell
+
+
+def _as_unit_rows(embeddings: Iterable[Any]) -> np.ndarray:
+    """Stack embeddings into an (n, d) float32 matrix with L2-normalized rows."""
+
+    matrix = np.asarray(list(embeddings) if not isinstance(embeddings, np.ndarray) else embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected 1-D embeddings, got array of shape {matrix.shape}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _probe_rows(embeddings: Iterable[Any]) -> np.ndarray:
+    """Like ``_as_unit_rows`` but an empty batch stays empty (zero probes)."""
+
+    if not isinstance(embeddings, np.ndarray):
+        embeddings = list(embeddings)
+    if len(embeddings) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    return _as_unit_rows(embeddings)
 
 
 class InMemoryEmbeddingStore:
@@ -15,29 +54,374 @@ class InMemoryEmbeddingStore:
 
     def __init__(self, modality: str = "generic") -> None:
         self.modality = modality
-        self._store: DefaultDict[str, List[Any]] = defaultdict(list)
+        # Snapshot: user_id -> tuple of embeddings. Published dicts are never mutated.
+        self._cell: CopyOnWriteCell[Mapping[str, Tuple[Any, ...]], Dict[str, Tuple[Any, ...]]] = CopyOnWriteCell(
+            {}, begin=dict, apply=self._apply, finish=lambda working: working
+        )
 
     def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
-        self._store[user_id].extend(list(embeddings))
+        self._cell.write(("add", user_id, tuple(embeddings)))
 
     def delete_user(self, user_id: str) -> None:
-        if user_id in self._store:
-            del self._store[user_id]
+        self._cell.write(("delete", user_id))
 
     def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]:
         results: List[Tuple[str, float, dict[str, Any]]] = []
-        for user_id, embeddings in self._store.items():
+        for user_id, embeddings in self._cell.read().items():
             score = max((self._score(embedding, stored) for stored in embeddings), default=0.0)
             metadata = {"num_samples": len(embeddings)}
             results.append((user_id, score, metadata))
         results.sort(key=lambda item: item[1], reverse=True)
         return results[:top_k]
 
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        # Samples may be placeholder strings, so there is no matrix form to batch over.
+        return BatchQueryResult.from_matches([self.query(embedding, top_k=top_k) for embedding in embeddings])
+
     def list_users(self) -> Sequence[str]:
-        return tuple(sorted(self._store.keys()))
+        return tuple(sorted(self._cell.read().keys()))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        return self._cell.read().get(user_id, ())
+
+    @staticmethod
+    def _apply(working: Dict[str, Tuple[Any, ...]], op: Tuple[Any, ...]) -> None:
+        if op[0] == "add":
+            _, user_id, embeddings = op
+            working[user_id] = working.get(user_id, ()) + embeddings
+        else:
+            working.pop(op[1], None)
 
     def _score(self, a: Any, b: Any) -> float:
+        # Numeric vectors are compared by cosine similarity; anything else (placeholder
+        # string samples) falls back to exact equality.
+        if isinstance(a, (list, tuple, np.ndarray)) and isinstance(b, (list, tuple, np.ndarray)):
+            va = np.asarray(a, dtype=np.float32).ravel()
+            vb = np.asarray(b, dtype=np.float32).ravel()
+            if va.shape == vb.shape:
+                denom = float(np.linalg.norm(va) * np.linalg.norm(vb))
+                return float(va @ vb) / denom if denom else 0.0
+            return 0.0
         if a == b:
             return 1.0
         return 0.0
 
+
+@dataclass(frozen=True)
+class _GallerySnapshot:
+    """Immutable view of a ``VectorEmbeddingStore``; rows/slots it covers are never rewritten."""
+
+    matrix: np.ndarray  # (rows, d) unit vectors
+    owners: np.ndarray  # (rows,) user slot per row, -1 once the user is deleted
+    user_ids: List[str]  # slot -> user_id; append-only, readers only index slots they cover
+    counts: np.ndarray  # (slots,) live rows per user slot, 0 for deleted users
+    slot_of: Dict[str, int]  # user_id -> slot of every live user; never changed once published
+    live_users: int
+    dead_rows: int
+
+
+class _GalleryBatch:
+    """Tracks which shared buffers one commit batch has already privatized."""
+
+    __slots__ = ("counts_private", "owners_private", "slots_private")
+
+    def __init__(self) -> None:
+        self.counts_private = False
+        self.owners_private = False
+        self.slots_private = False
+
+
+_EMPTY_SNAPSHOT = _GallerySnapshot(
+    matrix=np.zeros((0, 0), dtype=np.float32),
+    owners=np.zeros(0, dtype=np.int32),
+    user_ids=[],
+    counts=np.zeros(0, dtype=np.int32),
+    slot_of={},
+    live_users=0,
+    dead_rows=0,
+)
+
+
+class VectorEmbeddingStore:
+    """
+    Dense float32 gallery scored by cosine similarity.
+
+    Rows live in one growable matrix so a query is a single matrix-vector product followed
+    by an O(N) partial sort. Snapshots are views over the first ``rows`` entries of the
+    shared buffers: appends write past the end of every published view, and the rare
+    in-place changes (deleting a user, adding samples to an existing user) first copy the
+    small owner/count arrays, so enrolling new users never copies the gallery. The user ->
+    slot map is part of the snapshot and is copied once per batch that adds or deletes a
+    user, so readers never see the writer's map. Deleted rows are tombstoned and compacted
+    away once they make up half of the matrix.
+    """
+
+    modality = "generic"
+
+    def __init__(self, modality: str = "generic") -> None:
+        self.modality = modality
+        self._cell: CopyOnWriteCell[_GallerySnapshot, _GalleryBatch] = CopyOnWriteCell(
+            _EMPTY_SNAPSHOT, begin=lambda _: _GalleryBatch(), apply=self._apply, finish=self._finish
+        )
+        # Writer-side state, only touched by the committing writer.
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+        self._owner_buffer = np.zeros(0, dtype=np.int32)
+        self._count_buffer = np.zeros(0, dtype=np.int32)
+        self._user_ids: List[str] = []
+        self._slot_of: Dict[str, int] = {}
+        self._dead_rows = 0
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
+        rows = _as_unit_rows(embeddings)
+        if rows.shape[0]:
+            self._cell.write(("add", user_id, rows))
+
+    def delete_user(self, user_id: str) -> None:
+        self._cell.write(("delete", user_id))
+
+    def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]:
+        snapshot = self._cell.read()
+        if snapshot.live_users == 0 or top_k <= 0:
+            return []
+        probe = _as_unit_rows([embedding])[0]
+        if probe.shape[0] != snapshot.matrix.shape[1]:
+            raise ValueError(f"Query dimension {probe.shape[0]} does not match store dimension {snapshot.matrix.shape[1]}")
+        return self._top_users(snapshot, snapshot.matrix @ probe, min(top_k, snapshot.live_users))
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        """Score all probes with one matrix product per block of probes (same ranking as ``query``)."""
+
+        probes = _probe_rows(embeddings)
+        snapshot = self._cell.read()
+        if snapshot.live_users == 0 or top_k <= 0 or probes.shape[0] == 0:
+            return BatchQueryResult.empty(probes.shape[0])
+        if probes.shape[1] != snapshot.matrix.shape[1]:
+            raise ValueError(f"Query dimension {probes.shape[1]} does not match store dimension {snapshot.matrix.shape[1]}")
+        k = min(top_k, snapshot.live_users)
+        scores = np.empty((probes.shape[0], k), dtype=np.float32)
+        slots = np.empty((probes.shape[0], k), dtype=np.int64)
+        # Bound the (probes x rows) score block to roughly 64 MiB.
+        block = max(1, (1 << 24) // max(1, snapshot.matrix.shape[0]))
+        for start in range(0, probes.shape[0], block):
+            stop = start + block
+            scores[start:stop], slots[start:stop] = top_k_per_owner(
+                probes[start:stop] @ snapshot.matrix.T, snapshot.owners, k
+            )
+        # Slots index the snapshot's own user table; no per-query copy of user ids.
+        return BatchQueryResult(scores=scores, indices=slots, user_ids=snapshot.user_ids, num_samples=snapshot.counts)
+
+    def list_users(self) -> Sequence[str]:
+        snapshot = self._cell.read()
+        return tuple(sorted(snapshot.user_ids[slot] for slot in np.flatnonzero(snapshot.counts)))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        """Return the user's stored (unit-normalized) rows as an (n, d) matrix."""
+
+        snapshot = self._cell.read()
+        slot = snapshot.slot_of.get(user_id)
+        if slot is None or not snapshot.counts[slot]:
+            return np.zeros((0, snapshot.matrix.shape[1]), dtype=np.float32)
+        return snapshot.matrix[snapshot.owners == slot]
+
+    def export_rows(self) -> Tuple[np.ndarray, List[str]]:
+        """All live rows of the current snapshot and the user owning each row."""
+
+        snapshot = self._cell.read()
+        live = np.flatnonzero(snapshot.owners >= 0)
+        return snapshot.matrix[live], [snapshot.user_ids[slot] for slot in snapshot.owners[live]]
+
+    @staticmethod
+    def _top_users(snapshot: _GallerySnapshot, scores: np.ndarray, k: int) -> List[Tuple[str, float, dict[str, Any]]]:
+        owners = snapshot.owners
+        if snapshot.dead_rows:
+            scores = np.where(owners >= 0, scores, -np.inf)
+        total = scores.shape[0]
+        # A user's score is its best row, i.e. its first row in descending order. Take a
+        # few rows per wanted user and widen only if multi-sample users crowd the window.
+        window = min(total, k * 4)
+        while True:
+            if window < total:
+                candidates = np.argpartition(-scores, window - 1)[:window]
+            else:
+                candidates = np.arange(total)
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            slots = owners[candidates]
+            live = slots >= 0
+            candidates, slots = candidates[live], slots[live]
+            _, first = np.unique(slots, return_index=True)
+            if first.shape[0] >= k or window >= total:
+                break
+            window = min(total, window * 4)
+        chosen = candidates[np.sort(first)[:k]]
+        return [
+            (
+                snapshot.user_ids[owners[row]],
+                float(scores[row]),
+                {"num_samples": int(snapshot.counts[owners[row]])},
+            )
+            for row in chosen
+        ]
+
+    def _apply(self, batch: _GalleryBatch, op: Tuple[Any, ...]) -> None:
+        if op[0] == "add":
+            self._append(batch, op[1], op[2])
+        else:
+            self._remove(batch, op[1])
+
+    def _append(self, batch: _GalleryBatch, user_id: str, rows: np.ndarray) -> None:
+        if self._dim is None:
+            self._dim = rows.shape[1]
+            self._buffer = np.zeros((0, self._dim), dtype=np.float32)
+        elif rows.shape[1] != self._dim:
+            raise ValueError(f"Embedding dimension {rows.shape[1]} does not match store dimension {self._dim}")
+
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            slot = len(self._user_ids)
+            self._user_ids.append(user_id)
+            self._private_slots(batch)[user_id] = slot
+            if slot >= self._count_buffer.shape[0]:
+                self._count_buffer = self._grow(self._count_buffer, slot + 1, slot)
+                batch.counts_private = True
+        elif not batch.counts_private:
+            # Published snapshots cover this slot: copy before changing its count.
+            self._count_buffer = self._count_buffer.copy()
+            batch.counts_private = True
+
+        needed = self._rows + rows.shape[0]
+        if needed > self._buffer.shape[0]:
+            self._buffer = self._grow(self._buffer, needed, self._rows)
+            self._owner_buffer = self._grow(self._owner_buffer, needed, self._rows)
+            batch.owners_private = True
+        self._buffer[self._rows : needed] = rows
+        self._owner_buffer[self._rows : needed] = slot
+        self._count_buffer[slot] += rows.shape[0]
+        self._rows = needed
+
+    def _remove(self, batch: _GalleryBatch, user_id: str) -> None:
+        if user_id not in self._slot_of:
+            return
+        slot = self._private_slots(batch).pop(user_id)
+        if not batch.owners_private:
+            self._owner_buffer = self._owner_buffer.copy()
+            batch.owners_private = True
+        if not batch.counts_private:
+            self._count_buffer = self._count_buffer.copy()
+            batch.counts_private = True
+        owners = self._owner_buffer[: self._rows]
+        owners[owners == slot] = -1
+        self._dead_rows += int(self._count_buffer[slot])
+        self._count_buffer[slot] = 0
+
+    def _private_slots(self, batch: _GalleryBatch) -> Dict[str, int]:
+        # Published snapshots share the slot map: copy it once per batch before changing it.
+        if not batch.slots_private:
+            self._slot_of = dict(self._slot_of)
+            batch.slots_private = True
+        return self._slot_of
+
+    def _finish(self, batch: _GalleryBatch) -> _GallerySnapshot:
+        if self._dead_rows and self._dead_rows * 2 >= self._rows:
+            self._compact()
+        slots = len(self._user_ids)
+        return _GallerySnapshot(
+            matrix=self._buffer[: self._rows],
+            owners=self._owner_buffer[: self._rows],
+            user_ids=self._user_ids,
+            counts=self._count_buffer[:slots],
+            slot_of=self._slot_of,
+            live_users=len(self._slot_of),
+            dead_rows=self._dead_rows,
+        )
+
+    def _compact(self) -> None:
+        owners = self._owner_buffer[: self._rows]
+        live_rows = owners >= 0
+        live_slots = np.flatnonzero(self._count_buffer[: len(self._user_ids)])
+        remap = np.full(len(self._user_ids), -1, dtype=np.int32)
+        remap[live_slots] = np.arange(live_slots.shape[0], dtype=np.int32)
+
+        # Fresh buffers and a fresh user list: older snapshots keep the previous ones.
+        self._buffer = self._buffer[: self._rows][live_rows].copy()
+        self._owner_buffer = remap[owners[live_rows]]
+        self._count_buffer = self._count_buffer[live_slots].copy()
+        self._user_ids = [self._user_ids[slot] for slot in live_slots]
+        self._slot_of = {user_id: slot for slot, user_id in enumerate(self._user_ids)}
+        self._rows = self._buffer.shape[0]
+        self._dead_rows = 0
+
+    @staticmethod
+    def _grow(array: np.ndarray, needed: int, used: int) -> np.ndarray:
+        capacity = max(needed, 2 * array.shape[0], 1024)
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:used] = array[:used]
+        return grown
+
+
+class ShardedEmbeddingStore:
+    """
+    Gallery partitioned by ``crc32(user_id) % num_shards`` with parallel fan-out queries.
+
+    Each shard is an independent ``VectorEmbeddingStore``: enroll/delete are routed to the
+    owning shard and only batch with other writes to that shard, while a query scans every
+    shard's current snapshot concurrently on a thread pool (NumPy releases the GIL inside
+    the matrix-vector product) before a k-way merge of the per-shard top-k lists. Keep the
+    BLAS library single-threaded (e.g. ``OPENBLAS_NUM_THREADS=1``) so shard threads do not
+    oversubscribe the cores.
+    """
+
+    modality = "generic"
+
+    def __init__(self, modality: str = "generic", num_shards: Optional[int] = None, max_workers: Optional[int] = None) -> None:
+        self.modality = modality
+        self.num_shards = num_shards or os.cpu_count() or 1
+        if self.num_shards < 1:
+            raise ValueError("num_shards must be positive")
+        self._shards = [VectorEmbeddingStore(modality=modality) for _ in range(self.num_shards)]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.num_shards,
+            thread_name_prefix=f"{modality}-shard-query",
+        )
+
+    def shard_for(self, user_id: str) -> int:
+        return zlib.crc32(user_id.encode("utf-8")) % self.num_shards
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
+        self._shards[self.shard_for(user_id)].add_embeddings(user_id, _as_unit_rows(embeddings))
+
+    def delete_user(self, user_id: str) -> None:
+        self._shards[self.shard_for(user_id)].delete_user(user_id)
+
+    def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]:
+        probe = _as_unit_rows([embedding])[0]
+        if self.num_shards == 1:
+            return self._shards[0].query(probe, top_k=top_k)
+        futures = [self._executor.submit(shard.query, probe, top_k) for shard in self._shards]
+        partials = [future.result() for future in futures]
+        merged = heapq.merge(*partials, key=lambda item: item[1], reverse=True)
+        return list(itertools.islice(merged, top_k))
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        probes = _probe_rows(embeddings)
+        if self.num_shards == 1:
+            return self._shards[0].query_batch(probes, top_k=top_k)
+        futures = [self._executor.submit(shard.query_batch, probes, top_k) for shard in self._shards]
+        return BatchQueryResult.merge([future.result() for future in futures], top_k)
+
+    def list_users(self) -> Sequence[str]:
+        return tuple(sorted(itertools.chain.from_iterable(shard.list_users() for shard in self._shards)))
+
+    def export_rows(self) -> Tuple[np.ndarray, List[str]]:
+        exported = [shard.export_rows() for shard in self._shards]
+        matrices = [matrix for matrix, _ in exported if matrix.shape[0]]
+        if not matrices:
+            return np.zeros((0, 0), dtype=np.float32), []
+        return np.concatenate(matrices), list(itertools.chain.from_iterable(owners for _, owners in exported))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        return self._shards[self.shard_for(user_id)].get_embeddings(user_id)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
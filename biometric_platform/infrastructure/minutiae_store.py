@@ -0,0 +1,261 @@
+"""
+Fingerprint template gallery scored with binary cylinder codes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.fingerprint.mcc import CylinderCodec, CylinderSet
+from ..models.fingerprint.minutiae import MINUTIA_DTYPE
+from ..core.base import BatchQueryResult
+from ..core.utils import top_k_per_owner
+from .concurrency import CopyOnWriteCell
+
+
+@dataclass(frozen=True)
+class _TemplateSnapshot:
+    """Immutable view of a ``MinutiaeTemplateStore``; covered rows are never rewritten."""
+
+    codes: np.ndarray  # (templates, K, words) uint64, unused cylinder slots are zero
+    bit_counts: np.ndarray  # (templates, K) int32
+    angles: np.ndarray  # (templates, K) float32
+    sizes: np.ndarray  # (templates,) valid cylinders per template
+    owners: np.ndarray  # (templates,) user slot, -1 once the user is deleted
+    minutiae: List[np.ndarray]  # template -> stored MINUTIA_DTYPE array; append-only
+    user_ids: List[str]  # slot -> user_id; append-only
+    slot_of: Dict[str, int]  # user_id -> slot of every live user; never changed once published
+    live_users: int
+    dead_templates: int
+
+
+class MinutiaeTemplateStore:
+    """
+    1:N fingerprint gallery over minutiae templates.
+
+    Each enrolled template is stored as its ``MINUTIA_DTYPE`` array plus its binary
+    cylinders, padded to ``max_cylinders`` so the whole gallery is one
+    (templates, cylinders, words) uint64 block. A query encodes the probe once and scores
+    blocks of templates with broadcast XOR + popcount and a batched Local Similarity Sort;
+    a user's score is its best template. Writes follow the copy-on-write model of
+    ``VectorEmbeddingStore``: appends land past every published view and deletions
+    tombstone templates until they are compacted away.
+    """
+
+    modality = "fingerprint"
+
+    def __init__(
+        self,
+        modality: str = "fingerprint",
+        max_cylinders: int = 48,
+        block_bytes: int = 32 << 20,
+        codec: Optional[CylinderCodec] = None,
+        **codec_params: Any,
+    ) -> None:
+        self.modality = modality
+        self.codec = codec or CylinderCodec(**codec_params)
+        self._max_cylinders = max_cylinders
+        self._block_bytes = block_bytes
+        words = self.codec.num_words
+        # Writer-side state, only touched by the committing writer.
+        self._templates = 0
+        self._codes = np.zeros((0, max_cylinders, words), dtype=np.uint64)
+        self._bit_counts = np.zeros((0, max_cylinders), dtype=np.int32)
+        self._angles = np.zeros((0, max_cylinders), dtype=np.float32)
+        self._sizes = np.zeros(0, dtype=np.int32)
+        self._owners = np.zeros(0, dtype=np.int32)
+        self._minutiae: List[np.ndarray] = []
+        self._user_ids: List[str] = []
+        self._slot_of: Dict[str, int] = {}
+        self._dead = 0
+        self._owners_private = False
+        self._slots_private = False
+        self._cell: CopyOnWriteCell[_TemplateSnapshot, None] = CopyOnWriteCell(
+            self._snapshot_of(0), begin=lambda _: None, apply=self._apply, finish=lambda _: self._finish()
+        )
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
+        templates = [self._as_template(template) for template in embeddings]
+        if templates:
+            encoded = [(template, self._encode(template)) for template in templates]
+            self._cell.write(("add", user_id, encoded))
+
+    def delete_user(self, user_id: str) -> None:
+        self._cell.write(("delete", user_id))
+
+    def query(self, embedding: Any, top_k: int = 5) -> Sequence[Tuple[str, float, dict[str, Any]]]:
+        return self.query_batch([embedding], top_k=top_k)[0]
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        """
+        Score several probes in one pass over the gallery: the probes' cylinders are
+        concatenated, so every gallery block is XOR-ed against all of them at once and the
+        per-probe LSS runs on slices of the shared similarity block.
+        """
+
+        probes = [
+            embedding if isinstance(embedding, CylinderSet) else self._encode(self._as_template(embedding))
+            for embedding in embeddings
+        ]
+        snapshot = self._cell.read()
+        if snapshot.live_users == 0 or top_k <= 0 or not probes:
+            return BatchQueryResult.empty(len(probes))
+        scores = self._score_templates(snapshot, probes)
+        live = snapshot.owners >= 0
+        user_templates = np.bincount(snapshot.owners[live], minlength=len(snapshot.user_ids))
+        top_scores, top_slots = top_k_per_owner(scores, snapshot.owners, min(top_k, snapshot.live_users))
+        return BatchQueryResult(scores=top_scores, indices=top_slots, user_ids=snapshot.user_ids, num_samples=user_templates)
+
+    def list_users(self) -> Sequence[str]:
+        snapshot = self._cell.read()
+        slots = np.unique(snapshot.owners[snapshot.owners >= 0])
+        return tuple(sorted(snapshot.user_ids[slot] for slot in slots))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        snapshot = self._cell.read()
+        slot = snapshot.slot_of.get(user_id)
+        if slot is None:
+            return []
+        return [snapshot.minutiae[row] for row in np.flatnonzero(snapshot.owners == slot)]
+
+    def _score_templates(self, snapshot: _TemplateSnapshot, probes: List[CylinderSet]) -> np.ndarray:
+        """LSS score of every probe against every template, shape (probes, templates)."""
+
+        total = snapshot.sizes.shape[0]
+        scores = np.zeros((len(probes), total), dtype=np.float32)
+        sizes = np.array([len(probe) for probe in probes])
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        if offsets[-1] == 0:
+            return scores
+        combined = CylinderSet(
+            codes=np.concatenate([probe.codes for probe in probes]),
+            bit_counts=np.concatenate([probe.bit_counts for probe in probes]),
+            angles=np.concatenate([probe.angles for probe in probes]),
+        )
+        per_template = self._max_cylinders * int(offsets[-1]) * self.codec.num_words * 8
+        block = max(1, self._block_bytes // max(per_template, 1))
+        for start in range(0, total, block):
+            stop = min(total, start + block)
+            similarities = self.codec.similarity(
+                combined, snapshot.codes[start:stop], snapshot.bit_counts[start:stop], snapshot.angles[start:stop]
+            )
+            for index in np.flatnonzero(sizes):
+                counts = self.codec.pair_counts(int(sizes[index]), snapshot.sizes[start:stop])
+                scores[index, start:stop] = self.codec.lss(similarities[..., offsets[index] : offsets[index + 1]], counts)
+        return scores
+
+    def _as_template(self, template: Any) -> np.ndarray:
+        if isinstance(template, np.ndarray) and template.dtype == MINUTIA_DTYPE:
+            return template
+        if isinstance(template, (list, tuple)):
+            # JSON round-trips deliver rows as (x, y, angle, type) sequences or dicts.
+            rows = [tuple(row[name] for name in MINUTIA_DTYPE.names) if isinstance(row, dict) else tuple(row) for row in template]
+            return np.array(rows, dtype=MINUTIA_DTYPE)
+        raise TypeError(f"Expected a minutiae template, got {type(template)!r}")
+
+    def _encode(self, template: np.ndarray) -> CylinderSet:
+        if template.shape[0] > self._max_cylinders:
+            # Keep the minutiae nearest the centre of the print; peripheral ones are the
+            # least reliable and the most often cut off by the sensor.
+            xs, ys = template["x"].astype(np.float32), template["y"].astype(np.float32)
+            distance = (xs - xs.mean()) ** 2 + (ys - ys.mean()) ** 2
+            template = template[np.sort(np.argsort(distance, kind="stable")[: self._max_cylinders])]
+        return self.codec.encode(template)
+
+    def _apply(self, _: None, op: Tuple[Any, ...]) -> None:
+        if op[0] == "add":
+            self._append(op[1], op[2])
+        else:
+            self._remove(op[1])
+
+    def _append(self, user_id: str, encoded: List[Tuple[np.ndarray, CylinderSet]]) -> None:
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            slot = len(self._user_ids)
+            self._user_ids.append(user_id)
+            self._private_slots()[user_id] = slot
+
+        needed = self._templates + len(encoded)
+        if needed > self._sizes.shape[0]:
+            capacity = max(needed, 2 * self._sizes.shape[0], 256)
+            self._codes = self._grow(self._codes, capacity)
+            self._bit_counts = self._grow(self._bit_counts, capacity)
+            self._angles = self._grow(self._angles, capacity)
+            self._sizes = self._grow(self._sizes, capacity)
+            self._owners = self._grow(self._owners, capacity)
+            self._owners_private = True
+        for template, cylinders in encoded:
+            row, count = self._templates, len(cylinders)
+            self._codes[row, :count] = cylinders.codes
+            self._bit_counts[row, :count] = cylinders.bit_counts
+            self._angles[row, :count] = cylinders.angles
+            self._sizes[row] = count
+            self._owners[row] = slot
+            self._minutiae.append(template)
+            self._templates += 1
+
+    def _remove(self, user_id: str) -> None:
+        if user_id not in self._slot_of:
+            return
+        slot = self._private_slots().pop(user_id)
+        if not self._owners_private:
+            # Published snapshots cover these rows: copy before tombstoning.
+            self._owners = self._owners.copy()
+            self._owners_private = True
+        owners = self._owners[: self._templates]
+        self._dead += int((owners == slot).sum())
+        owners[owners == slot] = -1
+
+    def _finish(self) -> _TemplateSnapshot:
+        if self._dead and self._dead * 2 >= self._templates:
+            self._compact()
+        self._owners_private = self._slots_private = False
+        return self._snapshot_of(self._templates)
+
+    def _private_slots(self) -> Dict[str, int]:
+        # Published snapshots share the slot map: copy it once per batch before changing it.
+        if not self._slots_private:
+            self._slot_of = dict(self._slot_of)
+            self._slots_private = True
+        return self._slot_of
+
+    def _snapshot_of(self, rows: int) -> _TemplateSnapshot:
+        return _TemplateSnapshot(
+            codes=self._codes[:rows],
+            bit_counts=self._bit_counts[:rows],
+            angles=self._angles[:rows],
+            sizes=self._sizes[:rows],
+            owners=self._owners[:rows],
+            minutiae=self._minutiae,
+            user_ids=self._user_ids,
+            slot_of=self._slot_of,
+            live_users=len(self._slot_of),
+            dead_templates=self._dead,
+        )
+
+    def _compact(self) -> None:
+        live = self._owners[: self._templates] >= 0
+        live_slots = np.unique(self._owners[: self._templates][live])
+        remap = np.full(len(self._user_ids), -1, dtype=np.int32)
+        remap[live_slots] = np.arange(live_slots.shape[0], dtype=np.int32)
+
+        # Fresh buffers and lists: older snapshots keep the previous ones.
+        self._codes = self._codes[: self._templates][live].copy()
+        self._bit_counts = self._bit_counts[: self._templates][live].copy()
+        self._angles = self._angles[: self._templates][live].copy()
+        self._sizes = self._sizes[: self._templates][live].copy()
+        self._owners = remap[self._owners[: self._templates][live]]
+        self._minutiae = [template for template, keep in zip(self._minutiae, live) if keep]
+        self._user_ids = [self._user_ids[slot] for slot in live_slots]
+        self._slot_of = {user_id: slot for slot, user_id in enumerate(self._user_ids)}
+        self._templates = self._sizes.shape[0]
+        self._dead = 0
+
+    @staticmethod
+    def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[: array.shape[0]] = array
+        return grown
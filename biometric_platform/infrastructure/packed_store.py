@@ -0,0 +1,207 @@
+"""
+Packed raw sample storage.
+
+``PackedSampleStore`` keeps the content-addressed manifest and batched writer of
+``ContentAddressedSampleStore`` but appends sample bytes to large append-only segment
+files (``segments/segment-000001.pack``, ...) instead of creating one file per sample.
+The ``objects`` table of the manifest maps each object name to ``(segment, offset,
+length)``. Reads slice a read-only ``mmap`` of the segment, and bulk reads
+(``iter_contents``/``export``) walk samples in segment order, which makes them
+sequential I/O.
+
+Deleting a user only drops index rows; ``compact()`` rewrites the live objects into
+fresh segments, grouped by user, and removes the old ones. On open, segments that no
+index row refers to (an interrupted compaction) are deleted. Bytes past the last
+indexed object (an append cut short by a crash) are truncated. A root written by
+``ContentAddressedSampleStore`` is packed on first open.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .sample_store import OBJECTS_DIR, SEGMENTS_DIR, ContentAddressedSampleStore, _fsync_directory
+
+Location = Tuple[int, int, int]  # segment, offset, length
+
+
+class PackedSampleStore(ContentAddressedSampleStore):
+    """Deduplicated per-user samples packed into append-only, mmap-read segment files."""
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        segment_size: int = 256 * 1024 * 1024,
+        flush_interval: float = 0.05,
+        max_batch: int = 256,
+    ) -> None:
+        self._segment_size = segment_size
+        self._segments_dir = Path(root_dir) / SEGMENTS_DIR
+        self._locations: Dict[str, Location] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        # Held by the writer for each batch and by compact(), so segments only change in one place.
+        self._commit_lock = threading.Lock()
+        self._active = 1
+        super().__init__(root_dir, flush_interval=flush_interval, max_batch=max_batch)
+
+    def sample_ref(self, name: str) -> str:
+        return name
+
+    def segment_path(self, segment: int) -> Path:
+        return self._segments_dir / f"segment-{segment:06d}.pack"
+
+    def stats(self) -> Dict[str, int]:
+        """Segment count, bytes on disk and bytes still referenced (the rest is reclaimable)."""
+
+        with self._lock:
+            live = sum(length for _, _, length in self._locations.values())
+        paths = list(self._segments_dir.glob("segment-*.pack"))
+        return {"segments": len(paths), "segment_bytes": sum(path.stat().st_size for path in paths), "live_bytes": live}
+
+    def compact(self) -> int:
+        """Rewrite live objects into new segments, grouped by user; returns bytes reclaimed."""
+
+        with self._commit_lock:
+            with self._lock:
+                order = list(dict.fromkeys(name for names in self._index.values() for name in names))
+                # Objects of users whose deletion is still queued keep their rows until it commits.
+                order += [name for name in self._locations if name not in self._refs]
+                locations = {name: self._locations[name] for name in order if name in self._locations}
+            old_segments = sorted(self._segment_numbers())
+            before = sum(self.segment_path(segment).stat().st_size for segment in old_segments)
+
+            self._active = (old_segments[-1] + 1) if old_segments else 1
+            moved = self._append((name, self._read_object(name)) for name in locations)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "UPDATE objects SET segment = ?, offset = ?, length = ? WHERE name = ?",
+                        [(segment, offset, length, name) for name, (segment, offset, length) in moved],
+                    )
+            finally:
+                connection.close()
+            with self._lock:
+                self._locations.update(moved)
+                # Readers still holding an old map keep it alive; unlinking the file is safe.
+                self._maps = {}
+            for segment in old_segments:
+                self.segment_path(segment).unlink(missing_ok=True)
+            after = sum(self.segment_path(segment).stat().st_size for segment in self._segment_numbers())
+        return before - after
+
+    def _commit(self, connection: sqlite3.Connection, batch: List[Tuple[str, Any, Any, Any]]) -> None:
+        with self._commit_lock:
+            super()._commit(connection, batch)
+
+    def _load_objects(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " name TEXT PRIMARY KEY, segment INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+            )
+        ends: Dict[int, int] = {}
+        for name, segment, offset, length in connection.execute("SELECT name, segment, offset, length FROM objects"):
+            self._locations[name] = (segment, offset, length)
+            ends[segment] = max(ends.get(segment, 0), offset + length)
+
+        self._segments_dir.mkdir(parents=True, exist_ok=True)
+        for segment in self._segment_numbers():
+            path = self.segment_path(segment)
+            if segment not in ends:
+                path.unlink()
+            elif path.stat().st_size > ends[segment]:
+                os.truncate(path, ends[segment])
+        self._active = max(ends, default=1)
+
+        # Switching a store from the one-file-per-object layout: pack its files once.
+        loose = [name for name in self._refs if name not in self._locations and self.object_path(name).exists()]
+        if loose:
+            stored = self._append((name, self.object_path(name).read_bytes()) for name in loose)
+            with connection:
+                self._record_objects(connection, stored, [])
+            self._locations.update(stored)
+            shutil.rmtree(self._root / OBJECTS_DIR)
+
+    def _store_objects(self, objects: List[Tuple[str, bytes]]) -> List[Any]:
+        with self._lock:
+            new = {name: content for name, content in objects if name not in self._locations}
+        return self._append(list(new.items()))
+
+    def _append(self, objects: Iterable[Tuple[str, bytes]]) -> List[Tuple[str, Location]]:
+        """Append ``objects`` to the active segment (rolling over at ``segment_size``) and fsync."""
+
+        located: List[Tuple[str, Location]] = []
+        stream = None
+        created = False
+        try:
+            for name, content in objects:
+                if stream is None or (stream.tell() > 0 and stream.tell() + len(content) > self._segment_size):
+                    if stream is not None:
+                        stream.flush()
+                        os.fsync(stream.fileno())
+                        stream.close()
+                        self._active += 1
+                    path = self.segment_path(self._active)
+                    created = created or not path.exists()
+                    stream = path.open("ab")
+                located.append((name, (self._active, stream.tell(), len(content))))
+                stream.write(content)
+            if stream is not None:
+                stream.flush()
+                os.fsync(stream.fileno())
+        finally:
+            if stream is not None:
+                stream.close()
+        if created:
+            _fsync_directory(self._segments_dir)
+        return located
+
+    def _record_objects(self, connection: sqlite3.Connection, stored: List[Any], orphans: List[str]) -> None:
+        connection.executemany(
+            "INSERT OR REPLACE INTO objects (name, segment, offset, length) VALUES (?, ?, ?, ?)",
+            [(name, segment, offset, length) for name, (segment, offset, length) in stored],
+        )
+        connection.executemany("DELETE FROM objects WHERE name = ?", [(name,) for name in orphans])
+
+    def _publish(self, stored: List[Any], orphans: List[str]) -> None:
+        self._locations.update(stored)
+        for name in orphans:
+            self._locations.pop(name, None)
+
+    def _remove_orphans(self, orphans: List[str]) -> None:
+        pass  # their bytes stay in the segment until compact()
+
+    def _read_object(self, name: str) -> bytes:
+        with self._lock:
+            location = self._locations.get(name)
+        if location is None:
+            raise KeyError(f"Unknown sample object: {name}")
+        segment, offset, length = location
+        if length == 0:
+            return b""
+        return self._map(segment, offset + length)[offset : offset + length]
+
+    def _map(self, segment: int, size: int) -> mmap.mmap:
+        with self._lock:
+            mapped: Optional[mmap.mmap] = self._maps.get(segment)
+            if mapped is None or len(mapped) < size:  # the active segment has grown since it was mapped
+                with self.segment_path(segment).open("rb") as stream:
+                    mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapped
+            return mapped
+
+    def _physical_order(self, entries: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        with self._lock:
+            locations = dict(self._locations)
+        end = (float("inf"), 0, 0)
+        return sorted(entries, key=lambda entry: locations.get(entry[1], end)[:2])
+
+    def _segment_numbers(self) -> List[int]:
+        return [int(path.stem.split("-")[1]) for path in self._segments_dir.glob("segment-*.pack")]
@@ -0,0 +1,239 @@
+"""
+Scatter-gather embedding store that partitions the gallery across shard API nodes.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.base import BatchQueryResult
+
+
+class ShardUnavailableError(RuntimeError):
+    """Raised when a shard (all of its replicas) cannot serve a request."""
+
+
+class GatherResult(list):
+    """Merged top-k matches plus flags describing which shards contributed."""
+
+    def __init__(self, matches: Iterable[Tuple[str, float, dict[str, Any]]], missing_shards: Sequence[int] = ()) -> None:
+        super().__init__(matches)
+        self.missing_shards = tuple(missing_shards)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.missing_shards)
+
+
+def _request_json(url: str, method: str = "GET", body: Optional[dict[str, Any]] = None, timeout_s: float = 5.0) -> Any:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout_s) as response:
+            return json.loads(response.read() or b"null")
+    except (urllib.error.URLError, OSError, ValueError) as exc:
+        raise ShardUnavailableError(f"{method} {url} failed: {exc}") from exc
+
+
+class _ShardCall:
+    """Book-keeping for one shard during a hedged scatter."""
+
+    __slots__ = ("index", "replicas", "attempts", "last_sent", "futures", "result", "error")
+
+    def __init__(self, index: int, replicas: Sequence[str]) -> None:
+        self.index = index
+        self.replicas = replicas
+        self.attempts = 0
+        self.last_sent = 0.0
+        self.futures: List[Future] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ScatterGatherEmbeddingStore:
+    """
+    Coordinator-side ``EmbeddingStore`` backed by shard nodes (the API in the ``shard`` role).
+
+    Users are owned by shard ``crc32(user_id) % len(shards)``; writes go to every replica of
+    the owning shard. A query is scattered to all shards and their local top-k lists are
+    k-way merged. Each shard call is bounded by ``timeout_s``; if a replica has not answered
+    after ``hedge_after_s`` (or fails), the request is re-sent to the next replica and the
+    first answer wins. Shards that still fail are reported through ``GatherResult.partial``
+    instead of failing the whole query, unless ``allow_partial`` is false.
+
+    ``shards`` entries are either a base URL or a list of replica base URLs.
+    """
+
+    modality = "generic"
+
+    def __init__(
+        self,
+        modality: str = "generic",
+        shards: Sequence[str | Sequence[str]] = (),
+        timeout_s: float = 2.0,
+        hedge_after_s: Optional[float] = 0.2,
+        max_attempts: int = 2,
+        allow_partial: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if not shards:
+            raise ValueError("ScatterGatherEmbeddingStore requires at least one shard")
+        self.modality = modality
+        self._shards: List[Tuple[str, ...]] = [
+            (entry.rstrip("/"),) if isinstance(entry, str) else tuple(url.rstrip("/") for url in entry)
+            for entry in shards
+        ]
+        self._timeout_s = timeout_s
+        self._hedge_after_s = hedge_after_s
+        self._max_attempts = max(1, max_attempts)
+        self._allow_partial = allow_partial
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self._shards) * self._max_attempts * 4,
+            thread_name_prefix=f"{modality}-scatter",
+        )
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._shards)
+
+    def shard_for(self, user_id: str) -> int:
+        return zlib.crc32(user_id.encode("utf-8")) % len(self._shards)
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any]) -> None:
+        rows = np.asarray(list(embeddings) if not isinstance(embeddings, np.ndarray) else embeddings, dtype=np.float32)
+        body = {"user_id": user_id, "embeddings": np.atleast_2d(rows).tolist()}
+        for replica in self._shards[self.shard_for(user_id)]:
+            _request_json(self._url(replica, "embeddings"), "POST", body, self._timeout_s)
+
+    def delete_user(self, user_id: str) -> None:
+        quoted = urllib.parse.quote(user_id, safe="")
+        for replica in self._shards[self.shard_for(user_id)]:
+            _request_json(self._url(replica, f"users/{quoted}"), "DELETE", None, self._timeout_s)
+
+    def query(self, embedding: Any, top_k: int = 5) -> GatherResult:
+        body = {"embedding": np.asarray(embedding, dtype=np.float32).ravel().tolist(), "top_k": top_k}
+        answers, missing = self._scatter("query", "POST", body)
+        partials = [
+            [(match["user_id"], float(match["score"]), {**match.get("metadata", {}), "shard": index}) for match in answer["matches"]]
+            for index, answer in answers.items()
+        ]
+        merged = heapq.merge(*partials, key=lambda item: item[1], reverse=True)
+        return GatherResult(itertools.islice(merged, top_k), missing)
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5) -> BatchQueryResult:
+        """One request per shard for all probes; shard answers are merged per probe."""
+
+        rows = np.asarray(list(embeddings) if not isinstance(embeddings, np.ndarray) else embeddings, dtype=np.float32)
+        if rows.shape[0] == 0:
+            return BatchQueryResult.empty(0)
+        body = {"embeddings": rows.reshape(rows.shape[0], -1).tolist(), "top_k": top_k}
+        answers, missing = self._scatter("query_batch", "POST", body)
+        partials = []
+        for index, answer in answers.items():
+            indices = np.asarray(answer["indices"], dtype=np.int64).reshape(rows.shape[0], -1)
+            scores = np.asarray(answer["scores"], dtype=np.float32).reshape(indices.shape)
+            partials.append(
+                BatchQueryResult(
+                    scores=np.where(indices >= 0, scores, -np.inf).astype(np.float32),
+                    indices=indices,
+                    user_ids=answer["user_ids"],
+                    num_samples=np.asarray(answer["num_samples"], dtype=np.int64),
+                    metadata=[{"shard": index}] * len(answer["user_ids"]),
+                )
+            )
+        return BatchQueryResult.merge(partials, top_k, missing_shards=missing)
+
+    def list_users(self) -> Sequence[str]:
+        answers, _ = self._scatter("users", "GET", None)
+        return tuple(sorted(itertools.chain.from_iterable(answer["users"] for answer in answers.values())))
+
+    def get_embeddings(self, user_id: str) -> Sequence[Any]:
+        quoted = urllib.parse.quote(user_id, safe="")
+        error: Optional[ShardUnavailableError] = None
+        # Replicas hold identical rows, so fail over in order rather than scattering.
+        for replica in self._shards[self.shard_for(user_id)]:
+            try:
+                answer = _request_json(self._url(replica, f"users/{quoted}/embeddings"), "GET", None, self._timeout_s)
+            except ShardUnavailableError as exc:
+                error = exc
+                continue
+            return np.asarray(answer["embeddings"], dtype=np.float32)
+        raise error or ShardUnavailableError(f"Shard {self.shard_for(user_id)} has no replicas")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _url(self, replica: str, path: str) -> str:
+        return f"{replica}/shard/{self.modality}/{path}"
+
+    def _send(self, call: _ShardCall, path: str, method: str, body: Optional[dict[str, Any]]) -> None:
+        replica = call.replicas[call.attempts % len(call.replicas)]
+        call.attempts += 1
+        call.last_sent = time.monotonic()
+        future = self._executor.submit(_request_json, self._url(replica, path), method, body, self._timeout_s)
+        future.shard_call = call  # type: ignore[attr-defined]
+        call.futures.append(future)
+
+    def _scatter(self, path: str, method: str, body: Optional[dict[str, Any]]) -> Tuple[Dict[int, Any], List[int]]:
+        deadline = time.monotonic() + self._timeout_s
+        calls = [_ShardCall(index, replicas) for index, replicas in enumerate(self._shards)]
+        for call in calls:
+            self._send(call, path, method, body)
+
+        unresolved = {call.index: call for call in calls}
+        while unresolved:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake_at = deadline
+            if self._hedge_after_s is not None:
+                for call in unresolved.values():
+                    if call.attempts < self._max_attempts:
+                        wake_at = min(wake_at, call.last_sent + self._hedge_after_s)
+            # Completed-but-unprocessed futures stay in ``call.futures`` and are returned by
+            # ``wait`` immediately, so no answer can slip between iterations.
+            pending = [future for call in unresolved.values() for future in call.futures]
+            done, _ = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                call = future.shard_call  # type: ignore[attr-defined]
+                call.futures.remove(future)
+                if call.index not in unresolved:
+                    continue
+                error = future.exception()
+                if error is None:
+                    call.result = future.result()
+                    del unresolved[call.index]
+                    for other in call.futures:
+                        other.cancel()
+                    continue
+                call.error = error
+                if call.attempts < self._max_attempts:
+                    self._send(call, path, method, body)
+                elif not call.futures:
+                    del unresolved[call.index]
+
+            if self._hedge_after_s is not None:
+                now = time.monotonic()
+                for call in unresolved.values():
+                    if call.attempts < self._max_attempts and now - call.last_sent >= self._hedge_after_s:
+                        self._send(call, path, method, body)
+
+        answers = {call.index: call.result for call in calls if call.result is not None}
+        missing = sorted(call.index for call in calls if call.result is None)
+        if not answers:
+            raise ShardUnavailableError(f"No shard answered {method} {path} for modality '{self.modality}'")
+        if missing and not self._allow_partial:
+            raise ShardUnavailableError(f"Shards {missing} did not answer {method} {path}")
+        return answers, missing
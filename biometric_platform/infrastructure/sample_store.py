@@ -0,0 +1,335 @@
+"""
+Content-addressed raw sample storage.
+
+Each sample is stored once under the SHA-256 of its bytes, fanned out over two directory
+levels (``objects/ab/cd/abcd....jpg``), so re-enrolling an image or sharing it between
+users costs no extra space. A SQLite manifest maps users to their samples. An
+in-memory copy of it answers listings with a dict lookup.
+
+Writes leave the request path: ``put`` hashes the bytes, updates the in-memory index
+(visible to the next listing) and queues the file. A background writer drains the queue
+in batches. It writes every new file of a batch, fsyncs the files and their directories,
+then records the batch in one SQLite transaction, so many enrollments share the cost of
+one durable commit. ``flush()`` waits until everything queued so far is durable. A failed
+batch is logged and its samples are dropped from the index; the next ``put`` or
+``flush`` raises ``SampleWriteError``, so the failure reaches a request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MANIFEST_NAME = "manifest.sqlite3"
+OBJECTS_DIR = "objects"
+SEGMENTS_DIR = "segments"
+# Dataset manager ``sample_backend`` values: one file per object, or packed segments.
+SAMPLE_BACKENDS = ("files", "packed")
+
+logger = logging.getLogger(__name__)
+
+
+class SampleWriteError(RuntimeError):
+    """A background batch of sample writes failed; its samples were not stored."""
+
+
+class ContentAddressedSampleStore:
+    """Deduplicated per-user sample files with an asynchronous, batch-fsynced writer."""
+
+    def __init__(self, root_dir: str | Path, flush_interval: float = 0.05, max_batch: int = 256) -> None:
+        self._root = Path(root_dir)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._root / MANIFEST_NAME
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._lock = threading.Lock()
+        # user -> {object name: None}, insertion ordered; object name -> referencing users.
+        self._index: Dict[str, Dict[str, None]] = {}
+        self._refs: Counter[str] = Counter()
+        self._error: Optional[BaseException] = None
+        # Queued contents by object name, readable until the writer has stored them.
+        self._pending: Dict[str, bytes] = {}
+
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " user_id TEXT NOT NULL, name TEXT NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (user_id, name))"
+            )
+        for user_id, name in connection.execute("SELECT user_id, name FROM samples ORDER BY created_at, rowid"):
+            self._index.setdefault(user_id, {})[name] = None
+            self._refs[name] += 1
+        self._load_objects(connection)
+        connection.close()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name=f"sample-writer-{self._root.name}", daemon=True)
+        self._writer.start()
+
+    @property
+    def root_dir(self) -> Path:
+        return self._root
+
+    def object_path(self, name: str) -> Path:
+        return self._root / OBJECTS_DIR / name[:2] / name[2:4] / name
+
+    def sample_ref(self, name: str) -> str:
+        """What listings return for object ``name``: its file path."""
+
+        return str(self.object_path(name))
+
+    def put(self, user_id: str, samples: Sequence[Tuple[bytes, str]]) -> List[str]:
+        """Queue ``(content, extension)`` samples for ``user_id``; returns their refs."""
+
+        self._raise_failure()
+        refs = []
+        for content, extension in samples:
+            name = f"{hashlib.sha256(content).hexdigest()}.{extension}"
+            with self._lock:
+                user = self._index.setdefault(user_id, {})
+                if name not in user:
+                    user[name] = None
+                    self._refs[name] += 1
+                    self._pending[name] = content
+                    self._queue.put(("put", user_id, name, content))
+            refs.append(self.sample_ref(name))
+        return refs
+
+    def list(self, user_id: str) -> List[str]:
+        with self._lock:
+            names = list(self._index.get(user_id, ()))
+        return [self.sample_ref(name) for name in names]
+
+    def users(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def iter_samples(self) -> Iterator[Tuple[str, str]]:
+        """``(user_id, ref)`` for every stored sample."""
+
+        with self._lock:
+            entries = [(user_id, name) for user_id, names in self._index.items() for name in names]
+        for user_id, name in entries:
+            yield user_id, self.sample_ref(name)
+
+    def read(self, ref: str) -> bytes:
+        """Content of a sample ref (also accepted: a bare object name); queued samples included."""
+
+        name = Path(ref).name
+        with self._lock:
+            content = self._pending.get(name)
+        return content if content is not None else self._read_object(name)
+
+    def iter_contents(self) -> Iterator[Tuple[str, str, bytes]]:
+        """``(user_id, ref, content)`` for every sample, in on-disk order for bulk reads."""
+
+        with self._lock:
+            entries = [(user_id, name) for user_id, names in self._index.items() for name in names]
+        for user_id, name in self._physical_order(entries):
+            yield user_id, self.sample_ref(name), self.read(name)
+
+    def export(self, directory: str | Path) -> int:
+        """Write every sample to ``<directory>/<user_id>/<object name>``; returns files written."""
+
+        directory = Path(directory)
+        written = 0
+        for user_id, ref, content in self.iter_contents():
+            target = directory / user_id / Path(ref).name
+            if target.exists():  # content-addressed: an existing file is the same sample
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temporary = target.with_name(f".{target.name}.tmp")
+            temporary.write_bytes(content)
+            os.replace(temporary, target)
+            written += 1
+        return written
+
+    def import_tree(self, directory: str | Path, remove: bool = False) -> int:
+        """Add every ``<directory>/<user_id>/<file>`` (e.g. the former per-user layout) and flush."""
+
+        directory = Path(directory)
+        reserved = {MANIFEST_NAME, OBJECTS_DIR, SEGMENTS_DIR}
+        user_dirs = [path for path in sorted(directory.iterdir()) if path.is_dir() and path.name not in reserved]
+        count = 0
+        for user_dir in user_dirs:
+            files = sorted(path for path in user_dir.iterdir() if path.is_file())
+            self.put(user_dir.name, [(path.read_bytes(), path.suffix.lstrip(".").lower() or "bin") for path in files])
+            count += len(files)
+        self.flush()
+        if remove:
+            for user_dir in user_dirs:
+                shutil.rmtree(user_dir)
+        return count
+
+    def delete_user(self, user_id: str) -> None:
+        with self._lock:
+            names = self._index.pop(user_id, {})
+            for name in names:
+                self._refs[name] -= 1
+                if self._refs[name] <= 0:
+                    del self._refs[name]
+            if names:
+                self._queue.put(("delete", user_id, list(names), None))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued write is durable; raises if a batch failed since the last check."""
+
+        done = threading.Event()
+        self._queue.put(("flush", None, None, done))
+        if not done.wait(timeout):
+            raise TimeoutError("Sample writer did not flush in time")
+        self._raise_failure()
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._manifest, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def _run(self) -> None:
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._flush_interval
+            while batch[-1] is not None and batch[-1][0] != "flush" and len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            ops = [op for op in batch if op is not None]
+            try:
+                self._commit(connection, ops)
+            except BaseException as exc:  # surfaced by the next put() or flush()
+                logger.exception("Sample writer failed to store a batch of %d operations in %s", len(ops), self._root)
+                with self._lock:
+                    self._error = exc
+                self._discard_puts(ops)
+            for op in batch:
+                if op is not None and op[0] == "flush":
+                    op[3].set()
+            if stop:
+                connection.close()
+                return
+
+    def _commit(self, connection: sqlite3.Connection, batch: List[Tuple[str, Any, Any, Any]]) -> None:
+        stored = self._store_objects([(name, content) for kind, _, name, content in batch if kind == "put"])
+        with self._lock:
+            orphans = [
+                name for kind, _, names, _ in batch if kind == "delete" for name in names if self._refs.get(name, 0) <= 0
+            ]
+
+        now = time.time()
+        with connection:
+            self._record_objects(connection, stored, orphans)
+            for kind, user_id, names, _ in batch:
+                if kind == "put":  # ``names`` is the single object name of a put
+                    connection.execute(
+                        "INSERT OR IGNORE INTO samples (user_id, name, created_at) VALUES (?, ?, ?)", (user_id, names, now)
+                    )
+                elif kind == "delete":
+                    connection.execute("DELETE FROM samples WHERE user_id = ?", (user_id,))
+
+        with self._lock:
+            self._publish(stored, orphans)
+            for kind, _, name, _ in batch:
+                if kind == "put":
+                    self._pending.pop(name, None)
+        self._remove_orphans(orphans)
+
+    def _raise_failure(self) -> None:
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise SampleWriteError(f"Storing samples under {self._root} failed: {error}") from error
+
+    def _discard_puts(self, batch: List[Tuple[str, Any, Any, Any]]) -> None:
+        """Forget a failed batch's samples, so listings match what the manifest holds."""
+
+        with self._lock:
+            for kind, user_id, name, _ in batch:
+                if kind != "put":
+                    continue
+                self._pending.pop(name, None)
+                user = self._index.get(user_id)
+                if user is not None and name in user:
+                    del user[name]
+                    self._refs[name] -= 1
+                    if self._refs[name] <= 0:
+                        del self._refs[name]
+                    if not user:
+                        del self._index[user_id]
+
+    # Object storage hooks; PackedSampleStore replaces the one-file-per-object layout.
+
+    def _load_objects(self, connection: sqlite3.Connection) -> None:
+        pass
+
+    def _store_objects(self, objects: List[Tuple[str, bytes]]) -> List[Any]:
+        """Make the new objects of a batch durable before the manifest refers to them."""
+
+        directories = set()
+        for name, content in objects:
+            path = self.object_path(name)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary = path.with_name(f".{name}.tmp")
+                with temporary.open("wb") as stream:
+                    stream.write(content)
+                    stream.flush()
+                    os.fsync(stream.fileno())
+                os.replace(temporary, path)
+                directories.add(path.parent)
+        for directory in directories:
+            _fsync_directory(directory)
+        return []
+
+    def _record_objects(self, connection: sqlite3.Connection, stored: List[Any], orphans: List[str]) -> None:
+        pass
+
+    def _publish(self, stored: List[Any], orphans: List[str]) -> None:
+        pass
+
+    def _remove_orphans(self, orphans: List[str]) -> None:
+        for name in orphans:
+            with self._lock:
+                referenced = self._refs.get(name, 0) > 0
+            if not referenced:
+                self.object_path(name).unlink(missing_ok=True)
+
+    def _read_object(self, name: str) -> bytes:
+        return self.object_path(name).read_bytes()
+
+    def _physical_order(self, entries: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return entries
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Make renames into ``directory`` durable (no-op where directories cannot be opened)."""
+
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,232 @@
+"""
+Embedding store that keeps templates per embedding-model version.
+
+Templates produced by different models (or weights) are not comparable, so each model
+fingerprint (``EmbeddingModel.fingerprint()``) gets its own inner store, and the store
+remembers the model that produced each version. Verifiers are created per request, so
+this store (one per modality) is also where they find the model to embed with.
+
+During a template migration a target version is filled in the background
+(``migrate_user``) while the source version stays active. Both versions serve queries, and
+enrollments are written to both (``add_versioned_embeddings``). ``finish_migration``
+then switches every default call to the target with one reference assignment, and
+``drop_version`` releases the old templates and model.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.base import BatchQueryResult
+from ..core.utils import import_string
+
+DEFAULT_INNER_STORE = {"class": "biometric_platform.infrastructure.VectorEmbeddingStore", "params": {}}
+
+# ``migrate_user`` outcomes.
+MIGRATED = "migrated"
+SKIPPED = "skipped"  # deleted meanwhile, or already written by an enrollment during the migration
+STALE = "stale"  # the user changed while being re-embedded; re-embed again
+
+
+@dataclass(frozen=True)
+class _VersionState:
+    active: Optional[str] = None
+    stores: Mapping[str, Any] = field(default_factory=dict)
+    models: Mapping[str, Any] = field(default_factory=dict)
+    target: Optional[str] = None
+
+
+class VersionedEmbeddingStore:
+    """Per-model-version inner stores (``store``: ``{class, params}``) behind one active version."""
+
+    modality = "generic"
+
+    def __init__(self, modality: str = "generic", store: Optional[Mapping[str, Any]] = None) -> None:
+        self.modality = modality
+        self._store_cfg = dict(store or DEFAULT_INNER_STORE)
+        # Replaced as a whole, never mutated: a reader sees one consistent version table.
+        self._state = _VersionState()
+        # Serializes version changes and writes, so a migrated user never misses an enrollment.
+        self._lock = threading.Lock()
+        self._generations: Counter[str] = Counter()
+        self._empty: Any = None
+        self.migration: Any = None  # the running or last TemplateMigration, for status reports
+
+    @property
+    def active_version(self) -> Optional[str]:
+        return self._state.active
+
+    def versions(self) -> List[str]:
+        return list(self._state.stores)
+
+    def active_model(self) -> Optional[Tuple[str, Any]]:
+        state = self._state
+        return None if state.active is None else (state.active, state.models.get(state.active))
+
+    def migration_target(self) -> Optional[Tuple[str, Any]]:
+        state = self._state
+        return None if state.target is None else (state.target, state.models[state.target])
+
+    def claim_version(self, version: str, model: Any) -> Tuple[str, Any]:
+        """Tag an untagged store with ``version``/``model``; returns the active version and model."""
+
+        with self._lock:
+            if self._state.active is None:
+                self._state = _VersionState(active=version, stores={version: self._create()}, models={version: model})
+            return self._state.active, self._state.models[self._state.active]
+
+    def begin_migration(self, version: str, model: Any) -> None:
+        with self._lock:
+            state = self._state
+            if state.active is None:
+                raise ValueError("Template store has no active version to migrate from")
+            if state.target is not None:
+                raise ValueError(f"A migration to {state.target} is already in progress")
+            if version == state.active:
+                raise ValueError("Templates are already at the requested version")
+            self._state = replace(
+                state,
+                stores={**state.stores, version: self._create()},
+                models={**state.models, version: model},
+                target=version,
+            )
+
+    def unmigrated_users(self, ignore: Iterable[str] = ()) -> List[str]:
+        """Users of the active version that the migration target does not hold yet."""
+
+        state = self._state
+        if state.target is None:
+            return []
+        missing = set(state.stores[state.active].list_users()) - set(state.stores[state.target].list_users())
+        return sorted(missing - set(ignore))
+
+    def finish_migration(self, ignore: Iterable[str] = ()) -> Optional[str]:
+        """
+        Atomically make the migration target the active version and return the previous
+        one. Returns ``None`` without switching while users other than ``ignore`` are
+        still unmigrated (e.g. enrolled by a request that started before the migration).
+        """
+
+        with self._lock:
+            state = self._state
+            if state.target is None:
+                raise ValueError("No migration in progress")
+            if self.unmigrated_users(ignore):
+                return None
+            self._state = replace(state, active=state.target, target=None)
+            return state.active
+
+    def abort_migration(self) -> None:
+        with self._lock:
+            target = self._state.target
+            self._state = replace(self._state, target=None)
+        if target is not None:
+            self.drop_version(target)
+
+    def drop_version(self, version: str) -> None:
+        with self._lock:
+            state = self._state
+            if version in (state.active, state.target):
+                raise ValueError(f"Cannot drop template version {version} while it is in use")
+            dropped = state.stores.get(version)
+            self._state = replace(
+                state,
+                stores={name: store for name, store in state.stores.items() if name != version},
+                models={name: model for name, model in state.models.items() if name != version},
+            )
+        close = getattr(dropped, "close", None)
+        if close is not None:
+            close()
+
+    def generation(self, user_id: str) -> int:
+        """Changes whenever ``user_id`` is enrolled or deleted."""
+
+        return self._generations[user_id]
+
+    def add_embeddings(self, user_id: str, embeddings: Iterable[Any], version: Optional[str] = None) -> None:
+        with self._lock:
+            self._store(version, write=True).add_embeddings(user_id, embeddings)
+            self._generations[user_id] += 1
+
+    def add_versioned_embeddings(self, user_id: str, embeddings: Mapping[str, Iterable[Any]]) -> None:
+        """
+        Enroll templates computed by several models. The active version always receives
+        its templates; another version receives them only if it already holds the user or
+        the user is new, so a user still waiting for migration is not half-written.
+        """
+
+        with self._lock:
+            state = self._state
+            known = len(self._store(None, write=True).get_embeddings(user_id)) > 0
+            for version, rows in embeddings.items():
+                if version not in state.stores:
+                    continue  # the migration finished or was aborted meanwhile
+                if version == state.active or not known or len(state.stores[version].get_embeddings(user_id)):
+                    state.stores[version].add_embeddings(user_id, rows)
+            self._generations[user_id] += 1
+
+    def migrate_user(self, user_id: str, embeddings: Iterable[Any], version: str, generation: int) -> str:
+        """
+        Add re-embedded templates for ``user_id`` to ``version``. ``generation`` is
+        ``generation(user_id)`` from before its samples were read; if the user changed
+        since, nothing is written and ``STALE`` is returned.
+        """
+
+        embeddings = list(embeddings)
+        with self._lock:
+            if self._generations[user_id] != generation:
+                return STALE
+            if len(self._store(None).get_embeddings(user_id)) == 0 or len(self._store(version).get_embeddings(user_id)):
+                return SKIPPED
+            self._store(version, write=True).add_embeddings(user_id, embeddings)
+            return MIGRATED
+
+    def delete_user(self, user_id: str) -> None:
+        with self._lock:
+            for store in self._state.stores.values():
+                store.delete_user(user_id)
+            self._generations[user_id] += 1
+
+    def query(self, embedding: Any, top_k: int = 5, version: Optional[str] = None) -> Sequence[Tuple[str, float, dict[str, Any]]]:
+        return self._store(version).query(embedding, top_k=top_k)
+
+    def query_batch(self, embeddings: Iterable[Any], top_k: int = 5, version: Optional[str] = None) -> BatchQueryResult:
+        return self._store(version).query_batch(embeddings, top_k=top_k)
+
+    def list_users(self, version: Optional[str] = None) -> Sequence[str]:
+        return self._store(version).list_users()
+
+    def get_embeddings(self, user_id: str, version: Optional[str] = None) -> Sequence[Any]:
+        return self._store(version).get_embeddings(user_id)
+
+    def export_rows(self, version: Optional[str] = None) -> Tuple[np.ndarray, List[str]]:
+        return self._store(version).export_rows()
+
+    def close(self) -> None:
+        for store in self._state.stores.values():
+            close = getattr(store, "close", None)
+            if close is not None:
+                close()
+
+    def _store(self, version: Optional[str], write: bool = False) -> Any:
+        state = self._state
+        name = version or state.active
+        if name is None:
+            if write:
+                raise KeyError("Template store has no version yet; call claim_version() first")
+            if self._empty is None:
+                self._empty = self._create()
+            return self._empty  # reads of an untagged store see an empty gallery
+        try:
+            return state.stores[name]
+        except KeyError:
+            raise KeyError(f"Unknown template version: {name}") from None
+
+    def _create(self) -> Any:
+        store_cls = import_string(self._store_cfg["class"])
+        return store_cls(modality=self.modality, **self._store_cfg.get("params", {}))
@@ -4,22 +4,62 @@ FastAPI application exposing biometric services.
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import json
+import os
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from ...bootstrap import initialize_registry
+from ...bootstrap import initialize_registry, initialize_shard_stores
+from ...core import BiometricServiceRegistry, FusionSettings, FusionVerifier, SampleQualityError, load_app_config
+from ...core.config import AppConfig, load_yaml_file
+from ...models import ModelConfigWatcher, ModelManager
+from ...models.voice.audio import PCMStreamDecoder
+from .profiling import ProfilingSettings, RequestSampler, TraceMiddleware
+from .shard import create_shard_router
 from .schemas import (
     DeleteResponse,
     EnrollmentRequest,
     EnrollmentResponse,
+    FaceStreamStart,
+    FusionVerificationRequest,
+    FusionVerificationResponse,
     GetResponse,
+    IdentificationResponse,
+    MigrationRequest,
+    MigrationStatusResponse,
     ModalitiesResponse,
+    ModelSwapRequest,
+    ModelSwapResponse,
     VerificationRequest,
     VerificationResponse,
+    VoiceStreamStart,
 )
 
 app = FastAPI(title="Biometric Verification API", version="0.1.0")
-registry, _config = initialize_registry()
+_config_path = os.environ.get("BIOMETRIC_CONFIG", "configs/biometric.yaml")
+_config = load_app_config(_config_path)
+model_manager = ModelManager()
+
+# "standalone" serves the biometric endpoints (and acts as a coordinator when a modality is
+# configured with ScatterGatherEmbeddingStore); "shard" only serves a gallery partition.
+api_role = os.environ.get("BIOMETRIC_API_ROLE", _config.api.get("role", "standalone")).lower()
+if api_role == "shard":
+    registry = BiometricServiceRegistry()
+    app.include_router(create_shard_router(initialize_shard_stores(_config)))
+elif api_role == "standalone":
+    registry, _ = initialize_registry(_config, model_manager)
+    # Hot-swap models when the ``model`` section of the configuration file changes.
+    if _config.api.get("model_watch_interval_s"):
+        ModelConfigWatcher(_config_path, model_manager, interval_s=_config.api["model_watch_interval_s"]).start()
+else:
+    raise ValueError(f"Unknown API role: {api_role!r}")
+profiling_settings = ProfilingSettings.from_config(_config.profiling)
+fusion_verifier = FusionVerifier(registry, FusionSettings.from_config(_config.fusion))
+request_sampler = RequestSampler(profiling_settings)
 
 allowed_origins = [
     "http://localhost:5173",
@@ -34,7 +74,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(TraceMiddleware, settings=profiling_settings)
 
 
 @app.get("/biometric/modalities", response_model=ModalitiesResponse)
@@ -42,13 +84,106 @@ def list_modalities() -> dict[str, list[str]]:
     return {"modalities": registry.available_modalities()}
 
 
+# Declared before the ``/biometric/{modality}/...`` routes, which would otherwise match it.
+@app.post("/biometric/fusion/verify", response_model=FusionVerificationResponse)
+def fusion_verify(payload: FusionVerificationRequest) -> dict:
+    try:
+        with request_sampler.sample("fusion.verify"):
+            return fusion_verifier.verify(payload.samples, top_k=payload.top_k, user_id=payload.user_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.post("/biometric/face/identify", response_model=IdentificationResponse)
+def identify_faces(payload: VerificationRequest) -> dict:
+    """Identify every face in one image (group photos, crowd frames)."""
+
+    try:
+        service = registry.get("face")
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    with request_sampler.sample("face.identify"):
+        try:
+            return service.identify(payload.dict())
+        except SampleQualityError as exc:
+            raise HTTPException(status_code=422, detail={"reason": exc.reason, "message": exc.detail}) from exc
+
+
+@app.post("/biometric/face/migration", response_model=ModelSwapResponse)
+def start_face_migration(payload: MigrationRequest) -> dict:
+    """
+    Swap the face model through the model manager: the gallery is re-embedded in the
+    background and the model is published once the migration switched over. Poll the
+    migration with GET, the swap with ``GET /admin/models/face``.
+    """
+
+    try:
+        service = registry.get("face")
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if service.migration_status()["active_version"] is None:
+        raise HTTPException(status_code=409, detail="Template migration needs a VersionedEmbeddingStore")
+    try:
+        swap = model_manager.swap_embedding_model(
+            "face",
+            payload.model,
+            batch_size=payload.batch_size,
+            cpu_budget=payload.cpu_budget,
+            allow_partial=payload.allow_partial,
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return swap.to_dict()
+
+
+@app.get("/biometric/face/migration", response_model=MigrationStatusResponse)
+def face_migration_status() -> dict:
+    try:
+        service = registry.get("face")
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return service.migration_status()
+
+
+@app.post("/admin/models/{modality}", response_model=ModelSwapResponse)
+def swap_model(modality: str, payload: ModelSwapRequest) -> dict:
+    """Load, warm up and swap in a new embedding model in the background; poll with GET."""
+
+    try:
+        model_info = payload.model
+        if model_info is None:  # re-read the configuration file, e.g. after new weights were deployed
+            config = AppConfig(**load_yaml_file(Path(_config_path)))
+            if modality not in config.modalities:
+                raise KeyError(f"Modality '{modality}' is not configured")
+            model_info = ModelManager.model_info_from_config(config.modalities[modality])
+        return model_manager.swap_embedding_model(modality, model_info, force=payload.force).to_dict()
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@app.get("/admin/models/{modality}", response_model=ModelSwapResponse)
+def model_swap_status(modality: str) -> dict:
+    swap = model_manager.swap_status(modality)
+    if swap is None:
+        raise HTTPException(status_code=404, detail=f"No model swap for '{modality}'")
+    return swap.to_dict()
+
+
 @app.post("/biometric/{modality}/enroll", response_model=EnrollmentResponse)
 def enroll(modality: str, payload: EnrollmentRequest) -> dict:
     try:
         service = registry.get(modality)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return service.enroll(payload.dict())
+    with request_sampler.sample(f"{modality}.enroll"):
+        try:
+            return service.enroll(payload.dict())
+        except SampleQualityError as exc:
+            raise HTTPException(status_code=422, detail={"reason": exc.reason, "message": exc.detail}) from exc
 
 
 @app.post("/biometric/{modality}/verify", response_model=VerificationResponse)
@@ -57,7 +192,107 @@ def verify(modality: str, payload: VerificationRequest) -> dict:
         service = registry.get(modality)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return service.verify(payload.dict())
+    with request_sampler.sample(f"{modality}.verify"):
+        return service.verify(payload.dict())
+
+
+@app.websocket("/biometric/voice/stream")
+async def stream_voice(websocket: WebSocket) -> None:
+    """
+    Verify a claimed speaker while audio is still being captured.
+
+    The client sends a JSON start message (``VoiceStreamStart``), then binary audio frames.
+    Every frame is answered with the running decision; the socket closes as soon as the
+    decision is final. A ``{"event": "end"}`` text message forces a decision on the audio
+    received so far.
+    """
+
+    await websocket.accept()
+    try:
+        start = VoiceStreamStart.model_validate_json(await websocket.receive_text())
+        if start.format == "pcm_s16le" and start.sample_rate is None:
+            raise ValueError("sample_rate is required for pcm_s16le streams")
+        service = registry.get("voice")
+    except (ValidationError, ValueError, KeyError) as exc:
+        await websocket.send_json({"status": "error", "detail": str(exc)})
+        await websocket.close(code=1008)
+        return
+
+    container = "wav" if start.format == "wav" else "pcm"
+    decoder = PCMStreamDecoder(container, sample_rate=start.sample_rate, channels=start.channels)
+    session = None
+    await websocket.send_json({"status": "ready", "user_id": start.user_id})
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                samples = decoder.feed(message["bytes"])
+                if session is None and decoder.sample_rate is not None:
+                    session = await run_in_threadpool(service.open_stream, start.user_id, decoder.sample_rate)
+                if session is None or samples.size == 0:
+                    continue
+                update = await run_in_threadpool(session.push, samples)
+            elif json.loads(message.get("text") or "{}").get("event") == "end":
+                if session is None:
+                    raise ValueError("No audio received")
+                update = session.finish()
+            else:
+                continue
+            await websocket.send_json({**update.to_dict(), "threshold": session.threshold})
+            if update.final:
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+    except (KeyError, TypeError, ValueError) as exc:
+        await websocket.send_json({"status": "error", "detail": str(exc)})
+        await websocket.close(code=1008)
+
+
+@app.websocket("/biometric/face/stream")
+async def stream_face(websocket: WebSocket) -> None:
+    """
+    Verify a claimed user continuously from camera frames.
+
+    The client sends a JSON start message (``FaceStreamStart``), then one encoded image
+    (JPEG/PNG) per binary message. Every frame is answered with the running decision and
+    the tracked face box; the socket closes as soon as the decision is final. A
+    ``{"event": "end"}`` text message forces a decision on the frames received so far.
+    """
+
+    await websocket.accept()
+    try:
+        start = FaceStreamStart.model_validate_json(await websocket.receive_text())
+        service = registry.get("face")
+        session = await run_in_threadpool(service.open_video_session, start.user_id)
+    except (ValidationError, ValueError, KeyError, TypeError) as exc:
+        await websocket.send_json({"status": "error", "detail": str(exc)})
+        await websocket.close(code=1008)
+        return
+
+    await websocket.send_json({"status": "ready", "user_id": start.user_id})
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                update = await run_in_threadpool(session.push, message["bytes"])
+            elif json.loads(message.get("text") or "{}").get("event") == "end":
+                update = await run_in_threadpool(session.finish)
+            else:
+                continue
+            await websocket.send_json({**update.to_dict(), "threshold": session.threshold})
+            if update.final:
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+    except (KeyError, TypeError, ValueError) as exc:
+        await websocket.send_json({"status": "error", "detail": str(exc)})
+        await websocket.close(code=1008)
 
 
 @app.delete("/biometric/{modality}/{user_id}", response_model=DeleteResponse)
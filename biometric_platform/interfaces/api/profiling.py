@@ -0,0 +1,170 @@
+"""
+Opt-in request tracing and sampling profiler for the API.
+
+Two independent surfaces, both off by default:
+
+* Per-request trace: a request carrying the trace header (``X-Biometric-Trace: 1``) or the
+  ``?trace=1`` query flag gets its stage timings back in a ``Server-Timing`` header.
+* Sampling profiler: with ``sample_every: N`` one in every N profiled requests is run under a
+  stack sampler (collapsed ``.folded`` stacks for flamegraph.pl / speedscope) or cProfile
+  (``.prof``), written to ``output_dir``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+from ...core.tracing import RequestTrace, end_trace, start_trace
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class ProfilingSettings:
+    trace_header: str = "X-Biometric-Trace"
+    trace_query_param: str = "trace"
+    sample_every: int = 0
+    mode: str = "stack"
+    stack_interval_ms: float = 2.0
+    output_dir: str = "storage/profiles"
+
+    @classmethod
+    def from_config(cls, section: dict[str, Any] | None) -> "ProfilingSettings":
+        section = section or {}
+        known = {key: section[key] for key in cls.__dataclass_fields__ if key in section}
+        settings = cls(**known)
+        if settings.mode not in ("stack", "cprofile"):
+            raise ValueError(f"Unsupported profiling mode: {settings.mode!r}")
+        return settings
+
+
+def _server_timing(trace: RequestTrace) -> bytes:
+    parts = [
+        f"{name.replace('.', '-')};dur={entry['total_ms']:.2f}"
+        + (f";desc=\"x{entry['count']}\"" if entry["count"] > 1 else "")
+        for name, entry in trace.summary().items()
+    ]
+    parts.append(f"total;dur={trace.elapsed() * 1000.0:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class TraceMiddleware:
+    """ASGI middleware activating a ``RequestTrace`` for flagged requests only."""
+
+    def __init__(self, app: Any, settings: ProfilingSettings) -> None:
+        self.app = app
+        self._header = settings.trace_header.lower().encode("latin-1")
+        self._query_flag = f"{settings.trace_query_param}=".encode("latin-1")
+
+    def _is_flagged(self, scope: dict[str, Any]) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == self._header:
+                return value.decode("latin-1").strip().lower() in _TRUTHY
+        query = scope.get("query_string", b"")
+        if self._query_flag in query:
+            for pair in query.split(b"&"):
+                if pair.startswith(self._query_flag):
+                    return pair[len(self._query_flag):].decode("latin-1").lower() in _TRUTHY
+        return False
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._is_flagged(scope):
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace()
+
+        async def send_with_timing(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(trace)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_trace(token)
+
+
+class _StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval_s: float) -> None:
+        self._thread_id = thread_id
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self.counts: Counter[str] = Counter()
+        self._thread = threading.Thread(target=self._run, name="biometric-stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+
+
+class RequestSampler:
+    """Profiles one in every ``sample_every`` requests passed through ``sample``."""
+
+    def __init__(self, settings: ProfilingSettings) -> None:
+        self._settings = settings
+        self._counter = itertools.count(1)
+        self._output_dir = Path(settings.output_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings.sample_every > 0
+
+    def sample(self, label: str) -> ContextManager[None]:
+        if self._settings.sample_every <= 0:
+            return nullcontext()
+        sequence = next(self._counter)
+        if sequence % self._settings.sample_every:
+            return nullcontext()
+        return self._profile(label, sequence)
+
+    @contextmanager
+    def _profile(self, label: str, sequence: int) -> Iterator[None]:
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}_{label.replace('/', '_')}_{sequence:06d}"
+        if self._settings.mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(str(self._output_dir / f"{stem}.prof"))
+            return
+
+        sampler = _StackSampler(threading.get_ident(), self._settings.stack_interval_ms / 1000.0)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            lines = [f"{stack} {count}" for stack, count in sampler.counts.most_common()]
+            (self._output_dir / f"{stem}.folded").write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -4,7 +4,7 @@ Pydantic schemas for API payloads.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -32,10 +32,44 @@ class VerificationRequest(BaseModel):
     top_k: Optional[int] = Field(default=5, ge=1, description="Number of matches to retrieve")
 
 
+class FusionVerificationRequest(BaseModel):
+    samples: Dict[str, str] = Field(..., description="Modality name -> sample payload or reference")
+    top_k: Optional[int] = Field(default=5, ge=1, description="Number of matches to retrieve per modality")
+    user_id: Optional[str] = Field(default=None, description="Claimed identity; omit to rank all candidates")
+
+    @field_validator("samples")
+    @classmethod
+    def validate_samples(cls, value: Dict[str, str]) -> Dict[str, str]:
+        if not value:
+            raise ValueError("samples cannot be empty")
+        return value
+
+
+class VoiceStreamStart(BaseModel):
+    user_id: str = Field(..., description="Claimed identity to verify against")
+    format: Literal["wav", "pcm_s16le"] = Field(
+        default="wav", description="wav: a WAV file sent in slices; pcm_s16le: headerless 16-bit PCM"
+    )
+    sample_rate: Optional[int] = Field(default=None, gt=0, description="Required for pcm_s16le")
+    channels: int = Field(default=1, ge=1)
+
+
+class FaceStreamStart(BaseModel):
+    user_id: str = Field(..., description="Claimed identity to verify against")
+
+
+class DuplicateCandidate(BaseModel):
+    user_id: str
+    score: float
+
+
 class EnrollmentResponse(BaseModel):
     status: str = Field(..., description="Operation status")
     user_id: str
     stored_samples: Optional[List[str]] = Field(default=None)
+    possible_duplicates: Optional[List[DuplicateCandidate]] = Field(
+        default=None, description="Existing users this enrollment matches above the duplicate threshold"
+    )
 
 
 class VerificationResponse(BaseModel):
@@ -43,6 +77,45 @@ class VerificationResponse(BaseModel):
     decision: bool
     threshold: float
     matches: List[MatchSchema]
+    partial: bool = Field(default=False, description="True when some gallery shards did not answer")
+    reason: Optional[str] = Field(default=None, description="Quality-gate reason code when status is 'rejected'")
+
+
+class IdentifiedFaceSchema(BaseModel):
+    box: List[float] = Field(..., description="(x1, y1, x2, y2) in source image pixels")
+    probability: float
+    decision: bool
+    matches: List[MatchSchema]
+    reason: Optional[str] = Field(default=None, description="Quality-gate reason code when the face was skipped")
+
+
+class IdentificationResponse(BaseModel):
+    status: str
+    threshold: float
+    faces: List[IdentifiedFaceSchema]
+
+
+class FusionModalityResult(BaseModel):
+    status: Literal["completed", "rejected", "cancelled", "error"]
+    decision: Optional[bool] = None
+    threshold: Optional[float] = None
+    matches: List[MatchSchema] = Field(default_factory=list)
+    partial: bool = False
+    reason: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class FusionVerificationResponse(BaseModel):
+    status: str
+    decision: bool
+    rule: str
+    threshold: float
+    score: float = Field(..., description="Fused score of the best candidate")
+    user_id: Optional[str] = None
+    matches: List[MatchSchema]
+    modalities: Dict[str, FusionModalityResult]
+    short_circuited: bool = Field(default=False, description="True when pending modalities were cancelled")
+    partial: bool = Field(default=False, description="True when some gallery shards did not answer")
 
 
 class DeleteResponse(BaseModel):
@@ -60,3 +133,83 @@ class GetResponse(BaseModel):
 class ModalitiesResponse(BaseModel):
     modalities: List[str]
 
+
+class MigrationRequest(BaseModel):
+    model: Dict[str, Any] = Field(..., description="{class, params} of the new embedding model")
+    batch_size: int = Field(default=64, ge=1, description="Raw samples per batched forward pass")
+    cpu_budget: float = Field(default=0.5, gt=0.0, le=1.0, description="Fraction of wall time spent re-embedding")
+    allow_partial: bool = Field(default=False, description="Switch even if some users have no readable raw samples")
+
+
+class MigrationStatusResponse(BaseModel):
+    state: str = Field(..., description="idle, running, completed, failed or cancelled")
+    active_version: Optional[str] = None
+    source_version: Optional[str] = None
+    target_version: Optional[str] = None
+    total_users: int = 0
+    done_users: int = 0
+    migrated_users: int = 0
+    skipped_users: int = 0
+    failed_users: List[str] = Field(default_factory=list)
+    samples: int = 0
+    elapsed_s: float = 0.0
+    samples_per_s: float = 0.0
+    eta_s: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ModelSwapRequest(BaseModel):
+    model: Optional[Dict[str, Any]] = Field(
+        default=None, description="{class, params} of the new embedding model; default: the configuration file's"
+    )
+    force: bool = Field(
+        default=False,
+        description="Swap although the store holds templates that cannot be migrated; users must be re-enrolled",
+    )
+
+
+class ModelSwapResponse(BaseModel):
+    modality: str
+    state: str = Field(..., description="loading, warming, migrating, swapped, unchanged or failed")
+    version: Optional[str] = None
+    previous_version: Optional[str] = None
+    load_s: float = 0.0
+    warmup_s: float = 0.0
+    previous_released: bool = False
+    error: Optional[str] = None
+    migration: Optional[Dict[str, Any]] = Field(default=None, description="Template migration started by the swap")
+
+
+class ShardEmbeddingsRequest(BaseModel):
+    user_id: str
+    embeddings: List[List[float]] = Field(..., description="Embedding vectors owned by this shard")
+
+
+class ShardEmbeddingsResponse(BaseModel):
+    user_id: str
+    embeddings: List[List[float]]
+
+
+class ShardQueryRequest(BaseModel):
+    embedding: List[float]
+    top_k: int = Field(default=5, ge=1)
+
+
+class ShardQueryResponse(BaseModel):
+    matches: List[MatchSchema]
+
+
+class ShardBatchQueryRequest(BaseModel):
+    embeddings: List[List[float]]
+    top_k: int = Field(default=5, ge=1)
+
+
+class ShardBatchQueryResponse(BaseModel):
+    scores: List[List[float]] = Field(..., description="(probes, k) best first; 0 where indices is -1")
+    indices: List[List[int]] = Field(..., description="Positions in user_ids, -1 for unused slots")
+    user_ids: List[str]
+    num_samples: List[int]
+
+
+class ShardUsersResponse(BaseModel):
+    users: List[str]
@@ -0,0 +1,80 @@
+"""
+Routes served by an API node running in the ``shard`` role.
+
+A shard node owns one partition of each modality's gallery and answers local top-k queries
+for a ``ScatterGatherEmbeddingStore`` coordinator.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+
+import numpy as np
+
+from .schemas import (
+    ShardBatchQueryRequest,
+    ShardBatchQueryResponse,
+    ShardEmbeddingsRequest,
+    ShardEmbeddingsResponse,
+    ShardQueryRequest,
+    ShardQueryResponse,
+    ShardUsersResponse,
+)
+
+
+def create_shard_router(stores: dict[str, Any]) -> APIRouter:
+    router = APIRouter(prefix="/shard", tags=["shard"])
+
+    def get_store(modality: str) -> Any:
+        try:
+            return stores[modality.lower()]
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=f"Modality '{modality}' is not served by this shard") from exc
+
+    @router.get("/health")
+    def health() -> dict[str, Any]:
+        return {"status": "ok", "modalities": sorted(stores)}
+
+    @router.post("/{modality}/embeddings")
+    def add_embeddings(modality: str, payload: ShardEmbeddingsRequest) -> dict[str, Any]:
+        get_store(modality).add_embeddings(payload.user_id, payload.embeddings)
+        return {"status": "success", "user_id": payload.user_id}
+
+    @router.delete("/{modality}/users/{user_id}")
+    def delete_user(modality: str, user_id: str) -> dict[str, Any]:
+        get_store(modality).delete_user(user_id)
+        return {"status": "success", "user_id": user_id}
+
+    @router.get("/{modality}/users/{user_id}/embeddings", response_model=ShardEmbeddingsResponse)
+    def get_embeddings(modality: str, user_id: str) -> dict[str, Any]:
+        rows = get_store(modality).get_embeddings(user_id)
+        return {"user_id": user_id, "embeddings": [list(map(float, row)) for row in rows]}
+
+    @router.post("/{modality}/query", response_model=ShardQueryResponse)
+    def query(modality: str, payload: ShardQueryRequest) -> dict[str, Any]:
+        results = get_store(modality).query(payload.embedding, top_k=payload.top_k)
+        return {
+            "matches": [
+                {"user_id": user_id, "score": score, "metadata": metadata}
+                for user_id, score, metadata in results
+            ]
+        }
+
+    @router.post("/{modality}/query_batch", response_model=ShardBatchQueryResponse)
+    def query_batch(modality: str, payload: ShardBatchQueryRequest) -> dict[str, Any]:
+        # Ship only the matched users, not the store's whole user table.
+        result = get_store(modality).query_batch(payload.embeddings, top_k=payload.top_k).compact()
+        return {
+            "scores": np.where(result.indices >= 0, result.scores, 0.0).tolist(),
+            "indices": result.indices.tolist(),
+            "user_ids": list(result.user_ids),
+            "num_samples": np.asarray(result.num_samples).tolist(),
+        }
+
+    @router.get("/{modality}/users", response_model=ShardUsersResponse)
+    def list_users(modality: str) -> dict[str, Any]:
+        return {"users": list(get_store(modality).list_users())}
+
+    return router
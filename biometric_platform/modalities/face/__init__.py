@@ -5,6 +5,7 @@ Face modality implementation package.
 from .service import FaceService
 from .verifier import FaceVerifier
 from .dataset import FaceDatasetManager
+from .migration import MigrationProgress, TemplateMigration
 
-__all__ = ["FaceService", "FaceVerifier", "FaceDatasetManager"]
+__all__ = ["FaceService", "FaceVerifier", "FaceDatasetManager", "MigrationProgress", "TemplateMigration"]
 
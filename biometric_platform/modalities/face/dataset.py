@@ -6,8 +6,6 @@ from __future__ import annotations
 
 import base64
 import binascii
-import shutil
-import uuid
 from pathlib import Path
 from typing import Any, Iterable
 
@@ -19,59 +17,79 @@ except ImportError:  # pragma: no cover
     cv2 = None  # type: ignore[assignment]
 
 from ...core.base import DatasetManager
+from ...infrastructure.packed_store import PackedSampleStore
+from ...infrastructure.sample_store import SAMPLE_BACKENDS, ContentAddressedSampleStore
 
 
 class FaceDatasetManager(DatasetManager):
-    """Persist raw face samples to disk and provide simple metadata access."""
+    """
+    Persist raw face samples and provide simple metadata access.
+
+    Samples go to a ``ContentAddressedSampleStore`` under ``root_dir``: one file per
+    distinct image, named by its SHA-256, written off the request path.
+    ``sample_backend="packed"`` uses a ``PackedSampleStore`` instead, which appends them
+    to large segment files. Files of the former ``<root>/<user>/<uuid>.png`` layout are
+    not read; import them with ``scripts/packed_samples.py import`` (or ``pack``).
+    """
 
     modality = "face"
 
-    def __init__(self, root_dir: str | Path | None = None) -> None:
+    def __init__(
+        self, root_dir: str | Path | None = None, sample_backend: str = "files", segment_size_mb: int = 256
+    ) -> None:
         default_dir = Path("datasets") / "raw" / self.modality
         self._root_dir = Path(root_dir) if root_dir else default_dir
         self._root_dir.mkdir(parents=True, exist_ok=True)
+        if sample_backend not in SAMPLE_BACKENDS:
+            raise ValueError(f"Unknown sample backend '{sample_backend}'. Available: {SAMPLE_BACKENDS}")
+        if sample_backend == "packed":
+            self._store: ContentAddressedSampleStore = PackedSampleStore(
+                self._root_dir, segment_size=segment_size_mb * 1024 * 1024
+            )
+        else:
+            self._store = ContentAddressedSampleStore(self._root_dir)
 
     @property
     def root_dir(self) -> Path:
         return self._root_dir
 
+    @property
+    def store(self) -> ContentAddressedSampleStore:
+        return self._store
+
     def save_raw_samples(self, user_id: str, samples: Iterable[Any]) -> list[str]:
-        user_dir = self._root_dir / user_id
-        user_dir.mkdir(parents=True, exist_ok=True)
-
-        saved_paths: list[str] = []
-        for sample in samples:
-            filename = f"{uuid.uuid4().hex}.png"
-            path = user_dir / filename
-            written_path = self._write_sample(path, sample)
-            saved_paths.append(str(written_path))
-        return saved_paths
-
-    def _write_sample(self, path: Path, sample: Any) -> Path:
+        return self._store.put(user_id, [self._encode_sample(sample) for sample in samples])
+
+    def read_sample(self, ref: str) -> bytes:
+        """Bytes of a sample returned by ``save_raw_samples``/``list_user_samples``."""
+
+        return self._store.read(ref)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait until every saved sample is durable on disk."""
+
+        self._store.flush(timeout)
+
+    def _encode_sample(self, sample: Any) -> tuple[bytes, str]:
         if isinstance(sample, bytes):
-            path.write_bytes(sample)
-            return path
+            return sample, "png"
         if isinstance(sample, np.ndarray):
             if cv2 is None:
                 raise RuntimeError("OpenCV (cv2) is required to write numpy array samples")
-            cv2.imwrite(str(path), sample)
-            return path
+            ok, encoded = cv2.imencode(".png", sample)
+            if not ok:
+                raise ValueError("Failed to encode numpy array sample as PNG")
+            return encoded.tobytes(), "png"
         if isinstance(sample, str):
             source = Path(sample)
             if source.is_file():
-                shutil.copy(source, path)
-                return path
+                return source.read_bytes(), source.suffix.lstrip(".").lower() or "png"
 
             decoded = self._try_decode_data(sample)
             if decoded is not None:
-                if decoded.extension:
-                    path = path.with_suffix(f".{decoded.extension}")
-                path.write_bytes(decoded.content)
-                return path
-
-            fallback_path = path.with_suffix(".txt")
-            fallback_path.write_text(sample, encoding="utf-8")
-            return fallback_path
+                return decoded.content, decoded.extension or "png"
+
+            return sample.encode("utf-8"), "txt"
         raise TypeError(f"Unsupported sample type for writing: {type(sample)!r}")
 
     class DecodedData:
@@ -103,15 +121,10 @@ class FaceDatasetManager(DatasetManager):
             return None
 
     def list_user_samples(self, user_id: str) -> list[str]:
-        user_dir = self._root_dir / user_id
-        if not user_dir.exists():
-            return []
-        return sorted(str(p) for p in user_dir.iterdir() if p.is_file())
+        return self._store.list(user_id)
 
     def delete_user(self, user_id: str) -> None:
-        user_dir = self._root_dir / user_id
-        if user_dir.exists():
-            shutil.rmtree(user_dir)
+        self._store.delete_user(user_id)
 
     def prepare_training_split(self) -> dict[str, Any]:
         # TODO: implement dataset splitting strategy.
@@ -0,0 +1,220 @@
+"""
+Background re-embedding of face templates after an embedding model change.
+
+``TemplateMigration`` re-embeds every enrolled user's raw samples (kept by
+``FaceDatasetManager``) with the new model into a new version of a
+``VersionedEmbeddingStore``. The old version keeps serving verification meanwhile, and
+enrollments during the migration are written to both versions. Users are processed in
+batches of about ``batch_size`` samples, one batched forward pass each, and the job
+sleeps between batches to stay within ``cpu_budget``. Once every user is migrated the
+store switches to the new version atomically; the old templates and model are released
+after ``switch_grace_s`` so requests still using them can finish.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ...infrastructure.versioned_store import MIGRATED, SKIPPED, STALE
+from ...models.base import EmbeddingModel
+
+
+@dataclass
+class MigrationProgress:
+    """Snapshot of a migration; rates and ETA are derived from the samples re-embedded so far."""
+
+    state: str  # "running", "completed", "failed" or "cancelled"
+    source_version: str
+    target_version: str
+    total_users: int = 0
+    migrated_users: int = 0
+    skipped_users: int = 0  # deleted, or enrolled with the new model during the migration
+    failed_users: List[str] = field(default_factory=list)  # no readable raw samples
+    samples: int = 0
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def done_users(self) -> int:
+        return self.migrated_users + self.skipped_users + len(self.failed_users)
+
+    @property
+    def samples_per_s(self) -> float:
+        return self.samples / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def eta_s(self) -> Optional[float]:
+        if self.state != "running" or self.done_users == 0:
+            return None
+        remaining = max(0, self.total_users - self.done_users)
+        return remaining * self.elapsed_s / self.done_users
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "done_users": self.done_users,
+            "samples_per_s": round(self.samples_per_s, 2),
+            "eta_s": None if self.eta_s is None else round(self.eta_s, 1),
+        }
+
+
+class TemplateMigration:
+    """Re-embeds a face gallery with ``model`` in a background thread."""
+
+    def __init__(
+        self,
+        verifier: Any,
+        dataset_manager: Any,
+        model: EmbeddingModel,
+        batch_size: int = 64,
+        cpu_budget: float = 0.5,
+        switch_grace_s: float = 1.0,
+        allow_partial: bool = False,
+    ) -> None:
+        store = verifier.embedding_store
+        if not hasattr(store, "begin_migration"):
+            raise TypeError("Template migration needs a VersionedEmbeddingStore (extras.embedding_store)")
+        if dataset_manager is None or not hasattr(dataset_manager, "read_sample"):
+            raise TypeError("Template migration re-embeds raw samples and needs the modality's dataset manager")
+        if not 0 < cpu_budget <= 1:
+            raise ValueError("cpu_budget must be in (0, 1]")
+        self._verifier = verifier
+        self._store = store
+        self._dataset = dataset_manager
+        self._model = model
+        self._batch_size = batch_size
+        self._cpu_budget = cpu_budget
+        self._switch_grace_s = switch_grace_s
+        self._allow_partial = allow_partial
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._progress = MigrationProgress(state="running", source_version=store.active_version or "", target_version="")
+
+    def start(self) -> "TemplateMigration":
+        current = getattr(self._store, "migration", None)
+        if current is not None and current.progress().state == "running":
+            raise ValueError("A template migration is already running")
+        target = self._model.fingerprint()
+        self._store.begin_migration(target, self._model)
+        self._progress.target_version = target
+        self._store.migration = self
+        self._thread = threading.Thread(target=self._run, name=f"template-migration-{target}", daemon=True)
+        self._thread.start()
+        return self
+
+    def progress(self) -> MigrationProgress:
+        with self._lock:
+            return MigrationProgress(**asdict(self._progress))
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> MigrationProgress:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.progress()
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        try:
+            queue: Deque[str] = deque(self._store.list_users())
+            with self._lock:
+                self._progress.total_users = len(queue)
+            failed: set[str] = set()
+            while True:
+                while queue:
+                    if self._cancelled.is_set():
+                        raise _Cancelled()
+                    batch_started = time.monotonic()
+                    self._migrate_batch(self._take_batch(queue), queue, failed)
+                    with self._lock:
+                        self._progress.elapsed_s = time.monotonic() - started
+                    # Idle long enough that the work is ``cpu_budget`` of the wall time.
+                    busy = time.monotonic() - batch_started
+                    self._cancelled.wait(busy * (1 - self._cpu_budget) / self._cpu_budget)
+                if failed and not self._allow_partial:
+                    raise RuntimeError(f"{len(failed)} users have no readable raw samples")
+                # Users enrolled by requests that started before the migration.
+                missing = self._store.unmigrated_users(ignore=failed)
+                if missing:
+                    queue.extend(missing)
+                    with self._lock:
+                        self._progress.total_users += len(missing)
+                    continue
+                previous = self._store.finish_migration(ignore=failed)
+                if previous is not None:
+                    break
+            self._finish("completed", started)
+            self._cancelled.wait(self._switch_grace_s)  # requests already holding the old model finish
+            self._store.drop_version(previous)
+        except _Cancelled:
+            self._store.abort_migration()
+            self._finish("cancelled", started)
+        except Exception as exc:  # noqa: BLE001 - reported through progress()
+            self._store.abort_migration()
+            self._finish("failed", started, error=str(exc))
+
+    def _take_batch(self, queue: Deque[str]) -> List[Tuple[str, int, List[bytes]]]:
+        """Users (with their generation and raw samples) adding up to about ``batch_size`` samples."""
+
+        batch: List[Tuple[str, int, List[bytes]]] = []
+        samples = 0
+        while queue and (not batch or samples < self._batch_size):
+            user_id = queue.popleft()
+            generation = self._store.generation(user_id)
+            contents = []
+            for ref in self._dataset.list_user_samples(user_id):
+                try:
+                    contents.append(self._dataset.read_sample(ref))
+                except (OSError, KeyError):
+                    continue
+            batch.append((user_id, generation, contents))
+            samples += len(contents)
+        return batch
+
+    def _migrate_batch(self, batch: List[Tuple[str, int, List[bytes]]], queue: Deque[str], failed: set[str]) -> None:
+        flat = [content for _, _, contents in batch for content in contents]
+        rows = self._verifier.embed_stored_samples(flat, self._model) if flat else []
+        target = self._progress.target_version
+        offset = 0
+        for user_id, generation, contents in batch:
+            embeddings = [row for row in rows[offset : offset + len(contents)] if row is not None]
+            offset += len(contents)
+            if not embeddings:
+                if self._store.generation(user_id) != generation:
+                    outcome = STALE
+                elif len(self._store.get_embeddings(user_id)) == 0:
+                    outcome = SKIPPED  # deleted before its samples were read
+                else:
+                    failed.add(user_id)
+                    with self._lock:
+                        self._progress.failed_users.append(user_id)
+                    continue
+            else:
+                outcome = self._store.migrate_user(user_id, np.asarray(embeddings), target, generation)
+            if outcome == STALE:
+                queue.append(user_id)  # enrolled or deleted meanwhile: read its samples again
+                continue
+            with self._lock:
+                if outcome == MIGRATED:
+                    self._progress.migrated_users += 1
+                    self._progress.samples += len(embeddings)
+                else:
+                    self._progress.skipped_users += 1
+
+    def _finish(self, state: str, started: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._progress.state = state
+            self._progress.elapsed_s = time.monotonic() - started
+            self._progress.error = error
+
+
+class _Cancelled(Exception):
+    pass
@@ -8,6 +8,9 @@ from dataclasses import asdict
 from typing import Any, Iterable
 
 from ...core.base import BiometricService, DatasetManager, BiometricVerifier
+from ...core.tracing import trace_stage
+from ...models.base import EmbeddingModel
+from .migration import TemplateMigration
 
 
 class FaceService(BiometricService):
@@ -25,25 +28,69 @@ class FaceService(BiometricService):
         materialized_samples = list(samples_iterable)
 
         saved_paths: list[str] = []
-        if self._dataset_manager:
-            saved_paths = self._dataset_manager.save_raw_samples(user_id, materialized_samples)
-        self._verifier.enroll(user_id, materialized_samples)
+
+        def save_samples() -> None:
+            if self._dataset_manager:
+                with trace_stage("dataset.save"):
+                    saved_paths.extend(self._dataset_manager.save_raw_samples(user_id, materialized_samples))
+
+        # Saved after the quality gate, so rejected samples are never persisted, and before
+        # the templates, so a template migration never re-embeds an outdated sample list.
+        self._verifier.enroll(user_id, materialized_samples, before_store=save_samples)
         response = {"status": "success", "user_id": user_id}
         if saved_paths:
             response["stored_samples"] = saved_paths
+        duplicates = self._verifier.suspected_duplicates(user_id)
+        if duplicates:
+            response["possible_duplicates"] = [{"user_id": pair.user_b, "score": pair.score} for pair in duplicates]
         return response
 
     def verify(self, payload: dict[str, Any]) -> dict[str, Any]:
         sample = payload["sample"]
         top_k = payload.get("top_k", 5)
         result = self._verifier.match(sample, top_k=top_k)
-        return {
-            "status": "success",
+        response = {
+            "status": "rejected" if result.reason else "success",
             "decision": result.decision,
             "threshold": result.threshold,
             "matches": [asdict(match) for match in result.matches],
+            "partial": result.partial,
+        }
+        if result.reason:
+            response["reason"] = result.reason
+        return response
+
+    def identify(self, payload: dict[str, Any]) -> dict[str, Any]:
+        faces = self._verifier.identify_all(payload["sample"], top_k=payload.get("top_k", 5))
+        return {
+            "status": "success",
+            "threshold": self._verifier.threshold,
+            "faces": [
+                {
+                    "box": face.box,
+                    "probability": face.probability,
+                    "decision": face.decision,
+                    "matches": [asdict(match) for match in face.matches],
+                    "reason": face.reason,
+                }
+                for face in faces
+            ],
         }
 
+    def start_migration(self, model: EmbeddingModel, **options: Any) -> TemplateMigration:
+        """Re-embed the gallery with ``model`` in the background (see ``TemplateMigration``)."""
+
+        return TemplateMigration(self._verifier, self._dataset_manager, model, **options).start()
+
+    def migration_status(self) -> dict[str, Any]:
+        store = self._verifier.embedding_store
+        migration = getattr(store, "migration", None)
+        status = migration.progress().to_dict() if migration is not None else {"state": "idle"}
+        return {**status, "active_version": getattr(store, "active_version", None)}
+
+    def open_video_session(self, user_id: str) -> Any:
+        return self._verifier.open_video_session(user_id)
+
     def delete(self, user_id: str) -> dict[str, Any]:
         self._verifier.remove(user_id)
         if self._dataset_manager:
@@ -0,0 +1,226 @@
+"""
+Continuous face verification over a stream of camera frames.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ...core.base import SampleQualityError
+from ...core.tracing import trace_stage
+from ...core.utils import decode_image, to_rgb_uint8
+from ...models.base import EmbeddingModel
+from ...models.face.quality import FaceQualityGate, laplacian_variance
+from ...models.face.tracking import FaceTracker, sample_patch, to_gray
+
+
+@dataclass
+class FaceStreamUpdate:
+    """Running state reported after every frame."""
+
+    status: str  # "pending", "accepted" or "rejected"
+    score: Optional[float]
+    frames: int
+    embeddings: int
+    box: Optional[List[float]]
+    tracking: str  # "detected", "tracked" or "lost"
+    final: bool
+    reason: Optional[str] = None  # why the tracked face is not used, if it is not
+
+    @property
+    def decision(self) -> Optional[bool]:
+        return None if self.status == "pending" else self.status == "accepted"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "decision": self.decision,
+            "score": self.score,
+            "frames": self.frames,
+            "embeddings": self.embeddings,
+            "box": self.box,
+            "tracking": self.tracking,
+            "final": self.final,
+            "reason": self.reason,
+        }
+
+
+class FaceStreamSession:
+    """
+    Verifies one claimed user from a sequence of frames.
+
+    The detector runs only when the tracker asks for it (every ``detect_every`` frames or
+    while no face is tracked); other frames move the box with ``FaceTracker``. Each frame
+    with a usable face is ranked by the sharpness of its face patch, and every
+    ``embed_every`` frames only the best one is embedded. Embeddings of the current track
+    are averaged, and the mean is scored against the user's templates. A new track (a
+    different or re-acquired face) starts a fresh average. Once ``min_embeddings`` have been
+    collected the session accepts as soon as the score clears ``threshold + margin``
+    and rejects below ``threshold - margin``. After ``max_embeddings`` (or on ``finish``) it
+    decides against the plain threshold.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        templates: np.ndarray,
+        detector: Any,
+        embedder: EmbeddingModel,
+        threshold: float,
+        tracker: Optional[FaceTracker] = None,
+        quality_gate: Optional[FaceQualityGate] = None,
+        embed_every: int = 10,
+        min_embeddings: int = 2,
+        max_embeddings: int = 8,
+        margin: float = 0.05,
+        sharpness_patch: int = 96,
+    ) -> None:
+        self.user_id = user_id
+        self._templates = templates
+        self._detector = detector
+        self._embedder = embedder
+        self._threshold = threshold
+        self._tracker = tracker or FaceTracker()
+        self._quality = quality_gate
+        self._embed_every = max(1, embed_every)
+        self._min_embeddings = min_embeddings
+        self._max_embeddings = max_embeddings
+        self._margin = margin
+        self._sharpness_patch = sharpness_patch
+        self._frames = 0
+        self._track_id = 0
+        self._usable = False
+        self._reason: Optional[str] = None
+        self._window = 0
+        # Best frame of the current window: (sharpness, frame, box, aligned crop if known).
+        self._best: Optional[Tuple[float, np.ndarray, np.ndarray, Optional[np.ndarray]]] = None
+        self._embeddings: List[np.ndarray] = []
+        self._result: Optional[FaceStreamUpdate] = None
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def push(self, frame: Any) -> FaceStreamUpdate:
+        if self._result is not None:
+            return self._result
+        with trace_stage("decode"):
+            frame = self._as_frame(frame)
+            gray = to_gray(frame)
+        self._frames += 1
+
+        if self._tracker.needs_detection():
+            with trace_stage("detect"):
+                faces = self._detector.detect_faces(frame)
+            index = self._tracker.observe(gray, [face.box for face in faces])
+            mode = "lost" if index is None else "detected"
+            if index is not None:
+                if self._tracker.track_id != self._track_id:
+                    self._start_track(self._tracker.track_id)
+                self._check_face(faces[index])
+                if self._usable:
+                    self._consider(frame, gray, faces[index].box, faces[index].crop)
+        else:
+            with trace_stage("track"):
+                box = self._tracker.propagate(gray)
+            mode = "lost" if box is None else "tracked"
+            if box is not None and self._usable:
+                self._consider(frame, gray, box, None)
+
+        if self._tracker.tracking:
+            self._window += 1
+            if self._window >= self._embed_every:
+                self._embed_best()
+
+        score = self._score()
+        if score is not None:
+            count = len(self._embeddings)
+            if count >= self._max_embeddings:
+                return self._decide(score >= self._threshold, score, mode)
+            if count >= self._min_embeddings:
+                if score >= self._threshold + self._margin:
+                    return self._decide(True, score, mode)
+                if score < self._threshold - self._margin:
+                    return self._decide(False, score, mode)
+        return self._update("pending", score, mode, final=False)
+
+    def finish(self) -> FaceStreamUpdate:
+        if self._result is not None:
+            return self._result
+        self._embed_best()
+        score = self._score()
+        return self._decide(score is not None and score >= self._threshold, score, "lost" if not self._tracker.tracking else "tracked")
+
+    def _start_track(self, track_id: int) -> None:
+        self._track_id = track_id
+        self._embeddings = []
+        self._best = None
+        self._window = 0
+
+    def _check_face(self, face: Any) -> None:
+        self._usable, self._reason = True, None
+        if self._quality is not None:
+            try:
+                self._quality.check_face(face)
+            except SampleQualityError as exc:
+                # Skip the track's frames until the next detection clears it.
+                self._usable, self._reason = False, exc.reason
+
+    def _consider(self, frame: np.ndarray, gray: np.ndarray, box: np.ndarray, crop: Optional[np.ndarray]) -> None:
+        sharpness = laplacian_variance(sample_patch(gray, box, self._sharpness_patch))
+        if self._best is None or sharpness > self._best[0]:
+            self._best = (sharpness, frame, np.array(box, dtype=np.float32), crop)
+
+    def _embed_best(self) -> None:
+        self._window = 0
+        if self._best is None:
+            return
+        _, frame, box, crop = self._best
+        self._best = None
+        if crop is None:
+            crop = self._align(frame, box)
+        with trace_stage("embed"):
+            embedding = np.asarray(self._embedder.embed(crop), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(embedding))
+        if norm > 0:
+            self._embeddings.append(embedding / norm)
+
+    def _align(self, frame: np.ndarray, box: np.ndarray) -> np.ndarray:
+        align = getattr(self._detector, "align", None)
+        if align is not None:
+            return align(frame, box)
+        size = getattr(self._detector, "image_size", 160)
+        x1, y1, x2, y2 = (int(round(value)) for value in box)
+        return np.array(Image.fromarray(frame).crop((x1, y1, x2, y2)).resize((size, size)))
+
+    def _score(self) -> Optional[float]:
+        if not self._embeddings:
+            return None
+        mean = np.mean(self._embeddings, axis=0)
+        mean /= np.linalg.norm(mean) or 1.0
+        return float((self._templates @ mean).max())
+
+    def _update(self, status: str, score: Optional[float], mode: str, final: bool) -> FaceStreamUpdate:
+        box = self._tracker.box
+        return FaceStreamUpdate(
+            status=status,
+            score=score,
+            frames=self._frames,
+            embeddings=len(self._embeddings),
+            box=None if box is None else [round(float(value), 1) for value in box],
+            tracking=mode,
+            final=final,
+            reason=None if self._usable or not self._tracker.tracking else self._reason,
+        )
+
+    def _decide(self, accepted: bool, score: Optional[float], mode: str) -> FaceStreamUpdate:
+        self._result = self._update("accepted" if accepted else "rejected", score, mode, final=True)
+        return self._result
+
+    @staticmethod
+    def _as_frame(frame: Any) -> np.ndarray:
+        return to_rgb_uint8(decode_image(frame))
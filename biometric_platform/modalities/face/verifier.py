@@ -1,29 +1,48 @@
 """
-Baseline face verifier implementation (placeholder).
+Face verifier: MTCNN detection, an optional quality gate in front of the embedding model,
+batched embedding and 1:N search over the configured embedding store.
+
+With a ``VersionedEmbeddingStore`` templates are written per model version, so a new
+model can be migrated to in the background. The verifier also identifies every face in
+a frame (``identify_all``), opens video stream sessions and flags likely duplicate
+enrollments.
 """
 
 from __future__ import annotations
 
-from typing import Any, Iterable, List, Optional
-
-import base64
-import binascii
-from io import BytesIO
-from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Sequence, Union
 
 import numpy as np
-from PIL import Image, UnidentifiedImageError
 
 from ...core.base import (
     BiometricVerifier,
     EmbeddingStore,
     MatchResult,
+    SampleQualityError,
     VerificationResult,
 )
-from ...infrastructure import InMemoryEmbeddingStore
+from ...core.tracing import trace_stage
+from ...core.utils import decode_image, to_rgb_uint8
+from ...infrastructure import DuplicatePair, InMemoryEmbeddingStore, check_user
 from ...models.base import EmbeddingModel
 from ...models.face.detector import MTCNNDetector
 from ...models.face.embedding import FaceEmbeddingModel
+from ...models.face.quality import FaceQualityGate
+from ...models.face.tracking import FaceTracker
+from .streaming import FaceStreamSession
+
+
+@dataclass(frozen=True)
+class IdentifiedFace:
+    """One face found by ``FaceVerifier.identify_all``; ``reason`` is set when the quality
+    gate skipped it (it then has no matches)."""
+
+    box: List[float]
+    probability: float
+    matches: Sequence[MatchResult]
+    decision: bool
+    reason: Optional[str] = None
 
 
 class FaceVerifier(BiometricVerifier):
@@ -37,87 +56,234 @@ class FaceVerifier(BiometricVerifier):
         embedding_store: Optional[EmbeddingStore] = None,
         embedder: Optional[EmbeddingModel] = None,
         detector: Optional[MTCNNDetector] = None,
+        quality_gate: Union[FaceQualityGate, Mapping[str, Any], None] = None,
+        video_detect_every: int = 5,
+        video_embed_every: int = 10,
+        video_min_embeddings: int = 2,
+        video_max_embeddings: int = 8,
+        video_margin: float = 0.05,
+        duplicate_threshold: Optional[float] = None,
     ) -> None:
         self._threshold = threshold
         self._store = embedding_store or InMemoryEmbeddingStore(modality=self.modality)
         self._embedder = embedder or FaceEmbeddingModel()
         self._detector = detector or MTCNNDetector()
+        # Config passes the gate thresholds as a mapping (``extras.verifier_kwargs.quality_gate``).
+        if not isinstance(quality_gate, FaceQualityGate):
+            quality_gate = FaceQualityGate(**(quality_gate or {}))
+        self._quality = quality_gate if quality_gate.enabled else None
+        self._video_detect_every = video_detect_every
+        self._video_options = {
+            "embed_every": video_embed_every,
+            "min_embeddings": video_min_embeddings,
+            "max_embeddings": video_max_embeddings,
+            "margin": video_margin,
+        }
+        self._duplicate_threshold = duplicate_threshold
+        # Versioned template stores own the model their active templates were built with
+        # (it changes after a template migration); other stores use ``embedder`` as given.
+        self._version: Optional[str] = None
+        active_model = getattr(self._store, "active_model", None)
+        if active_model is not None:
+            current = active_model() or self._store.claim_version(self._embedder.fingerprint(), self._embedder)
+            self._version, self._embedder = current
+        self._query_options = {"version": self._version} if self._version else {}
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def embedding_store(self) -> EmbeddingStore:
+        return self._store
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._version
 
-    def enroll(self, user_id: str, samples: Iterable[Any]) -> None:
-        embeddings = [self.generate_embedding(sample) for sample in samples]
-        if not embeddings:
+    def enroll(self, user_id: str, samples: Iterable[Any], before_store: Optional[Callable[[], Any]] = None) -> None:
+        """
+        ``before_store`` runs once every sample passed the quality gate, before the
+        templates are written. Raw samples saved there are visible to a template migration
+        by the time it can see the new templates.
+        """
+
+        crops = [self._face_crop(sample) for sample in samples]
+        if not crops:
             raise ValueError("No samples provided for enrollment")
-        self._store.add_embeddings(user_id, embeddings)
+        with trace_stage("embed"):
+            embeddings = [self._embedder.embed(crop).tolist() for crop in crops]
+        if before_store is not None:
+            before_store()
+        if self._version is None:
+            with trace_stage("store.add"):
+                self._store.add_embeddings(user_id, embeddings)
+            return
+
+        by_version = {self._version: embeddings}
+        migration = self._store.migration_target()
+        if migration is not None and migration[0] != self._version:
+            # Written to the migration target as well, so the switch-over loses no enrollment.
+            target, model = migration
+            with trace_stage("embed.migration"):
+                by_version[target] = model.embed_batch(crops)
+        with trace_stage("store.add"):
+            self._store.add_versioned_embeddings(user_id, by_version)
+
+    def embed_stored_samples(
+        self, samples: Sequence[Any], embedder: Optional[EmbeddingModel] = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Re-embed stored raw samples (encoded bytes or paths) with one batched forward pass
+        of ``embedder`` (default: the verifier's model). They passed the quality gate when
+        they were enrolled, so it is not applied again; undecodable samples give ``None``.
+        """
+
+        crops: List[np.ndarray] = []
+        positions: List[int] = []
+        for position, sample in enumerate(samples):
+            try:
+                crops.append(self._face_crop(sample, gate=False))
+            except (TypeError, ValueError):
+                continue
+            positions.append(position)
+        embeddings: List[Optional[np.ndarray]] = [None] * len(samples)
+        if crops:
+            rows = (embedder or self._embedder).embed_batch(crops)
+            for position, row in zip(positions, rows):
+                embeddings[position] = row
+        return embeddings
 
     def generate_embedding(self, sample: Any) -> Any:
-        image = self._load_image(sample)
-        if self._detector:
-            faces = self._detector.detect(image)
-            if faces:
-                image = faces[0]
-        embedding = self._embedder.embed(image)
+        """Embed the sample's face; raises ``SampleQualityError`` before the embedding forward
+        pass when the quality gate rejects the frame or the detected face."""
+
+        crop = self._face_crop(sample)
+        with trace_stage("embed"):
+            embedding = self._embedder.embed(crop)
         return embedding.tolist()
 
     def match(self, sample: Any, top_k: int = 5) -> VerificationResult:
-        embedding = self.generate_embedding(sample)
-        query_results = self._store.query(embedding, top_k=top_k)
+        try:
+            embedding = self.generate_embedding(sample)
+        except SampleQualityError as exc:
+            return VerificationResult(
+                matches=[], threshold=self._threshold, modality=self.modality, decision=False, reason=exc.reason
+            )
+        with trace_stage("store.query"):
+            query_results = self._store.query(embedding, top_k=top_k, **self._query_options)
+        return VerificationResult.from_query(query_results, self._threshold, self.modality)
+
+    def identify_all(self, sample: Any, top_k: int = 5) -> List[IdentifiedFace]:
+        """
+        Identify every face in the sample. All accepted crops are embedded in one batched
+        forward pass and scored against the gallery with one batched query.
+        """
+
+        with trace_stage("decode"):
+            image = self._load_image(sample)
+        if self._quality:
+            with trace_stage("quality"):
+                self._quality.check_frame(image)
+        detect_faces = getattr(self._detector, "detect_faces", None)
+        if detect_faces is None:
+            raise TypeError(f"{type(self._detector).__name__} does not report face boxes")
+        with trace_stage("detect"):
+            faces = detect_faces(image, keep_all=True)
+
+        reasons: List[Optional[str]] = []
+        for face in faces:
+            reason = None
+            if self._quality:
+                try:
+                    self._quality.check_face(face)
+                except SampleQualityError as exc:
+                    reason = exc.reason
+            reasons.append(reason)
+        accepted = [index for index, reason in enumerate(reasons) if reason is None]
 
-        matches: List[MatchResult] = [
-            MatchResult(user_id=user_id, score=score, metadata=metadata)
-            for user_id, score, metadata in query_results
-        ]
-        decision = bool(matches and matches[0].score >= self._threshold)
-        return VerificationResult(matches=matches, threshold=self._threshold, modality=self.modality, decision=decision)
+        results: List[Sequence[Any]] = []
+        if accepted:
+            with trace_stage("embed"):
+                embeddings = self._embedder.embed_batch([faces[index].crop for index in accepted])
+            with trace_stage("store.query"):
+                results = list(self._store.query_batch(embeddings, top_k=top_k, **self._query_options))
+
+        matches_of = {
+            index: [MatchResult(user_id=user_id, score=score, metadata=metadata) for user_id, score, metadata in result]
+            for index, result in zip(accepted, results)
+        }
+        identified: List[IdentifiedFace] = []
+        for index, face in enumerate(faces):
+            matches = matches_of.get(index, [])
+            identified.append(
+                IdentifiedFace(
+                    box=[round(float(value), 1) for value in face.box],
+                    probability=float(face.probability),
+                    matches=matches,
+                    decision=bool(matches and matches[0].score >= self._threshold),
+                    reason=reasons[index],
+                )
+            )
+        return identified
+
+    def suspected_duplicates(self, user_id: str) -> List[DuplicatePair]:
+        """Other enrolled users matching ``user_id`` above ``duplicate_threshold`` (off when unset)."""
+
+        if self._duplicate_threshold is None:
+            return []
+        with trace_stage("dedup.check"):
+            return check_user(self._store, user_id, self._duplicate_threshold)
 
     def remove(self, user_id: str) -> None:
         self._store.delete_user(user_id)
 
-    def _load_image(self, sample: Any) -> np.ndarray:
-        if isinstance(sample, np.ndarray):
-            image = sample
-        elif isinstance(sample, list):
-            image = np.array(sample)
-        elif isinstance(sample, str):
-            image = self._decode_string_sample(sample)
-        else:
-            raise TypeError(f"Unsupported sample type: {type(sample)!r}")
-
-        if image.ndim == 2:
-            image = np.stack([image] * 3, axis=-1)
-        if image.dtype != np.uint8:
-            image = np.clip(image, 0, 255).astype(np.uint8)
-        return image
+    def open_video_session(self, user_id: str) -> FaceStreamSession:
+        """Start continuous verification of ``user_id`` from frames pushed one by one."""
 
-    def _decode_string_sample(self, sample: str) -> np.ndarray:
-        if sample.startswith("data:"):
-            _, _, data_part = sample.partition(",")
-            if not data_part:
-                raise ValueError("Invalid data URI sample")
-            try:
-                data_bytes = base64.b64decode(data_part, validate=True)
-            except binascii.Error as exc:
-                raise ValueError("Invalid base64 data URI") from exc
-            return self._image_from_bytes(data_bytes)
-
-        potential_path = Path(sample)
-        if potential_path.exists():
-            try:
-                with Image.open(potential_path) as img:
-                    return np.array(img.convert("RGB"))
-            except UnidentifiedImageError as exc:
-                raise ValueError(f"Unable to load image from path: {sample}") from exc
+        if getattr(self._detector, "detect_faces", None) is None:
+            raise TypeError(f"{type(self._detector).__name__} does not report face boxes for tracking")
+        with trace_stage("store.get"):
+            templates = np.asarray(self._store.get_embeddings(user_id, **self._query_options), dtype=np.float32)
+        if templates.size == 0:
+            raise KeyError(f"User '{user_id}' is not enrolled for {self.modality}")
+        templates = templates / np.linalg.norm(templates, axis=1, keepdims=True)
+        return FaceStreamSession(
+            user_id,
+            templates,
+            self._detector,
+            self._embedder,
+            threshold=self._threshold,
+            tracker=FaceTracker(detect_every=self._video_detect_every),
+            quality_gate=self._quality,
+            **self._video_options,
+        )
 
-        try:
-            data_bytes = base64.b64decode(sample, validate=True)
-            return self._image_from_bytes(data_bytes)
-        except binascii.Error as exc:
-            raise ValueError("Unsupported string sample format") from exc
+    def _face_crop(self, sample: Any, gate: bool = True) -> np.ndarray:
+        quality = self._quality if gate else None
+        with trace_stage("decode"):
+            image = self._load_image(sample)
+        if quality:
+            with trace_stage("quality"):
+                quality.check_frame(image)
+        if self._detector:
+            with trace_stage("detect"):
+                detect_faces = getattr(self._detector, "detect_faces", None)
+                if detect_faces is not None:
+                    faces = detect_faces(image)
+                    crops = [face.crop for face in faces]
+                else:
+                    faces, crops = [], self._detector.detect(image)
+            if quality:
+                if not crops:
+                    quality.check_face(None)
+                if faces:
+                    quality.check_face(faces[0])
+            if crops:
+                image = crops[0]
+        return image
 
     @staticmethod
-    def _image_from_bytes(data: bytes) -> np.ndarray:
-        try:
-            with Image.open(BytesIO(data)) as img:
-                return np.array(img.convert("RGB"))
-        except UnidentifiedImageError as exc:
-            raise ValueError("Unable to decode image bytes") from exc
+    def _load_image(sample: Any) -> np.ndarray:
+        return to_rgb_uint8(decode_image(sample))
 
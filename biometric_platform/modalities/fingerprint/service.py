@@ -8,6 +8,7 @@ from dataclasses import asdict
 from typing import Any, Iterable
 
 from ...core.base import BiometricService, BiometricVerifier, DatasetManager
+from ...core.tracing import trace_stage
 
 
 class FingerprintService(BiometricService):
@@ -26,7 +27,8 @@ class FingerprintService(BiometricService):
 
         saved_paths: list[str] = []
         if self._dataset_manager:
-            saved_paths = self._dataset_manager.save_raw_samples(user_id, materialized_samples)
+            with trace_stage("dataset.save"):
+                saved_paths = self._dataset_manager.save_raw_samples(user_id, materialized_samples)
         self._verifier.enroll(user_id, materialized_samples)
 
         response = {"status": "success", "user_id": user_id}
@@ -43,6 +45,7 @@ class FingerprintService(BiometricService):
             "decision": result.decision,
             "threshold": result.threshold,
             "matches": [asdict(match) for match in result.matches],
+            "partial": result.partial,
         }
 
     def delete(self, user_id: str) -> dict[str, Any]:
@@ -1,22 +1,27 @@
 """
-Placeholder fingerprint verifier implementation.
+Minutiae-based fingerprint verifier.
 """
 
 from __future__ import annotations
 
-from typing import Any, Iterable, List, Optional
+from typing import Any, Iterable, Optional
+
+import numpy as np
 
 from ...core.base import (
     BiometricVerifier,
     EmbeddingStore,
-    MatchResult,
     VerificationResult,
 )
-from ...infrastructure import InMemoryEmbeddingStore
+from ...core.tracing import trace_stage
+from ...core.utils import decode_image
+from ...infrastructure import MinutiaeTemplateStore
+from ...models.base import EmbeddingModel
+from ...models.fingerprint.minutiae import MinutiaeExtractor
 
 
 class FingerprintVerifier(BiometricVerifier):
-    """Demonstrates fingerprint verification pipeline with placeholder logic."""
+    """Fingerprint verifier extracting minutiae templates and matching them by cylinder codes."""
 
     modality = "fingerprint"
 
@@ -24,30 +29,37 @@ class FingerprintVerifier(BiometricVerifier):
         self,
         threshold: float = 0.6,
         embedding_store: Optional[EmbeddingStore] = None,
+        embedder: Optional[EmbeddingModel] = None,
     ) -> None:
         self._threshold = threshold
-        self._store = embedding_store or InMemoryEmbeddingStore(modality=self.modality)
+        self._store = embedding_store or MinutiaeTemplateStore(modality=self.modality)
+        self._embedder = embedder or MinutiaeExtractor()
 
     def enroll(self, user_id: str, samples: Iterable[Any]) -> None:
         embeddings = [self.generate_embedding(sample) for sample in samples]
         if not embeddings:
             raise ValueError("No samples provided for enrollment")
-        self._store.add_embeddings(user_id, embeddings)
+        with trace_stage("store.add"):
+            self._store.add_embeddings(user_id, embeddings)
 
     def generate_embedding(self, sample: Any) -> Any:
-        return sample
+        with trace_stage("decode"):
+            image = self._load_image(sample)
+        with trace_stage("embed"):
+            return self._embedder.embed(image)
 
     def match(self, sample: Any, top_k: int = 5) -> VerificationResult:
         embedding = self.generate_embedding(sample)
-        query_results = self._store.query(embedding, top_k=top_k)
-
-        matches: List[MatchResult] = [
-            MatchResult(user_id=user_id, score=score, metadata=metadata)
-            for user_id, score, metadata in query_results
-        ]
-        decision = bool(matches and matches[0].score >= self._threshold)
-        return VerificationResult(matches=matches, threshold=self._threshold, modality=self.modality, decision=decision)
+        with trace_stage("store.query"):
+            query_results = self._store.query(embedding, top_k=top_k)
+        return VerificationResult.from_query(query_results, self._threshold, self.modality)
 
     def remove(self, user_id: str) -> None:
         self._store.delete_user(user_id)
 
+    @staticmethod
+    def _load_image(sample: Any) -> np.ndarray:
+        image = decode_image(sample, mode="L")
+        if image.ndim == 3:
+            image = image[..., :3].mean(axis=2)
+        return image.astype(np.float32)
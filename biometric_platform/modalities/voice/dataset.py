@@ -12,53 +12,73 @@ from pathlib import Path
 from typing import Any, Iterable
 
 from ...core.base import DatasetManager
+from ...infrastructure.packed_store import PackedSampleStore
+from ...infrastructure.sample_store import SAMPLE_BACKENDS
 
 
 class VoiceDatasetManager(DatasetManager):
-    """Store raw audio samples for voice modality."""
+    """
+    Store raw audio samples for voice modality.
+
+    ``sample_backend="packed"`` appends samples to segment files through a
+    ``PackedSampleStore`` instead of writing one file per sample under ``<root>/<user_id>/``.
+    Existing per-user files are packed with ``scripts/packed_samples.py pack``.
+    """
 
     modality = "voice"
 
-    def __init__(self, root_dir: str | Path | None = None) -> None:
+    def __init__(
+        self, root_dir: str | Path | None = None, sample_backend: str = "files", segment_size_mb: int = 256
+    ) -> None:
         default_dir = Path("datasets") / "raw" / self.modality
         self._root_dir = Path(root_dir) if root_dir else default_dir
         self._root_dir.mkdir(parents=True, exist_ok=True)
+        if sample_backend not in SAMPLE_BACKENDS:
+            raise ValueError(f"Unknown sample backend '{sample_backend}'. Available: {SAMPLE_BACKENDS}")
+        self._store: PackedSampleStore | None = None
+        if sample_backend == "packed":
+            self._store = PackedSampleStore(self._root_dir, segment_size=segment_size_mb * 1024 * 1024)
 
     @property
     def root_dir(self) -> Path:
         return self._root_dir
 
+    @property
+    def store(self) -> PackedSampleStore | None:
+        return self._store
+
     def save_raw_samples(self, user_id: str, samples: Iterable[Any]) -> list[str]:
+        if self._store is not None:
+            return self._store.put(user_id, [self._encode_sample(sample) for sample in samples])
+
         user_dir = self._root_dir / user_id
         user_dir.mkdir(parents=True, exist_ok=True)
         saved_paths: list[str] = []
         for sample in samples:
-            filename = f"{uuid.uuid4().hex}.wav"
-            path = user_dir / filename
-            written_path = self._write_sample(path, sample)
-            saved_paths.append(str(written_path))
+            content, extension = self._encode_sample(sample)
+            path = user_dir / f"{uuid.uuid4().hex}.{extension}"
+            path.write_bytes(content)
+            saved_paths.append(str(path))
         return saved_paths
 
-    def _write_sample(self, path: Path, sample: Any) -> Path:
+    def read_sample(self, ref: str) -> bytes:
+        """Bytes of a sample returned by ``save_raw_samples``/``list_user_samples``."""
+
+        return self._store.read(ref) if self._store is not None else Path(ref).read_bytes()
+
+    def _encode_sample(self, sample: Any) -> tuple[bytes, str]:
         if isinstance(sample, bytes):
-            path.write_bytes(sample)
-            return path
+            return sample, "wav"
         if isinstance(sample, str):
             source = Path(sample)
             if source.is_file():
-                shutil.copy(source, path)
-                return path
+                return source.read_bytes(), "wav"
 
             decoded = self._try_decode_data(sample)
             if decoded is not None:
-                if decoded.extension:
-                    path = path.with_suffix(f".{decoded.extension}")
-                path.write_bytes(decoded.content)
-                return path
-
-            fallback_path = path.with_suffix(".txt")
-            fallback_path.write_text(sample, encoding="utf-8")
-            return fallback_path
+                return decoded.content, decoded.extension or "wav"
+
+            return sample.encode("utf-8"), "txt"
         raise TypeError(f"Unsupported voice sample type: {type(sample)!r}")
 
     class DecodedData:
@@ -90,12 +110,17 @@ class VoiceDatasetManager(DatasetManager):
             return None
 
     def list_user_samples(self, user_id: str) -> list[str]:
+        if self._store is not None:
+            return self._store.list(user_id)
         user_dir = self._root_dir / user_id
         if not user_dir.exists():
             return []
         return sorted(str(p) for p in user_dir.iterdir() if p.is_file())
 
     def delete_user(self, user_id: str) -> None:
+        if self._store is not None:
+            self._store.delete_user(user_id)
+            return
         user_dir = self._root_dir / user_id
         if user_dir.exists():
             shutil.rmtree(user_dir)
@@ -8,6 +8,7 @@ from dataclasses import asdict
 from typing import Any, Iterable
 
 from ...core.base import BiometricService, BiometricVerifier, DatasetManager
+from ...core.tracing import trace_stage
 
 
 class VoiceService(BiometricService):
@@ -26,7 +27,8 @@ class VoiceService(BiometricService):
 
         saved_paths: list[str] = []
         if self._dataset_manager:
-            saved_paths = self._dataset_manager.save_raw_samples(user_id, materialized_samples)
+            with trace_stage("dataset.save"):
+                saved_paths = self._dataset_manager.save_raw_samples(user_id, materialized_samples)
         self._verifier.enroll(user_id, materialized_samples)
 
         response = {"status": "success", "user_id": user_id}
@@ -43,8 +45,12 @@ class VoiceService(BiometricService):
             "decision": result.decision,
             "threshold": result.threshold,
             "matches": [asdict(match) for match in result.matches],
+            "partial": result.partial,
         }
 
+    def open_stream(self, user_id: str, sample_rate: int | None = None) -> Any:
+        return self._verifier.open_stream(user_id, sample_rate=sample_rate)
+
     def delete(self, user_id: str) -> dict[str, Any]:
         self._verifier.remove(user_id)
         if self._dataset_manager:
@@ -0,0 +1,109 @@
+"""
+Incremental voice verification over streamed audio.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from ...models.voice.embedding import SpeakerEmbeddingStream
+
+
+@dataclass
+class StreamDecision:
+    """Running state reported after every chunk."""
+
+    status: str  # "pending", "accepted" or "rejected"
+    score: Optional[float]
+    voiced_seconds: float
+    final: bool
+
+    @property
+    def decision(self) -> Optional[bool]:
+        return None if self.status == "pending" else self.status == "accepted"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "decision": self.decision,
+            "score": self.score,
+            "voiced_seconds": round(self.voiced_seconds, 3),
+            "final": self.final,
+        }
+
+
+class VoiceStreamSession:
+    """
+    Scores a growing utterance against one claimed user's templates.
+
+    After each chunk the pooled embedding is refreshed from running sums and compared with
+    the templates (a handful of dot products). Once ``min_voiced_s`` of speech has been
+    heard, the session accepts as soon as the score clears ``threshold + margin`` and
+    rejects once it falls below ``threshold - margin``; after ``max_voiced_s`` (or on
+    ``finish``) it decides against the plain threshold.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        templates: np.ndarray,
+        stream: SpeakerEmbeddingStream,
+        threshold: float,
+        hop_seconds: float,
+        min_voiced_s: float = 0.5,
+        max_voiced_s: float = 6.0,
+        margin: float = 0.05,
+    ) -> None:
+        self.user_id = user_id
+        self._templates = templates
+        self._stream = stream
+        self._threshold = threshold
+        self._hop_seconds = hop_seconds
+        self._min_voiced_s = min_voiced_s
+        self._max_voiced_s = max_voiced_s
+        self._margin = margin
+        self._result: Optional[StreamDecision] = None
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def voiced_seconds(self) -> float:
+        return self._stream.num_frames * self._hop_seconds
+
+    def push(self, samples: np.ndarray) -> StreamDecision:
+        if self._result is not None:
+            return self._result
+        self._stream.push(samples)
+        if self._stream.num_frames == 0:
+            return StreamDecision("pending", None, 0.0, final=False)
+
+        score = self._score()
+        voiced = self.voiced_seconds
+        if voiced >= self._max_voiced_s:
+            return self._decide(score >= self._threshold, score)
+        if voiced >= self._min_voiced_s:
+            if score >= self._threshold + self._margin:
+                return self._decide(True, score)
+            if score < self._threshold - self._margin:
+                return self._decide(False, score)
+        return StreamDecision("pending", score, voiced, final=False)
+
+    def finish(self) -> StreamDecision:
+        if self._result is not None:
+            return self._result
+        if self._stream.num_frames == 0:
+            return self._decide(False, None)
+        score = self._score()
+        return self._decide(score >= self._threshold, score)
+
+    def _score(self) -> float:
+        return float((self._templates @ self._stream.embedding()).max())
+
+    def _decide(self, accepted: bool, score: Optional[float]) -> StreamDecision:
+        self._result = StreamDecision("accepted" if accepted else "rejected", score, self.voiced_seconds, final=True)
+        return self._result
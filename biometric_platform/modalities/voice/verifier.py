@@ -1,22 +1,32 @@
 """
-Placeholder voice verifier implementation.
+Voice verifier built on the MFCC speaker embedding.
 """
 
 from __future__ import annotations
 
-from typing import Any, Iterable, List, Optional
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+import base64
+import binascii
+from pathlib import Path
+
+import numpy as np
 
 from ...core.base import (
     BiometricVerifier,
     EmbeddingStore,
-    MatchResult,
     VerificationResult,
 )
+from ...core.tracing import trace_stage
 from ...infrastructure import InMemoryEmbeddingStore
+from ...models.base import EmbeddingModel
+from ...models.voice.audio import open_wav
+from ...models.voice.embedding import MFCCSpeakerEmbedding
+from .streaming import VoiceStreamSession
 
 
 class VoiceVerifier(BiometricVerifier):
-    """Demonstrates voice verification pipeline with placeholder logic."""
+    """Voice verifier decoding WAV/PCM samples and embedding them in a streaming fashion."""
 
     modality = "voice"
 
@@ -24,30 +34,106 @@ class VoiceVerifier(BiometricVerifier):
         self,
         threshold: float = 0.6,
         embedding_store: Optional[EmbeddingStore] = None,
+        embedder: Optional[EmbeddingModel] = None,
+        stream_min_voiced_s: float = 0.5,
+        stream_max_voiced_s: float = 6.0,
+        stream_margin: float = 0.05,
     ) -> None:
         self._threshold = threshold
         self._store = embedding_store or InMemoryEmbeddingStore(modality=self.modality)
+        self._embedder = embedder or MFCCSpeakerEmbedding()
+        self._stream_options = {
+            "min_voiced_s": stream_min_voiced_s,
+            "max_voiced_s": stream_max_voiced_s,
+            "margin": stream_margin,
+        }
 
     def enroll(self, user_id: str, samples: Iterable[Any]) -> None:
         embeddings = [self.generate_embedding(sample) for sample in samples]
         if not embeddings:
             raise ValueError("No samples provided for enrollment")
-        self._store.add_embeddings(user_id, embeddings)
+        with trace_stage("store.add"):
+            self._store.add_embeddings(user_id, embeddings)
 
     def generate_embedding(self, sample: Any) -> Any:
-        return sample
+        with trace_stage("decode"):
+            sample_rate, chunks = self._load_audio(sample)
+        with trace_stage("embed"):
+            stream_embed = getattr(self._embedder, "embed_stream", None)
+            if stream_embed is not None:
+                embedding = stream_embed(chunks, sample_rate=sample_rate)
+            else:
+                embedding = self._embedder.embed(np.concatenate(list(chunks)))
+        return embedding.tolist()
 
     def match(self, sample: Any, top_k: int = 5) -> VerificationResult:
         embedding = self.generate_embedding(sample)
-        query_results = self._store.query(embedding, top_k=top_k)
-
-        matches: List[MatchResult] = [
-            MatchResult(user_id=user_id, score=score, metadata=metadata)
-            for user_id, score, metadata in query_results
-        ]
-        decision = bool(matches and matches[0].score >= self._threshold)
-        return VerificationResult(matches=matches, threshold=self._threshold, modality=self.modality, decision=decision)
+        with trace_stage("store.query"):
+            query_results = self._store.query(embedding, top_k=top_k)
+        return VerificationResult.from_query(query_results, self._threshold, self.modality)
 
     def remove(self, user_id: str) -> None:
         self._store.delete_user(user_id)
 
+    def open_stream(self, user_id: str, sample_rate: Optional[int] = None) -> VoiceStreamSession:
+        """Start incremental verification of ``user_id`` against audio pushed chunk by chunk."""
+
+        open_embedding_stream = getattr(self._embedder, "stream", None)
+        if open_embedding_stream is None:
+            raise TypeError(f"{type(self._embedder).__name__} does not support streaming embeddings")
+        with trace_stage("store.get"):
+            templates = np.asarray(self._store.get_embeddings(user_id), dtype=np.float32)
+        if templates.size == 0:
+            raise KeyError(f"User '{user_id}' is not enrolled for {self.modality}")
+        templates = templates / np.linalg.norm(templates, axis=1, keepdims=True)
+        stream = open_embedding_stream(sample_rate)
+        return VoiceStreamSession(
+            user_id,
+            templates,
+            stream,
+            threshold=self._threshold,
+            hop_seconds=stream.hop_seconds,
+            **self._stream_options,
+        )
+
+
+    def _load_audio(self, sample: Any) -> Tuple[Optional[int], Iterator[np.ndarray]]:
+        """
+        Return ``(sample_rate, chunks)``. WAV payloads carry their own rate and are decoded
+        lazily; raw PCM arrays are taken to be at the embedder's native rate.
+        """
+
+        if isinstance(sample, (bytes, bytearray)):
+            return open_wav(bytes(sample))
+        if isinstance(sample, str):
+            return open_wav(self._resolve_string_sample(sample))
+        if isinstance(sample, (np.ndarray, list)):
+            audio = np.asarray(sample)
+            if audio.dtype.kind not in "iuf":
+                raise TypeError(f"Unsupported PCM dtype: {audio.dtype}")
+            return None, iter([audio])
+        raise TypeError(f"Unsupported sample type: {type(sample)!r}")
+
+    @staticmethod
+    def _resolve_string_sample(sample: str) -> bytes | Path:
+        if sample.startswith("data:"):
+            _, _, data_part = sample.partition(",")
+            if not data_part:
+                raise ValueError("Invalid data URI sample")
+            try:
+                return base64.b64decode(data_part, validate=True)
+            except binascii.Error as exc:
+                raise ValueError("Invalid base64 data URI") from exc
+
+        potential_path = Path(sample)
+        try:
+            if potential_path.is_file():
+                return potential_path
+        except OSError:
+            # Long base64 payloads are not valid file names.
+            pass
+
+        try:
+            return base64.b64decode(sample, validate=True)
+        except binascii.Error as exc:
+            raise ValueError("Unsupported string sample format") from exc
@@ -5,7 +5,7 @@ Exports model registry utilities and shared abstract interfaces.
 """
 
 from .registry import ModelRegistry
-from .manager import ModelManager
+from .manager import IncompatibleGalleryError, ModelConfigWatcher, ModelManager, ModelSwap
 
-__all__ = ["ModelRegistry", "ModelManager"]
+__all__ = ["ModelRegistry", "ModelManager", "ModelConfigWatcher", "ModelSwap", "IncompatibleGalleryError"]
 
@@ -4,8 +4,9 @@ Abstract interfaces for biometric models.
 
 from __future__ import annotations
 
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Any, Protocol
+from typing import Any, Optional, Protocol, Sequence
 
 import numpy as np
 
@@ -17,6 +18,42 @@ class EmbeddingModel(ABC):
     def embed(self, image: np.ndarray) -> np.ndarray:
         """Return an embedding for the given image."""
 
+    def embed_batch(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """Return an ``(n, d)`` matrix of embeddings; models with a batched forward override this."""
+
+        return np.stack([np.asarray(self.embed(image), dtype=np.float32).ravel() for image in images])
+
+    def warmup(self) -> None:
+        """Run a throwaway forward pass so lazy initialization is not paid by a request."""
+
+    def as_module(self) -> Optional[Any]:
+        """
+        Return a ``torch.nn.Module`` mapping float ``(n, 3, H, W)`` images in [0, 1] to
+        ``(n, d)`` embeddings in one forward pass, or ``None`` if the model has no tensor
+        forward path. The module shares the model's weights, so training it fine-tunes
+        this model.
+        """
+
+        return None
+
+    def fingerprint(self) -> str:
+        """Identifies the weights; embeddings with different fingerprints are not comparable."""
+
+        module = self.as_module()
+        if module is None:
+            return hashlib.sha256(repr(type(self)).encode("utf-8")).hexdigest()[:16]
+        return module_fingerprint(module)
+
+
+def module_fingerprint(module: Any) -> str:
+    """Hash of a torch module's architecture and weights (changes after any update)."""
+
+    digest = hashlib.sha256(f"{type(module).__module__}.{type(module).__qualname__}\n{module}".encode("utf-8"))
+    for name, tensor in module.state_dict().items():
+        digest.update(name.encode("utf-8"))
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
 
 class Detector(ABC):
     """Detects and aligns biometric regions (e.g., faces) in raw images."""
@@ -4,17 +4,29 @@ Face detection and alignment utilities using MTCNN.
 
 from __future__ import annotations
 
-from typing import List
+from dataclasses import dataclass
+from typing import List, Optional
 
 import numpy as np
 from PIL import Image
 
 try:  # pragma: no cover
-    from facenet_pytorch import MTCNN
+    from facenet_pytorch import MTCNN, extract_face, fixed_image_standardization
 except ImportError as exc:  # pragma: no cover
     raise ImportError("facenet-pytorch is required for MTCNNDetector") from exc
 
 
+@dataclass(frozen=True)
+class DetectedFace:
+    """One detection: aligned crop, ``(x1, y1, x2, y2)`` box in the source image, MTCNN
+    probability and the five landmarks (eyes, nose, mouth corners) as (x, y) rows."""
+
+    crop: np.ndarray
+    box: np.ndarray
+    probability: float
+    landmarks: Optional[np.ndarray] = None
+
+
 class MTCNNDetector:
     """Wraps facenet-pytorch MTCNN for face alignment."""
 
@@ -39,30 +51,52 @@ class MTCNNDetector:
     def detect(self, image: np.ndarray) -> List[np.ndarray]:
         """Return aligned face crops for the given image."""
 
-        if image.ndim == 2:
-            image = np.stack([image] * 3, axis=-1)
-        if image.dtype != np.uint8:
-            image = np.clip(image, 0, 255).astype(np.uint8)
+        return [face.crop for face in self.detect_faces(image)]
 
-        pil_image = Image.fromarray(image)
-        if self.keep_all:
-            faces = self.mtcnn(pil_image)
-            if faces is None:
-                return []
-            if isinstance(faces, list):
-                tensors = faces
-            else:
-                tensors = list(faces)
-        else:
-            tensor = self.mtcnn(pil_image)
-            if tensor is None:
+    def detect_faces(self, image: np.ndarray, keep_all: Optional[bool] = None) -> List[DetectedFace]:
+        """
+        Return aligned crops together with their boxes, probabilities and landmarks.
+
+        ``keep_all`` overrides the constructor setting for this call, so one detector can
+        serve both single-face verification and every-face identification.
+        """
+
+        keep_all = self.keep_all if keep_all is None else keep_all
+        pil_image = Image.fromarray(self._as_rgb(image))
+        # Same steps as ``MTCNN.forward``, keeping the detection details it discards.
+        boxes, probs, points = self.mtcnn.detect(pil_image, landmarks=True)
+        if boxes is None:
+            return []
+        if not keep_all:
+            boxes, probs, points = self.mtcnn.select_boxes(
+                boxes, probs, points, pil_image, method=self.mtcnn.selection_method
+            )
+            if boxes is None:
                 return []
-            tensors = [tensor]
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        probs = np.atleast_1d(np.asarray(probs, dtype=np.float32))
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 5, 2)
+        return [
+            DetectedFace(crop=self._extract(pil_image, box), box=box, probability=float(prob), landmarks=landmarks)
+            for box, prob, landmarks in zip(boxes, probs, points)
+        ]
+
+    def align(self, image: np.ndarray, box: np.ndarray) -> np.ndarray:
+        """Crop and resize ``box`` exactly as detected faces are, without running detection."""
+
+        return self._extract(Image.fromarray(self._as_rgb(image)), np.asarray(box, dtype=np.float32))
 
-        crops: List[np.ndarray] = []
-        for tensor in tensors:
-            arr = tensor.permute(1, 2, 0).cpu().numpy()
-            arr = np.clip(arr * 255.0, 0, 255).astype(np.uint8)
-            crops.append(arr)
-        return crops
+    def _extract(self, pil_image: Image.Image, box: np.ndarray) -> np.ndarray:
+        tensor = extract_face(pil_image, box, self.mtcnn.image_size, self.mtcnn.margin, None)
+        if self.mtcnn.post_process:
+            tensor = fixed_image_standardization(tensor)
+        arr = tensor.permute(1, 2, 0).cpu().numpy()
+        return np.clip(arr * 255.0, 0, 255).astype(np.uint8)
 
+    @staticmethod
+    def _as_rgb(image: np.ndarray) -> np.ndarray:
+        if image.ndim == 2:
+            image = np.stack([image] * 3, axis=-1)
+        if image.dtype != np.uint8:
+            image = np.clip(image, 0, 255).astype(np.uint8)
+        return image
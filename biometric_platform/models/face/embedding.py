@@ -4,7 +4,7 @@ Face embedding model built on top of backbone.
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Optional
 
 import numpy as np
 
@@ -18,6 +18,11 @@ class FaceEmbeddingModel(EmbeddingModel):
     def __init__(self, embedding_dim: int = 512, seed: Optional[int] = None) -> None:
         self.backbone = SimpleBackbone(embedding_dim=embedding_dim, seed=seed)
 
+    def as_module(self) -> Any:
+        from .modules import SimpleBackboneModule
+
+        return SimpleBackboneModule(self.backbone.embedding_dim)
+
     def embed(self, image: np.ndarray) -> np.ndarray:
         if image.ndim == 3 and image.shape[2] == 3:
             image = image.astype(np.float32) / 255.0
@@ -0,0 +1,54 @@
+"""
+Tensor-in/tensor-out forward paths of the face embedding models.
+
+Each module maps a float ``(n, 3, H, W)`` batch in [0, 1] (what ``torchvision``'s
+``ToTensor`` produces) to ``(n, d)`` unit-norm embeddings in a single forward pass, so
+training code can batch on the device and back-propagate into the backbone.
+"""
+
+from __future__ import annotations
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torchvision.transforms.functional as TF
+
+
+class PretrainedFaceModule(nn.Module):
+    """Resize + ``[-1, 1]`` normalisation + InceptionResnetV1 + L2 normalisation."""
+
+    def __init__(self, backbone: nn.Module, image_size: int = 160) -> None:
+        super().__init__()
+        self.backbone = backbone
+        self.image_size = image_size
+
+    @property
+    def embedding_dim(self) -> int:
+        """Output width of InceptionResnetV1's last linear layer."""
+
+        return self.backbone.last_linear.out_features
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        if images.shape[-2:] != (self.image_size, self.image_size):
+            images = TF.resize(images, [self.image_size, self.image_size], antialias=True)
+        features = self.backbone((images - 0.5) / 0.5)
+        return F.normalize(features.flatten(1), dim=1)
+
+
+class SimpleBackboneModule(nn.Module):
+    """Differentiable twin of ``SimpleBackbone``; it has no parameters of its own."""
+
+    def __init__(self, embedding_dim: int = 512) -> None:
+        super().__init__()
+        self.embedding_dim = embedding_dim
+
+    def extra_repr(self) -> str:
+        return f"embedding_dim={self.embedding_dim}"
+
+    def forward(self, images: torch.Tensor) -> torch.Tensor:
+        # ``SimpleBackbone`` flattens HWC images; keep that element order.
+        flat = images.permute(0, 2, 3, 1).flatten(1) if images.ndim == 4 else images.flatten(1)
+        std = flat.std(dim=1, unbiased=False, keepdim=True)
+        normalized = (flat - flat.mean(dim=1, keepdim=True)) / torch.where(std == 0, torch.ones_like(std), std)
+        normalized = F.pad(normalized, (0, max(0, self.embedding_dim - normalized.shape[1])))
+        return F.normalize(normalized[:, : self.embedding_dim], dim=1)
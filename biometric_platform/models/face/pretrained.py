@@ -6,7 +6,7 @@ This is a placeholder demonstrating the expected interface.
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Optional, Sequence
 
 import numpy as np
 
@@ -26,28 +26,41 @@ class PretrainedFaceEmbedding(EmbeddingModel):
             raise ImportError("facenet-pytorch is required for PretrainedFaceEmbedding")
         self.model = InceptionResnetV1(pretrained=pretrained).eval().to(device)
         self.device = device
+        self._module: Any = None
+
+    def as_module(self) -> Any:
+        """The tensor forward path; shares (and fine-tunes) ``self.model``'s weights."""
+
+        if self._module is None:
+            from .modules import PretrainedFaceModule
+
+            self._module = PretrainedFaceModule(self.model)
+        return self._module
+
+    def warmup(self) -> None:
+        self.embed_batch([np.zeros((self.as_module().image_size,) * 2 + (3,), dtype=np.uint8)])
 
     def embed(self, image: np.ndarray) -> np.ndarray:
+        return self.embed_batch([image])[0]
+
+    def embed_batch(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """Embed all images in one forward pass."""
+
         import torch
-        import torchvision.transforms as T
-
-        transform = T.Compose(
-            [
-                T.ToTensor(),
-                T.Resize((160, 160)),
-                T.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5]),
-            ]
-        )
-        if isinstance(image, np.ndarray):
+        import torchvision.transforms.functional as TF
+
+        module = self.as_module()
+        tensors = []
+        for image in images:
+            if not isinstance(image, np.ndarray):
+                raise TypeError("Unsupported image type for pretrained embedding.")
             if image.ndim == 2:
                 image = np.stack([image] * 3, axis=-1)
-            tensor = transform(image).unsqueeze(0).to(self.device)
-        else:
-            raise TypeError("Unsupported image type for pretrained embedding.")
+            # Resize per image: crops may differ in size before they are stacked.
+            tensors.append(TF.resize(TF.to_tensor(image), [module.image_size, module.image_size], antialias=True))
+        if not tensors:
+            return np.zeros((0, module.embedding_dim), dtype=np.float32)
 
         with torch.no_grad():
-            embedding = self.model(tensor)
-        feature = embedding.cpu().numpy().squeeze()
-        norm = np.linalg.norm(feature) or 1.0
-        return (feature / norm).astype(np.float32)
-
+            embeddings = module(torch.stack(tensors).to(self.device))
+        return embeddings.cpu().numpy().astype(np.float32)
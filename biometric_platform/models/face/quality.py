@@ -0,0 +1,111 @@
+"""
+Cheap face sample quality checks run before the embedding forward pass.
+
+The frame-level check (sharpness) runs before detection; the face-level checks (box size,
+detection probability, pose estimated from the five MTCNN landmarks) run on the detection
+result. Each failed check raises ``SampleQualityError`` with a stable reason code so
+callers can tell users what to fix.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from ...core.base import SampleQualityError
+
+if TYPE_CHECKING:  # the detector module requires facenet-pytorch
+    from .detector import DetectedFace
+
+BLURRY = "blurry"
+NO_FACE = "no_face"
+FACE_TOO_SMALL = "face_too_small"
+LOW_CONFIDENCE = "low_confidence"
+EXTREME_POSE = "extreme_pose"
+
+
+def downsampled_gray(image: np.ndarray, max_side: int = 256) -> np.ndarray:
+    """Grayscale float32 image block-averaged so that its longer side is at most ``max_side``."""
+
+    gray = image.astype(np.float32)
+    if gray.ndim == 3:
+        gray = gray[..., :3].mean(axis=2)
+    factor = max(1, -(-max(gray.shape) // max_side))
+    if factor > 1:
+        h, w = (gray.shape[0] // factor) * factor, (gray.shape[1] // factor) * factor
+        gray = gray[:h, :w].reshape(h // factor, factor, w // factor, factor).mean(axis=(1, 3))
+    return gray
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Variance of the 4-neighbour Laplacian, a standard focus measure."""
+
+    if min(gray.shape) < 3:
+        return 0.0
+    laplacian = (
+        gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:] - 4.0 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+
+def estimate_pose(landmarks: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Return ``(yaw, pitch, roll_degrees)`` from (left eye, right eye, nose, mouth left,
+    mouth right) landmarks.
+
+    ``yaw`` is the nose offset from the eye midpoint along the eye line, relative to the
+    inter-ocular distance (0 for a frontal face, about ±0.5 near profile). ``pitch`` is
+    where the nose sits between the eye line (0) and the mouth line (1); frontal faces sit
+    around 0.5.
+    """
+
+    left_eye, right_eye, nose, mouth_left, mouth_right = np.asarray(landmarks, dtype=np.float32)
+    eye_axis = right_eye - left_eye
+    eye_distance = float(np.hypot(*eye_axis)) or 1.0
+    roll = float(np.degrees(np.arctan2(eye_axis[1], eye_axis[0])))
+    # Express the other landmarks in the roll-corrected frame centred between the eyes.
+    unit = eye_axis / eye_distance
+    normal = np.array([-unit[1], unit[0]], dtype=np.float32)
+    eye_mid = (left_eye + right_eye) / 2
+    nose_offset = nose - eye_mid
+    mouth_offset = (mouth_left + mouth_right) / 2 - eye_mid
+    yaw = float(nose_offset @ unit) / eye_distance
+    mouth_depth = float(mouth_offset @ normal)
+    pitch = float(nose_offset @ normal) / mouth_depth if mouth_depth > 0 else 0.0
+    return yaw, pitch, roll
+
+
+@dataclass(frozen=True)
+class FaceQualityGate:
+    """Thresholds for the pre-embedding quality checks; ``enabled=False`` turns them off."""
+
+    enabled: bool = True
+    min_sharpness: float = 20.0
+    sharpness_side: int = 256
+    min_face_size: int = 48
+    min_probability: float = 0.95
+    max_yaw: float = 0.3
+    pitch_range: Tuple[float, float] = (0.25, 0.8)
+    max_roll: float = 25.0
+
+    def check_frame(self, image: np.ndarray) -> None:
+        sharpness = laplacian_variance(downsampled_gray(image, self.sharpness_side))
+        if sharpness < self.min_sharpness:
+            raise SampleQualityError(BLURRY, f"sharpness {sharpness:.1f} < {self.min_sharpness}")
+
+    def check_face(self, face: Optional[DetectedFace]) -> None:
+        if face is None:
+            raise SampleQualityError(NO_FACE, "no face detected")
+        x1, y1, x2, y2 = (float(value) for value in face.box)
+        size = min(x2 - x1, y2 - y1)
+        if size < self.min_face_size:
+            raise SampleQualityError(FACE_TOO_SMALL, f"face size {size:.0f}px < {self.min_face_size}px")
+        if face.probability < self.min_probability:
+            raise SampleQualityError(LOW_CONFIDENCE, f"detection probability {face.probability:.3f} < {self.min_probability}")
+        if face.landmarks is not None:
+            yaw, pitch, roll = estimate_pose(face.landmarks)
+            low, high = self.pitch_range
+            if abs(yaw) > self.max_yaw or not low <= pitch <= high or abs(roll) > self.max_roll:
+                raise SampleQualityError(EXTREME_POSE, f"yaw {yaw:.2f}, pitch {pitch:.2f}, roll {roll:.0f}°")
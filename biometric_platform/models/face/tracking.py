@@ -0,0 +1,159 @@
+"""
+Lightweight single-face tracking between full detections.
+
+Between detector runs the face box is propagated with a constant-velocity prediction
+refined by phase correlation: the face patch from the previous frame is correlated with
+the same-size patch around the predicted box in the new frame, and the correlation peak
+gives the residual translation (a global optical-flow estimate for the face). Both
+patches are sampled at a fixed small size, so a tracked frame costs two 2-D FFTs of
+``patch_size`` x ``patch_size`` regardless of the camera resolution. Detections are
+associated with the track by IoU; a weak correlation peak or an unmatched detection
+ends the track.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> float:
+    """Intersection over union of two ``(x1, y1, x2, y2)`` boxes."""
+
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return float(intersection / union) if union > 0 else 0.0
+
+
+def to_gray(frame: np.ndarray) -> np.ndarray:
+    frame = np.asarray(frame, dtype=np.float32)
+    return frame[..., :3].mean(axis=2) if frame.ndim == 3 else frame
+
+
+def sample_patch(gray: np.ndarray, box: np.ndarray, size: int) -> np.ndarray:
+    """Nearest-neighbour resample of ``box`` (clipped to the frame) to ``size`` x ``size``."""
+
+    h, w = gray.shape
+    ys = np.clip(np.linspace(box[1], box[3], size, endpoint=False).astype(np.int64), 0, h - 1)
+    xs = np.clip(np.linspace(box[0], box[2], size, endpoint=False).astype(np.int64), 0, w - 1)
+    return gray[ys[:, None], xs[None, :]]
+
+
+@lru_cache(maxsize=4)
+def _window(size: int) -> np.ndarray:
+    window = np.outer(np.hanning(size), np.hanning(size)).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+
+def phase_correlation(reference: np.ndarray, target: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Return ``(dy, dx, peak)``: the translation of ``target`` relative to ``reference`` in
+    patch pixels and the normalized correlation peak (1 for a pure shift, ~0 for no match).
+    """
+
+    window = _window(reference.shape[0])
+    a = np.fft.rfft2((reference - reference.mean()) * window)
+    b = np.fft.rfft2((target - target.mean()) * window)
+    cross = b * np.conj(a)
+    cross /= np.maximum(np.abs(cross), 1e-9)
+    surface = np.fft.irfft2(cross, s=reference.shape)
+    peak_index = np.unravel_index(int(np.argmax(surface)), surface.shape)
+    size = np.array(surface.shape)
+    dy, dx = (np.array(peak_index) + size // 2) % size - size // 2
+    return float(dy), float(dx), float(surface[peak_index])
+
+
+class FaceTracker:
+    """
+    Follows one face between detector runs.
+
+    ``needs_detection`` tells the caller when to run the full detector: every
+    ``detect_every`` frames, and on every frame while no face is tracked. ``observe``
+    associates the detections of such a frame with the track, ``propagate`` moves the box
+    on the frames in between. ``track_id`` changes whenever a new face is acquired.
+    """
+
+    def __init__(
+        self,
+        detect_every: int = 5,
+        iou_threshold: float = 0.3,
+        patch_size: int = 64,
+        min_peak: float = 0.08,
+    ) -> None:
+        self.detect_every = max(1, detect_every)
+        self.iou_threshold = iou_threshold
+        self.patch_size = patch_size
+        self.min_peak = min_peak
+        self.box: Optional[np.ndarray] = None
+        self.track_id = 0
+        self._velocity = np.zeros(4, dtype=np.float32)
+        self._patch: Optional[np.ndarray] = None
+        self._since_detection = 0
+
+    @property
+    def tracking(self) -> bool:
+        return self.box is not None
+
+    def needs_detection(self) -> bool:
+        return self.box is None or self._since_detection >= self.detect_every
+
+    def observe(self, gray: np.ndarray, boxes: Sequence[np.ndarray]) -> Optional[int]:
+        """
+        Update the track from a detection frame and return the index of the detection now
+        being tracked (``None`` when there is no face). An existing track continues with
+        its best-overlapping detection; otherwise the largest detection starts a new track.
+        """
+
+        self._since_detection = 0
+        if not len(boxes):
+            self._lose()
+            return None
+        boxes = [np.asarray(box, dtype=np.float32) for box in boxes]
+        chosen: Optional[int] = None
+        if self.box is not None:
+            overlaps = [iou(self.box, box) for box in boxes]
+            best = int(np.argmax(overlaps))
+            if overlaps[best] >= self.iou_threshold:
+                chosen = best
+                self._velocity = 0.5 * self._velocity + 0.5 * (boxes[best] - self.box) / self.detect_every
+        if chosen is None:
+            areas = [(box[2] - box[0]) * (box[3] - box[1]) for box in boxes]
+            chosen = int(np.argmax(areas))
+            self.track_id += 1
+            self._velocity = np.zeros(4, dtype=np.float32)
+        self.box = boxes[chosen]
+        self._patch = sample_patch(gray, self.box, self.patch_size)
+        return chosen
+
+    def propagate(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """Move the box to ``gray``; returns the new box, or ``None`` if the face was lost."""
+
+        if self.box is None or self._patch is None:
+            return None
+        self._since_detection += 1
+        predicted = self.box + self._velocity
+        patch = sample_patch(gray, predicted, self.patch_size)
+        dy, dx, peak = phase_correlation(self._patch, patch)
+        if peak < self.min_peak:
+            self._lose()
+            return None
+        scale_x = (predicted[2] - predicted[0]) / self.patch_size
+        scale_y = (predicted[3] - predicted[1]) / self.patch_size
+        # The face moved by (dx, dy) patch pixels relative to the predicted window.
+        box = predicted + np.array([dx * scale_x, dy * scale_y, dx * scale_x, dy * scale_y], dtype=np.float32)
+        self._velocity = 0.7 * self._velocity + 0.3 * (box - self.box)
+        self.box = box
+        self._patch = sample_patch(gray, box, self.patch_size)
+        return box
+
+    def _lose(self) -> None:
+        self.box = None
+        self._patch = None
+        self._velocity = np.zeros(4, dtype=np.float32)
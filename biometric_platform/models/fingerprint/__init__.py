@@ -0,0 +1,9 @@
+"""
+Fingerprint modality models.
+"""
+
+from .mcc import CylinderCodec, CylinderSet
+from .minutiae import MINUTIA_DTYPE, MinutiaeExtractor, extract_minutiae
+from .pair_code import MinutiaePairCode
+
+__all__ = ["CylinderCodec", "CylinderSet", "MINUTIA_DTYPE", "MinutiaeExtractor", "MinutiaePairCode", "extract_minutiae"]
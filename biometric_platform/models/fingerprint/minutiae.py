@@ -0,0 +1,171 @@
+"""
+Minutiae extraction from fingerprint images.
+
+The pipeline is binarization against a local mean, Zhang-Suen thinning, and
+crossing-number detection on the skeleton. Every step operates on whole-image neighbour
+planes (shifted views of a padded array), so the only Python loop is the thinning
+iteration count, which is bounded by the ridge half-width.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ..base import EmbeddingModel
+
+#: One row per minutia: pixel position, direction in radians [0, 2π) and kind.
+MINUTIA_DTYPE = np.dtype([("x", np.int16), ("y", np.int16), ("angle", np.float32), ("type", np.uint8)])
+
+RIDGE_ENDING = 1
+BIFURCATION = 2
+
+# Clockwise 8-neighbourhood starting north (P2..P9 in Zhang-Suen notation) as (dy, dx).
+_NEIGHBOUR_OFFSETS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+def empty_template() -> np.ndarray:
+    return np.zeros(0, dtype=MINUTIA_DTYPE)
+
+
+def _box_mean(image: np.ndarray, window: int) -> np.ndarray:
+    """Mean over a ``window`` x ``window`` neighbourhood via an integral image."""
+
+    pad = window // 2
+    padded = np.pad(image.astype(np.float64), pad + 1, mode="edge")
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    h, w = image.shape
+    total = (
+        integral[window : window + h, window : window + w]
+        - integral[:h, window : window + w]
+        - integral[window : window + h, :w]
+        + integral[:h, :w]
+    )
+    return total / float(window * window)
+
+
+def _neighbours(binary: np.ndarray) -> np.ndarray:
+    """Return the (8, h, w) stack of neighbour planes P2..P9."""
+
+    padded = np.pad(binary, 1)
+    h, w = binary.shape
+    return np.stack([padded[1 + dy : 1 + dy + h, 1 + dx : 1 + dx + w] for dy, dx in _NEIGHBOUR_OFFSETS])
+
+
+def to_grayscale(image: np.ndarray) -> np.ndarray:
+    image = np.asarray(image, dtype=np.float32)
+    if image.ndim == 3:
+        image = image[..., :3].mean(axis=2)
+    return image
+
+
+def segment_and_binarize(gray: np.ndarray, window: int = 15, min_std: float = 8.0) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(ridges, foreground)``: dark-ridge pixels and the textured fingerprint area."""
+
+    smoothed = _box_mean(gray, 3)
+    mean = _box_mean(smoothed, window)
+    std = np.sqrt(np.maximum(_box_mean(smoothed**2, window) - mean**2, 0.0))
+    foreground = std > min_std
+    # Shrink the foreground so minutiae at the print boundary (ridges cut off by the
+    # sensor edge) are not reported.
+    foreground = _box_mean(foreground.astype(np.float32), 2 * window + 1) > 0.99
+    return (smoothed < mean) & foreground, foreground
+
+
+def thin(binary: np.ndarray) -> np.ndarray:
+    """Zhang-Suen thinning, with each sub-iteration applied to the whole image at once."""
+
+    skeleton = binary.astype(np.uint8)
+    while True:
+        changed = False
+        for step in (0, 1):
+            p = _neighbours(skeleton)
+            count = p.sum(axis=0)
+            transitions = ((p == 0) & (np.roll(p, -1, axis=0) == 1)).sum(axis=0)
+            p2, p4, p6, p8 = p[0], p[2], p[4], p[6]
+            if step == 0:
+                first, second = p2 * p4 * p6, p4 * p6 * p8
+            else:
+                first, second = p2 * p4 * p8, p2 * p6 * p8
+            remove = (skeleton == 1) & (count >= 2) & (count <= 6) & (transitions == 1) & (first == 0) & (second == 0)
+            if remove.any():
+                skeleton[remove] = 0
+                changed = True
+        if not changed:
+            return skeleton.astype(bool)
+
+
+def orientation_field(gray: np.ndarray, window: int = 15) -> np.ndarray:
+    """Ridge orientation in [0, π) per pixel from smoothed doubled-angle gradient moments."""
+
+    gy, gx = np.gradient(_box_mean(gray, 3))
+    gxx = _box_mean(gx * gx, window)
+    gyy = _box_mean(gy * gy, window)
+    gxy = _box_mean(gx * gy, window)
+    # The gradient is perpendicular to the ridges.
+    return np.mod(0.5 * np.arctan2(2 * gxy, gxx - gyy) + np.pi / 2, np.pi)
+
+
+def detect_minutiae(
+    skeleton: np.ndarray,
+    orientation: np.ndarray,
+    foreground: np.ndarray,
+    border: int = 8,
+    min_distance: float = 8.0,
+) -> np.ndarray:
+    """Crossing-number minutiae with directions resolved along the ridge."""
+
+    p = _neighbours(skeleton.astype(np.int8))
+    crossing = np.abs(p - np.roll(p, -1, axis=0)).sum(axis=0) // 2
+    candidates = skeleton & foreground & ((crossing == 1) | (crossing == 3))
+    candidates[:border] = candidates[-border:] = False
+    candidates[:, :border] = candidates[:, -border:] = False
+    ys, xs = np.nonzero(candidates)
+    if ys.size == 0:
+        return empty_template()
+
+    # Break ridges and spurs produce clusters of close minutiae; drop every member.
+    if ys.size > 1:
+        diff_y = ys[:, None] - ys[None, :]
+        diff_x = xs[:, None] - xs[None, :]
+        close = (diff_y**2 + diff_x**2) < min_distance**2
+        np.fill_diagonal(close, False)
+        keep = ~close.any(axis=1)
+        ys, xs = ys[keep], xs[keep]
+
+    # Orientation is only defined modulo π; pick the sense pointing away from the
+    # skeleton pixels around the minutia (out of an ending, towards a bifurcation's stem).
+    offsets = np.array(_NEIGHBOUR_OFFSETS, dtype=np.float32)
+    local = p[:, ys, xs].astype(np.float32)
+    away_y = -(local * offsets[:, 0:1]).sum(axis=0)
+    away_x = -(local * offsets[:, 1:2]).sum(axis=0)
+    theta = orientation[ys, xs]
+    flip = (np.cos(theta) * away_x + np.sin(theta) * away_y) < 0
+    angles = np.mod(theta + np.pi * flip, 2 * np.pi)
+
+    template = np.empty(ys.size, dtype=MINUTIA_DTYPE)
+    template["x"] = xs
+    template["y"] = ys
+    template["angle"] = angles
+    template["type"] = np.where(crossing[ys, xs] == 1, RIDGE_ENDING, BIFURCATION)
+    return template
+
+
+def extract_minutiae(image: np.ndarray, window: int = 15) -> np.ndarray:
+    """Full pipeline: grayscale image (dark ridges) -> structured ``MINUTIA_DTYPE`` array."""
+
+    gray = to_grayscale(image)
+    ridges, foreground = segment_and_binarize(gray, window=window)
+    skeleton = thin(ridges)
+    return detect_minutiae(skeleton, orientation_field(gray, window=window), foreground)
+
+
+class MinutiaeExtractor(EmbeddingModel):
+    """``EmbeddingModel`` adapter: the "embedding" of a fingerprint is its minutiae template."""
+
+    def __init__(self, window: int = 15, max_minutiae: int = 128) -> None:
+        self.window = window
+        self.max_minutiae = max_minutiae
+
+    def embed(self, image: np.ndarray) -> np.ndarray:
+        template = extract_minutiae(image, window=self.window)
+        return template[: self.max_minutiae]
@@ -0,0 +1,72 @@
+"""
+Fixed-length binary fingerprint codes built from minutia pairs.
+
+Every pair of minutiae closer than ``max_distance`` is described by three quantities that
+do not change under rotation or translation: their distance, the bearing of the second
+minutia seen from the first (relative to the first minutia's direction) and the
+difference of their directions. Each triple sets one bit in a
+(distance bins x bearing bins x direction bins) grid. Two impressions of the same finger
+share many of their bits, and the codes are compared by the Dice coefficient of the set
+bits.
+
+The code is far cheaper to search than cylinder codes (one XOR + popcount per template,
+indexable by ``BinaryTemplateStore``) but less discriminative; it is suited to large
+galleries or to shortlisting candidates for ``MinutiaeTemplateStore``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ..base import EmbeddingModel
+from .mcc import angle_difference
+from .minutiae import extract_minutiae
+
+
+class MinutiaePairCode(EmbeddingModel):
+    """Fingerprint image (or minutiae template) -> boolean pair-code vector."""
+
+    def __init__(
+        self,
+        distance_step: float = 10.0,
+        max_distance: float = 100.0,
+        angle_bins: int = 16,
+        window: int = 15,
+    ) -> None:
+        self.distance_step = distance_step
+        self.max_distance = max_distance
+        self.angle_bins = angle_bins
+        self.window = window
+        self.distance_bins = int(np.ceil(max_distance / distance_step))
+        self.num_bits = self.distance_bins * angle_bins * angle_bins
+
+    def embed(self, image: np.ndarray) -> np.ndarray:
+        return self.encode(extract_minutiae(image, window=self.window))
+
+    def encode(self, minutiae: np.ndarray) -> np.ndarray:
+        """Return the ``num_bits`` boolean code of a ``MINUTIA_DTYPE`` template."""
+
+        bits = np.zeros(self.num_bits, dtype=bool)
+        if minutiae.shape[0] < 2:
+            return bits
+        xs = minutiae["x"].astype(np.float32)
+        ys = minutiae["y"].astype(np.float32)
+        angles = minutiae["angle"].astype(np.float32)
+
+        dx = xs[None, :] - xs[:, None]
+        dy = ys[None, :] - ys[:, None]
+        distance = np.hypot(dx, dy)
+        # Ordered pairs: (i, j) and (j, i) see different bearings, both are recorded.
+        pairs = (distance < self.max_distance) & ~np.eye(minutiae.shape[0], dtype=bool)
+        i, j = np.nonzero(pairs)
+        if i.size == 0:
+            return bits
+
+        bearing = angle_difference(np.arctan2(dy[i, j], dx[i, j]), angles[i])
+        direction = angle_difference(angles[j], angles[i])
+        scale = self.angle_bins / (2 * np.pi)
+        distance_bin = np.minimum((distance[i, j] / self.distance_step).astype(np.int64), self.distance_bins - 1)
+        bearing_bin = np.floor((bearing + np.pi) * scale).astype(np.int64) % self.angle_bins
+        direction_bin = np.floor((direction + np.pi) * scale).astype(np.int64) % self.angle_bins
+        bits[(distance_bin * self.angle_bins + bearing_bin) * self.angle_bins + direction_bin] = True
+        return bits
@@ -1,31 +1,128 @@
 """
 Model management utilities for biometric modalities.
+
+``ModelManager`` caches one embedding model per modality. Services are built per request
+and look the model up on each request, so ``swap_embedding_model`` can replace it without
+a restart: the new model is loaded and warmed in a background thread, then published
+with one dict assignment. Requests that already hold the old model finish on it, and it
+is freed once the last of them returns. ``ModelConfigWatcher`` triggers swaps when the
+``model`` section of the configuration file changes.
+
+A modality can register a swap handler that must finish before the model is published,
+e.g. the face template migration of a ``VersionedEmbeddingStore``. Without one, a swap
+that changes the model of a modality whose store holds templates is refused
+(``IncompatibleGalleryError``) unless it is forced: the stored templates would no longer
+be comparable with new embeddings until every user is re-enrolled.
 """
 
 from __future__ import annotations
 
-from typing import Any, Optional
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
 
 from ..core.utils import import_string
-from ..core.config import ModalityConfig
+from ..core.config import AppConfig, ModalityConfig, load_yaml_file
 from .base import EmbeddingModel
 
+# Called with the warmed model (and the swap's options) before it is published. Returns a
+# started job, e.g. a ``TemplateMigration``: ``wait()`` blocks until it ends and returns a
+# progress with ``state`` and ``to_dict()``; the model is published if it "completed".
+SwapHandler = Callable[..., Any]
+# Returns True while the modality's store holds templates.
+GalleryCheck = Callable[[], bool]
+
+
+class IncompatibleGalleryError(ValueError):
+    """A swap would serve a model whose embeddings do not match the stored templates."""
+
+
+class ModelSwap:
+    """A background load, warm-up and swap of one modality's embedding model."""
+
+    def __init__(
+        self,
+        modality: str,
+        model_info: dict[str, Any],
+        options: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+    ) -> None:
+        self.modality = modality
+        self.model_info = model_info
+        self.options = dict(options or {})
+        self.force = force
+        self.state = "loading"  # loading, warming, migrating, swapped, unchanged or failed
+        self.version: Optional[str] = None
+        self.previous_version: Optional[str] = None
+        self.load_s = 0.0
+        self.warmup_s = 0.0
+        self.error: Optional[str] = None
+        self.job: Any = None  # started by the modality's swap handler
+        self._previous: Optional[weakref.ref] = None
+        self._done = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> "ModelSwap":
+        self._done.wait(timeout)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        previous = None if self._previous is None else self._previous()
+        return {
+            "modality": self.modality,
+            "state": self.state,
+            "version": self.version,
+            "previous_version": self.previous_version,
+            "load_s": round(self.load_s, 3),
+            "warmup_s": round(self.warmup_s, 3),
+            # False while requests that started before the swap still hold the old model.
+            "previous_released": self._previous is not None and previous is None,
+            "error": self.error,
+            "migration": None if self.job is None else self.job.progress().to_dict(),
+        }
+
 
 class ModelManager:
     """Loads and caches models based on modality configuration."""
 
     def __init__(self) -> None:
         self._embedding_cache: dict[str, EmbeddingModel] = {}
+        self._model_info: dict[str, dict[str, Any]] = {}
+        self._swaps: dict[str, ModelSwap] = {}
+        self._swap_handlers: dict[str, SwapHandler] = {}
+        self._gallery_checks: dict[str, GalleryCheck] = {}
+        self._lock = threading.Lock()
 
     def get_embedding_model(self, modality: str, config: ModalityConfig) -> EmbeddingModel:
-        if modality in self._embedding_cache:
+        embedding_model = self._embedding_cache.get(modality)
+        if embedding_model is not None:
+            return embedding_model
+
+        with self._lock:
+            if modality not in self._embedding_cache:
+                model_info = self.model_info_from_config(config)
+                self._embedding_cache[modality] = self.build_embedding_model(modality, model_info)
+                self._model_info[modality] = model_info
             return self._embedding_cache[modality]
 
-        model_info: dict[str, Any] = {}
+    @staticmethod
+    def model_info_from_config(config: ModalityConfig) -> dict[str, Any]:
         if config.model:
-            model_info = config.model
-        elif config.extras and "embedding_model" in config.extras:
-            model_info = {"class": config.extras["embedding_model"]}
+            return dict(config.model)
+        if config.extras and "embedding_model" in config.extras:
+            return {"class": config.extras["embedding_model"]}
+        return {}
+
+    @staticmethod
+    def build_embedding_model(modality: str, model_info: dict[str, Any]) -> EmbeddingModel:
+        """Instantiate a ``{class, params}`` model description without caching it."""
 
         class_path = model_info.get("class")
         if not class_path:
@@ -36,10 +133,170 @@ class ModelManager:
         embedding_model = model_cls(**kwargs)
         if not isinstance(embedding_model, EmbeddingModel):
             raise TypeError(f"Embedding model for '{modality}' must implement EmbeddingModel interface")
-
-        self._embedding_cache[modality] = embedding_model
         return embedding_model
 
+    def model_info(self, modality: str) -> Optional[dict[str, Any]]:
+        """The ``{class, params}`` description of the model currently served, if loaded."""
+
+        return self._model_info.get(modality)
+
+    def set_swap_handler(self, modality: str, handler: Optional[SwapHandler]) -> None:
+        if handler is None:
+            self._swap_handlers.pop(modality, None)
+        else:
+            self._swap_handlers[modality] = handler
+
+    def set_gallery_check(self, modality: str, check: Optional[GalleryCheck]) -> None:
+        if check is None:
+            self._gallery_checks.pop(modality, None)
+        else:
+            self._gallery_checks[modality] = check
+
+    def swap_embedding_model(
+        self, modality: str, model_info: dict[str, Any], force: bool = False, **options: Any
+    ) -> ModelSwap:
+        """
+        Load ``model_info`` in a background thread, warm it up and make it the model of
+        ``modality``. Only one swap per modality runs at a time (``ValueError`` otherwise).
+        ``options`` are passed to the modality's swap handler.
+
+        Without a swap handler, a new model for a modality whose store holds templates
+        raises ``IncompatibleGalleryError`` (or fails the swap once its weights turn out to
+        differ) unless ``force`` is set, after which every user has to be re-enrolled.
+        """
+
+        if not force and model_info != self._model_info.get(modality) and self._gallery_blocks(modality):
+            raise IncompatibleGalleryError(self._incompatible_message(modality))
+        with self._lock:
+            if modality not in self._embedding_cache:
+                raise KeyError(f"No embedding model loaded for modality '{modality}'")
+            current = self._swaps.get(modality)
+            if current is not None and current.running:
+                raise ValueError(f"A model swap for '{modality}' is already in progress")
+            swap = ModelSwap(modality, dict(model_info), options, force=force)
+            self._swaps[modality] = swap
+        threading.Thread(target=self._run_swap, args=(swap,), name=f"model-swap-{modality}", daemon=True).start()
+        return swap
+
+    def swap_status(self, modality: str) -> Optional[ModelSwap]:
+        return self._swaps.get(modality)
+
+    def _run_swap(self, swap: ModelSwap) -> None:
+        try:
+            started = time.perf_counter()
+            model = self.build_embedding_model(swap.modality, swap.model_info)
+            swap.version = model.fingerprint()
+            swap.load_s = time.perf_counter() - started
+
+            swap.state = "warming"
+            started = time.perf_counter()
+            model.warmup()  # the first request after the swap must not pay lazy initialization
+            swap.warmup_s = time.perf_counter() - started
+
+            previous = self._embedding_cache[swap.modality]
+            swap.previous_version = previous.fingerprint()
+            # The fingerprint alone misses parameter changes of models without tensor weights,
+            # the description alone misses new weights deployed under the same path.
+            if swap.model_info == self._model_info.get(swap.modality) and swap.version == swap.previous_version:
+                swap.state = "unchanged"
+                return
+            handler = self._swap_handlers.get(swap.modality)
+            if handler is None and not swap.force and self._gallery_blocks(swap.modality):
+                raise IncompatibleGalleryError(self._incompatible_message(swap.modality))
+            if handler is not None:
+                swap.state = "migrating"
+                swap.job = handler(model, **swap.options)
+                outcome = swap.job.wait()
+                if outcome.state != "completed":
+                    raise RuntimeError(f"Model not swapped: migration {outcome.state} ({outcome.error})")
+            with self._lock:
+                self._embedding_cache[swap.modality] = model
+                self._model_info[swap.modality] = swap.model_info
+            swap._previous = weakref.ref(previous)
+            swap.state = "swapped"
+        except Exception as exc:  # noqa: BLE001 - reported through swap_status()
+            swap.state = "failed"
+            swap.error = str(exc)
+        finally:
+            swap._done.set()
+
+    def _gallery_blocks(self, modality: str) -> bool:
+        check = self._gallery_checks.get(modality)
+        return modality not in self._swap_handlers and check is not None and check()
+
+    @staticmethod
+    def _incompatible_message(modality: str) -> str:
+        return (
+            f"The '{modality}' store holds templates of the current model and cannot be migrated; "
+            "force the swap and re-enroll every user"
+        )
+
     def clear_cache(self) -> None:
         self._embedding_cache.clear()
+        self._model_info.clear()
+
+
+class ModelConfigWatcher:
+    """
+    Polls the configuration file and hot-swaps each loaded modality whose model
+    description changed. An unreadable or invalid file is skipped (``last_error``) and the
+    current models keep serving.
+    """
+
+    def __init__(self, config_path: str | Path, model_manager: ModelManager, interval_s: float = 2.0) -> None:
+        self._path = Path(config_path)
+        self._manager = model_manager
+        self._interval_s = interval_s
+        self._mtime = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> "ModelConfigWatcher":
+        self._thread = threading.Thread(target=self._run, name="model-config-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def check(self) -> List[ModelSwap]:
+        """Start a swap for every changed modality if the file changed since the last check."""
+
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return []
+        previous_mtime, self._mtime = self._mtime, mtime
+        try:
+            config = AppConfig(**load_yaml_file(self._path))
+        except (OSError, ValueError, yaml.YAMLError) as exc:  # ValueError covers pydantic's ValidationError
+            self.last_error = str(exc)
+            return []
+        self.last_error = None
+
+        swaps = []
+        for modality, modality_config in config.modalities.items():
+            current = self._manager.model_info(modality)
+            wanted = ModelManager.model_info_from_config(modality_config)
+            if current is None or not wanted or wanted == current:
+                continue
+            try:
+                swaps.append(self._manager.swap_embedding_model(modality, wanted))
+            except IncompatibleGalleryError as exc:  # needs a forced swap through the admin API
+                self.last_error = str(exc)
+            except ValueError as exc:  # a swap still running: check this file again next time
+                self.last_error = str(exc)
+                self._mtime = previous_mtime
+        return swaps
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            self.check()
 
+    def _stat(self) -> Optional[float]:
+        try:
+            return self._path.stat().st_mtime
+        except OSError:
+            return None
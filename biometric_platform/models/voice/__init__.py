@@ -0,0 +1,14 @@
+"""
+Voice modality models.
+"""
+
+from .embedding import MFCCSpeakerEmbedding, SpeakerEmbeddingStream
+from .features import FeatureConfig, LogMelExtractor, StreamingFeatureExtractor
+
+__all__ = [
+    "FeatureConfig",
+    "LogMelExtractor",
+    "MFCCSpeakerEmbedding",
+    "SpeakerEmbeddingStream",
+    "StreamingFeatureExtractor",
+]
@@ -0,0 +1,134 @@
+"""
+PCM decoding helpers for voice samples.
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+import wave
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+_PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def pcm_to_float(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM bytes to mono float32 samples in [-1, 1]."""
+
+    if sample_width not in _PCM_DTYPES:
+        raise ValueError(f"Unsupported PCM sample width: {sample_width} bytes")
+    samples = np.frombuffer(data, dtype=_PCM_DTYPES[sample_width]).astype(np.float32)
+    if sample_width == 1:
+        samples = (samples - 128.0) / 128.0
+    else:
+        samples /= float(2 ** (8 * sample_width - 1))
+    if channels > 1:
+        samples = samples[: samples.size - samples.size % channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def open_wav(source: Union[bytes, Path, BinaryIO], chunk_frames: int = 16000) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Open a WAV payload (bytes, file path or binary stream) and return ``(sample_rate, chunks)``.
+
+    Chunks are decoded lazily, ``chunk_frames`` samples at a time, so callers that consume
+    them incrementally never hold the whole decoded signal.
+    """
+
+    owned = None
+    if isinstance(source, (bytes, bytearray)):
+        stream: BinaryIO = io.BytesIO(source)
+    elif isinstance(source, Path):
+        stream = owned = source.open("rb")
+    else:
+        stream = source
+    try:
+        reader = wave.open(stream, "rb")
+    except (wave.Error, EOFError) as exc:
+        if owned is not None:
+            owned.close()
+        raise ValueError("Unable to decode WAV audio") from exc
+
+    def chunks() -> Iterator[np.ndarray]:
+        try:
+            width, channels = reader.getsampwidth(), reader.getnchannels()
+            while True:
+                data = reader.readframes(chunk_frames)
+                if not data:
+                    return
+                yield pcm_to_float(data, width, channels)
+        finally:
+            reader.close()
+            if owned is not None:
+                owned.close()
+
+    return reader.getframerate(), chunks()
+
+
+class PCMStreamDecoder:
+    """
+    Incremental decoder for audio delivered in arbitrary byte pieces (e.g. WebSocket frames).
+
+    ``container="pcm"`` expects headerless little-endian PCM with the given format;
+    ``container="wav"`` parses the RIFF header from the first bytes and then streams the
+    ``data`` chunk, so a WAV file can be sent as-is in fixed-size slices. Bytes that do not
+    complete a sample frame are held until the next piece arrives.
+    """
+
+    _MAX_HEADER_BYTES = 1 << 16
+
+    def __init__(
+        self,
+        container: str = "pcm",
+        sample_rate: Optional[int] = None,
+        sample_width: int = 2,
+        channels: int = 1,
+    ) -> None:
+        if container not in ("pcm", "wav"):
+            raise ValueError(f"Unsupported audio container: {container!r}")
+        self.container = container
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+        self._header_done = container == "pcm"
+        self._pending = b""
+
+    def feed(self, data: bytes) -> np.ndarray:
+        buffer = self._pending + data
+        if not self._header_done:
+            buffer = self._consume_header(buffer)
+            if not self._header_done:
+                self._pending = buffer
+                return np.zeros(0, dtype=np.float32)
+        frame_bytes = self.sample_width * self.channels
+        usable = len(buffer) - len(buffer) % frame_bytes
+        self._pending = buffer[usable:]
+        return pcm_to_float(buffer[:usable], self.sample_width, self.channels)
+
+    def _consume_header(self, buffer: bytes) -> bytes:
+        if len(buffer) >= 12 and (buffer[:4] != b"RIFF" or buffer[8:12] != b"WAVE"):
+            raise ValueError("Audio stream is not a RIFF/WAVE payload")
+        offset = 12
+        while len(buffer) >= offset + 8:
+            chunk_id = buffer[offset : offset + 4]
+            (size,) = struct.unpack("<I", buffer[offset + 4 : offset + 8])
+            body = offset + 8
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise ValueError("WAV stream has no fmt chunk before its data")
+                self._header_done = True
+                return buffer[body:]
+            if len(buffer) < body + size:
+                break
+            if chunk_id == b"fmt ":
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", buffer[body : body + 16])
+                if format_tag not in (1, 0xFFFE):
+                    raise ValueError(f"Unsupported WAV format tag: {format_tag}")
+                self.channels, self.sample_rate, self.sample_width = channels, sample_rate, bits // 8
+            offset = body + size + (size & 1)
+        if len(buffer) > self._MAX_HEADER_BYTES:
+            raise ValueError("WAV header is too large")
+        return buffer
@@ -0,0 +1,120 @@
+"""
+Speaker embedding built on the streaming MFCC front-end.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from ..base import EmbeddingModel
+from .features import FeatureConfig, StreamingFeatureExtractor
+
+
+class SpeakerEmbeddingStream:
+    """
+    Accumulates statistics pooling (per-coefficient mean and standard deviation) over a
+    chunked signal. Only running sums are kept, so memory does not grow with duration.
+    """
+
+    def __init__(self, config: FeatureConfig, min_log_energy: float) -> None:
+        self._extractor = StreamingFeatureExtractor(config)
+        self.hop_seconds = config.hop_length / config.sample_rate
+        # c0 of the orthonormal DCT is the mean log-mel energy scaled by sqrt(n_mels).
+        self._energy_floor = min_log_energy * np.sqrt(config.n_mels)
+        dim = config.n_mfcc - 1
+        self._sum = np.zeros(dim, dtype=np.float64)
+        self._sum_sq = np.zeros(dim, dtype=np.float64)
+        self.num_frames = 0
+
+    def push(self, chunk: np.ndarray) -> int:
+        """Feed PCM samples; returns the number of voiced frames they completed."""
+
+        features = self._extractor.push(chunk)
+        voiced = features[features[:, 0] > self._energy_floor, 1:].astype(np.float64)
+        self._sum += voiced.sum(axis=0)
+        self._sum_sq += np.square(voiced).sum(axis=0)
+        self.num_frames += voiced.shape[0]
+        return voiced.shape[0]
+
+    def embedding(self) -> np.ndarray:
+        if self.num_frames == 0:
+            raise ValueError("Audio sample contains no voiced frames")
+        mean = self._sum / self.num_frames
+        std = np.sqrt(np.maximum(self._sum_sq / self.num_frames - np.square(mean), 0.0))
+        pooled = np.concatenate([mean, std])
+        norm = np.linalg.norm(pooled) or 1.0
+        return (pooled / norm).astype(np.float32)
+
+
+class MFCCSpeakerEmbedding(EmbeddingModel):
+    """
+    MFCC statistics-pooling speaker embedding.
+
+    Frame sizes are fixed in milliseconds, so the same model handles any sample rate; the
+    per-rate feature configuration (and the filterbank/window caches behind it) is built once.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        n_mels: int = 40,
+        n_mfcc: int = 20,
+        frame_ms: float = 25.0,
+        hop_ms: float = 10.0,
+        fmin: float = 20.0,
+        fmax: float = 7600.0,
+        min_log_energy: float = -12.0,
+        chunk_size: int = 16000,
+    ) -> None:
+        if n_mfcc < 2:
+            raise ValueError("n_mfcc must be at least 2")
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self._n_mels = n_mels
+        self._n_mfcc = n_mfcc
+        self._frame_ms = frame_ms
+        self._hop_ms = hop_ms
+        self._fmin = fmin
+        self._fmax = fmax
+        self._min_log_energy = min_log_energy
+        self._configs: Dict[int, FeatureConfig] = {}
+
+    @property
+    def embedding_dim(self) -> int:
+        return 2 * (self._n_mfcc - 1)
+
+    def feature_config(self, sample_rate: Optional[int] = None) -> FeatureConfig:
+        sample_rate = int(sample_rate or self.sample_rate)
+        config = self._configs.get(sample_rate)
+        if config is None:
+            frame_length = int(round(sample_rate * self._frame_ms / 1000.0))
+            config = FeatureConfig(
+                sample_rate=sample_rate,
+                frame_ms=self._frame_ms,
+                hop_ms=self._hop_ms,
+                n_fft=1 << max(frame_length - 1, 1).bit_length(),
+                n_mels=self._n_mels,
+                n_mfcc=self._n_mfcc,
+                fmin=self._fmin,
+                fmax=min(self._fmax, sample_rate / 2.0),
+            )
+            self._configs[sample_rate] = config
+        return config
+
+    def stream(self, sample_rate: Optional[int] = None) -> SpeakerEmbeddingStream:
+        return SpeakerEmbeddingStream(self.feature_config(sample_rate), self._min_log_energy)
+
+    def embed_stream(self, chunks: Iterable[np.ndarray], sample_rate: Optional[int] = None) -> np.ndarray:
+        stream = self.stream(sample_rate)
+        for chunk in chunks:
+            stream.push(chunk)
+        return stream.embedding()
+
+    def embed(self, audio: np.ndarray, sample_rate: Optional[int] = None) -> np.ndarray:
+        audio = np.asarray(audio).ravel()
+        if audio.dtype.kind in "iu":
+            audio = audio.astype(np.float32) / float(np.iinfo(audio.dtype).max)
+        chunks = (audio[start : start + self.chunk_size] for start in range(0, audio.size, self.chunk_size))
+        return self.embed_stream(chunks, sample_rate)
@@ -0,0 +1,169 @@
+"""
+Vectorized log-mel / MFCC feature extraction for the voice modality.
+
+Framing uses strided views (no per-frame Python loops) and the filterbank, window and DCT
+matrices are cached per configuration, so extracting features for a chunk is a handful of
+array operations. ``StreamingFeatureExtractor`` accepts PCM in arbitrary chunk sizes and
+keeps only the samples needed to complete the next frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _hz_to_mel(hz: np.ndarray | float) -> np.ndarray | float:
+    return 2595.0 * np.log10(1.0 + np.asarray(hz) / 700.0)
+
+
+def _mel_to_hz(mel: np.ndarray | float) -> np.ndarray | float:
+    return 700.0 * (10.0 ** (np.asarray(mel) / 2595.0) - 1.0)
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=32)
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, fmin: float = 0.0, fmax: Optional[float] = None) -> np.ndarray:
+    """Triangular mel filterbank of shape (n_mels, n_fft // 2 + 1), cached per configuration."""
+
+    fmax = fmax or sample_rate / 2.0
+    bins = np.linspace(0.0, sample_rate / 2.0, n_fft // 2 + 1)
+    mel_points = np.linspace(_hz_to_mel(fmin), _hz_to_mel(fmax), n_mels + 2)
+    hz_points = _mel_to_hz(mel_points)
+    lower, center, upper = hz_points[:-2, None], hz_points[1:-1, None], hz_points[2:, None]
+    rising = (bins[None, :] - lower) / np.maximum(center - lower, 1e-10)
+    falling = (upper - bins[None, :]) / np.maximum(upper - center, 1e-10)
+    return _frozen(np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32))
+
+
+@lru_cache(maxsize=32)
+def analysis_window(frame_length: int) -> np.ndarray:
+    return _frozen(np.hanning(frame_length).astype(np.float32))
+
+
+@lru_cache(maxsize=32)
+def dct_matrix(n_mels: int, n_mfcc: int) -> np.ndarray:
+    """Orthonormal DCT-II basis of shape (n_mels, n_mfcc)."""
+
+    n = np.arange(n_mels)[:, None]
+    k = np.arange(n_mfcc)[None, :]
+    basis = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+    basis[:, 0] /= np.sqrt(2.0)
+    return _frozen(basis.astype(np.float32))
+
+
+def frame_signal(signal: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Return a (num_frames, frame_length) strided view; trailing partial frames are dropped."""
+
+    if signal.shape[0] < frame_length:
+        return np.zeros((0, frame_length), dtype=signal.dtype)
+    return sliding_window_view(signal, frame_length)[::hop_length]
+
+
+@dataclass(frozen=True)
+class FeatureConfig:
+    sample_rate: int = 16000
+    frame_ms: float = 25.0
+    hop_ms: float = 10.0
+    n_fft: int = 512
+    n_mels: int = 40
+    n_mfcc: int = 20
+    fmin: float = 20.0
+    fmax: Optional[float] = None
+    preemphasis: float = 0.97
+
+    @property
+    def frame_length(self) -> int:
+        return int(round(self.sample_rate * self.frame_ms / 1000.0))
+
+    @property
+    def hop_length(self) -> int:
+        return int(round(self.sample_rate * self.hop_ms / 1000.0))
+
+    @property
+    def num_features(self) -> int:
+        return self.n_mfcc or self.n_mels
+
+
+class LogMelExtractor:
+    """Computes log-mel energies, or MFCCs when ``n_mfcc`` is non-zero, for whole signals."""
+
+    def __init__(self, config: FeatureConfig | None = None) -> None:
+        self.config = config or FeatureConfig()
+        if self.config.frame_length > self.config.n_fft:
+            raise ValueError("frame length must not exceed n_fft")
+
+    def __call__(self, signal: np.ndarray) -> np.ndarray:
+        signal = np.asarray(signal, dtype=np.float32)
+        if self.config.preemphasis:
+            emphasized = np.empty_like(signal)
+            emphasized[:1] = signal[:1]
+            emphasized[1:] = signal[1:] - self.config.preemphasis * signal[:-1]
+            signal = emphasized
+        return self.features_from_frames(frame_signal(signal, self.config.frame_length, self.config.hop_length))
+
+    def features_from_frames(self, frames: np.ndarray) -> np.ndarray:
+        """Map pre-emphasized (num_frames, frame_length) frames to (num_frames, num_features)."""
+
+        cfg = self.config
+        if frames.shape[0] == 0:
+            return np.zeros((0, cfg.num_features), dtype=np.float32)
+        windowed = frames * analysis_window(cfg.frame_length)
+        power = np.abs(np.fft.rfft(windowed, n=cfg.n_fft, axis=1)) ** 2 / cfg.n_fft
+        mel = power.astype(np.float32) @ mel_filterbank(cfg.sample_rate, cfg.n_fft, cfg.n_mels, cfg.fmin, cfg.fmax).T
+        log_mel = np.log(np.maximum(mel, 1e-10))
+        if cfg.n_mfcc:
+            return log_mel @ dct_matrix(cfg.n_mels, cfg.n_mfcc)
+        return log_mel
+
+
+class StreamingFeatureExtractor:
+    """
+    Incremental front-end over chunked PCM.
+
+    ``push`` returns features for every frame completed by the new chunk. Only the last
+    ``frame_length - hop_length`` samples (plus the pre-emphasis history) are carried over,
+    so memory stays bounded regardless of recording length, and the concatenated output is
+    identical to running ``LogMelExtractor`` on the whole signal.
+    """
+
+    def __init__(self, config: FeatureConfig | None = None) -> None:
+        self._extractor = LogMelExtractor(config)
+        self.config = self._extractor.config
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._last_sample: Optional[float] = None
+        self.samples_seen = 0
+
+    def push(self, chunk: np.ndarray) -> np.ndarray:
+        chunk = np.asarray(chunk, dtype=np.float32).ravel()
+        if chunk.size == 0:
+            return np.zeros((0, self.config.num_features), dtype=np.float32)
+        coeff = self.config.preemphasis
+        if coeff:
+            emphasized = np.empty_like(chunk)
+            emphasized[0] = chunk[0] - coeff * self._last_sample if self._last_sample is not None else chunk[0]
+            emphasized[1:] = chunk[1:] - coeff * chunk[:-1]
+            self._last_sample = float(chunk[-1])
+        else:
+            emphasized = chunk
+        self.samples_seen += chunk.size
+
+        buffer = np.concatenate([self._carry, emphasized]) if self._carry.size else emphasized
+        frames = frame_signal(buffer, self.config.frame_length, self.config.hop_length)
+        consumed = frames.shape[0] * self.config.hop_length
+        features = self._extractor.features_from_frames(frames)
+        self._carry = buffer[consumed:].copy()
+        return features
+
+    def reset(self) -> None:
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._last_sample = None
+        self.samples_seen = 0
@@ -0,0 +1,76 @@
+"""
+Scan a modality's gallery for duplicate identities (one person enrolled under several IDs).
+
+Usage:
+    python scripts/dedup_gallery.py --threshold 0.8 --report reports/face_duplicates.jsonl \\
+        --checkpoint reports/face_duplicates.ckpt
+
+The gallery is read through the modality's configured ``extras.embedding_store``, so the
+script is meant for stores that outlive the API process (e.g. a ScatterGatherEmbeddingStore
+over shard nodes). Re-running with the same checkpoint resumes an interrupted scan.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+def _ensure_project_root_on_path() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+
+_ensure_project_root_on_path()
+
+from biometric_platform.bootstrap import create_embedding_store  # noqa: E402
+from biometric_platform.core import load_app_config  # noqa: E402
+from biometric_platform.infrastructure import CANDIDATE_MODES, scan_duplicates  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="configs/biometric.yaml")
+    parser.add_argument("--modality", default="face")
+    parser.add_argument("--threshold", type=float, required=True, help="cosine similarity reported as a duplicate")
+    parser.add_argument("--report", required=True, help="JSONL output, one user pair per line")
+    parser.add_argument("--checkpoint", default=None, help="enables resuming an interrupted scan")
+    parser.add_argument("--block-rows", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--candidates", choices=CANDIDATE_MODES, default="exact")
+    parser.add_argument("--ann-neighbors", type=int, default=32)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    config = load_app_config(args.config)
+    modality_cfg = config.modalities.get(args.modality)
+    if modality_cfg is None:
+        raise SystemExit(f"Modality {args.modality!r} is not configured")
+    store = create_embedding_store(args.modality, modality_cfg.extras.get("embedding_store"))
+    if store is None:
+        raise SystemExit(f"Modality {args.modality!r} has no extras.embedding_store configured")
+
+    started = time.perf_counter()
+    summary = scan_duplicates(
+        store,
+        threshold=args.threshold,
+        report_path=args.report,
+        checkpoint_path=args.checkpoint,
+        block_rows=args.block_rows,
+        max_workers=args.workers,
+        candidates=args.candidates,
+        ann_neighbors=args.ann_neighbors,
+    )
+    print(
+        f"{summary.pairs} duplicate pairs in {summary.report_path} "
+        f"({summary.stripes} stripes, {summary.resumed_stripes} resumed, {time.perf_counter() - started:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
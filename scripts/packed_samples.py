@@ -0,0 +1,88 @@
+"""
+Maintain a raw sample store (``dataset_kwargs.sample_backend``: ``files`` or ``packed``).
+
+Usage:
+    python scripts/packed_samples.py --root datasets/raw/face import
+    python scripts/packed_samples.py --root datasets/raw/face pack
+    python scripts/packed_samples.py --root datasets/raw/face stats
+    python scripts/packed_samples.py --root datasets/raw/face compact
+    python scripts/packed_samples.py --root datasets/raw/face export --output datasets/exported/face
+
+``import`` adds the files of the former ``<root>/<user_id>/<sample>`` layout to the
+content-addressed store of the face dataset manager. ``pack`` does the same for a packed
+store, and also packs content-addressed object files. The original per-user directories
+are kept unless ``--remove-originals`` is given; pass it once the import has been checked. ``compact`` reclaims the space of deleted users. ``export``
+writes ``<output>/<user_id>/<sample>`` files, e.g. for ``prepare_face_dataset.py``. Run it
+while the API is stopped; the store has a single writer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+
+def _ensure_project_root_on_path() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+
+_ensure_project_root_on_path()
+
+from biometric_platform.infrastructure import ContentAddressedSampleStore, PackedSampleStore  # noqa: E402
+from biometric_platform.infrastructure.sample_store import SEGMENTS_DIR  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="datasets/raw/face", help="dataset manager root of one modality")
+    parser.add_argument("--segment-size-mb", type=int, default=256)
+    parser.add_argument("command", choices=("import", "pack", "stats", "compact", "export"))
+    parser.add_argument("--output", default=None, help="export destination")
+    parser.add_argument(
+        "--remove-originals", action="store_true", help="import/pack: delete the per-user directories afterwards"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "export" and not args.output:
+        raise SystemExit("export requires --output")
+
+    started = time.perf_counter()
+    if args.command == "import":
+        if (Path(args.root) / SEGMENTS_DIR).exists():
+            raise SystemExit(f"{args.root} is a packed store; use pack")
+        store = ContentAddressedSampleStore(args.root)
+        try:
+            imported = store.import_tree(args.root, remove=args.remove_originals)
+            print(f"Imported {imported} files for {len(store.users())} users ({time.perf_counter() - started:.1f}s)")
+        finally:
+            store.close()
+        return
+
+    store = PackedSampleStore(args.root, segment_size=args.segment_size_mb * 1024 * 1024)
+    try:
+        if args.command == "pack":
+            imported = store.import_tree(args.root, remove=args.remove_originals)
+            print(f"Imported {imported} loose files")
+        elif args.command == "compact":
+            print(f"Reclaimed {store.compact() / 1e6:.1f} MB")
+        elif args.command == "export":
+            print(f"Exported {store.export(args.output)} files to {args.output}")
+        stats = store.stats()
+        print(
+            f"{len(store.users())} users, {stats['segments']} segments, "
+            f"{stats['segment_bytes'] / 1e6:.1f} MB on disk, {stats['live_bytes'] / 1e6:.1f} MB live "
+            f"({time.perf_counter() - started:.1f}s)"
+        )
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
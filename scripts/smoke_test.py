@@ -32,6 +32,7 @@ def _ensure_project_root_on_path() -> None:
 _ensure_project_root_on_path()
 
 from biometric_platform.bootstrap import initialize_registry  # noqa: E402
+from biometric_platform.core import SampleQualityError  # noqa: E402
 
 
 def _generate_dummy_face() -> str:
@@ -54,7 +55,11 @@ def run_smoke_test() -> dict[str, Any]:
 
     sample_image = _generate_dummy_face()
     enroll_payload = {"user_id": "demo_user", "samples": [sample_image]}
-    enroll_response = service.enroll(enroll_payload)
+    try:
+        enroll_response = service.enroll(enroll_payload)
+    except SampleQualityError as exc:
+        # The drawn placeholder is not a real face; the quality gate may reject it.
+        enroll_response = {"status": "rejected", "reason": exc.reason}
 
     verify_payload = {"sample": sample_image}
     verify_response = service.verify(verify_payload)
@@ -0,0 +1,66 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Left eye, right eye, nose, mouth left, mouth right of an upright frontal face.
+FRONTAL = np.array([[70, 80], [130, 80], [100, 110], [75, 140], [125, 140]], dtype=np.float32)
+
+# ``synthetic_voice`` parameters of two distinguishable speakers.
+ALICE = dict(f0=120, formants=[(500, 150), (1500, 200)])
+BOB = dict(f0=210, formants=[(800, 150), (2500, 300)])
+
+VOICE_CONFIG = """
+environment: test
+storage:
+  dataset_root: {dataset_root}
+modalities:
+  face:
+    enabled: false
+    verifier_class: biometric_platform.modalities.face.verifier.FaceVerifier
+    service_class: biometric_platform.modalities.face.service.FaceService
+  voice:
+    enabled: true
+    verifier_class: biometric_platform.modalities.voice.verifier.VoiceVerifier
+    service_class: biometric_platform.modalities.voice.service.VoiceService
+    threshold: 0.9
+    extras:
+      embedding_store:
+        class: biometric_platform.infrastructure.VectorEmbeddingStore
+    model:
+      class: biometric_platform.models.voice.embedding.MFCCSpeakerEmbedding
+"""
+
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """Starts the API on a YAML config (``{dataset_root}`` is filled in with a tmp dir)."""
+
+    clients = []
+
+    def start(config: str) -> TestClient:
+        config_path = tmp_path / "biometric.yaml"
+        config_path.write_text(config.format(dataset_root=tmp_path / "raw"), encoding="utf-8")
+        monkeypatch.setenv("BIOMETRIC_CONFIG", str(config_path))
+        monkeypatch.setenv("BIOMETRIC_API_ROLE", "standalone")
+        sys.modules.pop("biometric_platform.interfaces.api.app", None)
+        module = importlib.import_module("biometric_platform.interfaces.api.app")
+        test_client = TestClient(module.app)
+        clients.append(test_client.__enter__())
+        return clients[-1]
+
+    try:
+        yield start
+    finally:
+        for test_client in clients:
+            test_client.__exit__(None, None, None)
+        sys.modules.pop("biometric_platform.interfaces.api.app", None)
+
+
+@pytest.fixture
+def client(api_client):
+    """The API with only the voice modality enabled."""
+
+    return api_client(VOICE_CONFIG)
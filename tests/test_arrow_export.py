@@ -0,0 +1,36 @@
+from io import BytesIO
+
+from PIL import Image
+
+from training.scripts.lfw_arrow_to_images import ExportOptions, export_rows
+
+
+def encoded(image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (24, 24), color=(200, 30, 90)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_export_copies_matching_bytes_reencodes_others_and_resumes(tmp_path):
+    jpeg, png = encoded("JPEG"), encoded("PNG")
+    rows = [
+        (0, {"image": {"bytes": jpeg, "path": None}, "identity": "alice"}),
+        (1, {"image": {"bytes": png, "path": None}, "identity": "alice"}),
+        (2, {"image": {"bytes": jpeg, "path": None}, "path": "lfw/bob/bob_0001.jpg"}),
+        (3, {"image": {"bytes": None, "path": None}, "identity": "carol"}),
+    ]
+    options = ExportOptions(output=str(tmp_path))
+    stats = export_rows(rows, options)
+
+    assert (stats.written, stats.copied, stats.failed) == (3, 2, 1)
+    assert (tmp_path / "alice" / "alice_000000.jpg").read_bytes() == jpeg
+    assert (tmp_path / "bob" / "bob_000002.jpg").read_bytes() == jpeg
+    reencoded = (tmp_path / "alice" / "alice_000001.jpg").read_bytes()
+    assert reencoded.startswith(b"\xff\xd8\xff") and Image.open(BytesIO(reencoded)).size == (24, 24)
+
+    again = export_rows(rows, options)
+    assert (again.written, again.skipped) == (0, 3)
+
+    original = export_rows(rows[1:2], ExportOptions(output=str(tmp_path), image_format="original"))
+    assert original.copied == 1 and (tmp_path / "alice" / "alice_000001.png").read_bytes() == png
+    assert not list(tmp_path.rglob("*.tmp"))
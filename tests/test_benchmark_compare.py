@@ -0,0 +1,37 @@
+from benchmarks.common import BenchmarkResult, write_results
+from benchmarks.compare import Comparison, compare_results, render_report
+
+
+def result(name, p50, throughput, **params):
+    latency = {"p50": p50, "p95": p50 * 2, "p99": p50 * 3}
+    return BenchmarkResult(name, params, iterations=10, items_per_iteration=1, latency_ms=latency, throughput_per_s=throughput)
+
+
+def test_regressions_respect_the_tolerance_and_the_metric_direction():
+    assert Comparison("case", "p95", 10.0, 11.5).is_regression(0.1)
+    assert not Comparison("case", "p95", 10.0, 10.5).is_regression(0.1)
+    assert not Comparison("case", "p95", 10.0, 5.0).is_regression(0.1)  # faster
+    assert Comparison("case", "throughput_per_s", 100.0, 80.0).is_regression(0.1)
+    assert not Comparison("case", "throughput_per_s", 100.0, 150.0).is_regression(0.1)
+    assert Comparison("case", "p50", 0.0, 5.0).change == 0.0  # no baseline to compare against
+
+
+def test_compare_results_pairs_cases_and_counts_regressions(tmp_path):
+    baseline = write_results(
+        tmp_path / "baseline.json",
+        [result("embed", 10.0, 100.0, batch=1), result("query", 2.0, 500.0), result("dropped", 1.0, 1.0)],
+        {},
+    )
+    candidate = write_results(
+        tmp_path / "candidate.json",
+        [result("embed", 10.2, 99.0, batch=1), result("query", 3.0, 350.0), result("added", 1.0, 1.0)],
+        {},
+    )
+
+    comparisons, missing, added = compare_results(baseline, candidate)
+    assert missing == ["dropped"] and added == ["added"]
+    assert {item.key for item in comparisons} == {"embed[batch=1]", "query"} and len(comparisons) == 8
+
+    report, regressions = render_report(comparisons, tolerance=0.1)
+    assert regressions == 4  # query: p50, p95, p99 and throughput; embed stays within 10%
+    assert all("REGRESSION" in line for line in report.splitlines() if line.startswith("query "))
@@ -0,0 +1,91 @@
+import numpy as np
+
+from biometric_platform.infrastructure import BinaryTemplateStore
+from biometric_platform.models.fingerprint import MinutiaePairCode, extract_minutiae
+
+from .test_fingerprint_matching import synthetic_print
+
+
+def _noisy(code: np.ndarray, flips: int, rng: np.random.Generator) -> np.ndarray:
+    noisy = code.copy()
+    noisy[rng.choice(code.shape[0], flips, replace=False)] ^= True
+    return noisy
+
+
+def test_multi_index_search_matches_linear_scan():
+    rng = np.random.default_rng(0)
+    codes = rng.random((6000, 256)) < 0.5
+    indexed = BinaryTemplateStore(num_bits=256, index_min_rows=1000)
+    linear = BinaryTemplateStore(num_bits=256, index_min_rows=10**9)
+    for store in (indexed, linear):
+        for start in range(0, codes.shape[0], 3):
+            store.add_embeddings(f"user_{start // 3}", codes[start : start + 3])
+
+    snapshot = indexed._cell.read()
+    assert snapshot.index is not None and linear._cell.read().index is None
+    probes = [_noisy(codes[row], int(flips), rng) for row, flips in zip(rng.integers(0, 6000, 12), rng.integers(0, 40, 12))]
+    probes.append(rng.random(256) < 0.5)  # no close neighbour: falls back to the scan
+    for probe in probes:
+        for top_k in (1, 3):
+            assert [result[:2] for result in indexed.query(probe, top_k)] == [result[:2] for result in linear.query(probe, top_k)]
+    hit = indexed._search_index(snapshot, indexed._pack([probes[0]])[0], 1)
+    assert hit is not None
+
+    exact = indexed.query(codes[42], top_k=1)[0]
+    assert exact == ("user_14", 1.0, {"num_samples": 3})
+
+
+def test_packed_input_round_trip_and_compaction():
+    rng = np.random.default_rng(1)
+    bits = rng.random((4, 100)) < 0.5
+    store = BinaryTemplateStore()
+    store.add_embeddings("alice", bits[:2])
+    packed = np.packbits(np.pad(bits[2], (0, 28))).view(np.uint64)
+    store.add_embeddings("bob", [packed, bits[3].astype(np.uint8)])
+
+    assert store.num_bits == 100
+    assert np.array_equal(store.get_embeddings("bob"), bits[2:])
+    assert store.query(bits[2], top_k=1)[0][:2] == ("bob", 1.0)
+
+    before = store._cell.read()
+    store.delete_user("alice")
+    assert store._cell.read().codes.shape[0] == 2  # half the rows were dead: compacted
+    assert set(before.slot_of) == {"alice", "bob"} and set(store._cell.read().slot_of) == {"bob"}
+    assert store.get_embeddings("alice").shape == (0, 100)
+    assert store.list_users() == ("bob",)
+    assert [result[0] for result in store.query(bits[0], top_k=5)] == ["bob"]
+
+
+def test_enrolling_new_users_reuses_the_owner_buffer():
+    rng = np.random.default_rng(2)
+    store = BinaryTemplateStore(num_bits=64)
+    store.add_embeddings("user_0", rng.random((1, 64)) < 0.5)
+    owners = store._owners
+    before = store._cell.read()
+    for index in range(1, 100):
+        store.add_embeddings(f"user_{index}", rng.random((1, 64)) < 0.5)
+
+    assert store._owners is owners  # appended in place, not copied per enrollment
+    store.add_embeddings("user_0", rng.random((1, 64)) < 0.5)
+    assert before.counts.tolist() == [1] and store._cell.read().counts[0] == 2
+
+
+def test_queries_on_an_empty_store_do_not_fix_the_code_length():
+    store = BinaryTemplateStore()
+    assert store.query(np.ones(32, dtype=bool)) == [] and store.num_bits is None
+
+    store.add_embeddings("alice", [np.ones(100, dtype=bool)])
+    assert store.num_bits == 100 and store.query(np.ones(100, dtype=bool), top_k=1)[0][:2] == ("alice", 1.0)
+
+
+def test_pair_codes_identify_fingers_with_dice_scores():
+    encoder = MinutiaePairCode()
+    store = BinaryTemplateStore(modality="fingerprint", num_bits=encoder.num_bits, metric="dice")
+    for finger in range(8):
+        store.add_embeddings(f"finger_{finger}", [encoder.embed(synthetic_print(finger)[0])])
+
+    for finger in (2, 5):
+        probe = encoder.encode(extract_minutiae(synthetic_print(finger, rotation_deg=12, shift=(8, -5), impression=2)[0]))
+        results = store.query(probe, top_k=2)
+        assert results[0][0] == f"finger_{finger}"
+        assert results[0][1] > results[1][1] + 0.05
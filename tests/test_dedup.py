@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pytest
+
+from biometric_platform.infrastructure import InMemoryEmbeddingStore, ShardedEmbeddingStore, VectorEmbeddingStore, check_user, scan_duplicates
+from biometric_platform.infrastructure import dedup
+from biometric_platform.modalities.face.verifier import FaceVerifier
+
+from .test_query_batch import unit_rows
+
+
+def gallery_with_duplicates(store, users=40, dim=32, seed=0):
+    """Three samples per user; (u5, u31) and (u12, u20) are the same identity."""
+
+    rng = np.random.default_rng(seed)
+    identities = unit_rows(users, dim, seed=seed)
+    identities[31] = identities[5]
+    identities[20] = identities[12]
+    for user, identity in enumerate(identities):
+        samples = identity + 0.05 * rng.standard_normal((3, dim)).astype(np.float32)
+        store.add_embeddings(f"u{user:02d}", list(samples))
+    return store
+
+
+def read_report(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.parametrize("store_cls", [VectorEmbeddingStore, ShardedEmbeddingStore, InMemoryEmbeddingStore])
+def test_scan_reports_each_duplicate_pair_once_across_stripes(tmp_path, store_cls):
+    store = gallery_with_duplicates(store_cls(modality="face"))
+    summary = scan_duplicates(store, threshold=0.9, report_path=tmp_path / "report.jsonl", block_rows=7, max_workers=3)
+
+    pairs = read_report(tmp_path / "report.jsonl")
+    assert {(pair["user_a"], pair["user_b"]) for pair in pairs} == {("u05", "u31"), ("u12", "u20")}
+    assert summary.pairs == 2 and summary.stripes > 10 and summary.resumed_stripes == 0
+    assert all(pair["score"] > 0.9 for pair in pairs)
+
+
+def test_interrupted_scan_resumes_without_duplicate_lines(tmp_path, monkeypatch):
+    store = gallery_with_duplicates(VectorEmbeddingStore(modality="face"), users=60)
+    report, checkpoint = tmp_path / "report.jsonl", tmp_path / "scan.ckpt"
+    scan_duplicates(store, 0.9, tmp_path / "full.jsonl", block_rows=4)
+    expected = read_report(tmp_path / "full.jsonl")
+
+    original = dedup._stripe_pairs
+    calls = []
+
+    def flaky(matrix, owners, stripe, *args):
+        calls.append(stripe)
+        if len(calls) == 30:
+            raise KeyboardInterrupt
+        return original(matrix, owners, stripe, *args)
+
+    monkeypatch.setattr(dedup, "_stripe_pairs", flaky)
+    with pytest.raises(KeyboardInterrupt):
+        scan_duplicates(store, 0.9, report, checkpoint, block_rows=4, max_workers=1)
+    with report.open("ab") as stream:
+        stream.write(b'{"user_a": "torn')  # a line cut short by the crash
+
+    monkeypatch.setattr(dedup, "_stripe_pairs", original)
+    summary = scan_duplicates(store, 0.9, report, checkpoint, block_rows=4, max_workers=1)
+    assert summary.resumed_stripes == 29
+    assert sorted(map(json.dumps, read_report(report))) == sorted(map(json.dumps, expected))
+
+    store.add_embeddings("newcomer", unit_rows(1, 32, seed=99))
+    with pytest.raises(ValueError):
+        scan_duplicates(store, 0.9, report, checkpoint, block_rows=4)
+
+
+@pytest.mark.parametrize("store_cls", [VectorEmbeddingStore, InMemoryEmbeddingStore])
+def test_scan_of_an_empty_store_writes_an_empty_report(tmp_path, store_cls):
+    report = tmp_path / "report.jsonl"
+    summary = scan_duplicates(store_cls(modality="face"), 0.8, report, tmp_path / "scan.ckpt")
+    assert summary.pairs == 0 and summary.stripes == 0 and report.read_bytes() == b""
+
+
+def test_online_check_flags_users_matching_the_new_enrollment():
+    store = gallery_with_duplicates(VectorEmbeddingStore(modality="face"))
+    assert [pair.user_b for pair in check_user(store, "u05", 0.9)] == ["u31"]
+    assert check_user(store, "u06", 0.9) == []
+
+    twin = store.get_embeddings("u03")
+    store.add_embeddings("u03-again", list(twin))
+    assert [pair.user_b for pair in check_user(store, "u03-again", 0.9)] == ["u03"]
+
+    verifier = FaceVerifier(embedder=None, detector=None, embedding_store=store, duplicate_threshold=0.9)
+    assert [pair.user_b for pair in verifier.suspected_duplicates("u03")] == ["u03-again"]
+    assert FaceVerifier(embedder=None, detector=None, embedding_store=store).suspected_duplicates("u03") == []
+
+
+class OneWayIndex:
+    """Neighbour lists that are not symmetric, as HNSW's can be: only row 5 lists row 1."""
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def search(self, queries, k):
+        neighbours = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        for position, query in enumerate(queries):
+            row = int(np.flatnonzero((self.matrix == query).all(axis=1))[0])
+            neighbours[position, :2] = [row, 1 if row == 5 else -1]
+        return None, neighbours
+
+
+def test_ann_candidates_keep_pairs_found_from_either_row():
+    matrix = unit_rows(6, 8, seed=3)
+    matrix[5] = matrix[1]
+    owners = np.arange(6)
+
+    pairs = dedup._ann_candidates(OneWayIndex(matrix), matrix, ann_neighbors=4, block_rows=2)
+    assert pairs.tolist() == [1 * 6 + 5]
+    found = dedup._stripe_pairs(matrix, owners, (0, 3), 0.9, 2, pairs)
+    assert list(found) == [(1, 5)] and dedup._stripe_pairs(matrix, owners, (3, 6), 0.9, 2, pairs) == {}
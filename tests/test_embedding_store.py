@@ -0,0 +1,172 @@
+import threading
+
+import numpy as np
+import pytest
+
+from biometric_platform.infrastructure import (
+    InMemoryEmbeddingStore,
+    ShardedEmbeddingStore,
+    VectorEmbeddingStore,
+)
+
+
+def random_gallery(num_users: int = 200, dim: int = 32, samples_per_user: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return {f"user_{i:04d}": rng.standard_normal((samples_per_user, dim)).astype(np.float32) for i in range(num_users)}
+
+
+def brute_force(gallery, probe, top_k):
+    probe = probe / np.linalg.norm(probe)
+    scored = []
+    for user_id, rows in gallery.items():
+        rows = rows / np.linalg.norm(rows, axis=1, keepdims=True)
+        scored.append((user_id, float((rows @ probe).max())))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+def test_in_memory_store_scores_vectors_by_cosine_and_strings_by_equality():
+    store = InMemoryEmbeddingStore()
+    store.add_embeddings("alice", [[1.0, 0.0], [0.0, 1.0]])
+    store.add_embeddings("bob", [[1.0, 1.0]])
+
+    results = store.query([2.0, 0.0], top_k=2)
+    assert results[0][0] == "alice"
+    assert results[0][1] == 1.0
+    assert np.isclose(results[1][1], np.sqrt(0.5))
+
+    text_store = InMemoryEmbeddingStore()
+    text_store.add_embeddings("carol", ["sample_frame_1"])
+    assert text_store.query("sample_frame_1")[0][1] == 1.0
+    assert text_store.query("other")[0][1] == 0.0
+
+
+def test_vector_store_matches_brute_force():
+    gallery = random_gallery()
+    store = VectorEmbeddingStore()
+    for user_id, rows in gallery.items():
+        store.add_embeddings(user_id, rows)
+
+    probe = gallery["user_0042"][1] + 0.01
+    results = store.query(probe, top_k=5)
+    expected = brute_force(gallery, probe, 5)
+
+    assert [user_id for user_id, _, _ in results] == [user_id for user_id, _ in expected]
+    assert np.allclose([score for _, score, _ in results], [score for _, score in expected], atol=1e-5)
+    assert results[0][2] == {"num_samples": 3}
+
+
+def test_sharded_store_routes_writes_and_merges_top_k():
+    gallery = random_gallery()
+    store = ShardedEmbeddingStore(num_shards=4)
+    for user_id, rows in gallery.items():
+        store.add_embeddings(user_id, rows)
+
+    assert store.list_users() == tuple(sorted(gallery))
+    for user_id in ("user_0001", "user_0100"):
+        assert user_id in store._shards[store.shard_for(user_id)].list_users()
+
+    probe = gallery["user_0007"][0]
+    results = store.query(probe, top_k=10)
+    expected = brute_force(gallery, probe, 10)
+    assert [user_id for user_id, _, _ in results] == [user_id for user_id, _ in expected]
+
+    store.delete_user("user_0007")
+    assert store.query(probe, top_k=1)[0][0] != "user_0007"
+    assert "user_0007" not in store.list_users()
+    store.close()
+
+
+def test_vector_store_compacts_deleted_users_and_reuses_nothing_stale():
+    gallery = random_gallery(num_users=20, dim=8)
+    store = VectorEmbeddingStore()
+    for user_id, rows in gallery.items():
+        store.add_embeddings(user_id, rows)
+    for user_id in list(gallery)[:15]:
+        store.delete_user(user_id)
+    store.add_embeddings("user_0019", gallery["user_0019"][:1])
+
+    remaining = {user_id: gallery[user_id] for user_id in list(gallery)[15:]}
+    assert store.list_users() == tuple(sorted(remaining))
+    results = store.query(gallery["user_0016"][0], top_k=10)
+    assert len(results) == 5
+    assert results[0][0] == "user_0016"
+    assert dict((user_id, meta["num_samples"]) for user_id, _, meta in results)["user_0019"] == 4
+
+
+def test_vector_store_snapshots_keep_their_own_slot_map():
+    gallery = random_gallery(num_users=3, dim=8)
+    store = VectorEmbeddingStore()
+    store.add_embeddings("user_0000", gallery["user_0000"])
+    before = store._cell.read()
+    store.add_embeddings("user_0001", gallery["user_0001"])
+    store.delete_user("user_0000")
+
+    assert before.slot_of == {"user_0000": 0}
+    assert list(store._cell.read().slot_of) == ["user_0001"]  # compacted: half the rows were dead
+    assert store.get_embeddings("user_0000").shape == (0, 8)
+    rows = gallery["user_0001"]
+    assert np.allclose(store.get_embeddings("user_0001"), rows / np.linalg.norm(rows, axis=1, keepdims=True))
+
+
+@pytest.mark.parametrize(
+    "store_factory",
+    [InMemoryEmbeddingStore, VectorEmbeddingStore, lambda: ShardedEmbeddingStore(num_shards=3)],
+    ids=["in_memory", "vector", "sharded"],
+)
+def test_mixed_load_never_exposes_torn_reads(store_factory):
+    store = store_factory()
+    rng = np.random.default_rng(7)
+    dim, copies = 8, 3
+    vectors = {f"user_{w}_{i}": rng.standard_normal(dim).astype(np.float32) for w in range(4) for i in range(8)}
+    probe = rng.standard_normal(dim).astype(np.float32)
+    expected = {
+        user_id: float(vector @ probe / (np.linalg.norm(vector) * np.linalg.norm(probe)))
+        for user_id, vector in vectors.items()
+    }
+    stop = threading.Event()
+    failures: list[BaseException] = []
+
+    def writer(worker: int) -> None:
+        try:
+            for step in range(150):
+                user_id = f"user_{worker}_{step % 8}"
+                # Each enrollment adds `copies` identical rows at once; a reader must never
+                # see a partial enrollment.
+                store.add_embeddings(user_id, [vectors[user_id]] * copies)
+                if step % 3 == 2:
+                    store.delete_user(user_id)
+        except BaseException as exc:  # noqa: BLE001
+            failures.append(exc)
+
+    def reader() -> None:
+        try:
+            while not stop.is_set():
+                results = store.query(probe, top_k=6)
+                scores = [score for _, score, _ in results]
+                assert scores == sorted(scores, reverse=True)
+                for user_id, score, metadata in results:
+                    assert metadata["num_samples"] > 0 and metadata["num_samples"] % copies == 0
+                    assert abs(score - expected[user_id]) < 1e-4
+                users = store.list_users()
+                assert len(set(users)) == len(users)
+        except BaseException as exc:  # noqa: BLE001
+            failures.append(exc)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    writers = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert not failures, failures[0]
+    # Each user's presence is decided by the last step that touched it.
+    final_users = set(store.list_users())
+    for worker in range(4):
+        for slot in range(8):
+            last_step = max(step for step in range(150) if step % 8 == slot)
+            assert (f"user_{worker}_{slot}" in final_users) == (last_step % 3 != 2)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from biometric_platform.core import cmc_curve, suggest_threshold, verification_curve
+
+
+def sweep(scores, labels, threshold):
+    accepted = scores >= threshold
+    return accepted[labels].mean(), accepted[~labels].mean()
+
+
+def test_curve_from_one_sort_matches_threshold_sweep():
+    rng = np.random.default_rng(0)
+    labels = rng.random(3000) < 0.3
+    # Rounded scores produce ties, which must be accepted or rejected together.
+    scores = np.round(np.where(labels, rng.normal(0.7, 0.1, labels.size), rng.normal(0.3, 0.1, labels.size)), 2)
+    curve = verification_curve(scores, labels)
+
+    assert curve.thresholds[0] == np.inf and curve.tar[0] == curve.far[0] == 0
+    assert curve.tar[-1] == curve.far[-1] == 1
+    for index in range(1, len(curve.thresholds), 7):
+        tar, far = sweep(scores, labels, curve.thresholds[index])
+        assert curve.tar[index] == pytest.approx(tar) and curve.far[index] == pytest.approx(far)
+
+    tar, threshold = curve.operating_point(1e-2)
+    assert sweep(scores, labels, threshold)[1] <= 1e-2 < sweep(scores, labels, threshold - 0.01)[1]
+    assert tar == pytest.approx(sweep(scores, labels, threshold)[0])
+
+    eer, eer_threshold = curve.eer()
+    tar, far = sweep(scores, labels, eer_threshold)
+    assert 0.01 < eer < 0.04 and abs((1 - tar) - far) < 0.02
+
+
+def test_suggestion_falls_back_to_eer_without_enough_impostors():
+    scores = np.array([0.9, 0.8, 0.75, 0.4, 0.5, 0.2])
+    labels = np.array([1, 1, 1, 0, 0, 0])
+    suggestion = suggest_threshold(verification_curve(scores, labels), target_far=1e-3)
+    assert suggestion.basis == "eer" and 0.5 < suggestion.threshold <= 0.75
+    assert suggestion.tar == 1.0 and suggestion.far == 0.0
+
+    rng = np.random.default_rng(1)
+    impostors = rng.normal(0.2, 0.1, 20000)
+    curve = verification_curve(np.r_[rng.normal(0.8, 0.1, 500), impostors], np.r_[np.ones(500), np.zeros(20000)])
+    suggestion = suggest_threshold(curve, target_far=1e-3)
+    assert suggestion.basis == "far=0.001" and suggestion.far <= 1e-3
+    assert (impostors >= suggestion.threshold).mean() == pytest.approx(suggestion.far)
+
+
+def test_cmc_matches_brute_force_ranking_with_distractors():
+    rng = np.random.default_rng(2)
+    identities = rng.standard_normal((30, 16))
+    gallery = np.concatenate([identities, identities[:10] + 0.5 * rng.standard_normal((10, 16)), rng.standard_normal((200, 16))])
+    gallery_labels = [f"id{i}" for i in range(30)] + [f"id{i}" for i in range(10)] + [f"d{i}" for i in range(200)]
+    probes = np.concatenate([identities + 0.9 * rng.standard_normal((30, 16)), rng.standard_normal((3, 16))])
+    probe_labels = [f"id{i}" for i in range(30)] + ["stranger"] * 3
+
+    cmc = cmc_curve(probes, probe_labels, gallery, gallery_labels, max_rank=10, block_bytes=4096)
+    assert cmc.probes == 30 and cmc.unmated_probes == 3
+
+    unit = lambda rows: rows / np.linalg.norm(rows, axis=1, keepdims=True)  # noqa: E731
+    scores = unit(probes[:30]) @ unit(gallery).T
+    ranks = []
+    for probe, label in enumerate(probe_labels[:30]):
+        best = {}
+        for column, owner in enumerate(gallery_labels):
+            best[owner] = max(best.get(owner, -np.inf), scores[probe, column])
+        ranks.append(sum(score > best[label] for score in best.values()) + 1)
+    expected = [np.mean(np.array(ranks) <= k) for k in range(1, 11)]
+    assert np.allclose(cmc.rates, expected)
+    assert 0 < cmc.rank(1) < cmc.rank(10) <= 1
+
+
+def test_cmc_of_empty_probes_or_gallery_is_all_zero():
+    gallery = np.eye(3, dtype=np.float32)
+    empty_probes = cmc_curve(np.zeros((0, 3)), [], gallery, ["a", "b", "c"], max_rank=2)
+    assert empty_probes.probes == 0 and empty_probes.rates.tolist() == [0.0, 0.0]
+
+    empty_gallery = cmc_curve(gallery, ["a", "b", "c"], [], [], max_rank=2)
+    assert empty_gallery.probes == 0 and empty_gallery.unmated_probes == 3 and empty_gallery.rank(1) == 0.0
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from biometric_platform.infrastructure import VectorEmbeddingStore
+from biometric_platform.modalities.face.service import FaceService
+from biometric_platform.modalities.face.verifier import FaceVerifier
+from biometric_platform.models.base import EmbeddingModel
+from biometric_platform.models.face.detector import DetectedFace, MTCNNDetector
+from biometric_platform.models.face.pretrained import PretrainedFaceEmbedding
+
+from .conftest import FRONTAL
+from .test_face_quality import textured_frame
+from .test_query_batch import unit_rows
+
+
+def face_with_code(code: int, box, probability=0.999) -> DetectedFace:
+    # The crop's pixel value carries the identity for ``LookupEmbedder``.
+    return DetectedFace(
+        crop=np.full((160, 160, 3), code, dtype=np.uint8),
+        box=np.array(box, dtype=np.float32),
+        probability=probability,
+        landmarks=FRONTAL,
+    )
+
+
+class GroupDetector:
+    def __init__(self, faces):
+        self.faces = faces
+        self.keep_all = None
+
+    def detect_faces(self, image, keep_all=None):
+        self.keep_all = keep_all
+        return self.faces
+
+
+class LookupEmbedder(EmbeddingModel):
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.batches = []
+
+    def embed(self, image):
+        return self.vectors[int(image[0, 0, 0])]
+
+    def embed_batch(self, images):
+        self.batches.append(len(images))
+        return super().embed_batch(images)
+
+
+def test_identify_all_embeds_every_accepted_face_in_one_batch():
+    vectors = {code: vector for code, vector in zip((10, 20, 30, 40), unit_rows(4, 16, seed=2))}
+    embedder = LookupEmbedder(vectors)
+    detector = GroupDetector([])
+    verifier = FaceVerifier(embedder=embedder, detector=detector, embedding_store=VectorEmbeddingStore(modality="face"))
+    verifier._store.add_embeddings("alice", [vectors[10]])
+    verifier._store.add_embeddings("bob", [vectors[20]])
+    verifier._store.add_embeddings("carol", [vectors[30]])
+
+    detector.faces = [
+        face_with_code(20, (10, 10, 110, 120)),
+        face_with_code(40, (150, 20, 250, 130)),
+        face_with_code(10, (260, 30, 300, 60)),  # too small for the quality gate
+        face_with_code(30, (20, 130, 120, 235)),
+    ]
+    response = FaceService(verifier).identify({"sample": textured_frame(), "top_k": 2})
+
+    assert detector.keep_all is True
+    assert embedder.batches == [3]
+    faces = response["faces"]
+    assert [face["box"] for face in faces] == [[10, 10, 110, 120], [150, 20, 250, 130], [260, 30, 300, 60], [20, 130, 120, 235]]
+    assert faces[0]["decision"] and faces[0]["matches"][0]["user_id"] == "bob"
+    assert not faces[1]["decision"]  # unknown face still gets its closest candidates
+    assert len(faces[1]["matches"]) == 2
+    assert faces[2]["reason"] == "face_too_small" and faces[2]["matches"] == []
+    assert faces[3]["decision"] and faces[3]["matches"][0]["user_id"] == "carol"
+    assert response["threshold"] == verifier.threshold
+
+
+def test_pretrained_batch_forward_matches_single_embeddings():
+    model = PretrainedFaceEmbedding(pretrained=None)
+    crops = [np.random.default_rng(seed).integers(0, 255, (160, 160, 3), dtype=np.uint8) for seed in range(4)]
+    batched = model.embed_batch(crops)
+    assert batched.shape == (4, 512)
+    assert np.allclose(batched, np.stack([model.embed(crop) for crop in crops]), atol=1e-5)
+
+
+def test_detector_keep_all_override_returns_every_face(monkeypatch):
+    detector = MTCNNDetector()
+    boxes = np.array([[10, 20, 60, 90], [100, 50, 220, 200]], dtype=np.float32)
+    probs = np.array([0.99, 0.97], dtype=np.float32)
+    monkeypatch.setattr(detector.mtcnn, "detect", lambda image, landmarks=False: (boxes, probs, np.tile(FRONTAL, (2, 1, 1))))
+
+    faces = detector.detect_faces(textured_frame(), keep_all=True)
+    assert len(faces) == 2 and len(detector.detect_faces(textured_frame())) == 1
+    assert all(face.crop.shape == (160, 160, 3) for face in faces)
+    assert np.allclose(faces[0].box, boxes[0]) and faces[0].probability == pytest.approx(0.99)
@@ -0,0 +1,41 @@
+import numpy as np
+import torch
+
+from biometric_platform.models.face.embedding import FaceEmbeddingModel
+from biometric_platform.models.face.pretrained import PretrainedFaceEmbedding
+from biometric_platform.models.voice.embedding import MFCCSpeakerEmbedding
+
+
+def crop_batch(crops):
+    return torch.stack([torch.from_numpy(crop).permute(2, 0, 1).float() / 255.0 for crop in crops])
+
+
+def test_pretrained_module_is_batched_and_trainable():
+    model = PretrainedFaceEmbedding(pretrained=None)
+    crops = [np.random.default_rng(seed).integers(0, 255, (160, 160, 3), dtype=np.uint8) for seed in range(3)]
+    module = model.as_module()
+    batch = crop_batch(crops)
+
+    with torch.no_grad():
+        assert np.allclose(module(batch).numpy(), model.embed_batch(crops), atol=1e-5)
+    module(batch).sum().backward()
+    assert model.model.last_linear.weight.grad is not None
+
+
+def test_pretrained_empty_batch_has_the_module_width():
+    model = PretrainedFaceEmbedding(pretrained=None)
+    model.model.last_linear = torch.nn.Linear(model.model.last_linear.in_features, 128, bias=False)
+    assert model.embed_batch([]).shape == (0, 128)
+
+
+def test_simple_backbone_module_matches_numpy_embedding():
+    model = FaceEmbeddingModel(embedding_dim=64)
+    crops = [np.random.default_rng(seed).integers(0, 255, (8, 8, 3), dtype=np.uint8) for seed in range(2)]
+    batch = crop_batch(crops)
+    assert np.allclose(model.as_module()(batch).numpy(), model.embed_batch(crops), atol=1e-5)
+
+
+def test_models_without_a_tensor_path_return_no_module():
+    model = MFCCSpeakerEmbedding()
+    assert model.as_module() is None
+    assert model.fingerprint() == MFCCSpeakerEmbedding().fingerprint()
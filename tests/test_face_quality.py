@@ -0,0 +1,150 @@
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from biometric_platform.core import SampleQualityError
+from biometric_platform.infrastructure import VectorEmbeddingStore
+from biometric_platform.modalities.face.service import FaceService
+from biometric_platform.modalities.face.verifier import FaceVerifier
+from biometric_platform.models.face.detector import DetectedFace, MTCNNDetector
+from biometric_platform.models.face.quality import FaceQualityGate, estimate_pose
+
+from .conftest import FRONTAL
+
+
+
+def textured_frame(seed: int = 0, blur_passes: int = 0) -> np.ndarray:
+    image = np.random.default_rng(seed).uniform(0, 255, size=(240, 320))
+    for _ in range(blur_passes):
+        padded = np.pad(image, 3, mode="edge")
+        image = sum(padded[dy : dy + 240, dx : dx + 320] for dy in range(7) for dx in range(7)) / 49.0
+    return np.repeat(image[..., None], 3, axis=2).astype(np.uint8)
+
+
+def detection(box=(40, 40, 200, 220), probability=0.999, landmarks=FRONTAL) -> DetectedFace:
+    return DetectedFace(
+        crop=np.full((160, 160, 3), 128, dtype=np.uint8),
+        box=np.array(box, dtype=np.float32),
+        probability=probability,
+        landmarks=landmarks,
+    )
+
+
+class FakeDetector:
+    def __init__(self, faces):
+        self.faces = faces
+
+    def detect_faces(self, image):
+        return self.faces
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, image):
+        self.calls += 1
+        return np.asarray(image, dtype=np.float32).mean(axis=(0, 1)) + 1.0
+
+
+def test_pose_estimate_from_landmarks():
+    yaw, pitch, roll = estimate_pose(FRONTAL)
+    assert abs(yaw) < 0.01 and 0.4 < pitch < 0.6 and abs(roll) < 0.1
+
+    turned = FRONTAL.copy()
+    turned[2, 0] += 25  # nose swings towards the right eye
+    assert estimate_pose(turned)[0] == pytest.approx(25 / 60)
+
+    angle = np.radians(30)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]], dtype=np.float32)
+    yaw, pitch, roll = estimate_pose(FRONTAL @ rotation.T)
+    assert roll == pytest.approx(30, abs=0.1) and abs(yaw) < 0.01 and 0.4 < pitch < 0.6
+
+
+@pytest.mark.parametrize(
+    "face, reason",
+    [
+        (None, "no_face"),
+        (detection(box=(10, 10, 40, 50)), "face_too_small"),
+        (detection(probability=0.7), "low_confidence"),
+        (detection(landmarks=FRONTAL + np.array([[0, 0], [0, 0], [25, 0], [0, 0], [0, 0]], dtype=np.float32)), "extreme_pose"),
+    ],
+)
+def test_gate_rejects_with_reason_codes(face, reason):
+    with pytest.raises(SampleQualityError) as info:
+        FaceQualityGate().check_face(face)
+    assert info.value.reason == reason
+    FaceQualityGate().check_face(detection())
+
+
+def test_rejected_samples_skip_the_embedding_model():
+    embedder = CountingEmbedder()
+    detector = FakeDetector([detection()])
+    verifier = FaceVerifier(embedder=embedder, detector=detector, embedding_store=VectorEmbeddingStore(modality="face"))
+    service = FaceService(verifier)
+    service.enroll({"user_id": "alice", "samples": [textured_frame()]})
+    assert embedder.calls == 1
+
+    blurry = service.verify({"sample": textured_frame(seed=1, blur_passes=3)})
+    assert blurry["status"] == "rejected" and blurry["reason"] == "blurry" and not blurry["decision"]
+    detector.faces = []
+    assert service.verify({"sample": textured_frame(seed=2)})["reason"] == "no_face"
+    assert embedder.calls == 1
+
+    detector.faces = [detection()]
+    accepted = service.verify({"sample": textured_frame(seed=3)})
+    assert accepted["status"] == "success" and accepted["matches"][0]["user_id"] == "alice"
+    assert "reason" not in accepted
+
+    detector.faces = [detection(probability=0.5)]
+    with pytest.raises(SampleQualityError):
+        verifier.enroll("bob", [textured_frame(seed=4)])
+    lenient = FaceVerifier(embedder=embedder, detector=detector, quality_gate={"enabled": False})
+    lenient.enroll("bob", [textured_frame(seed=4)])
+
+
+def test_detector_reports_boxes_probabilities_and_landmarks(monkeypatch):
+    detector = MTCNNDetector()
+    boxes = np.array([[10, 20, 60, 90], [100, 50, 220, 200]], dtype=np.float32)
+    probs = np.array([0.99, 0.97], dtype=np.float32)
+    points = np.tile(FRONTAL, (2, 1, 1))
+    monkeypatch.setattr(detector.mtcnn, "detect", lambda image, landmarks=False: (boxes, probs, points))
+
+    faces = detector.detect_faces(textured_frame())
+    assert len(faces) == 1  # keep_all=False selects the largest box
+    assert np.allclose(faces[0].box, boxes[1]) and faces[0].probability == pytest.approx(0.97)
+    assert faces[0].crop.shape == (160, 160, 3) and faces[0].landmarks.shape == (5, 2)
+    assert detector.detect(textured_frame())[0].shape == (160, 160, 3)
+
+
+FACE_CONFIG = """
+environment: test
+storage:
+  dataset_root: {dataset_root}
+modalities:
+  face:
+    verifier_class: biometric_platform.modalities.face.verifier.FaceVerifier
+    service_class: biometric_platform.modalities.face.service.FaceService
+    extras:
+      detector:
+        class: tests.test_face_quality.FakeDetector
+        params:
+          faces: []
+    model:
+      class: biometric_platform.models.face.embedding.FaceEmbeddingModel
+"""
+
+
+def test_verify_endpoint_returns_the_rejection_reason(api_client):
+    client = api_client(FACE_CONFIG)
+    buffer = io.BytesIO()
+    Image.fromarray(textured_frame()).save(buffer, format="PNG")
+
+    # Raw base64 (not a data URI) too long to be a file name.
+    response = client.post("/biometric/face/verify", json={"sample": base64.b64encode(buffer.getvalue()).decode()})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "rejected" and response.json()["reason"] == "no_face"
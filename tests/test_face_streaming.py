@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from biometric_platform.infrastructure import VectorEmbeddingStore
+from biometric_platform.modalities.face.verifier import FaceVerifier
+from biometric_platform.models.face.detector import DetectedFace
+from biometric_platform.models.face.tracking import FaceTracker, iou, to_gray
+
+from .conftest import FRONTAL
+
+
+def moving_face_video(frames: int = 40, step=(3, 2), seed: int = 0):
+    """A textured square drifting over a textured background; yields (frame, true box)."""
+
+    rng = np.random.default_rng(seed)
+    background = rng.uniform(0, 120, size=(240, 320)).astype(np.float32)
+    face = rng.uniform(100, 255, size=(80, 80)).astype(np.float32)
+    for index in range(frames):
+        x, y = 40 + step[0] * index, 30 + step[1] * index
+        frame = background.copy()
+        frame[y : y + 80, x : x + 80] = face
+        yield np.repeat(frame[..., None], 3, axis=2).astype(np.uint8), np.array([x, y, x + 80, y + 80], dtype=np.float32)
+
+
+class CountingDetector:
+    def __init__(self, boxes):
+        self.boxes = boxes  # true box per frame index
+        self.frame = 0
+        self.calls = 0
+
+    def detect_faces(self, image):
+        self.calls += 1
+        box = self.boxes[self.frame]
+        return [] if box is None else [DetectedFace(crop=np.zeros((160, 160, 3), np.uint8), box=box, probability=0.999, landmarks=FRONTAL)]
+
+
+class FixedEmbedder:
+    def __init__(self, vector):
+        self.vector = np.asarray(vector, dtype=np.float32)
+        self.calls = 0
+
+    def embed(self, image):
+        self.calls += 1
+        return self.vector
+
+
+def play(session, detector, video):
+    updates = []
+    for index, (frame, _) in enumerate(video):
+        detector.frame = index
+        updates.append(session.push(frame))
+        if updates[-1].final:
+            break
+    return updates
+
+
+def test_tracker_follows_motion_between_detections_and_loses_occluded_face():
+    video = list(moving_face_video(frames=12))
+    tracker = FaceTracker(detect_every=100)
+    assert tracker.needs_detection()
+    assert tracker.observe(to_gray(video[0][0]), [video[0][1]]) == 0
+    for frame, truth in video[1:]:
+        box = tracker.propagate(to_gray(frame))
+        assert box is not None and iou(box, truth) > 0.8
+    assert tracker.track_id == 1 and not tracker.needs_detection()
+
+    blank = np.full_like(video[0][0], 60)
+    assert tracker.propagate(to_gray(blank)) is None
+    assert not tracker.tracking and tracker.needs_detection()
+    tracker.observe(to_gray(video[0][0]), [video[0][1]])
+    assert tracker.track_id == 2
+
+
+def verifier_for(embedder, detector, **kwargs):
+    verifier = FaceVerifier(
+        embedder=embedder,
+        detector=detector,
+        embedding_store=VectorEmbeddingStore(modality="face"),
+        threshold=0.6,
+        quality_gate={"enabled": False},
+        **kwargs,
+    )
+    verifier._store.add_embeddings("alice", [np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)])
+    return verifier
+
+
+@pytest.mark.parametrize("vector, accepted", [([1.0, 0.1, 0.0, 0.0], True), ([0.0, 1.0, 0.0, 0.0], False)])
+def test_session_detects_every_n_frames_and_embeds_best_frame_per_window(vector, accepted):
+    video = list(moving_face_video(frames=60))
+    detector = CountingDetector([truth for _, truth in video])
+    embedder = FixedEmbedder(vector)
+    verifier = verifier_for(embedder, detector, video_detect_every=5, video_embed_every=10, video_min_embeddings=2)
+    session = verifier.open_video_session("alice")
+
+    updates = play(session, detector, video)
+    assert [update.status for update in updates[:-1]] == ["pending"] * (len(updates) - 1)
+    final = updates[-1]
+    assert final.final and final.decision is accepted and final.frames == 20
+    assert final.embeddings == embedder.calls == 2
+    # A full detection after every 5 tracked frames (frames 0, 6, 12, 18).
+    assert detector.calls == 4
+    assert {update.tracking for update in updates} == {"detected", "tracked"}
+    assert session.push(video[-1][0]) is final
+
+
+def test_session_restarts_on_lost_face_and_forces_decision_on_finish():
+    video = list(moving_face_video(frames=14))
+    boxes = [truth for _, truth in video]
+    boxes[6] = None  # face leaves the frame at the second detection (after 5 tracked frames)
+    detector = CountingDetector(boxes)
+    embedder = FixedEmbedder([1.0, 0.0, 0.0, 0.0])
+    verifier = verifier_for(embedder, detector, video_detect_every=5, video_embed_every=4, video_min_embeddings=3)
+    session = verifier.open_video_session("alice")
+
+    updates = play(session, detector, video)
+    assert updates[6].tracking == "lost" and updates[7].tracking == "detected"
+    assert detector.calls == 4  # frames 0, 6, 7 and 12
+    assert not updates[-1].final
+    final = session.finish()
+    assert final.final and final.decision is True and final.embeddings >= 1
+
+    with pytest.raises(KeyError):
+        verifier.open_video_session("mallory")
+
+
+def test_stream_endpoint_rejects_disabled_modality(client):
+    with client.websocket_connect("/biometric/face/stream") as websocket:
+        websocket.send_json({"user_id": "alice"})
+        reply = websocket.receive_json()
+    assert reply["status"] == "error"
@@ -0,0 +1,79 @@
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from biometric_platform.models.face.modules import SimpleBackboneModule
+from training.feature_cache import FeatureCache
+
+
+class NamedPairs(Dataset):
+    """Pairs over a small pool of images; ``loads`` counts image reads."""
+
+    def __init__(self, pairs, images):
+        self.pairs = pairs
+        self.images = images
+        self.loads = 0
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def pair_ids(self, index):
+        first, second, _ = self.pairs[index]
+        return f"img{first}", f"img{second}"
+
+    def pair_label(self, index):
+        return self.pairs[index][2]
+
+    def __getitem__(self, index):
+        self.loads += 1
+        first, second, label = self.pairs[index]
+        return self.images[first], self.images[second], torch.tensor(label)
+
+
+class CountingModule(SimpleBackboneModule):
+    def __init__(self):
+        super().__init__(embedding_dim=16)
+        self.embedded = 0
+
+    def forward(self, images):
+        self.embedded += images.shape[0]
+        return super().forward(images)
+
+
+def test_cache_embeds_each_image_once_and_serves_later_runs_from_disk(tmp_path):
+    generator = torch.Generator().manual_seed(0)
+    images = [torch.rand(3, 4, 4, generator=generator) for _ in range(6)]
+    pairs = [(0, 1, 1), (1, 2, 0), (3, 0, 1), (4, 5, 0), (5, 1, 1)]
+    dataset = NamedPairs(pairs, images)
+    module = CountingModule()
+
+    cache = FeatureCache.for_module(tmp_path, "toy/train", module, 16)
+    features = cache.pair_features(dataset, module, torch.device("cpu"), batch_size=2)
+    assert module.embedded == 6 and len(cache) == 6
+
+    first, second, label = features[2]
+    expected = module(torch.stack([images[3], images[0]])).detach().numpy()
+    assert np.allclose(first.numpy(), expected[0]) and np.allclose(second.numpy(), expected[1])
+    assert label.item() == 1.0
+
+    dataset.loads = 0
+    module.embedded = 0
+    reopened = FeatureCache.for_module(tmp_path, "toy/train", module, 16)
+    again = reopened.pair_features(dataset, module, torch.device("cpu"))
+    assert dataset.loads == 0 and module.embedded == 0
+    assert np.allclose(again[4][1].numpy(), features[4][1].numpy())
+
+    # A different model gets its own cache directory.
+    assert FeatureCache.for_module(tmp_path, "toy/train", SimpleBackboneModule(32), 32).directory != cache.directory
+
+
+def test_rows_written_after_the_last_index_save_are_discarded(tmp_path):
+    cache = FeatureCache(tmp_path, dim=4)
+    cache.add(["a", "b"], np.ones((2, 4)))
+    with (tmp_path / "features.f32").open("ab") as data:
+        data.write(b"\x00" * 10)  # torn append from a crashed run
+
+    reopened = FeatureCache(tmp_path, dim=4)
+    reopened.add(["c"], np.full((1, 4), 2.0))
+    assert reopened.matrix.shape == (3, 4)
+    assert np.array_equal(reopened.matrix[reopened.rows(["c", "a"])], [[2.0] * 4, [1.0] * 4])
@@ -0,0 +1,100 @@
+import base64
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from biometric_platform.infrastructure import MinutiaeTemplateStore
+from biometric_platform.models.fingerprint import MINUTIA_DTYPE, CylinderCodec, extract_minutiae
+from biometric_platform.models.fingerprint.mcc import popcount
+from biometric_platform.modalities.fingerprint.verifier import FingerprintVerifier
+
+
+def synthetic_print(finger: int, size: int = 320, rotation_deg: float = 0.0, shift=(0, 0), impression: int = 0):
+    """
+    Ridge pattern whose phase field carries planted dislocations (each one a minutia), seen
+    under a rigid transform with sensor noise. Returns the image and the planted positions.
+    """
+
+    rng = np.random.default_rng(finger)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float64)
+    centre = size / 2
+    cos, sin = np.cos(-np.radians(rotation_deg)), np.sin(-np.radians(rotation_deg))
+    x = cos * (xx - centre - shift[0]) - sin * (yy - centre - shift[1]) + centre
+    y = sin * (xx - centre - shift[0]) + cos * (yy - centre - shift[1]) + centre
+
+    period = 9.0
+    base = rng.uniform(0, np.pi)
+    curvature = rng.uniform(-0.004, 0.004)
+    phase = 2 * np.pi / period * (x * np.cos(base) + y * np.sin(base) + curvature * ((x - centre) ** 2 - (y - centre) ** 2))
+    planted = rng.uniform(0.15 * size, 0.85 * size, size=(36, 2))
+    for (px, py), sign in zip(planted, rng.choice([-1, 1], size=36)):
+        phase += sign * np.arctan2(y - py, x - px)
+
+    image = 128 + 90 * np.cos(phase) + np.random.default_rng(1000 + impression).normal(0, 10, phase.shape)
+    return np.clip(image, 0, 255).astype(np.uint8), planted
+
+
+def test_extraction_recovers_planted_minutiae():
+    image, planted = synthetic_print(1)
+    template = extract_minutiae(image)
+
+    assert template.dtype == MINUTIA_DTYPE
+    distance = np.hypot(template["x"][:, None] - planted[:, 0], template["y"][:, None] - planted[:, 1])
+    assert (distance.min(axis=0) < 6).sum() >= 26
+    assert (distance.min(axis=1) >= 6).sum() <= 4
+
+
+def test_vectorized_similarity_matches_pairwise_reference():
+    codec = CylinderCodec()
+    probe = codec.encode(extract_minutiae(synthetic_print(2)[0]))
+    reference = codec.encode(extract_minutiae(synthetic_print(2, rotation_deg=10, impression=1)[0]))
+    assert probe.codes.dtype == np.uint64 and probe.codes.shape[1] == codec.num_words
+
+    words = probe.codes[:3]
+    assert list(popcount(words)) == [sum(bin(int(word)).count("1") for word in row) for row in words]
+
+    similarities = codec.similarity(probe, reference.codes, reference.bit_counts, reference.angles)
+    for i in range(0, len(reference), 7):
+        for j in range(0, len(probe), 5):
+            bits_a = np.unpackbits(reference.codes[i].view(np.uint8))
+            bits_b = np.unpackbits(probe.codes[j].view(np.uint8))
+            expected = 1 - np.sum(bits_a ^ bits_b) / (bits_a.sum() + bits_b.sum())
+            angle = abs((reference.angles[i] - probe.angles[j] + np.pi) % (2 * np.pi) - np.pi)
+            assert np.isclose(similarities[i, j], expected if angle <= np.pi / 2 else 0.0)
+
+
+def test_one_to_many_search_ranks_the_right_finger():
+    store = MinutiaeTemplateStore()
+    for finger in range(8):
+        store.add_embeddings(f"finger_{finger}", [extract_minutiae(synthetic_print(finger)[0])])
+
+    probe = extract_minutiae(synthetic_print(3, rotation_deg=-12, shift=(8, -5), impression=2)[0])
+    results = store.query(probe, top_k=3)
+    assert results[0][0] == "finger_3"
+    assert results[0][1] > 0.45 > results[1][1]
+    assert results[0][2] == {"num_samples": 1}
+
+    assert store.get_embeddings("finger_3")[0].dtype == MINUTIA_DTYPE
+    before = store._cell.read()
+    store.delete_user("finger_3")
+    assert "finger_3" in before.slot_of and "finger_3" not in store._cell.read().slot_of
+    assert store.get_embeddings("finger_3") == []
+    assert "finger_3" not in store.list_users()
+    assert store.query(probe, top_k=1)[0][0] != "finger_3"
+
+
+def test_verifier_enrolls_and_verifies_encoded_images():
+    def encode(image: np.ndarray) -> str:
+        buffer = BytesIO()
+        Image.fromarray(image).save(buffer, format="PNG")
+        return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    verifier = FingerprintVerifier(threshold=0.45)
+    verifier.enroll("alice", [encode(synthetic_print(4)[0])])
+    verifier.enroll("bob", [encode(synthetic_print(5)[0])])
+
+    genuine = verifier.match(encode(synthetic_print(4, rotation_deg=8, impression=3)[0]), top_k=2)
+    assert genuine.decision and genuine.matches[0].user_id == "alice"
+    impostor = verifier.match(encode(synthetic_print(6)[0]), top_k=2)
+    assert not impostor.decision
@@ -0,0 +1,128 @@
+import base64
+import time
+
+import pytest
+
+from biometric_platform.core import BiometricServiceRegistry, FusionSettings, FusionVerifier, trace_stage
+from biometric_platform.core.fusion import ScoreFusion
+
+from .conftest import ALICE, BOB
+from .test_voice_features import synthetic_voice, to_wav
+
+
+class StagedService:
+    """Fake modality service: ``stages`` traced steps of ``delay`` seconds, then fixed matches."""
+
+    def __init__(self, scores, threshold=0.5, stages=1, delay=0.0):
+        self.scores = scores
+        self.threshold = threshold
+        self.stages = stages
+        self.delay = delay
+        self.completed_stages = 0
+
+    def verify(self, payload):
+        for _ in range(self.stages):
+            with trace_stage("embed"):
+                time.sleep(self.delay)
+            self.completed_stages += 1
+        matches = [{"user_id": user, "score": score, "metadata": {}} for user, score in self.scores.items()]
+        return {
+            "status": "success",
+            "decision": max(self.scores.values()) >= self.threshold,
+            "threshold": self.threshold,
+            "matches": sorted(matches, key=lambda match: -match["score"]),
+            "partial": False,
+        }
+
+
+def fusion_of(services, **settings):
+    registry = BiometricServiceRegistry()
+    for modality, service in services.items():
+        registry.register(modality, lambda service=service: service)
+    return FusionVerifier(registry, FusionSettings(**settings))
+
+
+def test_fusion_rules_combine_threshold_relative_evidence():
+    evidence = {"face": 0.9, "voice": 0.2}
+    assert ScoreFusion(FusionSettings(rule="min")).fuse(evidence) == 0.2
+    assert ScoreFusion(FusionSettings(rule="max")).fuse(evidence) == 0.9
+    weighted = ScoreFusion(FusionSettings(weights={"face": 3.0}))
+    assert weighted.fuse(evidence) == pytest.approx((3 * 0.9 + 0.2) / 4)
+    assert weighted.evidence("face", 0.6, threshold=0.6) == pytest.approx(0.5)
+
+    lr = ScoreFusion(
+        FusionSettings(rule="likelihood_ratio", score_models={"voice": {"genuine": [0.95, 0.02], "impostor": [0.8, 0.05]}})
+    )
+    assert lr.evidence("voice", 0.95, threshold=0.9) > 0 > lr.evidence("voice", 0.82, threshold=0.9)
+    assert lr.evidence("voice", 0.0, threshold=0.9) == -lr.settings.llr_clip
+    with pytest.raises(ValueError):
+        FusionSettings.from_config({"rule": "median"})
+
+
+def test_modalities_run_concurrently_and_rank_fused_candidates():
+    fusion = fusion_of(
+        {
+            "face": StagedService({"alice": 0.7, "bob": 0.55}, threshold=0.6, stages=3, delay=0.1),
+            "voice": StagedService({"alice": 0.95, "carol": 0.92}, threshold=0.9, stages=3, delay=0.1),
+        }
+    )
+    started = time.perf_counter()
+    response = fusion.verify({"face": "img", "voice": "wav"}, top_k=3)
+    assert time.perf_counter() - started < 0.5
+
+    assert response["decision"] and response["user_id"] == "alice"
+    assert [match["user_id"] for match in response["matches"]][0] == "alice"
+    assert {result["status"] for result in response["modalities"].values()} == {"completed"}
+    assert not response["short_circuited"]
+
+    claimed = fusion.verify({"face": "img", "voice": "wav"}, user_id="bob")
+    assert claimed["user_id"] == "bob" and not claimed["decision"]
+
+
+def test_confident_reject_cancels_the_slower_modality():
+    slow = StagedService({"alice": 0.99}, stages=20, delay=0.05)
+    fusion = fusion_of({"face": StagedService({"alice": 0.1}), "voice": slow}, rule="min")
+
+    started = time.perf_counter()
+    response = fusion.verify({"face": "img", "voice": "wav"})
+    assert time.perf_counter() - started < 0.5
+    assert response["short_circuited"] and not response["decision"]
+    assert response["modalities"]["voice"] == {"status": "cancelled"}
+    time.sleep(0.2)
+    assert slow.completed_stages < 20
+
+    # Under "max" a single reject never decides the outcome.
+    lenient = fusion_of({"face": StagedService({"alice": 0.1}), "voice": StagedService({"alice": 0.99}, stages=2, delay=0.05)}, rule="max")
+    response = lenient.verify({"face": "img", "voice": "wav"})
+    assert response["decision"] and not response["short_circuited"]
+
+
+def test_fusion_endpoint_verifies_registered_modalities(client):
+    encode = lambda signal: base64.b64encode(to_wav(signal)).decode()
+    client.post("/biometric/voice/enroll", json={"user_id": "alice", "samples": [encode(synthetic_voice(seed=1, **ALICE))]})
+    client.post("/biometric/voice/enroll", json={"user_id": "bob", "samples": [encode(synthetic_voice(seed=2, **BOB))]})
+
+    response = client.post("/biometric/fusion/verify", json={"samples": {"voice": encode(synthetic_voice(seed=3, **ALICE))}})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["decision"] and body["user_id"] == "alice" and body["rule"] == "weighted_sum"
+    assert body["modalities"]["voice"]["status"] == "completed"
+
+    missing = client.post("/biometric/fusion/verify", json={"samples": {"iris": "x"}})
+    assert missing.status_code == 404
+
+
+class FailingService:
+    def verify(self, payload):
+        raise RuntimeError("all replicas of shard 2 timed out")
+
+
+def test_a_failing_modality_is_reported_without_failing_the_request():
+    fusion = fusion_of({"face": StagedService({"alice": 0.9}, threshold=0.6), "voice": FailingService()})
+    response = fusion.verify({"face": "img", "voice": "wav"})
+
+    assert response["modalities"]["face"]["status"] == "completed"
+    assert response["modalities"]["voice"] == {
+        "status": "error",
+        "detail": "all replicas of shard 2 timed out",
+    }
@@ -0,0 +1,151 @@
+import base64
+import gc
+import os
+import time
+
+import numpy as np
+import yaml
+
+from biometric_platform.bootstrap import initialize_registry
+from biometric_platform.core.config import AppConfig, ModalityConfig
+from biometric_platform.models import ModelConfigWatcher, ModelManager
+from biometric_platform.models.base import EmbeddingModel
+
+from .conftest import ALICE
+from .test_voice_features import synthetic_voice, to_wav
+
+
+class TaggedEmbedder(EmbeddingModel):
+    """A constant embedding per ``tag``, which is also its version."""
+
+    def __init__(self, tag: int = 1) -> None:
+        self.tag = tag
+        self.warmed = False
+
+    def fingerprint(self):
+        return f"tagged-{self.tag}"
+
+    def warmup(self):
+        self.warmed = True
+
+    def embed(self, image):
+        return np.full(4, self.tag, dtype=np.float32)
+
+
+def face_config(tmp_path, tag=1):
+    return {
+        "storage": {"dataset_root": str(tmp_path / "raw")},
+        "modalities": {
+            "face": {
+                "verifier_class": "biometric_platform.modalities.face.verifier.FaceVerifier",
+                "service_class": "biometric_platform.modalities.face.service.FaceService",
+                "dataset_manager_class": "biometric_platform.modalities.face.dataset.FaceDatasetManager",
+                "extras": {"verifier_kwargs": {"quality_gate": {"enabled": False}}},
+                "model": {"class": "tests.test_model_swap.TaggedEmbedder", "params": {"tag": tag}},
+            }
+        },
+    }
+
+
+def test_swap_serves_new_requests_while_in_flight_ones_keep_the_old_model(tmp_path):
+    manager = ModelManager()
+    registry, config = initialize_registry(AppConfig(**face_config(tmp_path)), manager)
+    in_flight = registry.get("face")
+
+    swap = manager.swap_embedding_model("face", {"class": "tests.test_model_swap.TaggedEmbedder", "params": {"tag": 2}})
+    status = swap.wait(timeout=10).to_dict()
+
+    assert status["state"] == "swapped" and status["version"] == "tagged-2" and status["previous_version"] == "tagged-1"
+    assert in_flight._verifier._embedder.tag == 1
+    fresh = registry.get("face")._verifier._embedder
+    assert fresh.tag == 2 and fresh.warmed
+    # The configuration is not pinned to the model of the first request.
+    assert "embedder" not in config.modalities["face"].extras["verifier_kwargs"]
+    assert not swap.to_dict()["previous_released"]
+
+    del in_flight
+    gc.collect()
+    assert swap.to_dict()["previous_released"]
+
+
+def test_failed_swap_keeps_the_current_model(tmp_path):
+    manager = ModelManager()
+    registry, _ = initialize_registry(AppConfig(**face_config(tmp_path)), manager)
+
+    swap = manager.swap_embedding_model("face", {"class": "tests.test_model_swap.MissingEmbedder"}).wait(timeout=10)
+
+    assert swap.state == "failed" and swap.error
+    assert registry.get("face")._verifier._embedder.tag == 1
+
+
+def test_config_watch_swaps_changed_models_and_ignores_invalid_files(tmp_path):
+    path = tmp_path / "biometric.yaml"
+    path.write_text(yaml.safe_dump(face_config(tmp_path)))
+    manager = ModelManager()
+    manager.get_embedding_model("face", ModalityConfig(**face_config(tmp_path)["modalities"]["face"]))
+    watcher = ModelConfigWatcher(path, manager)
+
+    assert watcher.check() == []  # unchanged file
+
+    path.write_text("modalities: [")
+    os.utime(path, (1, 1))
+    assert watcher.check() == [] and watcher.last_error
+
+    path.write_text(yaml.safe_dump(face_config(tmp_path, tag=3)))
+    os.utime(path, (2, 2))
+    (swap,) = watcher.check()
+    assert swap.wait(timeout=10).state == "swapped"
+    assert manager.model_info("face")["params"] == {"tag": 3} and watcher.last_error is None
+
+    os.utime(path, (3, 3))  # touched, same models
+    assert watcher.check() == []
+
+
+def test_swap_with_a_versioned_store_publishes_after_the_migration(tmp_path):
+    config = face_config(tmp_path)
+    config["modalities"]["face"]["extras"]["embedding_store"] = {
+        "class": "biometric_platform.infrastructure.VersionedEmbeddingStore"
+    }
+    manager = ModelManager()
+    registry, _ = initialize_registry(AppConfig(**config), manager)
+    store = registry.get("face")._verifier.embedding_store
+    store.add_embeddings("ghost", [[1.0, 1.0, 1.0, 1.0]])  # no raw samples: cannot be migrated
+    tag_2 = {"class": "tests.test_model_swap.TaggedEmbedder", "params": {"tag": 2}}
+
+    failed = manager.swap_embedding_model("face", tag_2).wait(timeout=10).to_dict()
+    assert failed["state"] == "failed" and failed["migration"]["failed_users"] == ["ghost"]
+    assert manager.model_info("face")["params"] == {"tag": 1} and store.active_version == "tagged-1"
+
+    store.delete_user("ghost")
+    swap = manager.swap_embedding_model("face", tag_2, switch_grace_s=0).wait(timeout=10)
+    assert swap.state == "swapped" and swap.to_dict()["migration"]["state"] == "completed"
+    assert store.active_version == "tagged-2" and registry.get("face")._verifier._embedder.tag == 2
+    assert manager.get_embedding_model("face", AppConfig(**config).modalities["face"]).tag == 2
+
+
+def test_params_change_of_a_model_without_weights_is_swapped(tmp_path):
+    manager = ModelManager()
+    voice = {"class": "biometric_platform.models.voice.embedding.MFCCSpeakerEmbedding", "params": {"n_mfcc": 20}}
+    manager.get_embedding_model("voice", ModalityConfig(verifier_class="", service_class="", model=voice))
+
+    assert manager.swap_embedding_model("voice", voice).wait(timeout=10).state == "unchanged"
+    changed = {**voice, "params": {"n_mfcc": 13}}
+    assert manager.swap_embedding_model("voice", changed).wait(timeout=10).state == "swapped"
+    assert manager.model_info("voice") == changed
+
+
+def test_swap_is_refused_while_the_gallery_holds_templates_of_the_old_model(client):
+    encode = lambda signal: base64.b64encode(to_wav(signal)).decode()
+    alice = encode(synthetic_voice(seed=1, **ALICE))
+    assert client.post("/biometric/voice/enroll", json={"user_id": "alice", "samples": [alice]}).status_code == 200
+    changed = {"class": "biometric_platform.models.voice.embedding.MFCCSpeakerEmbedding", "params": {"n_mfcc": 13}}
+
+    refused = client.post("/admin/models/voice", json={"model": changed})
+    assert refused.status_code == 409 and "re-enroll" in refused.json()["detail"]
+    assert client.post("/biometric/voice/verify", json={"sample": alice}).json()["decision"]
+
+    assert client.post("/admin/models/voice", json={"model": changed, "force": True}).status_code == 200
+    deadline = time.monotonic() + 10
+    while client.get("/admin/models/voice").json()["state"] not in ("swapped", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.get("/admin/models/voice").json()["state"] == "swapped"
@@ -0,0 +1,55 @@
+import os
+import shutil
+
+from PIL import Image
+
+from training.datasets import build_folder_shards
+from training.scripts.prepare_face_dataset import prepare_dataset
+
+
+def write_image(path, value):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (20, 20), color=(value, value, value)).save(path)
+
+
+def index_rows(root, split):
+    return [line.split("\t") for line in (root / f"{split}.tsv").read_text().splitlines()[1:]]
+
+
+def test_incremental_run_links_images_and_only_redoes_changed_users(tmp_path):
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    for user, count in (("alice", 4), ("bob", 3), ("carol", 2)):
+        for number in range(count):
+            write_image(raw / user / f"{number}.png", 20 * number)
+
+    first = prepare_dataset(raw, processed, 0.25, seed=1, incremental=True)
+    assert first == {"users": 3, "updated": 3, "removed": 0}
+    train, val = index_rows(processed, "train"), index_rows(processed, "val")
+    assert len(train) + len(val) == 9 and {row[1] for row in val} == {"alice", "bob", "carol"}
+    linked = processed / train[0][0]
+    assert linked.exists() and os.path.samefile(linked, raw / train[0][1] / linked.name)
+    alice_split = sorted(row[0] for row in train + val if row[1] == "alice")
+
+    write_image(raw / "bob" / "3.png", 99)
+    (raw / "carol" / "0.png").unlink()
+    (raw / "carol" / "1.png").unlink()
+    (raw / "carol").rmdir()
+    second = prepare_dataset(raw, processed, 0.25, seed=1, incremental=True)
+    assert second == {"users": 2, "updated": 1, "removed": 1}
+    rows = index_rows(processed, "train") + index_rows(processed, "val")
+    assert sorted(row[0] for row in rows if row[1] == "alice") == alice_split
+    assert sum(row[1] == "bob" for row in rows) == 4 and not (processed / "train" / "carol").exists()
+    assert all((processed / path).exists() for path, _, _ in rows)
+
+    shutil.rmtree(processed / "train" / "alice")  # output lost, raw images unchanged
+    assert prepare_dataset(raw, processed, 0.25, seed=1, incremental=True)["updated"] == 1
+    assert all((processed / path).exists() for path, _, _ in index_rows(processed, "train"))
+
+    copied = prepare_dataset(raw, tmp_path / "copied", 0.25, seed=1)
+    assert copied["updated"] == 2
+    copy = next((tmp_path / "copied" / "train" / "alice").iterdir())
+    assert not os.path.samefile(copy, raw / "alice" / copy.name)  # full runs copy by default
+
+    shards = build_folder_shards(None, tmp_path / "shards", image_size=8, index_file=processed / "train.tsv")
+    assert len(shards) == len(index_rows(processed, "train"))
+    assert shards.identities()[1] == ["alice", "bob"]
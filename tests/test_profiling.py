@@ -0,0 +1,75 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from biometric_platform.core.tracing import current_trace, trace_stage
+from biometric_platform.interfaces.api.profiling import (
+    ProfilingSettings,
+    RequestSampler,
+    TraceMiddleware,
+)
+
+
+def build_app(settings: ProfilingSettings) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TraceMiddleware, settings=settings)
+
+    @app.get("/work")
+    def work() -> dict:
+        with trace_stage("decode"):
+            time.sleep(0.001)
+        for _ in range(2):
+            with trace_stage("embed"):
+                pass
+        return {"traced": current_trace() is not None}
+
+    return app
+
+
+def test_trace_header_returns_server_timing():
+    client = TestClient(build_app(ProfilingSettings()))
+
+    response = client.get("/work", headers={"X-Biometric-Trace": "1"})
+
+    assert response.json() == {"traced": True}
+    timing = response.headers["server-timing"]
+    assert "decode;dur=" in timing
+    assert 'embed;dur=' in timing and 'desc="x2"' in timing
+    assert "total;dur=" in timing
+
+
+def test_trace_is_off_by_default_and_accepts_query_flag():
+    client = TestClient(build_app(ProfilingSettings()))
+
+    plain = client.get("/work")
+    assert plain.json() == {"traced": False}
+    assert "server-timing" not in plain.headers
+
+    flagged = client.get("/work", params={"trace": "1"})
+    assert "server-timing" in flagged.headers
+
+
+def test_sampler_profiles_one_in_n_requests(tmp_path):
+    for mode, suffix in (("stack", ".folded"), ("cprofile", ".prof")):
+        output_dir = tmp_path / mode
+        sampler = RequestSampler(
+            ProfilingSettings(sample_every=2, mode=mode, stack_interval_ms=0.5, output_dir=str(output_dir))
+        )
+        for _ in range(4):
+            with sampler.sample("face.verify"):
+                time.sleep(0.01)
+
+        files = sorted(output_dir.iterdir())
+        assert len(files) == 2
+        assert all(path.suffix == suffix for path in files)
+
+
+def test_sampler_disabled_writes_nothing(tmp_path):
+    sampler = RequestSampler(ProfilingSettings(output_dir=str(tmp_path / "profiles")))
+
+    with sampler.sample("face.verify"):
+        pass
+
+    assert not sampler.enabled
+    assert not (tmp_path / "profiles").exists()
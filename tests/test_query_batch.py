@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from biometric_platform.core import BatchQueryResult
+from biometric_platform.infrastructure import (
+    BinaryTemplateStore,
+    InMemoryEmbeddingStore,
+    MinutiaeTemplateStore,
+    ShardedEmbeddingStore,
+    VectorEmbeddingStore,
+)
+from biometric_platform.models.fingerprint import extract_minutiae
+
+from .test_fingerprint_matching import synthetic_print
+
+
+def unit_rows(n: int, dim: int, seed: int) -> np.ndarray:
+    rows = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def reference_top_k(scores: np.ndarray, owners: list, k: int):
+    """Best-row-per-user ranking computed the slow way."""
+
+    best = {}
+    for owner, score in zip(owners, scores):
+        best[owner] = max(best.get(owner, -np.inf), float(score))
+    return sorted(best.items(), key=lambda item: -item[1])[:k]
+
+
+@pytest.mark.parametrize(
+    "store_factory",
+    [
+        lambda: VectorEmbeddingStore(modality="face"),
+        lambda: ShardedEmbeddingStore(modality="face", num_shards=3),
+        lambda: InMemoryEmbeddingStore(modality="face"),
+    ],
+)
+def test_dense_stores_match_single_queries(store_factory):
+    store = store_factory()
+    gallery = unit_rows(300, 32, seed=0)
+    for index in range(0, 300, 3):
+        store.add_embeddings(f"user_{index // 3}", gallery[index : index + 3])
+    store.delete_user("user_7")
+    probes = unit_rows(20, 32, seed=1)
+    probes[:5] = gallery[[0, 4, 21, 150, 299]]
+
+    batched = store.query_batch(probes, top_k=4)
+    assert isinstance(batched, BatchQueryResult) and len(batched) == 20
+    assert batched.scores.shape == batched.indices.shape == (20, 4)
+    for probe, result in zip(probes, batched):
+        expected = store.query(probe, top_k=4)
+        assert [user for user, _, _ in result] == [user for user, _, _ in expected]
+        assert np.allclose([score for _, score, _ in result], [score for _, score, _ in expected], atol=1e-5)
+        assert result[0][2]["num_samples"] == 3
+    assert list(VectorEmbeddingStore().query_batch(probes, top_k=3)) == [[]] * 20
+    assert len(store.query_batch([], top_k=3)) == 0
+
+
+def test_binary_store_batch_mixes_index_hits_and_scan():
+    rng = np.random.default_rng(2)
+    codes = rng.random((3000, 128)) < 0.5
+    store = BinaryTemplateStore(num_bits=128, index_min_rows=500)
+    owners = [f"user_{row // 2}" for row in range(3000)]
+    for start in range(0, 3000, 2):
+        store.add_embeddings(owners[start], codes[start : start + 2])
+    probes = codes[[10, 500, 2999]].copy()
+    probes[1, :5] ^= True
+    probes = np.vstack([probes, rng.random((3, 128)) < 0.5])  # no close neighbour: scanned
+
+    snapshot = store._cell.read()
+    resolved = [store._search_index(snapshot, code, 1) is not None for code in store._pack(probes)]
+    assert any(resolved) and not all(resolved)
+
+    for top_k in (1, 3):
+        batched = store.query_batch(probes, top_k=top_k)
+        for probe, result in zip(probes, batched):
+            scores = 1.0 - (codes != probe).sum(axis=1) / 128.0
+            expected = reference_top_k(scores, owners, top_k)
+            assert np.allclose([score for _, score, _ in result], [score for _, score in expected])
+            assert result[0][0] == expected[0][0]
+
+
+def test_minutiae_store_batch_matches_pairwise_scores():
+    store = MinutiaeTemplateStore()
+    templates = {f"finger_{finger}": extract_minutiae(synthetic_print(finger)[0]) for finger in range(5)}
+    for user_id, template in templates.items():
+        store.add_embeddings(user_id, [template])
+    probes = [extract_minutiae(synthetic_print(finger, rotation_deg=8, impression=1)[0]) for finger in (3, 0)]
+    probes.append(np.zeros(0, dtype=probes[0].dtype))  # empty template scores 0 everywhere
+
+    batched = store.query_batch(probes, top_k=3)
+    for probe, result in zip(probes, batched):
+        encoded = store._encode(probe)
+        scores = [store.codec.match(encoded, store._encode(template)) for template in templates.values()]
+        expected = reference_top_k(scores, list(templates), 3)
+        assert np.allclose([score for _, score, _ in result], [score for _, score in expected], atol=1e-6)
+    assert batched[0][0][0] == "finger_3" and batched[1][0][0] == "finger_0"
+
+
+def test_merge_and_compact_keep_per_probe_order():
+    shard_a = BatchQueryResult.from_matches([[("a1", 0.9, {"num_samples": 1})], [("a2", 0.3, {"num_samples": 2})]])
+    shard_b = BatchQueryResult.from_matches(
+        [[("b1", 0.95, {"num_samples": 4}), ("b2", 0.1, {"num_samples": 1})], []], missing_shards=(2,)
+    )
+    merged = BatchQueryResult.merge([shard_a, shard_b], top_k=2)
+    assert merged[0] == [("b1", pytest.approx(0.95), {"num_samples": 4}), ("a1", pytest.approx(0.9), {"num_samples": 1})]
+    assert merged[1] == [("a2", pytest.approx(0.3), {"num_samples": 2})]
+    assert merged.partial and merged.missing_shards == (2,)
+
+    store = VectorEmbeddingStore()
+    store.add_embeddings("x", unit_rows(1, 8, seed=3))
+    store.add_embeddings("y", unit_rows(1, 8, seed=4))
+    store.delete_user("x")
+    compact = store.query_batch(unit_rows(2, 8, seed=5), top_k=5).compact()
+    assert list(compact.user_ids) == ["y"] and compact.indices.tolist() == [[0], [0]]
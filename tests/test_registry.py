@@ -4,9 +4,10 @@ from biometric_platform.bootstrap import initialize_registry
 from biometric_platform.core.config import AppConfig, ModalityConfig
 
 
-def build_test_config() -> AppConfig:
+def build_test_config(tmp_path) -> AppConfig:
     base_config = AppConfig(
         environment="test",
+        storage={"dataset_root": str(tmp_path / "raw")},
         modalities={
             "face": ModalityConfig(
                 enabled=True,
@@ -27,23 +28,23 @@ def build_test_config() -> AppConfig:
     return base_config
 
 
-def test_initialize_registry_only_registers_enabled_modalities():
-    config = build_test_config()
+def test_initialize_registry_only_registers_enabled_modalities(tmp_path):
+    config = build_test_config(tmp_path)
     registry, _ = initialize_registry(config)
 
     assert registry.available_modalities() == ["face"]
 
 
-def test_initialize_registry_with_enabled_voice():
-    config = build_test_config()
+def test_initialize_registry_with_enabled_voice(tmp_path):
+    config = build_test_config(tmp_path)
     config.modalities["voice"].enabled = True
 
     registry, _ = initialize_registry(config)
     assert sorted(registry.available_modalities()) == ["face", "voice"]
 
 
-def test_service_factory_produces_distinct_instances():
-    config = build_test_config()
+def test_service_factory_produces_distinct_instances(tmp_path):
+    config = build_test_config(tmp_path)
     registry, _ = initialize_registry(config)
 
     face_service_1 = registry.get("face")
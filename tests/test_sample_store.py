@@ -0,0 +1,162 @@
+import time
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from biometric_platform.infrastructure import ContentAddressedSampleStore, PackedSampleStore, SampleWriteError
+from biometric_platform.modalities.face.dataset import FaceDatasetManager
+from biometric_platform.modalities.fingerprint.dataset import FingerprintDatasetManager
+from biometric_platform.modalities.voice.dataset import VoiceDatasetManager
+from training.scripts.prepare_face_dataset import collect_user_images
+
+
+def png_bytes(value):
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), color=(value, value, value)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_identical_samples_are_stored_once_and_listed_before_flush(tmp_path):
+    store = ContentAddressedSampleStore(tmp_path, flush_interval=0.5)
+    shared, own = png_bytes(1), png_bytes(2)
+    alice = store.put("alice", [(shared, "png"), (own, "png"), (shared, "png")])
+    bob = store.put("bob", [(shared, "png")])
+
+    assert alice[0] == alice[2] == bob[0]
+    assert store.list("alice") == alice[:2]  # visible before the writer ran
+    store.flush()
+    assert Path(alice[0]).read_bytes() == shared
+    assert len(list((tmp_path / "objects").glob("*/*/*.png"))) == 2
+    store.close()
+
+
+def test_failed_write_batch_fails_the_next_put(tmp_path, monkeypatch):
+    store = ContentAddressedSampleStore(tmp_path, flush_interval=0.01)
+
+    def disk_full(objects):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(store, "_store_objects", disk_full)
+    store.put("alice", [(png_bytes(1), "png")])
+    deadline = time.monotonic() + 5
+    while store.list("alice") and time.monotonic() < deadline:  # the failed batch is dropped
+        time.sleep(0.01)
+    assert store.users() == []
+
+    with pytest.raises(SampleWriteError, match="No space left"):
+        store.put("bob", [(png_bytes(2), "png")])
+    monkeypatch.undo()
+    bob = store.put("bob", [(png_bytes(2), "png")])
+    store.flush()
+    assert Path(bob[0]).exists()
+    store.close()
+
+
+def test_reopen_reloads_manifest_and_delete_keeps_shared_objects(tmp_path):
+    store = ContentAddressedSampleStore(tmp_path)
+    shared, own = png_bytes(1), png_bytes(2)
+    alice = store.put("alice", [(shared, "png"), (own, "png")])
+    store.put("bob", [(shared, "png")])
+    store.close()
+
+    store = ContentAddressedSampleStore(tmp_path)
+    assert store.list("alice") == alice and sorted(store.users()) == ["alice", "bob"]
+    store.delete_user("alice")
+    store.flush()
+    assert store.list("alice") == []
+    assert Path(alice[0]).exists() and not Path(alice[1]).exists()
+    store.close()
+
+    assert ContentAddressedSampleStore(tmp_path).users() == ["bob"]
+
+
+def test_face_dataset_manager_round_trip_and_legacy_import(tmp_path):
+    legacy = tmp_path / "face" / "carol" / "old.png"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(png_bytes(3))
+
+    manager = FaceDatasetManager(tmp_path / "face")
+    assert manager.list_user_samples("carol") == []  # importing is an explicit step
+    assert manager.store.import_tree(tmp_path / "face") == 1
+    assert legacy.exists()  # originals are kept until the import is confirmed
+    assert [Path(path).read_bytes() for path in manager.list_user_samples("carol")] == [png_bytes(3)]
+
+    paths = manager.save_raw_samples("dave", [png_bytes(4), png_bytes(4), "not an image"])
+    assert paths[0] == paths[1] and paths[2].endswith(".txt")
+    manager.flush()
+    assert sorted(collect_user_images(tmp_path / "face")) == ["carol", "dave"]
+    assert collect_user_images(tmp_path / "face")["dave"] == [Path(paths[0])]
+
+    manager.delete_user("dave")
+    manager.flush()
+    assert manager.list_user_samples("dave") == [] and not Path(paths[0]).exists()
+
+
+def test_packed_store_rolls_segments_compacts_and_exports(tmp_path):
+    store = PackedSampleStore(tmp_path, segment_size=200)
+    alice = store.put("alice", [(png_bytes(value), "png") for value in range(3)])
+    bob = store.put("bob", [(png_bytes(0), "png"), (png_bytes(9), "png")])
+    assert store.read(bob[1]) == png_bytes(9)  # served from the queue before the flush
+    store.flush()
+    assert bob[0] == alice[0] and store.stats()["segments"] > 1
+    # Segment order: the shared first image is read for both users before alice's next ones.
+    order = [(user_id, content) for user_id, _, content in store.iter_contents()]
+    assert order == [("alice", png_bytes(0)), ("bob", png_bytes(0))] + [("alice", png_bytes(v)) for v in (1, 2)] + [
+        ("bob", png_bytes(9))
+    ]
+
+    store.delete_user("alice")
+    store.flush()
+    before = store.stats()
+    reclaimed = store.compact()
+    assert reclaimed == before["segment_bytes"] - before["live_bytes"] > 0
+    assert [store.read(ref) for ref in store.list("bob")] == [png_bytes(0), png_bytes(9)]
+    store.close()
+
+    store = PackedSampleStore(tmp_path, segment_size=200)
+    assert store.users() == ["bob"] and store.stats()["segment_bytes"] == store.stats()["live_bytes"]
+    assert store.export(tmp_path / "export") == 2
+    assert sorted(path.read_bytes() for path in (tmp_path / "export" / "bob").iterdir()) == sorted([png_bytes(0), png_bytes(9)])
+    store.close()
+
+
+def test_packed_store_truncates_unindexed_tail_and_packs_loose_objects(tmp_path):
+    loose = ContentAddressedSampleStore(tmp_path)
+    refs = loose.put("alice", [(png_bytes(1), "png"), (png_bytes(2), "png")])
+    loose.close()
+
+    store = PackedSampleStore(tmp_path)
+    assert not (tmp_path / "objects").exists()
+    assert [store.read(ref) for ref in store.list("alice")] == [png_bytes(1), png_bytes(2)]
+    store.close()
+
+    segment = next((tmp_path / "segments").iterdir())
+    size = segment.stat().st_size
+    with segment.open("ab") as stream:
+        stream.write(b"torn append")
+    store = PackedSampleStore(tmp_path)
+    assert segment.stat().st_size == size and store.read(Path(refs[1]).name) == png_bytes(2)
+    store.close()
+
+
+@pytest.mark.parametrize("manager_cls", [FaceDatasetManager, VoiceDatasetManager, FingerprintDatasetManager])
+def test_dataset_managers_packed_backend(tmp_path, manager_cls):
+    legacy = tmp_path / "carol" / "old.bin"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"legacy sample")
+
+    manager = manager_cls(tmp_path, sample_backend="packed", segment_size_mb=1)
+    assert manager.list_user_samples("carol") == []
+    manager.store.import_tree(tmp_path, remove=True)
+    refs = manager.save_raw_samples("dave", [b"first", b"second"])
+    assert manager.list_user_samples("dave") == refs
+    assert [manager.read_sample(ref) for ref in refs] == [b"first", b"second"]
+    assert [manager.read_sample(ref) for ref in manager.list_user_samples("carol")] == [b"legacy sample"]
+    assert not (tmp_path / "carol").exists()
+
+    manager.delete_user("dave")
+    assert manager.list_user_samples("dave") == []
+    with pytest.raises(ValueError):
+        manager_cls(tmp_path / "other", sample_backend="tape")
@@ -0,0 +1,129 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from biometric_platform.core.base import VerificationResult
+from biometric_platform.infrastructure import ScatterGatherEmbeddingStore, ShardUnavailableError
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+SHARD_CONFIG = """
+environment: test
+modalities:
+  face:
+    enabled: true
+    verifier_class: biometric_platform.modalities.face.verifier.FaceVerifier
+    service_class: biometric_platform.modalities.face.service.FaceService
+api:
+  role: shard
+  shard_store:
+    class: biometric_platform.infrastructure.VectorEmbeddingStore
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(url: str, process: subprocess.Popen, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"shard process exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/shard/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"shard at {url} did not become healthy")
+
+
+@pytest.fixture(scope="module")
+def shard_nodes(tmp_path_factory):
+    config_path = tmp_path_factory.mktemp("shard") / "biometric.yaml"
+    config_path.write_text(SHARD_CONFIG, encoding="utf-8")
+    env = {**os.environ, "BIOMETRIC_CONFIG": str(config_path), "BIOMETRIC_API_ROLE": "shard"}
+
+    nodes = []
+    for _ in range(3):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "biometric_platform.interfaces.api.app:app", "--port", str(port), "--log-level", "warning"],
+            cwd=PROJECT_ROOT,
+            env=env,
+        )
+        nodes.append((f"http://127.0.0.1:{port}", process))
+    try:
+        for url, process in nodes:
+            wait_until_healthy(url, process)
+        yield nodes
+    finally:
+        for _, process in nodes:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def test_scatter_gather_matches_local_ranking_and_flags_missing_shards(shard_nodes):
+    urls = [url for url, _ in shard_nodes]
+    store = ScatterGatherEmbeddingStore(modality="face", shards=urls, timeout_s=5.0)
+    rng = np.random.default_rng(0)
+    gallery = {f"user_{i:03d}": rng.standard_normal(16).astype(np.float32) for i in range(30)}
+    for user_id, vector in gallery.items():
+        store.add_embeddings(user_id, [vector])
+
+    assert store.list_users() == tuple(sorted(gallery))
+    templates = store.get_embeddings("user_003")
+    assert np.allclose(templates[0], gallery["user_003"] / np.linalg.norm(gallery["user_003"]), atol=1e-6)
+
+    probe = gallery["user_011"]
+    results = store.query(probe, top_k=5)
+    normalized = {user_id: vector / np.linalg.norm(vector) for user_id, vector in gallery.items()}
+    expected = sorted(normalized, key=lambda user_id: float(normalized[user_id] @ (probe / np.linalg.norm(probe))), reverse=True)[:5]
+    assert [user_id for user_id, _, _ in results] == expected
+    assert not results.partial
+    assert results[0][2]["shard"] == store.shard_for("user_011")
+
+    batched = store.query_batch([probe, gallery["user_020"]], top_k=5)
+    assert [user_id for user_id, _, _ in batched[0]] == expected
+    assert batched[1][0][0] == "user_020" and batched[1][0][2]["shard"] == store.shard_for("user_020")
+
+    store.delete_user("user_011")
+    assert store.query(probe, top_k=1)[0][0] != "user_011"
+
+    # Route one shard at a closed port: the query degrades to a partial result.
+    dead = ScatterGatherEmbeddingStore(modality="face", shards=[urls[0], urls[1], f"http://127.0.0.1:{free_port()}"], timeout_s=2.0)
+    partial = dead.query(probe, top_k=5)
+    assert partial.partial and partial.missing_shards == (2,)
+    assert VerificationResult.from_query(partial, threshold=0.5, modality="face").partial
+    assert dead.query_batch([probe], top_k=5).missing_shards == (2,)
+
+    strict = ScatterGatherEmbeddingStore(modality="face", shards=[f"http://127.0.0.1:{free_port()}"], timeout_s=1.0)
+    with pytest.raises(ShardUnavailableError):
+        strict.query(probe, top_k=5)
+
+
+def test_hedged_request_reaches_healthy_replica(shard_nodes):
+    url = shard_nodes[0][0]
+    # A listening socket that never answers stands in for a stalled replica.
+    with socket.socket() as stalled:
+        stalled.bind(("127.0.0.1", 0))
+        stalled.listen(8)
+        stalled_url = f"http://127.0.0.1:{stalled.getsockname()[1]}"
+        store = ScatterGatherEmbeddingStore(
+            modality="face", shards=[[stalled_url, url]], timeout_s=3.0, hedge_after_s=0.05
+        )
+
+        started = time.monotonic()
+        results = store.query(np.ones(16, dtype=np.float32), top_k=3)
+
+    assert not results.partial
+    assert time.monotonic() - started < 2.0
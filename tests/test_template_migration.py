@@ -0,0 +1,140 @@
+import threading
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from biometric_platform.infrastructure import VersionedEmbeddingStore
+from biometric_platform.infrastructure.versioned_store import MIGRATED, STALE
+from biometric_platform.modalities.face.dataset import FaceDatasetManager
+from biometric_platform.modalities.face.migration import TemplateMigration
+from biometric_platform.modalities.face.service import FaceService
+from biometric_platform.modalities.face.verifier import FaceVerifier
+from biometric_platform.models.base import EmbeddingModel
+
+
+class CodeEmbedder(EmbeddingModel):
+    """Maps the image's pixel value (the identity code) to a fixed random vector."""
+
+    def __init__(self, name, dim, gate=None):
+        self.name = name
+        self.vectors = np.random.default_rng(dim).normal(size=(256, dim)).astype(np.float32)
+        self.gate = gate
+
+    def fingerprint(self):
+        return self.name
+
+    def embed(self, image):
+        return self.vectors[int(image[0, 0, 0])]
+
+    def embed_batch(self, images):
+        if self.gate is not None:
+            self.gate.wait()
+        return super().embed_batch(images)
+
+
+class PassThroughDetector:
+    def detect(self, image):
+        return [image]
+
+
+def png(code):
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), color=(code, code, code)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def gallery(tmp_path):
+    store = VersionedEmbeddingStore(modality="face")
+    dataset = FaceDatasetManager(tmp_path / "face")
+    model_a = CodeEmbedder("model-a", 16)
+
+    def service():
+        # The API builds a verifier per request; the store decides which model it uses.
+        verifier = FaceVerifier(
+            embedder=model_a, detector=PassThroughDetector(), embedding_store=store, quality_gate={"enabled": False}
+        )
+        return FaceService(verifier, dataset)
+
+    for code in range(1, 21):
+        service().enroll({"user_id": f"user_{code:02d}", "samples": [png(code)]})
+    return store, dataset, service
+
+
+def test_migration_reembeds_raw_samples_and_switches_atomically(gallery):
+    store, _, service = gallery
+    model_b = CodeEmbedder("model-b", 8)
+
+    migration = TemplateMigration(service()._verifier, service()._dataset_manager, model_b, batch_size=6, cpu_budget=1.0, switch_grace_s=0)
+    progress = migration.start().wait(timeout=30)
+
+    assert progress.state == "completed" and progress.migrated_users == progress.total_users == 20
+    assert progress.samples == 20 and progress.samples_per_s > 0 and progress.eta_s is None
+    assert store.active_version == "model-b" and store.versions() == ["model-b"]
+    verifier = service()._verifier
+    assert verifier.model_version == "model-b"
+    result = verifier.match(png(7), top_k=1)
+    assert result.matches[0].user_id == "user_07" and result.matches[0].score == pytest.approx(1.0)
+
+
+def test_enrollments_and_deletions_during_migration_reach_the_new_version(gallery):
+    store, _, service = gallery
+    gate = threading.Event()
+    model_b = CodeEmbedder("model-b", 8, gate=gate)
+    migration = TemplateMigration(service()._verifier, service()._dataset_manager, model_b, batch_size=4, switch_grace_s=0)
+    migration.start()
+
+    gate.set()  # enrollment during the migration embeds with both models
+    service().enroll({"user_id": "newcomer", "samples": [png(99)]})
+    service().delete("user_03")
+    # The old version still answers verification while the migration runs.
+    assert service().verify({"sample": png(5), "top_k": 1})["matches"][0]["user_id"] == "user_05"
+
+    progress = migration.wait(timeout=30)
+    assert progress.state == "completed"
+    users = store.list_users()
+    assert "newcomer" in users and "user_03" not in users and len(users) == 20
+    assert service().verify({"sample": png(99), "top_k": 1})["matches"][0]["user_id"] == "newcomer"
+    assert service().migration_status()["active_version"] == "model-b"
+
+
+def test_migration_without_raw_samples_fails_and_keeps_the_old_version(gallery):
+    store, dataset, service = gallery
+    dataset.delete_user("user_04")  # templates remain, raw samples are gone
+    migration = TemplateMigration(service()._verifier, dataset, CodeEmbedder("model-b", 8), switch_grace_s=0)
+    progress = migration.start().wait(timeout=30)
+
+    assert progress.state == "failed" and progress.failed_users == ["user_04"]
+    assert store.active_version == "model-a" and store.versions() == ["model-a"]
+    assert service().migration_status()["state"] == "failed"
+
+
+def test_stale_generation_and_unmigrated_users_block_the_switch():
+    store = VersionedEmbeddingStore(modality="face")
+    store.claim_version("v1", object())
+    store.add_embeddings("alice", [[1.0, 0.0]])
+    store.begin_migration("v2", object())
+
+    generation = store.generation("alice")
+    store.add_embeddings("alice", [[0.0, 1.0]])  # enrolled again while being re-embedded
+    assert store.migrate_user("alice", [[1.0, 0.0, 0.0]], "v2", generation) == STALE
+    assert store.finish_migration() is None and store.unmigrated_users() == ["alice"]
+    assert store.migrate_user("alice", [[1.0, 0.0, 0.0]], "v2", store.generation("alice")) == MIGRATED
+    assert store.finish_migration() == "v1" and store.active_version == "v2"
+
+
+def test_enrollment_saves_raw_samples_before_writing_templates(gallery, monkeypatch):
+    store, dataset, service = gallery
+    seen = []
+    add_versioned_embeddings = store.add_versioned_embeddings
+
+    def check_samples_first(user_id, embeddings):
+        seen.append(len(dataset.list_user_samples(user_id)))
+        add_versioned_embeddings(user_id, embeddings)
+
+    monkeypatch.setattr(store, "add_versioned_embeddings", check_samples_first)
+    service().enroll({"user_id": "user_01", "samples": [png(101)]})
+    # A migration that reads the new generation also finds the re-enrolled sample.
+    assert seen == [2]
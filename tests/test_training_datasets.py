@@ -0,0 +1,74 @@
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader
+
+from training.datasets import ImageShards, RandomPairDataset, SequentialPairStream, build_folder_shards, build_pair_shards
+from training.datasets.lfw_pairs_dataset import LFWPairsDataset
+
+
+def encoded(value: int, size=(90, 70)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(value, 255 - value, value // 2)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_pair_shards_store_each_image_once_at_fixed_size(tmp_path):
+    images = [encoded(value) for value in (10, 80, 150, 220)]
+    rows = [(images[0], images[1], 0), (images[1], images[2], 1), ({"bytes": images[0]}, images[3], 1)]
+    shards = build_pair_shards(rows, tmp_path / "cache", image_size=32, shard_size=3)
+
+    assert len(shards) == 4 and len(shards.shards) == 2
+    assert shards.image(3).shape == (32, 32, 3) and shards.image(3).dtype == np.uint8
+    assert shards.image(2)[0, 0].tolist() == [150, 105, 75]
+    assert shards.pairs().tolist() == [[0, 1, 0], [1, 2, 1], [0, 3, 1]]
+    assert not (tmp_path / "cache.building").exists()
+
+    dataset = LFWPairsDataset.__new__(LFWPairsDataset)  # bypass the Arrow build
+    dataset.shards, dataset.pairs, dataset.transform = ImageShards(tmp_path / "cache"), shards.pairs(), torch.from_numpy
+    assert dataset.pair_ids(2)[0] == dataset.pair_ids(0)[0] != dataset.pair_ids(0)[1]
+
+
+def test_stream_deals_contiguous_blocks_to_workers_once_per_epoch(tmp_path):
+    class Indexed(torch.utils.data.Dataset):
+        def __len__(self):
+            return 50
+
+        def __getitem__(self, index):
+            return index
+
+    stream = SequentialPairStream(Indexed(), block_size=8, seed=3)
+    first = list(stream)
+    assert sorted(first) == list(range(50))
+    blocks = [index // 8 for index in first]
+    assert sum(a != b for a, b in zip(blocks, blocks[1:])) == 6  # one switch per block boundary
+
+    parallel = [int(item) for item in DataLoader(stream, batch_size=None, num_workers=2)]
+    assert sorted(parallel) == list(range(50))
+    stream.set_epoch(1)
+    assert list(stream) != first
+
+
+def test_random_pairs_are_genuine_or_impostor_and_reproducible(tmp_path):
+    root = tmp_path / "faces"
+    for identity, count in (("alice", 3), ("bob", 1), ("carol", 2)):
+        (root / identity).mkdir(parents=True)
+        for number in range(count):
+            (root / identity / f"{number}.png").write_bytes(encoded(40 * number + len(identity)))
+    shards = build_folder_shards(root, tmp_path / "cache", image_size=16)
+    slots, names = shards.identities()
+    assert names == ["alice", "bob", "carol"] and slots.tolist() == [0, 0, 0, 1, 2, 2]
+
+    pairs = RandomPairDataset(shards, pairs_per_epoch=200, positive_fraction=0.5, seed=7)
+    samples = [pairs.sample(index) for index in range(200)]
+    for first, second, label in samples:
+        assert first != second and (slots[first] == slots[second]) == bool(label)
+    assert 60 < sum(label for _, _, label in samples) < 140
+    assert pairs.sample(5) == samples[5]
+    pairs.set_epoch(1)
+    assert [pairs.sample(index) for index in range(200)] != samples
+
+    img0, img1, label = pairs[0]
+    assert img0.shape == (3, 16, 16) and img0.dtype == torch.float32 and float(img0.max()) <= 1.0
@@ -0,0 +1,88 @@
+import base64
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from biometric_platform.models.voice import LogMelExtractor, MFCCSpeakerEmbedding, StreamingFeatureExtractor
+from biometric_platform.models.voice.features import FeatureConfig, frame_signal, mel_filterbank
+from biometric_platform.modalities.voice.verifier import VoiceVerifier
+
+
+def synthetic_voice(f0: float, formants, seconds: float = 1.5, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """Harmonic source shaped by a fixed spectral envelope, with jittered pitch and loudness."""
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = f0 * (1 + 0.03 * np.sin(2 * np.pi * 3 * t + rng.uniform(0, 6)))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    signal = np.zeros_like(t)
+    for harmonic in range(1, 30):
+        gain = sum(np.exp(-((harmonic * f0 - center) / width) ** 2) for center, width in formants) + 0.02
+        signal += gain * np.sin(harmonic * phase)
+    signal *= 0.5 + 0.5 * np.sin(2 * np.pi * 2 * t + rng.uniform(0, 6)) ** 2
+    signal += 0.005 * rng.standard_normal(t.size)
+    return (0.3 * signal / np.abs(signal).max()).astype(np.float32)
+
+
+def to_wav(signal: np.ndarray, sample_rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes((signal * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_strided_framing_and_cached_filterbank():
+    signal = np.arange(1000, dtype=np.float32)
+    frames = frame_signal(signal, 400, 160)
+    assert frames.shape == (4, 400)
+    assert np.array_equal(frames[2], signal[320:720])
+    assert mel_filterbank(16000, 512, 40) is mel_filterbank(16000, 512, 40)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 157, 4000])
+def test_streaming_extractor_matches_whole_signal(chunk_size):
+    signal = synthetic_voice(140, [(600, 150)], seconds=0.5)
+    expected = LogMelExtractor()(signal)
+    stream = StreamingFeatureExtractor()
+    streamed = np.concatenate([stream.push(signal[i : i + chunk_size]) for i in range(0, signal.size, chunk_size)])
+    assert streamed.shape == expected.shape
+    assert np.allclose(streamed, expected, atol=1e-3)
+    # Only the tail of the last partial frame is retained between chunks.
+    assert stream._carry.size < FeatureConfig().frame_length
+
+
+def test_speaker_embedding_separates_voices_at_any_sample_rate():
+    model = MFCCSpeakerEmbedding()
+    first = model.embed(synthetic_voice(120, [(500, 150), (1500, 200)], seed=1))
+    again = model.embed(synthetic_voice(120, [(500, 150), (1500, 200)], seed=2))
+    other = model.embed(synthetic_voice(210, [(800, 150), (2500, 300)], seed=3))
+    assert first.shape == (model.embedding_dim,)
+    assert float(first @ again) > 0.95 > float(first @ other)
+
+    resampled = model.embed(synthetic_voice(120, [(500, 150), (1500, 200)], sample_rate=8000, seed=1), sample_rate=8000)
+    assert model.feature_config(8000).n_fft == 256
+    assert resampled.shape == first.shape
+
+    with pytest.raises(ValueError):
+        model.embed(np.zeros(16000, dtype=np.float32))
+
+
+def test_voice_verifier_enrolls_and_verifies_wav_payloads():
+    verifier = VoiceVerifier(threshold=0.95)
+    alice = synthetic_voice(120, [(500, 150), (1500, 200)], seed=1)
+    bob = synthetic_voice(210, [(800, 150), (2500, 300)], seed=3)
+    verifier.enroll("alice", [to_wav(alice)])
+    verifier.enroll("bob", ["data:audio/wav;base64," + base64.b64encode(to_wav(bob)).decode()])
+
+    probe = base64.b64encode(to_wav(synthetic_voice(120, [(500, 150), (1500, 200)], seed=4))).decode()
+    result = verifier.match(probe, top_k=2)
+    assert result.decision
+    assert [match.user_id for match in result.matches] == ["alice", "bob"]
+
+    with pytest.raises(ValueError):
+        verifier.match("sample_frame_1")
@@ -0,0 +1,67 @@
+import base64
+
+import numpy as np
+import pytest
+
+from biometric_platform.infrastructure import InMemoryEmbeddingStore, ShardedEmbeddingStore, VectorEmbeddingStore
+from biometric_platform.models.voice.audio import PCMStreamDecoder
+
+from .conftest import ALICE, BOB
+from .test_voice_features import synthetic_voice, to_wav
+
+
+def replay(client, user_id: str, wav: bytes, chunk_bytes: int = 3200):
+    updates = []
+    with client.websocket_connect("/biometric/voice/stream") as websocket:
+        websocket.send_json({"user_id": user_id, "format": "wav"})
+        assert websocket.receive_json()["status"] == "ready"
+        for start in range(0, len(wav), chunk_bytes):
+            websocket.send_bytes(wav[start : start + chunk_bytes])
+            if start + chunk_bytes > 44:
+                updates.append(websocket.receive_json())
+                if updates[-1]["final"]:
+                    return updates
+        websocket.send_json({"event": "end"})
+        updates.append(websocket.receive_json())
+    return updates
+
+
+def test_wav_stream_decoder_handles_split_headers_and_samples():
+    signal = synthetic_voice(seconds=0.2, **ALICE)
+    wav = to_wav(signal)
+    decoder = PCMStreamDecoder("wav")
+    decoded = np.concatenate([decoder.feed(wav[i : i + 7]) for i in range(0, len(wav), 7)])
+    assert decoder.sample_rate == 16000
+    assert np.allclose(decoded, signal, atol=1e-4)
+
+
+@pytest.mark.parametrize("store_cls", [InMemoryEmbeddingStore, VectorEmbeddingStore, ShardedEmbeddingStore])
+def test_stores_return_a_users_templates(store_cls):
+    store = store_cls(modality="voice")
+    store.add_embeddings("alice", [[3.0, 4.0], [1.0, 0.0]])
+    store.add_embeddings("bob", [[0.0, 1.0]])
+    rows = np.asarray(store.get_embeddings("alice"), dtype=np.float32)
+    assert rows.shape == (2, 2)
+    assert len(store.get_embeddings("nobody")) == 0
+
+
+def test_streamed_utterance_is_decided_before_it_ends(client):
+    enrollment = [base64.b64encode(to_wav(synthetic_voice(seed=seed, **ALICE))).decode() for seed in (1, 2)]
+    assert client.post("/biometric/voice/enroll", json={"user_id": "alice", "samples": enrollment}).status_code == 200
+
+    utterance = to_wav(synthetic_voice(seconds=4.0, seed=7, **ALICE))
+    updates = replay(client, "alice", utterance)
+    assert updates[-1]["status"] == "accepted" and updates[-1]["final"]
+    # 3200 bytes = 0.1 s of 16 kHz PCM; the decision lands well before the 4 s utterance ends.
+    assert len(updates) < 20
+    assert updates[-1]["voiced_seconds"] < 2.0
+
+    impostor = replay(client, "alice", to_wav(synthetic_voice(seconds=4.0, seed=8, **BOB)))
+    assert impostor[-1]["status"] == "rejected"
+    assert len(impostor) < 20
+
+    with client.websocket_connect("/biometric/voice/stream") as websocket:
+        websocket.send_json({"user_id": "mallory", "format": "pcm_s16le", "sample_rate": 16000})
+        assert websocket.receive_json()["status"] == "ready"
+        websocket.send_bytes(b"\x00\x00" * 1600)
+        assert websocket.receive_json()["status"] == "error"
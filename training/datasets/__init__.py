@@ -0,0 +1,18 @@
+"""
+Training datasets backed by the decoded-image shard cache.
+"""
+
+from .lfw_pairs_dataset import LFWPairsDataset, SequentialPairStream, to_tensor
+from .pair_sampler import RandomPairDataset
+from .shards import ImageShards, build_folder_shards, build_pair_shards, build_shards
+
+__all__ = [
+    "ImageShards",
+    "LFWPairsDataset",
+    "RandomPairDataset",
+    "SequentialPairStream",
+    "build_folder_shards",
+    "build_pair_shards",
+    "build_shards",
+    "to_tensor",
+]
@@ -0,0 +1,103 @@
+"""
+LFW pairs backed by the decoded-image shard cache.
+
+The first use of a split decodes the Arrow dataset once into uint8 shards
+(``shards.build_pair_shards``). Afterwards ``__getitem__`` only slices two memory-mapped
+images, so DataLoader workers spend no time on JPEG decoding or resizing.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, IterableDataset, get_worker_info
+
+from .shards import ImageShards, arrow_pair_rows, build_pair_shards
+
+
+def to_tensor(image: np.ndarray) -> torch.Tensor:
+    """uint8 HWC -> float CHW in [0, 1] (what ``EmbeddingModel.as_module()`` expects)."""
+
+    return torch.from_numpy(np.array(image)).permute(2, 0, 1).float().div_(255.0)
+
+
+class LFWPairsDataset(Dataset):
+    """``(img0, img1, label)`` items of an LFW pairs split."""
+
+    def __init__(
+        self,
+        arrow_dir: str | Path,
+        split: str = "train",
+        transform: Optional[Callable[[np.ndarray], Any]] = None,
+        cache_dir: str | Path = "datasets/cache/face_shards",
+        image_size: int = 160,
+        image_columns: Sequence[str] = ("img_0", "img_1"),
+        label_column: str = "pair",
+    ) -> None:
+        directory = Path(cache_dir) / f"{Path(arrow_dir).name}-{split}-{image_size}"
+        if not (directory / "meta.json").exists():
+            rows = arrow_pair_rows(arrow_dir, split, image_columns, label_column)
+            build_pair_shards(rows, directory, image_size=image_size)
+        self.shards = ImageShards(directory)
+        self.pairs = self.shards.pairs()
+        # ``transform`` receives the uint8 HWC array; the default only converts to a tensor.
+        self.transform = transform or to_tensor
+
+    def __len__(self) -> int:
+        return self.pairs.shape[0]
+
+    def pair_ids(self, index: int) -> Tuple[str, str]:
+        first, second, _ = self.pairs[index]
+        return self.shards.image_ids[first], self.shards.image_ids[second]
+
+    def pair_label(self, index: int) -> int:
+        return int(self.pairs[index, 2])
+
+    def __getitem__(self, index: int) -> Tuple[Any, Any, torch.Tensor]:
+        first, second, label = self.pairs[index]
+        return (
+            self.transform(self.shards.image(first)),
+            self.transform(self.shards.image(second)),
+            torch.tensor(label, dtype=torch.float32),
+        )
+
+
+class SequentialPairStream(IterableDataset):
+    """
+    Streams a map-style pair dataset in contiguous blocks.
+
+    Pairs are cut into ``block_size`` blocks; the block order is shuffled per epoch and
+    blocks are dealt round-robin to DataLoader workers. Each worker therefore reads its
+    shard pages mostly sequentially. Pairs inside a block are shuffled as well.
+    """
+
+    def __init__(self, dataset: Dataset, block_size: int = 512, shuffle: bool = True, seed: int = 0) -> None:
+        self.dataset = dataset
+        self.block_size = block_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __iter__(self) -> Iterator[Any]:
+        worker = get_worker_info()
+        worker_id, workers = (worker.id, worker.num_workers) if worker is not None else (0, 1)
+        rng = np.random.default_rng((self.seed, self.epoch))
+        blocks = np.arange(math.ceil(len(self.dataset) / self.block_size))
+        if self.shuffle:
+            rng.shuffle(blocks)
+        for block in blocks[worker_id::workers]:
+            indices = np.arange(block * self.block_size, min(len(self.dataset), (block + 1) * self.block_size))
+            if self.shuffle:
+                np.random.default_rng((self.seed, self.epoch, int(block))).shuffle(indices)
+            for index in indices:
+                yield self.dataset[int(index)]
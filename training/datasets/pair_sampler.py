@@ -0,0 +1,79 @@
+"""
+Genuine/impostor pairs drawn on the fly from an identity-labelled shard cache.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from .lfw_pairs_dataset import to_tensor
+from .shards import ImageShards
+
+
+class RandomPairDataset(Dataset):
+    """
+    ``pairs_per_epoch`` random pairs over ``shards`` (built with ``build_folder_shards``).
+
+    Item ``i`` of epoch ``e`` is drawn from ``default_rng((seed, e, i))``, so any worker can
+    produce any item with no shared state. The result is reproducible and changes with
+    ``set_epoch``. A ``positive_fraction`` of items are genuine: two different images of
+    an identity that has at least two. The rest are impostor pairs of two identities.
+    """
+
+    def __init__(
+        self,
+        shards: ImageShards,
+        pairs_per_epoch: int,
+        positive_fraction: float = 0.5,
+        transform: Optional[Callable[[np.ndarray], Any]] = None,
+        seed: int = 0,
+    ) -> None:
+        slots, names = shards.identities()
+        if (slots < 0).any():
+            raise ValueError("Pair sampling needs an identity for every image")
+        self.shards = shards
+        self.pairs_per_epoch = pairs_per_epoch
+        self.positive_fraction = positive_fraction
+        self.transform = transform or to_tensor
+        self.seed = seed
+        self.epoch = 0
+        # Images grouped by identity: identity k owns order[starts[k]:starts[k] + counts[k]].
+        self._order = np.argsort(slots, kind="stable")
+        self._counts = np.bincount(slots, minlength=len(names))
+        self._starts = np.r_[0, np.cumsum(self._counts)[:-1]]
+        self._multi = np.flatnonzero(self._counts >= 2)
+        if len(names) < 2 or (positive_fraction > 0 and not self._multi.size):
+            raise ValueError("Need two identities, and one with two images for genuine pairs")
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return self.pairs_per_epoch
+
+    def sample(self, index: int) -> Tuple[int, int, int]:
+        """``(image 0, image 1, label)`` of item ``index`` in the current epoch."""
+
+        rng = np.random.default_rng((self.seed, self.epoch, index))
+        if rng.random() < self.positive_fraction:
+            identity = self._multi[rng.integers(self._multi.size)]
+            first, second = rng.choice(self._counts[identity], size=2, replace=False)
+            base = self._starts[identity]
+            return int(self._order[base + first]), int(self._order[base + second]), 1
+        identities = len(self._counts)
+        first = rng.integers(identities)
+        second = (first + 1 + rng.integers(identities - 1)) % identities
+        pick = lambda identity: self._order[self._starts[identity] + rng.integers(self._counts[identity])]  # noqa: E731
+        return int(pick(first)), int(pick(second)), 0
+
+    def __getitem__(self, index: int) -> Tuple[Any, Any, torch.Tensor]:
+        first, second, label = self.sample(index)
+        return (
+            self.transform(self.shards.image(first)),
+            self.transform(self.shards.image(second)),
+            torch.tensor(label, dtype=torch.float32),
+        )
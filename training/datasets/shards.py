@@ -0,0 +1,239 @@
+"""
+Decoded-image shard cache.
+
+Images are decoded and resized once into fixed-shape ``(n, size, size, 3)`` uint8 ``.npy``
+shards that are memory-mapped at read time, so a training epoch reads raw pixels with no
+JPEG decode or resize. Identical encoded images (LFW repeats images across pairs) are
+stored once.
+
+Layout of a cache directory:
+    images-00000.npy ...   uint8 shards of ``shard_size`` images
+    image_ids.json         content hash per image (stable keys, e.g. for the feature cache)
+    identities.npy         identity slot per image (folder caches; -1 when unknown)
+    identity_names.json
+    pairs.npy              (n, 3) int64 [image 0, image 1, label] (pair caches)
+    meta.json              written last; a directory without it is an unfinished build
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    from datasets import Image as ArrowImage
+    from datasets import load_from_disk
+except ImportError:  # pragma: no cover
+    ArrowImage = None  # type: ignore
+    load_from_disk = None  # type: ignore
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png"}
+
+
+class ImageShards:
+    """Read side of a shard cache; memmaps are opened lazily so each DataLoader worker maps its own."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No finished shard cache at {self.directory}")
+        self.meta: Dict[str, Any] = json.loads(meta_path.read_text(encoding="utf-8"))
+        self.image_size: int = self.meta["image_size"]
+        self.shard_size: int = self.meta["shard_size"]
+        self.count: int = self.meta["count"]
+        self._shards: Optional[List[np.ndarray]] = None
+        self._image_ids: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def shards(self) -> List[np.ndarray]:
+        if self._shards is None:
+            paths = sorted(self.directory.glob("images-*.npy"))
+            self._shards = [np.load(path, mmap_mode="r") for path in paths]
+        return self._shards
+
+    @property
+    def image_ids(self) -> List[str]:
+        if self._image_ids is None:
+            self._image_ids = json.loads((self.directory / "image_ids.json").read_text(encoding="utf-8"))
+        return self._image_ids
+
+    def image(self, index: int) -> np.ndarray:
+        """``(size, size, 3)`` uint8 view of image ``index`` (no copy)."""
+
+        shard, offset = divmod(int(index), self.shard_size)
+        return self.shards[shard][offset]
+
+    def identities(self) -> Tuple[np.ndarray, List[str]]:
+        slots = np.load(self.directory / "identities.npy")
+        names = json.loads((self.directory / "identity_names.json").read_text(encoding="utf-8"))
+        return slots, names
+
+    def pairs(self) -> np.ndarray:
+        return np.load(self.directory / "pairs.npy")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Workers re-open the memmaps instead of pickling them.
+        return {**self.__dict__, "_shards": None}
+
+
+def build_shards(
+    directory: str | Path,
+    sources: Sequence[Any],
+    image_size: int = 160,
+    shard_size: int = 4096,
+    identities: Optional[Sequence[int]] = None,
+    identity_names: Sequence[str] = (),
+    pairs: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None,
+    extra_meta: Optional[Dict[str, Any]] = None,
+) -> ImageShards:
+    """
+    Decode ``sources`` (encoded bytes or file paths, one per image) into a new shard cache.
+
+    Decoding and resizing run on a thread pool (PIL releases the GIL). The cache is built
+    in a sibling temporary directory and renamed into place, so readers never see a
+    partial build.
+    """
+
+    directory = Path(directory)
+    temporary = directory.with_name(directory.name + ".building")
+    if temporary.exists():
+        shutil.rmtree(temporary)
+    temporary.mkdir(parents=True)
+
+    image_ids: List[str] = []
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1, thread_name_prefix="shards") as executor:
+        for number, start in enumerate(range(0, len(sources), shard_size)):
+            chunk = sources[start : start + shard_size]
+            shard = np.lib.format.open_memmap(
+                temporary / f"images-{number:05d}.npy", mode="w+", dtype=np.uint8, shape=(len(chunk), image_size, image_size, 3)
+            )
+            for offset, (pixels, digest) in enumerate(executor.map(lambda source: _decode(source, image_size), chunk)):
+                shard[offset] = pixels
+                image_ids.append(digest)
+            shard.flush()
+            del shard
+
+    (temporary / "image_ids.json").write_text(json.dumps(image_ids), encoding="utf-8")
+    slots = np.full(len(sources), -1, dtype=np.int64) if identities is None else np.asarray(identities, dtype=np.int64)
+    np.save(temporary / "identities.npy", slots)
+    (temporary / "identity_names.json").write_text(json.dumps(list(identity_names)), encoding="utf-8")
+    if pairs is not None:
+        np.save(temporary / "pairs.npy", np.asarray(pairs, dtype=np.int64).reshape(-1, 3))
+    meta = {"image_size": image_size, "shard_size": shard_size, "count": len(sources), **(extra_meta or {})}
+    (temporary / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    os.replace(temporary, directory)
+    return ImageShards(directory)
+
+
+def build_folder_shards(
+    root: str | Path | None, directory: str | Path, image_size: int = 160, index_file: str | Path | None = None, **kwargs: Any
+) -> ImageShards:
+    """
+    Shard cache of a ``<root>/<identity>/<image>`` tree (e.g. ``prepare_face_dataset`` output).
+
+    ``index_file`` (``prepare_face_dataset``'s ``<split>.tsv``, paths relative to its
+    directory) lists the images instead of walking the tree.
+    """
+
+    if index_file is not None:
+        index_file = Path(index_file)
+        lines = index_file.read_text(encoding="utf-8").splitlines()[1:]
+        entries = [(index_file.parent / path, user_id) for path, user_id, _ in (line.split("\t") for line in lines if line)]
+    else:
+        paths = sorted(path for path in Path(root).glob("*/*") if path.suffix.lower() in IMAGE_EXTS)
+        entries = [(path, path.parent.name) for path in paths]
+    paths = [path for path, _ in entries]
+    names = sorted({identity for _, identity in entries})
+    slot_of = {name: slot for slot, name in enumerate(names)}
+    return build_shards(
+        directory,
+        paths,
+        image_size=image_size,
+        identities=[slot_of[identity] for _, identity in entries],
+        identity_names=names,
+        extra_meta={"source": str(index_file or root)},
+        **kwargs,
+    )
+
+
+def build_pair_shards(
+    rows: Iterable[Tuple[Any, Any, Any]], directory: str | Path, image_size: int = 160, **kwargs: Any
+) -> ImageShards:
+    """Shard cache of ``(image 0, image 1, label)`` rows; repeated images are stored once."""
+
+    sources: List[bytes] = []
+    index_of: Dict[str, int] = {}
+    pairs: List[Tuple[int, int, int]] = []
+    for first, second, label in rows:
+        slots = []
+        for field in (first, second):
+            data = encoded_bytes(field)
+            digest = hashlib.sha1(data).hexdigest()
+            if digest not in index_of:
+                index_of[digest] = len(sources)
+                sources.append(data)
+            slots.append(index_of[digest])
+        pairs.append((slots[0], slots[1], int(label)))
+    return build_shards(directory, sources, image_size=image_size, pairs=np.asarray(pairs).reshape(-1, 3), **kwargs)
+
+
+def arrow_pair_rows(
+    arrow_dir: str | Path, split: Optional[str], image_columns: Sequence[str] = ("img_0", "img_1"), label_column: str = "pair"
+) -> Iterator[Tuple[Any, Any, Any]]:
+    """``(image 0, image 1, label)`` rows of a ``load_from_disk`` dataset, with images left encoded."""
+
+    if load_from_disk is None:
+        raise ImportError("The 'datasets' package is required to read Arrow datasets")
+    dataset = load_from_disk(str(arrow_dir))
+    if isinstance(dataset, dict):
+        if split not in dataset:
+            raise ValueError(f"Split '{split}' not found in dataset at {arrow_dir}. Available: {list(dataset.keys())}")
+        dataset = dataset[split]
+    for column in image_columns:
+        dataset = dataset.cast_column(column, ArrowImage(decode=False))
+    first, second = image_columns
+    for batch in dataset.iter(batch_size=1024):
+        yield from zip(batch[first], batch[second], batch[label_column])
+
+
+def encoded_bytes(field: Any) -> bytes:
+    """Encoded image bytes of an Arrow image field (dict with ``bytes``/``path``), bytes or a path."""
+
+    if isinstance(field, (bytes, bytearray)):
+        return bytes(field)
+    if isinstance(field, dict):
+        if field.get("bytes"):
+            return field["bytes"]
+        if field.get("path"):
+            return Path(field["path"]).read_bytes()
+    if isinstance(field, (str, Path)):
+        return Path(field).read_bytes()
+    if isinstance(field, Image.Image):
+        buffer = BytesIO()
+        field.save(buffer, format="PNG")
+        return buffer.getvalue()
+    raise TypeError(f"Cannot read image data from {type(field).__name__}")
+
+
+def _decode(source: Any, image_size: int) -> Tuple[np.ndarray, str]:
+    data = encoded_bytes(source)
+    with Image.open(BytesIO(data)) as image:
+        pixels = image.convert("RGB").resize((image_size, image_size), Image.BILINEAR)
+        return np.asarray(pixels, dtype=np.uint8), hashlib.sha1(data).hexdigest()
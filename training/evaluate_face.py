@@ -0,0 +1,156 @@
+"""
+Evaluate the deployed face embedder: verification on LFW pairs (ROC/DET, EER, TAR@FAR)
+and, optionally, 1:N identification (CMC) against a distractor gallery. Prints a
+suggested ``modalities.face.threshold`` for ``configs/biometric.yaml``.
+
+Usage:
+    python training/evaluate_face.py --arrow-dir datasets/external/lfw_pairs --split test \\
+        --identification-root datasets/processed/face/val --distractor-root datasets/external/distractors
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+if not __package__:
+    # Run as a script: put the project root in place of training/, whose datasets/ would
+    # shadow the HF ``datasets`` package.
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+
+import argparse
+import json
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+
+from biometric_platform.core.evaluation import cmc_curve, suggest_threshold, verification_curve
+from biometric_platform.models.base import EmbeddingModel
+from biometric_platform.models.manager import ModelManager
+from training.datasets.lfw_pairs_dataset import LFWPairsDataset
+from training.feature_cache import FeatureCache
+from training.train_face import embedding_module, get_embedding_model, instantiate_embedding_model, load_config
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png"}
+
+
+def pair_scores(
+    module: torch.nn.Module,
+    dataset: Dataset,
+    device: torch.device,
+    batch_size: int = 64,
+    num_workers: int = 0,
+    cache_dir: Optional[str] = None,
+    namespace: str = "lfw_pairs",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Cosine score and label of every pair; both images of a batch go through one forward."""
+
+    module.eval()
+    if cache_dir:
+        with torch.no_grad():
+            dim = module(dataset[0][0].unsqueeze(0).to(device)).shape[1]
+        cached = FeatureCache.for_module(cache_dir, namespace, module, dim).pair_features(
+            dataset, module, device, batch_size=batch_size, num_workers=num_workers
+        )
+        # Rows are unit norm, so the dot product is the cosine similarity.
+        first, second = cached.matrix[cached.pairs[:, 0]], cached.matrix[cached.pairs[:, 1]]
+        return np.einsum("ij,ij->i", first, second), cached.pairs[:, 2]
+
+    scores: List[np.ndarray] = []
+    labels: List[np.ndarray] = []
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers)
+    with torch.no_grad():
+        for img0, img1, label in loader:
+            emb0, emb1 = module(torch.cat([img0, img1]).to(device)).chunk(2)
+            scores.append((emb0 * emb1).sum(dim=1).cpu().numpy())
+            labels.append(label.numpy())
+    return np.concatenate(scores), np.concatenate(labels)
+
+
+def folder_embeddings(model: EmbeddingModel, root: Path, batch_size: int = 64) -> Tuple[np.ndarray, List[str], List[Path]]:
+    """Embed ``root/<identity>/<image>`` files; returns (embeddings, identity per row, paths)."""
+
+    paths = sorted(path for path in root.glob("*/*") if path.suffix.lower() in IMAGE_EXTS)
+    rows: List[np.ndarray] = []
+    for start in range(0, len(paths), batch_size):
+        images = [np.asarray(Image.open(path).convert("RGB").resize((160, 160))) for path in paths[start : start + batch_size]]
+        rows.append(model.embed_batch(images))
+    matrix = np.concatenate(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+    return matrix, [path.parent.name for path in paths], paths
+
+
+def identification_report(
+    model: EmbeddingModel, identification_root: Path, distractor_root: Optional[Path], max_rank: int
+) -> dict:
+    """First image of each identity is enrolled, the rest are probes; distractors only enlarge the gallery."""
+
+    embeddings, identities, _ = folder_embeddings(model, identification_root)
+    enrolled = np.r_[True, np.array(identities[1:]) != np.array(identities[:-1])] if identities else np.zeros(0, bool)
+    gallery, gallery_labels = embeddings[enrolled], [label for label, keep in zip(identities, enrolled) if keep]
+    probes, probe_labels = embeddings[~enrolled], [label for label, keep in zip(identities, enrolled) if not keep]
+    if distractor_root is not None:
+        distractors, distractor_ids, _ = folder_embeddings(model, distractor_root)
+        gallery = np.concatenate([gallery, distractors])
+        gallery_labels += [f"distractor/{identity}" for identity in distractor_ids]
+
+    cmc = cmc_curve(probes, probe_labels, gallery, gallery_labels, max_rank=max_rank)
+    return {
+        "gallery_identities": len(set(gallery_labels)),
+        "probes": cmc.probes,
+        **{f"rank-{k}": cmc.rank(k) for k in (1, 5, 10) if k <= max_rank},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate face verification/identification accuracy")
+    parser.add_argument("--config", type=str, default="training/configs/face_train.yaml", help="Path to config YAML")
+    parser.add_argument("--arrow-dir", type=str, default="datasets/external/lfw_pairs", help="Arrow dataset directory")
+    parser.add_argument("--split", type=str, default="test", help="Dataset split (train/test)")
+    parser.add_argument("--target-far", type=float, default=1e-3, help="FAR the suggested threshold is chosen for")
+    parser.add_argument("--identification-root", type=str, default=None, help="<identity>/<image> folder for CMC")
+    parser.add_argument("--distractor-root", type=str, default=None, help="<identity>/<image> folder of distractors")
+    parser.add_argument("--max-rank", type=int, default=20)
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    data_cfg = cfg.get("data", {})
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    embedding_model = instantiate_embedding_model(cfg.get("model", {})) or get_embedding_model("face", ModelManager())
+    module = embedding_module(embedding_model).to(device)
+
+    dataset = LFWPairsDataset(
+        arrow_dir=args.arrow_dir,
+        split=args.split,
+        cache_dir=data_cfg.get("shard_cache_dir", "datasets/cache/face_shards"),
+        image_size=data_cfg.get("image_size", 160),
+        image_columns=data_cfg.get("image_columns", ("img_0", "img_1")),
+        label_column=data_cfg.get("label_column", "pair"),
+    )
+    scores, labels = pair_scores(
+        module,
+        dataset,
+        device,
+        batch_size=data_cfg.get("batch_size", 64),
+        num_workers=data_cfg.get("num_workers", 4),
+        cache_dir=data_cfg.get("feature_cache_dir"),
+        namespace=f"lfw_pairs/{args.split}",
+    )
+    curve = verification_curve(scores, labels)
+    report = {"verification": curve.summary(fars=sorted({args.target_far, 1e-3, 1e-4}, reverse=True))}
+    if args.identification_root:
+        report["identification"] = identification_report(
+            embedding_model,
+            Path(args.identification_root),
+            Path(args.distractor_root) if args.distractor_root else None,
+            args.max_rank,
+        )
+    suggestion = suggest_threshold(curve, args.target_far)
+    report["suggested_threshold"] = {"modality": "face", **asdict(suggestion)}
+    print(json.dumps(report, indent=2))
+    print(f"Suggested modalities.face.threshold: {suggestion.threshold:.4f} ({suggestion.basis}, TAR {suggestion.tar:.4f}, FAR {suggestion.far:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+On-disk cache of frozen-backbone embeddings for training and evaluation.
+
+While the backbone is frozen its embedding of an image never changes, so each image is
+embedded once into a memory-mapped float32 matrix. Later epochs and ``--eval-only`` runs
+then read features instead of running the backbone. The cache directory is keyed by
+dataset namespace and model fingerprint (``module_fingerprint``), so a different or
+fine-tuned model never reuses stale features.
+
+Layout of ``<root>/<namespace>/<fingerprint>/``:
+    features.f32   rows of ``dim`` float32, append-only
+    index.json     {"dim": d, "rows": {image key: row}}; rows past the index are ignored
+    pairs.npy      (n, 3) int64 [row of image 0, row of image 1, label] per dataset pair
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset, Subset
+
+from biometric_platform.models.base import module_fingerprint
+
+
+def pair_keys(dataset: Any, index: int) -> Tuple[str, str]:
+    """Cache keys of pair ``index``'s two images; positional unless the dataset names its images."""
+
+    if hasattr(dataset, "pair_ids"):
+        first, second = dataset.pair_ids(index)
+        return str(first), str(second)
+    return f"{index}/0", f"{index}/1"
+
+
+class FeatureCache:
+    """Append-only float32 feature matrix on disk plus an image key -> row index."""
+
+    def __init__(self, directory: str | Path, dim: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._data_path = self.directory / "features.f32"
+        self._index_path = self.directory / "index.json"
+        self._rows: Dict[str, int] = {}
+        if self._index_path.exists():
+            state = json.loads(self._index_path.read_text(encoding="utf-8"))
+            if state["dim"] != dim:
+                raise ValueError(f"Feature cache {self.directory} holds dim {state['dim']}, expected {dim}")
+            self._rows = state["rows"]
+        # Drop rows appended after the last index save (interrupted run).
+        with self._data_path.open("ab") as data:
+            data.truncate(len(self._rows) * dim * 4)
+        self._matrix: Optional[np.memmap] = None
+
+    @classmethod
+    def for_module(cls, root: str | Path, namespace: str, module: Any, dim: int) -> "FeatureCache":
+        return cls(Path(root) / namespace / module_fingerprint(module), dim)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only memmap of all cached rows."""
+
+        if self._matrix is None or self._matrix.shape[0] != len(self._rows):
+            if not self._rows:
+                return np.zeros((0, self.dim), dtype=np.float32)
+            self._matrix = np.memmap(self._data_path, dtype=np.float32, mode="r", shape=(len(self._rows), self.dim))
+        return self._matrix
+
+    def rows(self, keys: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def add(self, keys: Sequence[str], features: np.ndarray) -> None:
+        """Append features for new keys; durable once this returns."""
+
+        features = np.ascontiguousarray(features, dtype=np.float32).reshape(len(keys), self.dim)
+        with self._data_path.open("ab") as data:
+            data.write(features.tobytes())
+            data.flush()
+            os.fsync(data.fileno())
+        start = len(self._rows)
+        self._rows.update({key: start + offset for offset, key in enumerate(keys)})
+        temporary = self._index_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"dim": self.dim, "rows": self._rows}), encoding="utf-8")
+        os.replace(temporary, self._index_path)
+
+    def pair_features(
+        self,
+        dataset: Dataset,
+        module: torch.nn.Module,
+        device: torch.device,
+        batch_size: int = 64,
+        num_workers: int = 0,
+    ) -> "CachedPairFeatures":
+        """
+        Embed every image of ``dataset`` (``(img0, img1, label)`` items) missing from the
+        cache, then return a dataset of cached ``(feature0, feature1, label)`` items. A fully
+        cached dataset loads no images at all.
+        """
+
+        pairs_path = self.directory / "pairs.npy"
+        if pairs_path.exists():
+            pairs = np.load(pairs_path)
+            if pairs.shape[0] == len(dataset):
+                return CachedPairFeatures(self.matrix, pairs)
+
+        keys = [pair_keys(dataset, index) for index in range(len(dataset))]
+        pending = [index for index, (first, second) in enumerate(keys) if first not in self or second not in self]
+        labels = np.zeros(len(dataset), dtype=np.int64)
+        loaded = np.zeros(len(dataset), dtype=bool)
+        if pending:
+            loader = DataLoader(Subset(dataset, pending), batch_size=batch_size, shuffle=False, num_workers=num_workers)
+            module.eval()
+            position = 0
+            with torch.no_grad():
+                for img0, img1, label in loader:
+                    indices = pending[position : position + len(label)]
+                    position += len(label)
+                    labels[indices] = label.numpy()
+                    loaded[indices] = True
+                    new_keys: List[str] = []
+                    images = []
+                    for side, batch in enumerate((img0, img1)):
+                        for row, index in enumerate(indices):
+                            key = keys[index][side]
+                            if key not in self and key not in new_keys:  # images repeat across pairs
+                                new_keys.append(key)
+                                images.append(batch[row])
+                    if new_keys:
+                        self.add(new_keys, module(torch.stack(images).to(device)).cpu().numpy())
+        for index in np.flatnonzero(~loaded):
+            labels[index] = int(_label_of(dataset, index))
+
+        pairs = np.column_stack([self.rows([first for first, _ in keys]), self.rows([second for _, second in keys]), labels])
+        np.save(pairs_path, pairs)
+        return CachedPairFeatures(self.matrix, pairs)
+
+
+def _label_of(dataset: Any, index: int) -> Any:
+    if hasattr(dataset, "pair_label"):
+        return dataset.pair_label(index)
+    return dataset[index][2]
+
+
+class CachedPairFeatures(Dataset):
+    """``(feature0, feature1, label)`` items read from a ``FeatureCache`` memmap."""
+
+    def __init__(self, matrix: np.ndarray, pairs: np.ndarray) -> None:
+        self.matrix = matrix
+        self.pairs = pairs
+
+    def __len__(self) -> int:
+        return self.pairs.shape[0]
+
+    def __getitem__(self, index: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        first, second, label = self.pairs[index]
+        return (
+            torch.from_numpy(np.array(self.matrix[first])),
+            torch.from_numpy(np.array(self.matrix[second])),
+            torch.tensor(label, dtype=torch.float32),
+        )
@@ -1,17 +1,60 @@
 """
 Convert LFW arrow/parquet dataset into directory of images grouped by identity.
+
+The dataset is split into fixed index ranges exported by a process pool. Each worker
+reads its range in Arrow record batches with images left encoded. When the stored
+format already matches ``--format`` the original bytes are written as-is; only other
+formats are decoded and re-encoded.
+
+Runs are resumable and incremental: files are written atomically under deterministic
+names, and each finished range leaves a marker in ``<output>/.export_state``. A re-run
+skips finished ranges and existing files, so rows appended to the dataset are the only
+work left.
 """
 
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
-from datasets import load_from_disk
 from PIL import Image
 
+try:
+    from datasets import Image as ArrowImage
+    from datasets import load_from_disk
+except ImportError:  # pragma: no cover
+    ArrowImage = None  # type: ignore
+    load_from_disk = None  # type: ignore
+
+# Leading bytes of the encodings we can pass through untouched.
+SIGNATURES = {"jpg": (b"\xff\xd8\xff",), "png": (b"\x89PNG\r\n\x1a\n",)}
+PIL_FORMATS = {"jpg": "JPEG", "png": "PNG"}
+STATE_DIR = ".export_state"
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    output: str
+    image_column: str = "image"
+    identity_column: Optional[str] = "identity"
+    path_column: Optional[str] = "path"
+    image_format: str = "jpg"  # "jpg", "png" or "original" (keep whatever is stored)
+
+
+@dataclass
+class RangeStats:
+    written: int = 0
+    copied: int = 0  # written from the original bytes without decoding
+    skipped: int = 0  # already exported by a previous run
+    failed: int = 0
+
 
 def ensure_pil(image_field: Any) -> Image.Image:
     if isinstance(image_field, Image.Image):
@@ -31,6 +74,24 @@ def ensure_pil(image_field: Any) -> Image.Image:
     raise TypeError("Cannot decode image field; please specify --image-column appropriately.")
 
 
+def encoded_image(image_field: Any) -> Tuple[Optional[bytes], Optional[str]]:
+    """Stored bytes of an undecoded image field and their format ("jpg"/"png"), if known."""
+
+    data = None
+    if isinstance(image_field, dict):
+        data = image_field.get("bytes")
+        if not data and image_field.get("path") and Path(image_field["path"]).exists():
+            data = Path(image_field["path"]).read_bytes()
+    elif isinstance(image_field, (bytes, bytearray)):
+        data = bytes(image_field)
+    if not data:
+        return None, None
+    for extension, signatures in SIGNATURES.items():
+        if data.startswith(signatures):
+            return data, extension
+    return data, None
+
+
 def resolve_identity(
     example: dict[str, Any],
     identity_column: Optional[str],
@@ -53,6 +114,104 @@ def resolve_identity(
     raise ValueError("Could not determine identity for sample; consider setting --identity-column or --path-column.")
 
 
+def export_rows(rows: Iterable[Tuple[int, dict[str, Any]]], options: ExportOptions) -> RangeStats:
+    """Export ``(dataset index, example)`` rows whose image column is left encoded."""
+
+    output_root = Path(options.output)
+    stats = RangeStats()
+    for idx, example in rows:
+        try:
+            identity = resolve_identity(example, options.identity_column, options.path_column)
+        except ValueError:
+            if "label" not in example:
+                print(f"[WARN] Skip sample {idx}: cannot determine identity")
+                stats.failed += 1
+                continue
+            identity = str(example["label"])
+
+        if options.image_column not in example:
+            print(f"[WARN] Skip sample {idx}: column '{options.image_column}' not found.")
+            stats.failed += 1
+            continue
+
+        field = example[options.image_column]
+        data, stored_format = encoded_image(field)
+        extension = (stored_format or "jpg") if options.image_format == "original" else options.image_format
+        image_path = output_root / identity / f"{identity}_{idx:06d}.{extension}"
+        if image_path.exists():
+            stats.skipped += 1
+            continue
+
+        if data is not None and stored_format == extension:
+            payload = data  # already in the requested format: no decode/re-encode
+            stats.copied += 1
+        else:
+            try:
+                buffer = BytesIO()
+                ensure_pil(field).save(buffer, format=PIL_FORMATS[extension])
+                payload = buffer.getvalue()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[WARN] Failed to decode image for sample {idx}: {exc}")
+                stats.failed += 1
+                continue
+
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = image_path.with_name(f".{image_path.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(payload)
+        os.replace(temporary, image_path)  # a file that exists is always complete
+        stats.written += 1
+    return stats
+
+
+def load_split(arrow_dir: str, split: Optional[str]) -> Any:
+    if load_from_disk is None:
+        raise ImportError("The 'datasets' package is required to read Arrow datasets")
+    dataset = load_from_disk(arrow_dir)
+    if isinstance(dataset, dict):
+        if split:
+            if split not in dataset:
+                raise ValueError(f"Split '{split}' not found in dataset at {arrow_dir}. Available: {list(dataset.keys())}")
+            return dataset[split]
+        raise ValueError("Dataset contains multiple splits; please specify --split")
+    if split:
+        print("[INFO] Single dataset detected; ignoring --split parameter.")
+    return dataset
+
+
+def range_rows(dataset: Any, start: int, stop: int, columns: list[str], batch_size: int) -> Iterator[Tuple[int, dict[str, Any]]]:
+    """Rows ``start:stop`` read as Arrow record batches, images as undecoded ``{bytes, path}``."""
+
+    table = dataset.select_columns(columns).with_format("arrow")[start:stop]
+    idx = start
+    for batch in table.to_batches(max_chunksize=batch_size):
+        for example in batch.to_pylist():
+            yield idx, example
+            idx += 1
+
+
+_WORKER_DATASET: Any = None
+
+
+def export_range(arrow_dir: str, split: Optional[str], start: int, stop: int, options: ExportOptions, batch_size: int) -> RangeStats:
+    """Process-pool task: export rows ``start:stop`` and mark the range finished."""
+
+    global _WORKER_DATASET
+    if _WORKER_DATASET is None:
+        # load_from_disk memory-maps the Arrow files, so every worker opens its own view cheaply.
+        dataset = load_split(arrow_dir, split)
+        _WORKER_DATASET = dataset.cast_column(options.image_column, ArrowImage(decode=False))
+    columns = [
+        column
+        for column in (options.image_column, options.identity_column, options.path_column, "label")
+        if column and column in _WORKER_DATASET.column_names
+    ]
+    stats = export_rows(range_rows(_WORKER_DATASET, start, stop, columns, batch_size), options)
+    if not stats.failed:
+        marker = Path(options.output) / STATE_DIR / f"range-{start:09d}-{stop:09d}.json"
+        marker.write_text(json.dumps(asdict(stats)), encoding="utf-8")
+    return stats
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Convert LFW arrow dataset to image folders.")
     parser.add_argument("--arrow-dir", type=str, required=True, help="Path to directory containing Arrow dataset (load_from_disk format)")
@@ -61,62 +220,51 @@ def main() -> None:
     parser.add_argument("--image-column", type=str, default="image", help="Column name storing image data")
     parser.add_argument("--identity-column", type=str, default="identity", help="Column containing identity (set empty string to disable)")
     parser.add_argument("--path-column", type=str, default="path", help="Column containing original file path (fallback when identity missing)")
-    parser.add_argument("--chunk-size", type=int, default=1000, help="Log progress every N samples")
+    parser.add_argument("--format", type=str, choices=("jpg", "png", "original"), default="jpg", help="Output encoding; matching sources are copied byte for byte")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Export processes")
+    parser.add_argument("--range-size", type=int, default=2000, help="Rows per resumable work unit")
+    parser.add_argument("--batch-size", type=int, default=256, help="Rows per Arrow record batch")
     parser.add_argument("--limit", type=int, default=None, help="Optional limit on number of samples to export")
     args = parser.parse_args()
 
-    dataset = load_from_disk(args.arrow_dir)
-    if isinstance(dataset, dict):
-        if args.split:
-            if args.split not in dataset:
-                raise ValueError(f"Split '{args.split}' not found in dataset at {args.arrow_dir}. Available: {list(dataset.keys())}")
-            ds = dataset[args.split]
-        else:
-            raise ValueError("Dataset contains multiple splits; please specify --split")
-    else:
-        if args.split:
-            print("[INFO] Single dataset detected; ignoring --split parameter.")
-        ds = dataset
-
-    output_root = Path(args.output)
-    output_root.mkdir(parents=True, exist_ok=True)
-    image_column = args.image_column
-    identity_column = args.identity_column or None
-    path_column = args.path_column or None
-
-    for idx, example in enumerate(ds):
-        if args.limit and idx >= args.limit:
-            break
-        try:
-            identity = resolve_identity(example, identity_column, path_column)
-        except ValueError:
-            if "label" in example:
-                identity = str(example["label"])
-            else:
-                print(f"[WARN] Skip sample {idx}: cannot determine identity")
-                continue
+    options = ExportOptions(
+        output=args.output,
+        image_column=args.image_column,
+        identity_column=args.identity_column or None,
+        path_column=args.path_column or None,
+        image_format=args.format,
+    )
+    dataset = load_split(args.arrow_dir, args.split)
+    if args.image_column not in dataset.column_names:
+        raise ValueError(f"Column '{args.image_column}' not found. Available: {dataset.column_names}")
+    total = min(len(dataset), args.limit) if args.limit else len(dataset)
 
-        if image_column not in example:
-            print(f"[WARN] Skip sample {idx}: column '{image_column}' not found.")
-            continue
-
-        try:
-            image = ensure_pil(example[image_column])
-        except Exception as exc:  # noqa: BLE001
-            print(f"[WARN] Failed to decode image for sample {idx}: {exc}")
-            continue
-
-        identity_dir = output_root / identity
-        identity_dir.mkdir(parents=True, exist_ok=True)
-        image_path = identity_dir / f"{identity}_{idx:06d}.jpg"
-        image.save(image_path, format="JPEG")
+    state_dir = Path(args.output) / STATE_DIR
+    state_dir.mkdir(parents=True, exist_ok=True)
+    # Fixed boundaries keep finished ranges valid when the dataset grows.
+    ranges = [(start, min(total, start + args.range_size)) for start in range(0, total, args.range_size)]
+    pending = [(start, stop) for start, stop in ranges if not (state_dir / f"range-{start:09d}-{stop:09d}.json").exists()]
+    print(f"{total} samples in {len(ranges)} ranges; {len(ranges) - len(pending)} already exported.")
 
-        if idx % 500 == 0:
-            print(f"Processed {idx} samples... (latest identity: {identity})")
+    totals = RangeStats()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(export_range, args.arrow_dir, args.split, start, stop, options, args.batch_size): (start, stop)
+            for start, stop in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            stats = future.result()
+            for field, value in asdict(stats).items():
+                setattr(totals, field, getattr(totals, field) + value)
+            start, stop = futures[future]
+            print(f"Range {start}-{stop} done ({done}/{len(pending)}): {stats.written} written, {stats.failed} failed")
 
-    print(f"Conversion complete. Images saved to {output_root}")
+    print(
+        f"Conversion complete in {time.perf_counter() - started:.1f}s. Images saved to {args.output} "
+        f"({totals.written} written, {totals.copied} without re-encoding, {totals.skipped} already present, {totals.failed} failed)"
+    )
 
 
 if __name__ == "__main__":
     main()
-
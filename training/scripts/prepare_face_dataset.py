@@ -1,20 +1,59 @@
 """
 Prepare face dataset: split raw images into train/val and copy to processed directory.
+
+``--incremental`` keeps a manifest of each user's raw files and split, so a re-run only
+touches users whose raw images changed or whose processed files went missing (and
+removes users that disappeared). Incremental runs hardlink images by default (reflinks
+and copies are options), falling back to copying when the filesystem cannot link; full
+runs copy unless ``--link`` says otherwise. A hardlinked processed file is the raw file,
+so editing it in place changes the raw sample. The work runs on a thread pool. Either mode writes a split index (``<processed-root>/<split>.tsv``:
+relative path, user id, label) that loaders can read without walking the directory tree.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from random import Random
-from typing import List
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: reflinks fall back to copies
+    fcntl = None  # type: ignore
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png"}
+SPLITS = ("train", "val")
+MANIFEST_NAME = "manifest.json"
+SAMPLE_MANIFEST = "manifest.sqlite3"  # biometric_platform.infrastructure.sample_store
+LINK_MODES = ("hardlink", "reflink", "copy")
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents (btrfs, XFS, ...)
 
 
 def collect_user_images(raw_root: Path) -> dict[str, List[Path]]:
     user_images: dict[str, List[Path]] = {}
+    if (raw_root / "segments").is_dir():
+        raise ValueError(
+            f"{raw_root} is a packed sample store; export it first: "
+            f"python scripts/packed_samples.py --root {raw_root} export --output <directory>"
+        )
+    if (raw_root / SAMPLE_MANIFEST).exists():
+        # Content-addressed layout written by FaceDatasetManager: read the manifest, not the tree.
+        connection = sqlite3.connect(raw_root / SAMPLE_MANIFEST)
+        try:
+            rows = connection.execute("SELECT user_id, name FROM samples ORDER BY created_at, rowid").fetchall()
+        finally:
+            connection.close()
+        for user_id, name in rows:
+            if Path(name).suffix.lower() in IMAGE_EXTS:
+                user_images.setdefault(user_id, []).append(raw_root / "objects" / name[:2] / name[2:4] / name)
+        return user_images
     for user_dir in raw_root.iterdir():
         if not user_dir.is_dir():
             continue
@@ -35,29 +74,144 @@ def split_images(images: List[Path], val_ratio: float, rng: Random) -> tuple[Lis
     return train_images, val_images
 
 
-def copy_images(images: List[Path], target_dir: Path) -> None:
-    target_dir.mkdir(parents=True, exist_ok=True)
-    for image in images:
-        shutil.copy(image, target_dir / image.name)
+def place_file(source: Path, target: Path, link_mode: str) -> None:
+    """Hardlink/reflink ``source`` to ``target``, copying when the filesystem cannot."""
+
+    if link_mode == "hardlink":
+        try:
+            os.link(source, target)
+            return
+        except OSError:  # other device, or links unsupported
+            pass
+    elif link_mode == "reflink" and fcntl is not None:
+        try:
+            with source.open("rb") as src, target.open("wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            target.unlink(missing_ok=True)
+    shutil.copy2(source, target)
 
 
-def prepare_dataset(raw_root: Path, processed_root: Path, val_ratio: float, seed: int) -> None:
-    rng = Random(seed)
+def copy_images(images: List[Path], target_dir: Path, link_mode: str = "copy") -> None:
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for image in images:
+        target = target_dir / image.name
+        target.unlink(missing_ok=True)
+        place_file(image, target, link_mode)
+
+
+def user_signature(images: List[Path]) -> str:
+    """Changes when any of the user's raw files is added, removed or modified."""
+
+    digest = hashlib.sha1()
+    for image in sorted(images):
+        stat = image.stat()
+        digest.update(f"{image.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prepare_user(
+    user_id: str, images: List[Path], processed_root: Path, val_ratio: float, seed: int, link_mode: str
+) -> Dict[str, Any]:
+    # Seeded per user so a user's split does not depend on which other users exist.
+    train_images, val_images = split_images(sorted(images), val_ratio, Random(f"{seed}:{user_id}"))
+    for split, split_images_ in zip(SPLITS, (train_images, val_images)):
+        target_dir = processed_root / split / user_id
+        if target_dir.exists():
+            shutil.rmtree(target_dir)
+        copy_images(split_images_, target_dir, link_mode)
+    return {
+        "signature": user_signature(images),
+        "train": sorted(image.name for image in train_images),
+        "val": sorted(image.name for image in val_images),
+    }
+
+
+def write_split_index(processed_root: Path, users: Dict[str, Dict[str, Any]]) -> None:
+    """``<split>.tsv`` with one ``relative path<TAB>user id<TAB>label`` line per image."""
+
+    labels = {user_id: label for label, user_id in enumerate(sorted(users))}
+    for split in SPLITS:
+        lines = ["path\tuser_id\tlabel"]
+        for user_id in sorted(users):
+            lines.extend(f"{split}/{user_id}/{name}\t{user_id}\t{labels[user_id]}" for name in users[user_id][split])
+        temporary = processed_root / f".{split}.tsv.tmp"
+        temporary.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temporary, processed_root / f"{split}.tsv")
+
+
+def load_manifest(processed_root: Path, val_ratio: float, seed: int) -> Dict[str, Dict[str, Any]]:
+    path = processed_root / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("val_ratio") != val_ratio or manifest.get("seed") != seed:
+        return {}  # different split parameters: every user is redone
+    return manifest.get("users", {})
+
+
+def outputs_present(processed_root: Path, user_id: str, entry: Dict[str, Any]) -> bool:
+    """Whether every file a manifest entry lists is still in ``processed/<split>/<user>``."""
+
+    return all((processed_root / split / user_id / name).exists() for split in SPLITS for name in entry.get(split, ()))
+
+
+def prepare_dataset(
+    raw_root: Path,
+    processed_root: Path,
+    val_ratio: float,
+    seed: int,
+    incremental: bool = False,
+    link_mode: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, int]:
+    if link_mode is None:
+        link_mode = "hardlink" if incremental else "copy"
     users = collect_user_images(raw_root)
     if not users:
         raise ValueError(f"No images found in raw dataset directory: {raw_root}")
 
-    for split in ("train", "val"):
-        split_dir = processed_root / split
-        if split_dir.exists():
-            shutil.rmtree(split_dir)
-
-    for user_id, images in users.items():
-        train_images, val_images = split_images(images, val_ratio, rng)
-        copy_images(train_images, processed_root / "train" / user_id)
-        copy_images(val_images, processed_root / "val" / user_id)
-
-    print(f"Prepared dataset at {processed_root}. Users: {len(users)}.")
+    processed_root.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(processed_root, val_ratio, seed) if incremental else {}
+    if not incremental:
+        for split in SPLITS:
+            split_dir = processed_root / split
+            if split_dir.exists():
+                shutil.rmtree(split_dir)
+
+    # A matching signature is only trusted while the user's output files are all in place: a
+    # deleted or partially written user directory is redone.
+    changed = [
+        user_id
+        for user_id, images in users.items()
+        if previous.get(user_id, {}).get("signature") != user_signature(images)
+        or not outputs_present(processed_root, user_id, previous[user_id])
+    ]
+    removed = [user_id for user_id in previous if user_id not in users]
+    manifest_users = {user_id: entry for user_id, entry in previous.items() if user_id in users}
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for user_id in removed:
+            for split in SPLITS:
+                shutil.rmtree(processed_root / split / user_id, ignore_errors=True)
+        futures = {
+            user_id: executor.submit(prepare_user, user_id, users[user_id], processed_root, val_ratio, seed, link_mode)
+            for user_id in changed
+        }
+        for user_id, future in futures.items():
+            manifest_users[user_id] = future.result()
+
+    write_split_index(processed_root, manifest_users)
+    manifest = {"val_ratio": val_ratio, "seed": seed, "users": manifest_users}
+    temporary = processed_root / f".{MANIFEST_NAME}.tmp"
+    temporary.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(temporary, processed_root / MANIFEST_NAME)
+
+    print(
+        f"Prepared dataset at {processed_root}. Users: {len(users)} "
+        f"({len(changed)} updated, {len(users) - len(changed)} unchanged, {len(removed)} removed)."
+    )
+    return {"users": len(users), "updated": len(changed), "removed": len(removed)}
 
 
 def main() -> None:
@@ -66,15 +220,34 @@ def main() -> None:
     parser.add_argument("--processed-root", type=str, default="datasets/processed/face", help="Output directory")
     parser.add_argument("--val-ratio", type=float, default=0.2, help="Validation split ratio")
     parser.add_argument("--seed", type=int, default=42, help="Random seed for shuffling")
+    parser.add_argument("--incremental", action="store_true", help="Only redo users whose raw images changed")
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default=None,
+        help=(
+            "How processed files refer to raw files (default: hardlink with --incremental, else copy). "
+            "A hardlink shares the raw file's inode: editing the processed file in place also changes "
+            "the raw sample, whose content-addressed name then no longer matches it."
+        ),
+    )
+    parser.add_argument("--workers", type=int, default=None, help="I/O threads")
     args = parser.parse_args()
 
     raw_root = Path(args.raw_root)
     processed_root = Path(args.processed_root)
     processed_root.mkdir(parents=True, exist_ok=True)
 
-    prepare_dataset(raw_root, processed_root, args.val_ratio, args.seed)
+    prepare_dataset(
+        raw_root,
+        processed_root,
+        args.val_ratio,
+        args.seed,
+        incremental=args.incremental,
+        link_mode=args.link,
+        max_workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
     main()
-
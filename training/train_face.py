@@ -5,23 +5,27 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # add training/.. (project root)
+if not __package__:
+    # Run as a script: put the project root in place of training/, whose datasets/ would
+    # shadow the HF ``datasets`` package.
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
 
 import argparse
 import yaml
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import DataLoader
-import torchvision.transforms as T
 
 from biometric_platform.core.config import load_app_config
+from biometric_platform.core.evaluation import verification_curve
 from biometric_platform.core.utils import import_string
 from biometric_platform.models.manager import ModelManager
 from biometric_platform.models.base import EmbeddingModel
-from training.datasets.lfw_pairs_dataset import LFWPairsDataset
+from training.datasets.lfw_pairs_dataset import LFWPairsDataset, SequentialPairStream
+from training.feature_cache import FeatureCache
 
 
 def load_config(config_path: str | Path) -> Dict[str, Any]:
@@ -47,21 +51,40 @@ def instantiate_embedding_model(model_cfg: Dict[str, Any]) -> Optional[Embedding
     return model
 
 
+def embedding_module(model: EmbeddingModel) -> nn.Module:
+    module = model.as_module()
+    if module is None:
+        raise TypeError(f"{type(model).__name__} has no tensor forward path (as_module() returned None)")
+    return module
+
+
 class SiameseWrapper(nn.Module):
-    def __init__(self, embedder: EmbeddingModel, device: torch.device, embedding_dim: int) -> None:
+    """
+    Embedding module (``EmbeddingModel.as_module()``) followed by a trainable projection.
+
+    The whole batch goes through the backbone in one forward. With
+    ``fine_tune_backbone=False`` the backbone is frozen and kept in eval mode, so only the
+    projection trains.
+    """
+
+    def __init__(self, backbone: nn.Module, embedding_dim: int, fine_tune_backbone: bool = False) -> None:
         super().__init__()
-        self.embedder = embedder
-        self.device = device
+        self.backbone = backbone
+        self.fine_tune_backbone = fine_tune_backbone
         self.projection = nn.Linear(embedding_dim, embedding_dim)
+        self.backbone.requires_grad_(fine_tune_backbone)
+
+    def train(self, mode: bool = True) -> "SiameseWrapper":
+        super().train(mode)
+        if not self.fine_tune_backbone:
+            self.backbone.eval()  # frozen BatchNorm statistics
+        return self
+
+    def trainable_parameters(self) -> Iterator[nn.Parameter]:
+        return (parameter for parameter in self.parameters() if parameter.requires_grad)
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        embeddings = []
-        for img in x:
-            img_np = (img.permute(1, 2, 0).cpu().numpy() * 255.0).astype("uint8")
-            embedding = self.embedder.embed(img_np)
-            embeddings.append(torch.tensor(embedding, device=self.device, dtype=torch.float32))
-        stacked = torch.stack(embeddings)
-        return self.projection(stacked)
+        return self.projection(self.backbone(x))
 
 
 def contrastive_loss(emb1: torch.Tensor, emb2: torch.Tensor, label: torch.Tensor, margin: float = 1.0) -> torch.Tensor:
@@ -91,34 +114,58 @@ def main() -> None:
     sample_dataset = LFWPairsDataset(
         arrow_dir=args.arrow_dir,
         split=args.split,
-        transform=T.Compose([T.Resize((160, 160)), T.ToTensor()]),
+        cache_dir=data_cfg.get("shard_cache_dir", "datasets/cache/face_shards"),
+        image_size=data_cfg.get("image_size", 160),
+        image_columns=data_cfg.get("image_columns", ("img_0", "img_1")),
+        label_column=data_cfg.get("label_column", "pair"),
     )
-    sample_img0, sample_img1, _ = sample_dataset[0]
-    embedding_sample = embedding_model.embed((sample_img0.permute(1, 2, 0).numpy() * 255).astype("uint8"))
-    embedding_dim = len(embedding_sample)
-    wrapper = SiameseWrapper(embedding_model, device, embedding_dim).to(device)
-
-    dataloader = DataLoader(
-        sample_dataset,
-        batch_size=data_cfg.get("batch_size", 32),
-        shuffle=True,
-        num_workers=data_cfg.get("num_workers", 4),
-    )
-
-    optimizer = None if args.eval_only else optim.Adam(wrapper.parameters(), lr=train_cfg["learning_rate"], weight_decay=train_cfg["weight_decay"])
+    backbone = embedding_module(embedding_model).to(device)
+    sample_img0, _, _ = sample_dataset[0]
+    with torch.no_grad():
+        embedding_dim = backbone.eval()(sample_img0.unsqueeze(0).to(device)).shape[1]
+    fine_tune = bool(train_cfg.get("fine_tune_backbone", False)) and not args.eval_only
+    wrapper = SiameseWrapper(backbone, embedding_dim, fine_tune_backbone=fine_tune).to(device)
+
+    # A frozen backbone embeds each image once; epochs then only run the projection head.
+    cache_dir = data_cfg.get("feature_cache_dir")
+    if cache_dir and not fine_tune:
+        cache = FeatureCache.for_module(cache_dir, f"lfw_pairs/{args.split}", backbone, embedding_dim)
+        train_dataset = cache.pair_features(
+            sample_dataset,
+            backbone,
+            device,
+            batch_size=data_cfg.get("batch_size", 32),
+            num_workers=data_cfg.get("num_workers", 4),
+        )
+        head: nn.Module = wrapper.projection
+        print(f"Feature cache: {len(cache)} images in {cache.directory}")
+        dataloader = DataLoader(train_dataset, batch_size=data_cfg.get("batch_size", 32), shuffle=True)
+    else:
+        # Workers stream contiguous blocks of pairs from the decoded shards.
+        train_dataset, head = SequentialPairStream(sample_dataset, block_size=data_cfg.get("block_size", 512)), wrapper
+        dataloader = DataLoader(
+            train_dataset,
+            batch_size=data_cfg.get("batch_size", 32),
+            num_workers=data_cfg.get("num_workers", 4),
+        )
+
+    optimizer = None if args.eval_only else optim.Adam(wrapper.trainable_parameters(), lr=train_cfg["learning_rate"], weight_decay=train_cfg["weight_decay"])
     margin = train_cfg.get("contrastive_margin", 1.0)
 
     for epoch in range(1 if args.eval_only else train_cfg["epochs"]):
         wrapper.train(not args.eval_only)
-        epoch_loss = 0.0
+        if isinstance(train_dataset, SequentialPairStream):
+            train_dataset.set_epoch(epoch)
+        epoch_loss, steps = 0.0, 0
+        pair_scores, pair_labels = [], []
         with torch.set_grad_enabled(not args.eval_only):
             for img0, img1, label in dataloader:
                 img0 = img0.to(device)
                 img1 = img1.to(device)
                 label = label.to(device)
 
-                emb0 = wrapper(img0)
-                emb1 = wrapper(img1)
+                # Both sides of every pair in a single forward.
+                emb0, emb1 = head(torch.cat([img0, img1])).chunk(2)
 
                 loss = contrastive_loss(emb0, emb1, label, margin)
 
@@ -128,10 +175,20 @@ def main() -> None:
                     optimizer.step()
 
                 epoch_loss += loss.item()
+                steps += 1
+                if args.eval_only:
+                    pair_scores.append(nn.functional.cosine_similarity(emb0, emb1).cpu())
+                    pair_labels.append(label.cpu())
 
-        avg_loss = epoch_loss / len(dataloader)
+        avg_loss = epoch_loss / max(steps, 1)
         if args.eval_only:
             print(f"Evaluation - Loss: {avg_loss:.4f}")
+            # Operating point of the projected embeddings (see training/evaluate_face.py for the deployed embedder).
+            summary = verification_curve(torch.cat(pair_scores).numpy(), torch.cat(pair_labels).numpy()).summary()
+            print(f"Evaluation - EER: {summary['eer']:.4f} at threshold {summary['eer_threshold']:.4f}")
+            for name, point in summary.items():
+                if name.startswith("tar@"):
+                    print(f"Evaluation - {name}: {point['tar']:.4f} at threshold {point['threshold']:.4f}")
         else:
             print(f"Epoch {epoch + 1}/{train_cfg['epochs']} - Loss: {avg_loss:.4f}")
 